@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPORT_SCHEMA_VERSION = 'v1'
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+SRC_DIR = Path(__file__).resolve().parents[1] / 'src'
+
+
+@dataclass
+class BenchResult:
+    name: str
+    params: dict[str, int | float | str]
+    rounds: int
+    iterations: int
+    min_us: float
+    median_us: float
+    mean_us: float
+    p95_us: float
+    stdev_us: float
+    ops_per_sec: float
+    extra: dict[str, int | float | str] = field(default_factory=dict)
+
+
+def ensure_src_on_path() -> None:
+    if str(SRC_DIR) not in sys.path:
+        sys.path.insert(0, str(SRC_DIR))
+
+
+def measure(
+    name: str,
+    fn: Callable[[], object],
+    *,
+    params: dict[str, int | float | str] | None = None,
+    rounds: int = 5,
+    min_round_seconds: float = 0.05,
+    max_iterations: int = 100_000,
+    extra: dict[str, int | float | str] | None = None,
+) -> BenchResult:
+    iterations = _calibrate(fn, min_round_seconds, max_iterations)
+    samples_us: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    try:
+        for _ in range(rounds):
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter_ns()
+            for _ in range(iterations):
+                fn()
+            elapsed_ns = time.perf_counter_ns() - start
+            if gc_was_enabled:
+                gc.enable()
+            samples_us.append(elapsed_ns / iterations / 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(name, samples_us, params=params, iterations=iterations, extra=extra)
+
+
+def summarize(
+    name: str,
+    samples_us: list[float],
+    *,
+    params: dict[str, int | float | str] | None = None,
+    iterations: int = 1,
+    extra: dict[str, int | float | str] | None = None,
+) -> BenchResult:
+    ordered = sorted(samples_us)
+    median_us = statistics.median(ordered)
+    return BenchResult(
+        name=name,
+        params=params or {},
+        rounds=len(ordered),
+        iterations=iterations,
+        min_us=round(ordered[0], 3),
+        median_us=round(median_us, 3),
+        mean_us=round(statistics.fmean(ordered), 3),
+        p95_us=round(_percentile(ordered, 0.95), 3),
+        stdev_us=round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+        ops_per_sec=round(1_000_000 / median_us, 2) if median_us > 0 else 0.0,
+        extra=extra or {},
+    )
+
+
+def build_report(suite: str, results: list[BenchResult]) -> dict:
+    return {
+        'schema_version': REPORT_SCHEMA_VERSION,
+        'suite': suite,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'git': _git_metadata(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': [asdict(result) for result in results],
+    }
+
+
+def write_report(report: dict, output: str | None = None) -> Path:
+    if output:
+        path = Path(output)
+    else:
+        commit = report['git']['commit'] or 'nogit'
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        path = RESULTS_DIR / f"{report['suite']}-{commit[:12]}-{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    return path
+
+
+def compare_reports(current: dict, baseline: dict) -> list[dict[str, str | float | None]]:
+    baseline_by_key = {_result_key(item): item for item in baseline.get('results', [])}
+    rows = []
+    for item in current.get('results', []):
+        previous = baseline_by_key.get(_result_key(item))
+        ratio = None
+        if previous and previous['median_us'] > 0:
+            ratio = round(item['median_us'] / previous['median_us'], 3)
+        rows.append(
+            {
+                'name': item['name'],
+                'params': json.dumps(item['params'], sort_keys=True),
+                'median_us': item['median_us'],
+                'baseline_median_us': previous['median_us'] if previous else None,
+                'ratio': ratio,
+            }
+        )
+    return rows
+
+
+def print_results(results: list[BenchResult], stream=sys.stdout) -> None:
+    for result in results:
+        params = ' '.join(f'{key}={value}' for key, value in result.params.items())
+        stream.write(
+            f'{result.name:<42} {params:<28} median={result.median_us:>12.3f}us '
+            f'p95={result.p95_us:>12.3f}us ops/s={result.ops_per_sec:>12.2f}\n'
+        )
+
+
+def print_comparison(rows: list[dict[str, str | float | None]], stream=sys.stdout) -> None:
+    for row in rows:
+        ratio = f"{row['ratio']:.3f}x" if row['ratio'] is not None else 'new'
+        stream.write(f"{row['name']:<42} {row['params']:<40} {ratio}\n")
+
+
+def _calibrate(fn: Callable[[], object], min_round_seconds: float, max_iterations: int) -> int:
+    iterations = 1
+    while iterations < max_iterations:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_seconds:
+            break
+        iterations = min(iterations * 2, max_iterations)
+    return iterations
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _result_key(item: dict) -> str:
+    return f"{item['name']}|{json.dumps(item['params'], sort_keys=True)}"
+
+
+def _git_metadata() -> dict[str, str | bool | None]:
+    root = Path(__file__).resolve().parents[1]
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+        dirty = bool(
+            subprocess.run(
+                ['git', 'status', '--porcelain', '--untracked-files=no'],
+                cwd=root,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=5,
+            ).stdout.strip()
+        )
+    except (OSError, subprocess.SubprocessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
@@ -0,0 +1,512 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from benchmarks._harness import (
+    BenchResult,
+    build_report,
+    compare_reports,
+    ensure_src_on_path,
+    measure,
+    print_comparison,
+    print_results,
+    summarize,
+    write_report,
+)
+
+ensure_src_on_path()
+
+from orchestrator.api.schemas import (  # noqa: E402
+    MAX_COMPONENT_DEPTH,
+    MAX_COMPONENTS_PER_TYPE,
+    MAX_COMPONENTS_PER_VIEW,
+    MAX_CONFIG_ENTRIES,
+    DashboardResponse,
+    QueryRequest,
+    ViewComponent,
+    ViewConfiguration,
+)
+from orchestrator.core.admin_rate_limit import InMemoryAdminRateLimiter  # noqa: E402
+from orchestrator.core.metrics import InMemoryMetrics  # noqa: E402
+from orchestrator.core.popularity import HeavyHitters  # noqa: E402
+from orchestrator.core.shared_metrics import SharedMetrics  # noqa: E402
+from orchestrator.core.time_range import parse_time_range  # noqa: E402
+from orchestrator.core.view_config_store import ViewConfigStore  # noqa: E402
+from orchestrator.datasets.charts import ChartSpec, aggregate  # noqa: E402
+from orchestrator.datasets.columnar import ColumnarTable  # noqa: E402
+from orchestrator.datasets.details import DetailStore  # noqa: E402
+from orchestrator.datasets.partitions import PartitionedDataset, write_partitions  # noqa: E402
+from orchestrator.datasets.rollups import Rollup, RollupConfig  # noqa: E402
+from orchestrator.datasets.search import SearchIndex  # noqa: E402
+from orchestrator.datasets.wire import columnar_page  # noqa: E402
+
+SUITE = 'micro'
+FULL_SIZES = {
+    'view_store_views': [10, 1_000, 10_000],
+    'dashboard_rows': [1_000, 100_000],
+    'metrics_threads': [1, 4, 16],
+    'metrics_ops_per_thread': 20_000,
+    'rate_limiter_keys': [100, 10_000, 100_000],
+    'detail_messages': [100, 10_000],
+}
+QUICK_SIZES = {
+    'view_store_views': [10, 100],
+    'dashboard_rows': [100, 1_000],
+    'metrics_threads': [1, 4],
+    'metrics_ops_per_thread': 1_000,
+    'rate_limiter_keys': [100, 1_000],
+    'detail_messages': [100, 1_000],
+}
+SYSTEMS = ['hipotecas', 'prestamos', 'seguros', 'tarjetas', 'inversion']
+RESOLUTIONS = ['Completada', 'En curso', 'Escalada', 'Abandonada']
+
+
+def view_at_limits(view_id: str = 'vista-limite', system: str = 'hipotecas') -> dict:
+    leaf_types = [('cards', '/cards'), ('table', '/dashboard'), ('detail', '/dashboard_detail'), ('chart', '/dashboard')]
+    containers = ['stack', 'split', 'stack'][: MAX_COMPONENT_DEPTH - 1]
+    leaves_needed = MAX_COMPONENTS_PER_VIEW - len(containers)
+    config = {f'option_{idx}': idx for idx in range(MAX_CONFIG_ENTRIES)}
+
+    leaves = []
+    type_counts: dict[str, int] = {}
+    for idx in range(leaves_needed):
+        component_type, data_source = leaf_types[idx % len(leaf_types)]
+        if type_counts.get(component_type, 0) >= MAX_COMPONENTS_PER_TYPE:
+            component_type, data_source = 'text', '/none'
+        type_counts[component_type] = type_counts.get(component_type, 0) + 1
+        leaves.append(
+            {
+                'id': f'{component_type}-{idx}',
+                'type': component_type,
+                'title': f'Componente {idx}',
+                'data_source': data_source,
+                'position': idx,
+                'config': config,
+            }
+        )
+
+    # Anida los contenedores hasta MAX_COMPONENT_DEPTH; las hojas quedan en el nivel mas profundo.
+    node_children = leaves
+    for depth, container_type in enumerate(reversed(containers)):
+        node_children = [
+            {
+                'id': f'{container_type}-{depth}',
+                'type': container_type,
+                'title': f'Layout {depth}',
+                'data_source': '/none',
+                'position': 0,
+                'children': node_children,
+            }
+        ]
+    return {'id': view_id, 'name': f'Vista {view_id}', 'system': system, 'enabled': True, 'components': node_children}
+
+
+def dashboard_payload(rows: int) -> dict:
+    columns = [
+        {'key': 'id', 'label': 'Id', 'sortable': True},
+        {'key': 'fecha_hora', 'label': 'Fecha · Hora', 'sortable': True},
+        {'key': 'numero_entrante', 'label': 'Numero entrante', 'filterable': True},
+        {'key': 'nombre_cliente', 'label': 'Nombre del cliente', 'filterable': True},
+        {'key': 'razones_llamada', 'label': 'Razones de la llamada', 'filterable': True},
+        {'key': 'duracion', 'label': 'Duracion', 'sortable': True},
+        {'key': 'resolucion', 'label': 'Resolucion', 'filterable': True, 'sortable': True},
+        {'key': 'detail', 'label': 'Detalle'},
+    ]
+    table_rows = [
+        {
+            'id': f'conv-{idx:07d}',
+            'detail': {'action': 'Ver detalle'},
+            'fecha_hora': f'{1 + idx % 28:02d}-02-2026 · {idx % 24:02d}:{idx % 60:02d}',
+            'numero_entrante': f'+34{600000000 + idx}',
+            'nombre_cliente': f'Cliente {idx % 5000}',
+            'razones_llamada': f'Motivo {idx % 40}',
+            'duracion': f'{idx % 15} min {idx % 60} s',
+            'resolucion': RESOLUTIONS[idx % len(RESOLUTIONS)],
+        }
+        for idx in range(rows)
+    ]
+    return {'table': {'columns': columns, 'rows': table_rows, 'nextCursor': None}}
+
+
+def bench_view_configuration(sizes: dict, rounds: int) -> list[BenchResult]:
+    payload = view_at_limits()
+    ViewConfiguration.model_validate(payload)
+    return [
+        measure(
+            'view_configuration.model_validate',
+            lambda: ViewConfiguration.model_validate(payload),
+            params={'components': MAX_COMPONENTS_PER_VIEW, 'depth': MAX_COMPONENT_DEPTH},
+            rounds=rounds,
+        )
+    ]
+
+
+def bench_view_store(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for views in sizes['view_store_views']:
+            storage = Path(tmp_dir) / f'view_configs_{views}.json'
+            items = [view_at_limits(f'vista-{idx}', SYSTEMS[idx % len(SYSTEMS)]) for idx in range(views)]
+            storage.write_text(json.dumps(items), encoding='utf-8')
+            store = ViewConfigStore(str(storage))
+            results.append(
+                measure(
+                    'view_config_store.list_configs',
+                    store.list_configs,
+                    params={'views': views, 'filter': 'none'},
+                    rounds=rounds,
+                )
+            )
+            results.append(
+                measure(
+                    'view_config_store.list_configs',
+                    lambda: store.list_configs(system='hipotecas', enabled=True),
+                    params={'views': views, 'filter': 'system+enabled'},
+                    rounds=rounds,
+                )
+            )
+    return results
+
+
+def bench_metrics(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    ops_per_thread = sizes['metrics_ops_per_thread']
+    for threads in sizes['metrics_threads']:
+        samples_us = []
+        for _ in range(rounds):
+            metrics = InMemoryMetrics()
+            elapsed = _run_threads(threads, lambda worker: _observe_loop(metrics, worker, ops_per_thread))
+            samples_us.append(elapsed / (threads * ops_per_thread) * 1_000_000)
+        results.append(
+            summarize(
+                'in_memory_metrics.observe_request',
+                samples_us,
+                params={'threads': threads},
+                iterations=threads * ops_per_thread,
+            )
+        )
+    with tempfile.TemporaryDirectory() as directory:
+        shared = SharedMetrics(directory)
+        statuses = (200, 200, 200, 404, 500)
+        picker = random.Random(7)
+        results.append(
+            measure(
+                'shared_metrics.observe_request',
+                lambda: shared.observe_request('POST', '/cards', statuses[picker.randrange(5)], picker.random() * 50, 'hipotecas'),
+                rounds=rounds,
+            )
+        )
+        results.append(measure('shared_metrics.snapshot', shared.snapshot, rounds=rounds))
+    return results
+
+
+def bench_rate_limiter(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    for keys in sizes['rate_limiter_keys']:
+        limiter = InMemoryAdminRateLimiter(max_requests=1_000_000, window_seconds=3600)
+        client_keys = [f'10.{idx // 65536 % 256}.{idx // 256 % 256}.{idx % 256}' for idx in range(keys)]
+        for client_key in client_keys:
+            limiter.allow(client_key)
+        picker = random.Random(keys)
+        results.append(
+            measure(
+                'in_memory_admin_rate_limiter.allow',
+                lambda: limiter.allow(client_keys[picker.randrange(keys)]),
+                params={'keys': keys},
+                rounds=rounds,
+            )
+        )
+    return results
+
+
+def bench_heavy_hitters(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    for keys in sizes['rate_limiter_keys']:
+        hitters = HeavyHitters(k=64)
+        # Trafico tipo Zipf: pocas consultas concentran casi todas las peticiones.
+        query_keys = [('hipotecas', 'dashboard', f'{{"limit":25,"search":"q{idx}"}}') for idx in range(keys)]
+        weights = [1 / (rank + 1) for rank in range(keys)]
+        stream = random.Random(keys).choices(query_keys, weights=weights, k=10_000)
+        position = iter(range(10**12))
+        results.append(
+            measure(
+                'heavy_hitters.add',
+                lambda: hitters.add(stream[next(position) % 10_000]),
+                params={'keys': keys},
+                rounds=rounds,
+            )
+        )
+    return results
+
+
+def bench_dashboard_response(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    for rows in sizes['dashboard_rows']:
+        payload = dashboard_payload(rows)
+        results.append(
+            measure(
+                'dashboard_response.model_validate',
+                lambda: DashboardResponse.model_validate(payload),
+                params={'rows': rows},
+                rounds=rounds,
+                min_round_seconds=0.0 if rows >= 100_000 else 0.05,
+            )
+        )
+    return results
+
+
+def bench_columnar_table(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    filtered = QueryRequest.model_validate(
+        {'filters': {'resolucion': ['Completada', 'Escalada']}, 'sort': [{'field': 'fecha_hora', 'direction': 'desc'}], 'limit': 25}
+    )
+    for rows in sizes['dashboard_rows']:
+        payload = dashboard_payload(rows)
+        build_samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            table = ColumnarTable.from_payload(payload)
+            build_samples.append((time.perf_counter() - start) * 1_000_000)
+        table.warm()
+        stats = table.stats()
+        results.append(
+            summarize('columnar_table.build', build_samples, params={'rows': rows}, extra={'bytes': stats['bytes'], 'numpy': str(stats['numpy'])})
+        )
+        results.append(measure('columnar_table.query', lambda: table.query(QueryRequest(limit=25), 25, 100), params={'rows': rows, 'query': 'page'}, rounds=rounds))
+        results.append(measure('columnar_table.query', lambda: table.query(filtered, 25, 100), params={'rows': rows, 'query': 'filter+sort'}, rounds=rounds))
+    return results
+
+
+def bench_search_index(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    queries = {'exact': 'escalada', 'prefix': '+346000', 'multi': 'cliente 42 motivo 7'}
+    for rows in sizes['dashboard_rows']:
+        table = ColumnarTable.from_payload(dashboard_payload(rows))
+        table.warm()
+        build_samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            index = SearchIndex.from_table(table)
+            build_samples.append((time.perf_counter() - start) * 1_000_000)
+        stats = index.stats()
+        results.append(summarize('search_index.build', build_samples, params={'rows': rows}, extra={'bytes': stats['bytes'], 'tokens': stats['tokens']}))
+        for name, text in queries.items():
+            req = QueryRequest(search=text, limit=25)
+            results.append(measure('search_index.query', lambda req=req: table.query(req, 25, 100, index), params={'rows': rows, 'query': name}, rounds=rounds))
+    return results
+
+
+def bench_chart_aggregation(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    charts = {
+        'group': {'group_by': 'resolucion'},
+        'hour': {'bucket': 'hour'},
+        'group+minute': {'group_by': 'resolucion', 'bucket': 'minute', 'max_points': 200},
+    }
+    for rows in sizes['dashboard_rows']:
+        table = ColumnarTable.from_payload(dashboard_payload(rows))
+        for name, config in charts.items():
+            spec = ChartSpec.from_component(ViewComponent(id=name, type='chart', title=name, data_source='/dashboard', config=config))
+            payload_bytes = len(aggregate(table, None, spec).model_dump_json())
+            results.append(
+                measure(
+                    'chart_aggregation.aggregate',
+                    lambda spec=spec: aggregate(table, None, spec),
+                    params={'rows': rows, 'chart': name},
+                    rounds=rounds,
+                    extra={'bytes': payload_bytes},
+                )
+            )
+    return results
+
+
+def bench_partitioned_dataset(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    windows = {'1d': '2026-02-14/2026-02-15', '7d': '2026-02-08/2026-02-15', 'all': None}
+    req = QueryRequest.model_validate({'filters': {'resolucion': 'Escalada'}, 'sort': [{'field': 'fecha_hora', 'direction': 'desc'}], 'limit': 25})
+    for rows in sizes['dashboard_rows']:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_partitions(tmp_dir, dashboard_payload(rows))
+            for name, window in windows.items():
+                time_range = parse_time_range(window)
+                # Apertura en frio: solo se leen las particiones de la ventana.
+                start = time.perf_counter()
+                dataset = PartitionedDataset.open(tmp_dir)
+                dataset.query(req, time_range, 25, 100)
+                cold_us = (time.perf_counter() - start) * 1_000_000
+                results.append(
+                    measure(
+                        'partitioned_dataset.query',
+                        lambda dataset=dataset, time_range=time_range: dataset.query(req, time_range, 25, 100),
+                        params={'rows': rows, 'window': name},
+                        rounds=rounds,
+                        extra={'cold_us': round(cold_us, 1), 'partitions_loaded': dataset.stats()['loads']},
+                    )
+                )
+    return results
+
+
+def bench_rollup_cards(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    config = RollupConfig.model_validate(
+        {
+            'cards': [
+                {'title': 'Conversaciones', 'metric': 'count'},
+                {'title': 'Tasa de resolucion', 'metric': 'ratio', 'field': 'resolucion', 'value': 'Completada'},
+                {'title': 'Duracion media', 'metric': 'avg', 'field': 'duracion'},
+                {'title': 'Duracion p95', 'metric': 'percentile', 'field': 'duracion'},
+            ]
+        }
+    )
+    windows = {'1d': '2026-02-14/2026-02-15', '7d': '2026-02-08/2026-02-15', 'all': None}
+    for rows in sizes['dashboard_rows']:
+        payload_rows = dashboard_payload(rows)['table']['rows']
+        rollup = Rollup(config)
+        rollup.add_rows(payload_rows)
+        for name, window in windows.items():
+            time_range = parse_time_range(window)
+            # Referencia: agregar de cero las filas de la ventana, que es lo que costaria sin rollups.
+            start = time.perf_counter()
+            scan = Rollup(config)
+            scan.add_rows(payload_rows)
+            scan.cards(time_range)
+            scan_us = (time.perf_counter() - start) * 1_000_000
+            results.append(
+                measure(
+                    'rollup.cards',
+                    lambda time_range=time_range: rollup.cards(time_range),
+                    params={'rows': rows, 'window': name},
+                    rounds=rounds,
+                    extra={'buckets': rollup.stats()['buckets'], 'scan_us': round(scan_us, 1)},
+                )
+            )
+    return results
+
+
+def bench_wire_format(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    table = ColumnarTable.from_payload(dashboard_payload(max(sizes['dashboard_rows'])))
+
+    def rows_page(req: QueryRequest) -> str:
+        return table.query(req, 25, 1000).model_dump_json()
+
+    def columnar(req: QueryRequest) -> str:
+        page, total, next_cursor = table.query_page(req, 25, 1000)
+        return columnar_page(table.columns, [(table, row) for row in page], next_cursor, total).model_dump_json()
+
+    for limit in (25, 500):
+        req = QueryRequest(limit=limit)
+        rows_bytes, columnar_bytes = len(rows_page(req).encode('utf-8')), len(columnar(req).encode('utf-8'))
+        for name, fn, size in (('rows', rows_page, rows_bytes), ('columnar', columnar, columnar_bytes)):
+            extra = {'bytes': size}
+            if name == 'columnar':
+                extra['reduction'] = round(rows_bytes / columnar_bytes, 2)
+            results.append(measure('wire_format.dashboard_page', lambda fn=fn, req=req: fn(req), params={'limit': limit, 'format': name}, rounds=rounds, extra=extra))
+    return results
+
+
+def bench_detail_window(sizes: dict, rounds: int) -> list[BenchResult]:
+    results = []
+    for messages in sizes['detail_messages']:
+        detail = {
+            'id': 'conv-1',
+            'left': {'messages': [{'role': 'cliente' if index % 2 else 'agente', 'text': f'Mensaje {index} sobre la cuota de la hipoteca'} for index in range(messages)]},
+            'right': [{'type': 'kv', 'title': 'Cliente', 'items': [{'key': 'Nombre', 'value': 'Cliente 1'}]}],
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'dashboard_details.jsonl'
+            path.write_text(json.dumps(detail) + '\n', encoding='utf-8')
+            store = DetailStore(path)
+            for name, window in (('full', {}), ('first_50', {'messages_limit': 50}), ('last_50', {'messages_limit': 50, 'messages_cursor': f'-{messages}'})):
+                results.append(
+                    measure(
+                        'detail_window.get',
+                        lambda window=window: store.get('conv-1', **window).model_dump_json(),
+                        params={'messages': messages, 'window': name},
+                        rounds=rounds,
+                    )
+                )
+    return results
+
+
+BENCHMARKS: dict[str, Callable[[dict, int], list[BenchResult]]] = {
+    'view_configuration': bench_view_configuration,
+    'view_store': bench_view_store,
+    'metrics': bench_metrics,
+    'rate_limiter': bench_rate_limiter,
+    'heavy_hitters': bench_heavy_hitters,
+    'dashboard_response': bench_dashboard_response,
+    'columnar_table': bench_columnar_table,
+    'search_index': bench_search_index,
+    'chart_aggregation': bench_chart_aggregation,
+    'partitioned_dataset': bench_partitioned_dataset,
+    'rollup_cards': bench_rollup_cards,
+    'wire_format': bench_wire_format,
+    'detail_window': bench_detail_window,
+}
+
+
+def run(only: list[str] | None = None, quick: bool = False, rounds: int | None = None) -> list[BenchResult]:
+    sizes = QUICK_SIZES if quick else FULL_SIZES
+    effective_rounds = rounds or (3 if quick else 5)
+    results: list[BenchResult] = []
+    for name, bench in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        results.extend(bench(sizes, effective_rounds))
+    return results
+
+
+def _observe_loop(metrics: InMemoryMetrics, worker: int, ops: int) -> None:
+    case = SYSTEMS[worker % len(SYSTEMS)]
+    for idx in range(ops):
+        metrics.observe_request('POST', '/dashboard', 200 if idx % 50 else 502, 12.5, case)
+
+
+def _run_threads(threads: int, target: Callable[[int], None]) -> float:
+    barrier = threading.Barrier(threads + 1)
+
+    def runner(worker: int) -> None:
+        barrier.wait()
+        target(worker)
+
+    workers = [threading.Thread(target=runner, args=(idx,)) for idx in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks de las piezas Python calientes del orquestador.')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='Ejecuta solo este benchmark.')
+    parser.add_argument('--quick', action='store_true', help='Tamanos reducidos para una pasada rapida.')
+    parser.add_argument('--rounds', type=int, default=None)
+    parser.add_argument('--output', default=None, help='Ruta del informe JSON (por defecto benchmarks/results/).')
+    parser.add_argument('--baseline', default=None, help='Informe previo con el que comparar medianas.')
+    args = parser.parse_args(argv)
+
+    results = run(only=args.only, quick=args.quick, rounds=args.rounds)
+    report = build_report(SUITE, results)
+    path = write_report(report, args.output)
+    print_results(results)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        print_comparison(compare_reports(report, baseline))
+    sys.stdout.write(f'report: {path}\n')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._harness import BenchResult, SRC_DIR, build_report, print_results, summarize, write_report
+
+SUITE = 'serve_scaling'
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_PATH = '/cards?caso_de_uso=hipotecas'
+READY_TIMEOUT_SECONDS = 30.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, extra_args: list[str] | None = None) -> subprocess.Popen:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get('PYTHONPATH')]))}
+    env.setdefault('LOG_REQUEST_SAMPLE_RATE', '0')
+    command = [sys.executable, '-m', 'orchestrator.serve', '--workers', str(workers), '--port', str(port), *(extra_args or [])]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(port: int, timeout_seconds: float = READY_TIMEOUT_SECONDS) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/ready')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f'server on port {port} not ready after {timeout_seconds}s')
+
+
+def stop_server(process: subprocess.Popen, timeout_seconds: float = 40.0) -> int:
+    process.send_signal(signal.SIGTERM)
+    return process.wait(timeout=timeout_seconds)
+
+
+def _client(port: int, path: str, duration_seconds: float) -> tuple[list[float], int]:
+    # Cliente keep-alive secuencial; la concurrencia la dan varios procesos para no competir por el GIL.
+    latencies_us: list[float] = []
+    errors = 0
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    body = b'{}'
+    headers = {'Content-Type': 'application/json'}
+    deadline = time.perf_counter() + duration_seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter_ns()
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except OSError:
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+            continue
+        latencies_us.append((time.perf_counter_ns() - start) / 1000)
+    connection.close()
+    return latencies_us, errors
+
+
+def load(port: int, path: str, concurrency: int, duration_seconds: float) -> tuple[list[float], int, float]:
+    with multiprocessing.get_context('spawn').Pool(concurrency) as pool:
+        start = time.perf_counter()
+        outcomes = pool.starmap(_client, [(port, path, duration_seconds)] * concurrency)
+        elapsed = time.perf_counter() - start
+    latencies_us = [value for samples, _ in outcomes for value in samples]
+    errors = sum(count for _, count in outcomes)
+    return latencies_us, errors, elapsed
+
+
+def run(worker_counts: list[int], concurrency: int, duration_seconds: float, path: str) -> list[BenchResult]:
+    results = []
+    for workers in worker_counts:
+        port = _free_port()
+        process = start_server(workers, port)
+        try:
+            wait_ready(port)
+            load(port, path, concurrency, min(duration_seconds, 1.0))
+            latencies_us, errors, elapsed = load(port, path, concurrency, duration_seconds)
+        finally:
+            stop_server(process)
+        results.append(
+            summarize(
+                f'serve.workers_{workers}',
+                latencies_us or [0.0],
+                params={'workers': workers, 'concurrency': concurrency, 'path': path},
+                extra={'requests': len(latencies_us), 'errors': errors, 'throughput_rps': round(len(latencies_us) / elapsed, 2)},
+            )
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Throughput de orchestrator.serve de 1 a N workers.')
+    parser.add_argument('--workers', type=int, action='append', help='Numero de workers a medir (repetible).')
+    parser.add_argument('--concurrency', type=int, default=16, help='Clientes keep-alive concurrentes.')
+    parser.add_argument('--duration', type=float, default=5.0, help='Segundos de carga por configuracion.')
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--output', default=None, help='Ruta del informe JSON (por defecto benchmarks/results/).')
+    args = parser.parse_args(argv)
+
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, max(cpus // 2, 1), cpus})
+    results = run(worker_counts, args.concurrency, args.duration, args.path)
+    report = build_report(SUITE, results)
+    report['cpus'] = cpus
+    path = write_report(report, args.output)
+    print_results(results)
+    baseline_rps = results[0].extra['throughput_rps'] or 1.0
+    for result in results:
+        rps = result.extra['throughput_rps']
+        sys.stdout.write(f"workers={result.params['workers']:<3} rps={rps:>10.1f} scaling={rps / baseline_rps:.2f}x errors={result.extra['errors']}\n")
+    sys.stdout.write(f'report: {path}\n')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks._harness import BenchResult, SRC_DIR, build_report, print_results, summarize, write_report
+
+SUITE = 'startup'
+APP_MODULE = 'orchestrator.main'
+# Modulos que el import de la app no debe arrastrar: se cargan con la primera vista/feature que los usa.
+LAZY_MODULES = ('httpx', 'yaml', 'urllib.request', 'orchestrator.api.admin', 'orchestrator.api.datops')
+DEFAULT_IMPORT_BUDGET_MS = 1500.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module} as target
+import_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+target.create_app()
+create_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{'import_ms': import_ms, 'create_app_ms': create_ms, 'lazy_loaded': {lazy_loaded}}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Convierte la salida de `-X importtime` en {modulo: (self_us, cumulative_us)}."""
+    modules: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|', 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def import_profile(module: str = APP_MODULE) -> dict:
+    """Importa la app en un interprete limpio con `-X importtime` y devuelve coste y modulos cargados."""
+    lazy_check = f'[name for name in {LAZY_MODULES!r} if name in sys.modules]'
+    probe = f'import sys\nimport {module}\nprint(__import__("json").dumps({lazy_check}))'
+    completed = _run_python(['-X', 'importtime', '-c', probe])
+    modules = parse_importtime(completed.stderr)
+    heaviest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {
+        'module': module,
+        'cumulative_ms': modules[module][1] / 1000,
+        'modules_imported': len(modules),
+        'lazy_loaded_on_import': json.loads(completed.stdout.strip().splitlines()[-1]),
+        'heaviest_self_ms': {name: round(self_us / 1000, 3) for name, (self_us, _) in heaviest},
+    }
+
+
+def cold_start_samples(rounds: int, module: str = APP_MODULE) -> list[dict]:
+    lazy_check = f'[name for name in {LAZY_MODULES!r} if name in sys.modules]'
+    probe = _PROBE.format(module=module, lazy_loaded=lazy_check)
+    return [json.loads(_run_python(['-c', probe]).stdout.strip().splitlines()[-1]) for _ in range(rounds)]
+
+
+def run(rounds: int = 5) -> tuple[list[BenchResult], dict]:
+    samples = cold_start_samples(rounds)
+    results = [
+        summarize('startup.import_app', [sample['import_ms'] * 1000 for sample in samples], params={'module': APP_MODULE}),
+        summarize('startup.create_app', [sample['create_app_ms'] * 1000 for sample in samples], params={'module': APP_MODULE}),
+    ]
+    return results, import_profile()
+
+
+def _run_python(args: list[str]) -> subprocess.CompletedProcess:
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get('PYTHONPATH')]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Coste de arranque en frio del orquestador (import y create_app).')
+    parser.add_argument('--rounds', type=int, default=5, help='Interpretes limpios a lanzar.')
+    parser.add_argument('--budget-ms', type=float, default=None, help='Falla si el import acumulado supera este presupuesto.')
+    parser.add_argument('--output', default=None, help='Ruta del informe JSON (por defecto benchmarks/results/).')
+    args = parser.parse_args(argv)
+
+    results, profile = run(rounds=args.rounds)
+    report = build_report(SUITE, results)
+    report['import_profile'] = profile
+    path = write_report(report, args.output)
+    print_results(results)
+    sys.stdout.write(f"import acumulado: {profile['cumulative_ms']:.1f} ms ({profile['modules_imported']} modulos)\n")
+    for name, self_ms in profile['heaviest_self_ms'].items():
+        sys.stdout.write(f'  {self_ms:>8.2f} ms  {name}\n')
+    sys.stdout.write(f'report: {path}\n')
+    if profile['lazy_loaded_on_import']:
+        sys.stderr.write(f"modulos perezosos cargados al importar: {profile['lazy_loaded_on_import']}\n")
+        return 1
+    if args.budget_ms is not None and profile['cumulative_ms'] > args.budget_ms:
+        sys.stderr.write(f"import de {APP_MODULE} por encima del presupuesto: {profile['cumulative_ms']:.1f} > {args.budget_ms} ms\n")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,3 +1,11 @@
-from orchestrator.main import app
+from orchestrator.main import create_app
 
-__all__ = ['app']
+__all__ = ['app', 'create_app']
+
+
+def __getattr__(name: str):
+    if name == 'app':
+        from orchestrator.main import app
+
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
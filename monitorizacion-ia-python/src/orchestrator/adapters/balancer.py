@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, TypeVar
+
+from orchestrator.adapters.base import Adapter, AdapterContext
+from orchestrator.api.schemas import CardsResponse, DashboardDetailResponse, DashboardResponse, QueryRequest
+from orchestrator.core.errors import ErrorCode, OrchestratorError, is_upstream_failure
+from orchestrator.core.tracing import add_span_event
+from orchestrator.datasets.changes import PageDiffCache
+
+if TYPE_CHECKING:
+    from orchestrator.adapters.http_proxy import HttpProxyAdapter
+
+logger = logging.getLogger(__name__)
+
+BALANCING_ROUND_ROBIN = 'round_robin'
+BALANCING_LEAST_OUTSTANDING = 'least_outstanding'
+BALANCING_P2C = 'p2c'
+EWMA_ALPHA = 0.3
+DEFAULT_EJECT_AFTER_FAILURES = 3
+
+T = TypeVar('T')
+
+
+def _is_connect_failure(error: OrchestratorError) -> bool:
+    # Sin status la request no llego a procesarse: es seguro repetirla en otro endpoint.
+    return error.code == ErrorCode.UPSTREAM_ERROR and (error.detail or {}).get('status_code') is None
+
+
+class Endpoint:
+    """Estado de un endpoint upstream compartido por todas las vistas que lo usan."""
+
+    def __init__(self, url: str, adapter: HttpProxyAdapter) -> None:
+        self.url = url
+        self.adapter = adapter
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.ewma_ms = 0.0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.last_check_at: str | None = None
+        self.last_error: str | None = None
+
+    def load_score(self) -> float:
+        # Latencia esperada si se le envia una request mas; sin muestras (0.0) gana para que se mida.
+        return self.ewma_ms * (self.outstanding + 1)
+
+    def record_success(self, latency_ms: float | None = None) -> None:
+        if latency_ms is not None:
+            self.ewma_ms = latency_ms if self.ewma_ms == 0.0 else EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * self.ewma_ms
+        self.consecutive_failures = 0
+        if not self.healthy:
+            self.healthy = True
+            logger.info('upstream endpoint readmitted', extra={'fields': {'event': 'upstream_readmitted', 'url': self.url}})
+
+    def record_failure(self, error: Exception | str, eject_after: int) -> None:
+        self.consecutive_failures += 1
+        self.last_error = str(error) or type(error).__name__
+        if self.healthy and self.consecutive_failures >= eject_after:
+            self.healthy = False
+            self.ejections += 1
+            logger.warning(
+                'upstream endpoint ejected',
+                extra={'fields': {'event': 'upstream_ejected', 'url': self.url, 'failures': self.consecutive_failures, 'error': self.last_error}},
+            )
+
+    def to_dict(self, configured_timeout_ms: float | None = None) -> dict:
+        adaptive_timeouts = getattr(self.adapter, 'adaptive_timeouts', None)
+        return {
+            'url': self.url,
+            'healthy': self.healthy,
+            'outstanding': self.outstanding,
+            'requests': self.requests,
+            'errors': self.errors,
+            'ewma_latency_ms': round(self.ewma_ms, 2),
+            'consecutive_failures': self.consecutive_failures,
+            'ejections': self.ejections,
+            'last_check_at': self.last_check_at,
+            'last_error': self.last_error,
+            'adaptive_timeouts': (
+                adaptive_timeouts.describe(self.url, configured_timeout_ms or self.adapter.default_timeout_ms)
+                if adaptive_timeouts is not None
+                else []
+            ),
+        }
+
+
+class BalancedProxyAdapter(Adapter):
+    """Reparte las llamadas de una vista entre sus endpoints upstream segun la estrategia configurada.
+
+    Solo se eligen endpoints sanos; si todos estan expulsados se usan todos, porque rechazar sin intentarlo
+    convierte una degradacion parcial en una caida total. Un fallo de conexion se repite una vez en otro endpoint.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        strategy: str = BALANCING_ROUND_ROBIN,
+        eject_after_failures: int = DEFAULT_EJECT_AFTER_FAILURES,
+        rng: random.Random | None = None,
+        delta_cache_size: int = 256,
+    ) -> None:
+        if not endpoints:
+            raise ValueError('at least one upstream endpoint is required')
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.eject_after_failures = eject_after_failures
+        self._rng = rng or random.Random()
+        self._next = 0
+        # Deltas para upstreams que no entienden `since`: se comparan con la ultima pagina servida.
+        self.page_diffs = PageDiffCache(delta_cache_size) if delta_cache_size > 0 else None
+
+    def pick(self, exclude: Endpoint | None = None) -> Endpoint:
+        candidates = [endpoint for endpoint in self.endpoints if endpoint.healthy and endpoint is not exclude]
+        if not candidates:
+            candidates = [endpoint for endpoint in self.endpoints if endpoint is not exclude] or self.endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == BALANCING_LEAST_OUTSTANDING:
+            fewest = min(endpoint.outstanding for endpoint in candidates)
+            candidates = [endpoint for endpoint in candidates if endpoint.outstanding == fewest]
+        elif self.strategy == BALANCING_P2C:
+            first, second = self._rng.sample(candidates, 2)
+            return first if first.load_score() <= second.load_score() else second
+        endpoint = candidates[self._next % len(candidates)]
+        self._next += 1
+        return endpoint
+
+    async def _call(self, ctx: AdapterContext, operation: Callable[[HttpProxyAdapter], Awaitable[T]]) -> T:
+        endpoint = self.pick()
+        try:
+            return await self._call_endpoint(endpoint, operation)
+        except OrchestratorError as error:
+            if len(self.endpoints) == 1 or not _is_connect_failure(error) or (ctx.deadline is not None and ctx.deadline.expired):
+                raise
+            fallback = self.pick(exclude=endpoint)
+            add_span_event('upstream.failover', failed=endpoint.url, endpoint=fallback.url)
+            return await self._call_endpoint(fallback, operation)
+
+    async def _call_endpoint(self, endpoint: Endpoint, operation: Callable[[HttpProxyAdapter], Awaitable[T]]) -> T:
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        start = time.perf_counter()
+        try:
+            result = await operation(endpoint.adapter)
+        except OrchestratorError as error:
+            if is_upstream_failure(error):
+                endpoint.errors += 1
+                endpoint.record_failure(error.message, self.eject_after_failures)
+            raise
+        finally:
+            endpoint.outstanding -= 1
+        endpoint.record_success((time.perf_counter() - start) * 1000)
+        return result
+
+    async def get_cards(self, ctx: AdapterContext, req: QueryRequest) -> CardsResponse:
+        return await self._call(ctx, lambda adapter: adapter.get_cards(ctx, req))
+
+    async def get_dashboard(self, ctx: AdapterContext, req: QueryRequest) -> DashboardResponse:
+        response = await self._call(ctx, lambda adapter: adapter.get_dashboard(ctx, req))
+        if response.version is not None or self.page_diffs is None:
+            return response
+        response = self.page_diffs.respond(req, response)
+        add_span_event('dashboard.delta', decision='full' if response.delta is None else 'delta', source='page_diff')
+        return response
+
+    async def get_detail(self, ctx: AdapterContext, id: str, req: QueryRequest | None) -> DashboardDetailResponse:
+        return await self._call(ctx, lambda adapter: adapter.get_detail(ctx, id, req))
+
+    def stats(self, configured_timeout_ms: float | None = None) -> list[dict]:
+        return [endpoint.to_dict(configured_timeout_ms) for endpoint in self.endpoints]
+
+
+async def check_endpoint(endpoint: Endpoint, path: str, timeout_ms: int, eject_after: int) -> bool:
+    endpoint.last_check_at = datetime.now(timezone.utc).isoformat()
+    try:
+        status_code = await endpoint.adapter.ping(path, timeout_ms)
+    except Exception as error:  # noqa: BLE001 - cualquier fallo del ping cuenta como fallo del endpoint
+        endpoint.record_failure(error, eject_after)
+        return False
+    if status_code >= 500:
+        endpoint.record_failure(f'health check returned {status_code}', eject_after)
+        return False
+    endpoint.record_success()
+    return True
+
+
+async def run_health_checks(
+    endpoints: Callable[[], list[Endpoint]],
+    interval_s: float,
+    path: str,
+    timeout_ms: int,
+    eject_after: int,
+) -> None:
+    while True:
+        current = endpoints()
+        if current:
+            await asyncio.gather(*(check_endpoint(endpoint, path, timeout_ms, eject_after) for endpoint in current))
+        await asyncio.sleep(interval_s)
@@ -1,11 +1,20 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from orchestrator.api.schemas import (
     CardsResponse,
+    ChartResponse,
+    ColumnarDashboardResponse,
     DashboardDetailResponse,
     DashboardResponse,
     QueryRequest,
 )
+from orchestrator.core.deadline import Deadline
+
+if TYPE_CHECKING:
+    from orchestrator.datasets.charts import ChartSpec
 
 
 @dataclass
@@ -16,6 +25,7 @@ class AdapterContext:
     timeout_ms: int
     user: str | None = None
     roles: list[str] | None = None
+    deadline: Deadline | None = None
 
 
 class Adapter:
@@ -25,5 +35,34 @@ class Adapter:
     async def get_dashboard(self, ctx: AdapterContext, req: QueryRequest) -> DashboardResponse:
         raise NotImplementedError
 
+    async def get_dashboard_columnar(self, ctx: AdapterContext, req: QueryRequest) -> ColumnarDashboardResponse:
+        # Por defecto (upstreams remotos) se piden filas y se transcodifican aqui.
+        from orchestrator.datasets.wire import encode_dashboard
+
+        return encode_dashboard(await self.get_dashboard(ctx, req))
+
     async def get_detail(self, ctx: AdapterContext, id: str, req: QueryRequest | None) -> DashboardDetailResponse:
         raise NotImplementedError
+
+    async def get_chart(self, ctx: AdapterContext, spec: ChartSpec, req: QueryRequest) -> ChartResponse:
+        # Por defecto (upstreams remotos) se recorren las paginas de /dashboard y se agrega aqui: al navegador solo llega la serie.
+        # El motor de agregacion se importa aqui: la interfaz de adapters no depende de la capa de datasets.
+        from orchestrator.datasets.charts import CHART_PAGE_ROWS, aggregate, chart_from_cards
+        from orchestrator.datasets.columnar import ColumnarTable
+
+        if spec.data_source == '/cards':
+            return chart_from_cards(spec, await self.get_cards(ctx, req))
+        page_req = req.model_copy(
+            update={'sort': None, 'cursor': None, 'since': None, 'fields': spec.fields(), 'limit': min(spec.max_rows, CHART_PAGE_ROWS)}
+        )
+        columns: list[dict] = []
+        rows: list[dict] = []
+        while len(rows) < spec.max_rows:
+            page = await self.get_dashboard(ctx, page_req)
+            columns = [column.model_dump(exclude_none=True) for column in page.table.columns]
+            rows.extend(row.model_dump(exclude_none=True) for row in page.table.rows)
+            if not page.table.nextCursor or not page.table.rows:
+                break
+            page_req = page_req.model_copy(update={'cursor': page.table.nextCursor})
+        table = ColumnarTable.from_payload({'table': {'columns': columns, 'rows': rows[: spec.max_rows]}})
+        return aggregate(table, None, spec)
@@ -1,3 +1,8 @@
+import asyncio
+import json
+import re
+import time
+
 import httpx
 
 from orchestrator.adapters.base import Adapter, AdapterContext
@@ -7,7 +12,43 @@ from orchestrator.api.schemas import (
     DashboardResponse,
     QueryRequest,
 )
-from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.adaptive_timeout import AdaptiveTimeouts
+from orchestrator.core.deadline import Deadline, deadline_exceeded
+from orchestrator.core.errors import ErrorCode, OrchestratorError, is_upstream_failure
+from orchestrator.core.timing import (
+    STAGE_UPSTREAM_BODY,
+    STAGE_UPSTREAM_CONNECT,
+    STAGE_UPSTREAM_TTFB,
+    STAGE_VALIDATE,
+    record_stage,
+    timed_stage,
+)
+from orchestrator.core.tracing import SPAN_KIND_CLIENT, add_span_event, propagation_headers, start_child_span
+from orchestrator.datasets.details import window_payload
+from orchestrator.datasets.projection import project_payload, projected_fields
+
+# Campos de QueryRequest que solo entiende una operacion: al resto de upstreams no se les mandan.
+_DASHBOARD_ONLY = frozenset({'since', 'fields'})
+_DETAIL_ONLY = frozenset({'messages_limit', 'messages_cursor'})
+# Capacidades opcionales del upstream y los campos que las activan.
+CAPABILITY_PROJECTION = 'projection'
+CAPABILITY_MESSAGE_WINDOW = 'message_window'
+
+
+class _ConnectTrace:
+    """Mide el tiempo de conexion (TCP + TLS) a partir de la extension `trace` de httpcore."""
+
+    def __init__(self) -> None:
+        self.connect_ms = 0.0
+        self._connect_started: float | None = None
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        if event_name.endswith('connect_tcp.started'):
+            self._connect_started = time.perf_counter()
+        elif self._connect_started is not None and (
+            event_name.endswith('connect_tcp.complete') or event_name.endswith('start_tls.complete')
+        ):
+            self.connect_ms = (time.perf_counter() - self._connect_started) * 1000
 
 
 class HttpProxyAdapter(Adapter):
@@ -16,9 +57,27 @@ class HttpProxyAdapter(Adapter):
         base_url: str,
         default_timeout_ms: int,
         routes: dict[str, str] | None = None,
+        client: httpx.AsyncClient | None = None,
+        retries: int = 0,
+        retry_backoff_ms: int = 50,
+        min_attempt_ms: int = 50,
+        adaptive_timeouts: AdaptiveTimeouts | None = None,
+        capability_reprobe_s: float = 300.0,
     ):
         self.base_url = base_url
         self.default_timeout_ms = default_timeout_ms
+        self.client = client
+        self.retries = retries
+        self.retry_backoff_ms = retry_backoff_ms
+        self.min_attempt_ms = min_attempt_ms
+        self.adaptive_timeouts = adaptive_timeouts
+        # Se activa con la primera respuesta versionada; hasta entonces `since` no se manda a upstreams estrictos.
+        self.supports_delta = False
+        # Capacidad -> instante (monotonic) hasta el que no se usa porque el upstream rechazo sus campos. Pasado
+        # `capability_reprobe_s` se vuelve a probar: un upstream actualizado o un 400 puntual no la apagan para siempre.
+        # Mientras tanto la proyeccion y la ventana de mensajes se aplican aqui a la vuelta.
+        self.capability_reprobe_s = capability_reprobe_s
+        self._disabled_until: dict[str, float] = {}
         self.routes = {
             'cards': '/cards',
             'dashboard': '/dashboard',
@@ -26,35 +85,181 @@ class HttpProxyAdapter(Adapter):
             **(routes or {}),
         }
 
-    async def _post(self, path: str, payload: dict, timeout_ms: int) -> dict:
+    @property
+    def supports_projection(self) -> bool:
+        return self.supports(CAPABILITY_PROJECTION)
+
+    @property
+    def supports_message_window(self) -> bool:
+        return self.supports(CAPABILITY_MESSAGE_WINDOW)
+
+    def supports(self, capability: str) -> bool:
+        return time.monotonic() >= self._disabled_until.get(capability, 0.0)
+
+    async def _post(self, route: str, path: str, payload: dict, ctx: AdapterContext) -> dict:
         url = f"{self.base_url.rstrip('/')}{path}"
+        attributes = {'http.method': 'POST', 'http.url': url, 'caso_de_uso': ctx.caso_de_uso}
+        with start_child_span(f'POST {path}', kind=SPAN_KIND_CLIENT, attributes=attributes) as span:
+            decoded, status_code = await self._send(route, url, payload, ctx)
+            if span is not None:
+                span.set_attribute('http.status_code', status_code)
+            return decoded
+
+    def attempt_timeout_ms(self, route: str, configured_ms: float) -> float:
+        if self.adaptive_timeouts is None:
+            return configured_ms
+        return min(self.adaptive_timeouts.timeout_for(self.base_url, route, configured_ms), configured_ms)
+
+    async def _send(self, route: str, url: str, payload: dict, ctx: AdapterContext) -> tuple[dict, int]:
+        # Todos los intentos comparten el mismo deadline: cada reintento solo dispone de lo que queda.
+        deadline = ctx.deadline or Deadline.after_ms(ctx.timeout_ms)
+        attempt = 0
+        while True:
+            attempt_ms = min(self.attempt_timeout_ms(route, ctx.timeout_ms), deadline.remaining_ms())
+            if attempt_ms <= 0 or (attempt > 0 and attempt_ms < self.min_attempt_ms):
+                raise deadline_exceeded('upstream')
+            started = time.perf_counter()
+            try:
+                result = await self._attempt(url, payload, ctx, deadline, attempt_ms)
+            except OrchestratorError as error:
+                if error.code == ErrorCode.UPSTREAM_TIMEOUT and self.adaptive_timeouts is not None:
+                    self.adaptive_timeouts.observe_timeout(self.base_url, route)
+                if attempt >= self.retries or not is_upstream_failure(error):
+                    raise
+                attempt += 1
+                add_span_event('upstream.retry', attempt=attempt, code=str(error.code), remaining_ms=round(deadline.remaining_ms(), 1))
+            else:
+                self._observe_latency(route, (time.perf_counter() - started) * 1000)
+                return result
+            backoff_ms = min(self.retry_backoff_ms * 2 ** (attempt - 1), deadline.remaining_ms())
+            await asyncio.sleep(backoff_ms / 1000)
+
+    def _observe_latency(self, route: str, latency_ms: float) -> None:
+        if self.adaptive_timeouts is not None:
+            self.adaptive_timeouts.observe(self.base_url, route, latency_ms)
+
+    async def _attempt(self, url: str, payload: dict, ctx: AdapterContext, deadline: Deadline, attempt_ms: float) -> tuple[dict, int]:
+        trace = _ConnectTrace()
+        # El upstream recibe el presupuesto de este intento, no el de toda la request: al agotarse se reintenta.
+        headers = {**propagation_headers(ctx.request_id, ctx.trace_id), **deadline.shrink(attempt_ms).headers()}
         try:
-            async with httpx.AsyncClient(timeout=timeout_ms / 1000) as client:
-                res = await client.post(url, json=payload)
+            # httpx aplica el timeout por operacion (connect, lectura...); asyncio.timeout acota el intento completo.
+            async with asyncio.timeout(attempt_ms / 1000):
+                if self.client is not None:
+                    start, headers_at, res, body = await self._exchange(self.client, url, payload, headers, trace, attempt_ms)
+                else:
+                    async with httpx.AsyncClient() as client:
+                        start, headers_at, res, body = await self._exchange(client, url, payload, headers, trace, attempt_ms)
+        except TimeoutError as exc:
+            if deadline.expired:
+                raise deadline_exceeded('upstream') from exc
+            raise OrchestratorError(ErrorCode.UPSTREAM_TIMEOUT, 'Upstream timeout', 504) from exc
         except httpx.TimeoutException as exc:
             raise OrchestratorError(ErrorCode.UPSTREAM_TIMEOUT, 'Upstream timeout', 504) from exc
         except httpx.HTTPError as exc:
             raise OrchestratorError(ErrorCode.UPSTREAM_ERROR, 'Upstream connection error', 502) from exc
+
+        record_stage(STAGE_UPSTREAM_CONNECT, trace.connect_ms)
+        record_stage(STAGE_UPSTREAM_TTFB, (headers_at - start) * 1000 - trace.connect_ms)
         if res.status_code >= 400:
-            raise OrchestratorError(
-                ErrorCode.UPSTREAM_ERROR,
-                'Upstream returned error',
-                502,
-                detail={'status_code': res.status_code},
-            )
-        return res.json()
+            record_stage(STAGE_UPSTREAM_BODY, (time.perf_counter() - headers_at) * 1000)
+            detail = {'status_code': res.status_code}
+            if res.status_code in (400, 422):
+                # Solo los nombres de campos de la request que cita el error, nunca el cuerpo del upstream.
+                detail['rejected_fields'] = _mentioned_keys(body, payload)
+            raise OrchestratorError(ErrorCode.UPSTREAM_ERROR, 'Upstream returned error', 502, detail=detail)
+        decoded = json.loads(body)
+        record_stage(STAGE_UPSTREAM_BODY, (time.perf_counter() - headers_at) * 1000)
+        return decoded, res.status_code
+
+    @staticmethod
+    async def _exchange(
+        client: httpx.AsyncClient,
+        url: str,
+        payload: dict,
+        headers: dict[str, str],
+        trace: _ConnectTrace,
+        timeout_ms: float,
+    ) -> tuple[float, float, httpx.Response, bytes]:
+        upstream_request = client.build_request(
+            'POST', url, json=payload, headers=headers, timeout=timeout_ms / 1000, extensions={'trace': trace}
+        )
+        start = time.perf_counter()
+        res = await client.send(upstream_request, stream=True)
+        headers_at = time.perf_counter()
+        try:
+            body = await res.aread()
+        finally:
+            await res.aclose()
+        return start, headers_at, res, body
+
+    async def ping(self, path: str, timeout_ms: int) -> int:
+        url = f"{self.base_url.rstrip('/')}{path}"
+        if self.client is not None:
+            res = await self.client.get(url, timeout=timeout_ms / 1000)
+        else:
+            async with httpx.AsyncClient() as client:
+                res = await client.get(url, timeout=timeout_ms / 1000)
+        return res.status_code
+
+    async def _post_optional(
+        self, route: str, path: str, payload: dict, ctx: AdapterContext, capability: str, optional: tuple[str, ...]
+    ) -> dict:
+        """`_post` que, si el upstream rechaza con 400/422 una request con campos `optional`, la repite sin ellos.
+
+        La capacidad solo se apaga (durante `capability_reprobe_s`) si el error cita alguno de esos campos y la
+        request sin ellos sale bien; cualquier otro 400 no dice nada de lo que soporta el upstream.
+        """
+        sent = [key for key in optional if key in payload]
+        try:
+            return await self._post(route, path, payload, ctx)
+        except OrchestratorError as error:
+            detail = error.detail or {}
+            if not sent or detail.get('status_code') not in (400, 422):
+                raise
+            unsupported = any(key in detail.get('rejected_fields', ()) for key in sent)
+        add_span_event('upstream.optional_fields', decision='rejected' if unsupported else 'retried', fields=','.join(sent))
+        result = await self._post(route, path, {key: value for key, value in payload.items() if key not in sent}, ctx)
+        if unsupported:
+            self._disabled_until[capability] = time.monotonic() + self.capability_reprobe_s
+        return result
 
     async def get_cards(self, ctx: AdapterContext, req: QueryRequest) -> CardsResponse:
-        payload = await self._post(self.routes['cards'], req.model_dump(), ctx.timeout_ms)
-        return CardsResponse.model_validate(payload)
+        payload = await self._post('cards', self.routes['cards'], req.model_dump(exclude=_DASHBOARD_ONLY | _DETAIL_ONLY), ctx)
+        with timed_stage(STAGE_VALIDATE):
+            return CardsResponse.model_validate(payload)
 
     async def get_dashboard(self, ctx: AdapterContext, req: QueryRequest) -> DashboardResponse:
-        payload = await self._post(self.routes['dashboard'], req.model_dump(), ctx.timeout_ms)
-        return DashboardResponse.model_validate(payload)
+        fields = projected_fields(req)
+        body = req.model_dump(exclude=_DETAIL_ONLY | ({'fields'} if self.supports_delta else _DASHBOARD_ONLY))
+        if fields is not None and self.supports_projection:
+            body['fields'] = fields
+        payload = await self._post_optional('dashboard', self.routes['dashboard'], body, ctx, CAPABILITY_PROJECTION, ('fields',))
+        with timed_stage(STAGE_VALIDATE):
+            # Lo que el upstream mande de mas se descarta antes de validar.
+            response = DashboardResponse.model_validate(project_payload(payload, fields))
+        if response.version is not None:
+            self.supports_delta = True
+        return response
 
     async def get_detail(self, ctx: AdapterContext, id: str, req: QueryRequest | None) -> DashboardDetailResponse:
         detail_path = self.routes['dashboard_detail']
         if '{id}' in detail_path:
             detail_path = detail_path.replace('{id}', id)
-        payload = await self._post(detail_path, (req or QueryRequest()).model_dump(), ctx.timeout_ms)
-        return DashboardDetailResponse.model_validate(payload)
+        req = req or QueryRequest()
+        windowed = req.messages_limit is not None or req.messages_cursor is not None
+        exclude = _DASHBOARD_ONLY if windowed and self.supports_message_window else _DASHBOARD_ONLY | _DETAIL_ONLY
+        payload = await self._post_optional(
+            'dashboard_detail', detail_path, req.model_dump(exclude=exclude), ctx, CAPABILITY_MESSAGE_WINDOW, tuple(sorted(_DETAIL_ONLY))
+        )
+        if windowed and 'total' not in ((payload.get('left') if isinstance(payload, dict) else None) or {}):
+            # El upstream ha devuelto la conversacion entera: se recorta antes de validar.
+            payload = window_payload(payload, req.messages_limit, req.messages_cursor)
+        with timed_stage(STAGE_VALIDATE):
+            return DashboardDetailResponse.model_validate(payload)
+
+
+def _mentioned_keys(body: bytes, payload: dict) -> list[str]:
+    """Claves de `payload` que aparecen como palabra en el cuerpo de un error del upstream (p. ej. `loc` de un 422)."""
+    text = body[:4096].decode('utf-8', errors='replace')
+    return [key for key in payload if re.search(rf'(?<![A-Za-z0-9_]){re.escape(key)}(?![A-Za-z0-9_])', text)]
@@ -1,48 +1,556 @@
+import asyncio
 import json
+import logging
+import threading
+import time
+import weakref
+from collections import Counter
 from pathlib import Path
 
+from pydantic import BaseModel
+
 from orchestrator.adapters.base import Adapter, AdapterContext
-from orchestrator.api.schemas import CardsResponse, DashboardDetailResponse, DashboardResponse, QueryRequest
+from orchestrator.api.schemas import (
+    CardsResponse,
+    ChartResponse,
+    ColumnarDashboardResponse,
+    DashboardDetailResponse,
+    DashboardResponse,
+    QueryRequest,
+)
 from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.time_range import parse_time_range
+from orchestrator.core.timing import STAGE_DATASET, STAGE_QUERY, STAGE_VALIDATE, timed_stage
+from orchestrator.core.tracing import add_span_event
+from orchestrator.core.use_case_loader import UseCaseConfig
+from orchestrator.datasets.changes import (
+    CHANGE_INSERT,
+    ChangeLog,
+    PageHistory,
+    diff_digests,
+    page_changes,
+    page_delta,
+    page_key,
+    table_digests,
+)
+from orchestrator.datasets.charts import ChartCache, ChartSpec, aggregate, aggregate_many
+from orchestrator.datasets.columnar import ColumnarTable
+from orchestrator.datasets.details import DETAILS_FILE, DetailStore, window_payload
+from orchestrator.datasets.partitions import PARTITIONS_DIR, PartitionedDataset, split_by_day
+from orchestrator.datasets.projection import projected_fields
+from orchestrator.datasets.rollups import ROLLUPS_FILE, SNAPSHOT_FILE, Rollup, RollupConfig, load_snapshot, save_snapshot
+from orchestrator.datasets.search import SearchIndex
+from orchestrator.datasets.versions import current_version, hold_versions, version_path
+from orchestrator.datasets.wire import columnar_page
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_FILE = 'dashboard.json'
+DATASET_FILES: dict[str, type[BaseModel]] = {
+    'cards.json': CardsResponse,
+    'dashboard_detail.json': DashboardDetailResponse,
+}
+_UNSET = object()
+
+
+class NativeDataset:
+    """Una version de los datos de un caso de uso con todo lo que se construye a partir de ella.
+
+    Es inmutable desde fuera: una version nueva es otro `NativeDataset`, asi que una request que ya tiene
+    el suyo lo usa hasta el final aunque entre medias se publique otro.
+    """
+
+    def __init__(
+        self, caso_de_uso: str, path: Path, version: str | None, changes: ChangeLog, max_open_partitions: int = 32
+    ) -> None:
+        self.caso_de_uso = caso_de_uso
+        self.path = path
+        self.version = version
+        self.max_open_partitions = max_open_partitions
+        # Log de cambios del caso de uso; `epoch` y `seq` son el punto del log que refleja esta version, guardados
+        # aqui porque el log puede avanzar (o cambiar de epoca) mientras esta version aun se sirve.
+        self.changes = changes
+        self.epoch = changes.epoch
+        self.seq = changes.seq
+        self._digests: dict[str, bytes] | None = None
+        self._models: dict[str, BaseModel] = {}
+        self._table: ColumnarTable | None = None
+        self._search_index: SearchIndex | None = None
+        self._details = _UNSET
+        self._partitioned = _UNSET
+        self._rollup = _UNSET
+
+    def token(self) -> str:
+        return f'{self.epoch}.{self.seq}'
+
+    def mark(self) -> None:
+        """Pasa a reflejar el ultimo lote del log (tras registrar cambios o abrir epoca)."""
+        self.epoch, self.seq = self.changes.epoch, self.changes.seq
+
+    def model(self, filename: str):
+        # Los payloads locales son inmutables en runtime: se validan una vez y se reutiliza el modelo.
+        with timed_stage(STAGE_DATASET):
+            model = self._models.get(filename)
+            if model is not None:
+                add_span_event('dataset.cache', decision='hit', file=filename)
+                return model
+            add_span_event('dataset.cache', decision='miss', file=filename)
+            payload = self.read_payload(filename)
+        with timed_stage(STAGE_VALIDATE):
+            model = DATASET_FILES[filename].model_validate(payload)
+        self._models[filename] = model
+        return model
+
+    def table(self) -> ColumnarTable:
+        # La tabla se construye una vez en columnas; las filas de cada pagina se materializan al servirla.
+        with timed_stage(STAGE_DATASET):
+            if self._table is not None:
+                add_span_event('dataset.cache', decision='hit', file=DASHBOARD_FILE)
+                return self._table
+            add_span_event('dataset.cache', decision='miss', file=DASHBOARD_FILE)
+            path = self.path / DASHBOARD_FILE
+            stat = path.stat() if path.exists() else None
+            version = f'{stat.st_mtime_ns:x}-{stat.st_size:x}' if stat is not None else None
+            self._table = ColumnarTable.from_payload(self.read_payload(DASHBOARD_FILE), version)
+        return self._table
+
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            self._search_index = SearchIndex.from_table(self.table(), self.details())
+        return self._search_index
+
+    def details(self) -> DetailStore | None:
+        if self._details is _UNSET:
+            path = self.path / DETAILS_FILE
+            self._details = DetailStore(path) if path.exists() else None
+        return self._details
+
+    def partitioned(self) -> PartitionedDataset | None:
+        if self._partitioned is _UNSET:
+            self._partitioned = PartitionedDataset.open(self.path, self.max_open_partitions, self.details())
+        return self._partitioned
+
+    def rollup(self) -> Rollup | None:
+        """Rollups del caso de uso si tiene `rollups.json`.
+
+        Se construyen al cargar la version (en `preload`, fuera de las requests). Despues solo los ponen al dia
+        `sync_rollup` desde un append o una relectura del manifest: servir `/cards` nunca agrega filas ni escribe.
+        """
+        if self._rollup is _UNSET:
+            config = RollupConfig.load(self.path / ROLLUPS_FILE)
+            dataset = self.partitioned()
+            if config is None:
+                self._rollup = None
+            elif dataset is None:
+                # Un `dashboard.json` no cambia en runtime: se agrega una vez.
+                rollup = Rollup(config)
+                rollup.add_rows(self.read_payload(DASHBOARD_FILE)['table']['rows'])
+                self._rollup = rollup
+            else:
+                self._rollup = load_snapshot(self.path / PARTITIONS_DIR / SNAPSHOT_FILE, config) or Rollup(config)
+                self.sync_rollup()
+        return self._rollup
+
+    def sync_rollup(self) -> None:
+        """Agrega solo las filas nuevas de las particiones y guarda el snapshot si algo ha cambiado.
+
+        Una version publicada no se toca: su snapshot solo se lee (lo trae la propia version, si acaso).
+        """
+        rollup = self._rollup
+        dataset = self.partitioned()
+        if isinstance(rollup, Rollup) and dataset is not None and rollup.sync(dataset) and self.version is None:
+            save_snapshot(self.path / PARTITIONS_DIR / SNAPSHOT_FILE, rollup)
+
+    def preload(self, retention_days: int = 0) -> int:
+        for filename in DATASET_FILES:
+            self.model(filename)
+        dataset = self.partitioned()
+        if dataset is None:
+            self.table().warm()
+            self.search_index()
+            self.rollup()
+            return len(DATASET_FILES) + 2
+        self.expire(retention_days, time.time())
+        self.rollup()
+        # Solo se deja abierta la particion mas reciente: es la que piden las ventanas por defecto (`24h`).
+        if dataset.partitions:
+            dataset.table(dataset.partitions[-1]).warm()
+        return len(DATASET_FILES) + 1
+
+    def expire(self, retention_days: int, now: float) -> list[str]:
+        dataset = self.partitioned()
+        # En una version publicada la retencion la aplica quien publica: aqui no se borra nada de ella.
+        if not retention_days or dataset is None or self.version is not None:
+            return []
+        expired = dataset.expire(retention_days, now)
+        if expired:
+            # Las filas caducadas no pasan por el log de cambios: se abre una epoca nueva y los clientes recargan completo.
+            self.changes.reset()
+            self.mark()
+            self.sync_rollup()
+        return expired
+
+    def reload(self) -> bool:
+        """Pone al dia un dataset particionado cuyo manifest ha cambiado por fuera (append desde otro proceso)."""
+        dataset = self.partitioned()
+        changed = dataset.reload() if dataset is not None else None
+        if not changed:
+            return False
+        by_day = {partition.day: partition for partition in dataset.partitions}
+        if all(day in by_day and by_day[day].rows > rows for day, rows in changed.items()):
+            # Solo han crecido particiones: las filas nuevas son altas para los clientes con `since`.
+            inserted = [(CHANGE_INSERT, row['id'], day) for day, rows in changed.items() for row in dataset.read_rows(by_day[day], rows)]
+            self.changes.record(inserted)
+        else:
+            self.changes.reset()
+        self.mark()
+        self.sync_rollup()
+        return True
+
+    def digests(self) -> dict[str, bytes]:
+        if self._digests is None:
+            self._digests = table_digests(self.table())
+        return self._digests
+
+    def nbytes(self) -> int:
+        """Memoria aproximada de las columnas cargadas (tabla completa o particiones abiertas)."""
+        nbytes = self._table.stats()['bytes'] if self._table is not None else 0
+        if isinstance(self._partitioned, PartitionedDataset):
+            nbytes += self._partitioned.nbytes()
+        return nbytes
+
+    def read_payload(self, filename: str) -> dict:
+        path = self.path / filename
+        if not path.exists():
+            raise OrchestratorError(
+                ErrorCode.VALIDATION_ERROR,
+                f'Local data file not found for {self.caso_de_uso}: {path}',
+                500,
+            )
+
+        return json.loads(path.read_text(encoding='utf-8'))
 
 
 class NativeAdapter(Adapter):
-    """Adapter nativo basado en JSON local por caso de uso (sin hardcodes)."""
+    """Adapter nativo basado en JSON local por caso de uso (sin hardcodes).
+
+    Si el directorio del caso de uso tiene un `CURRENT`, los datos se leen de `versions/<CURRENT>/` y
+    `refresh` cambia a una version nueva cuando ya esta cargada e indexada, sin cortar a quien esta leyendo.
+    """
 
-    def __init__(self, local_data_dir: str | None = None):
+    def __init__(
+        self,
+        local_data_dir: UseCaseConfig | str | None = None,
+        default_limit: int = 0,
+        max_limit: int = 100,
+        chart_cache_size: int = 256,
+        retention_days: int = 0,
+        max_open_partitions: int = 32,
+        change_log_size: int = 10000,
+        delta_cache_size: int = 256,
+    ):
+        if isinstance(local_data_dir, UseCaseConfig):
+            local_data_dir = local_data_dir.local_data_dir
         self._local_data_dir = local_data_dir
-        self._cache: dict[str, dict] = {}
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.chart_cache = ChartCache(chart_cache_size)
+        self.retention_days = retention_days
+        self.max_open_partitions = max_open_partitions
+        self.change_log_size = change_log_size
+        self._datasets: dict[str, NativeDataset] = {}
+        self._changes: dict[str, ChangeLog] = {}
+        # Ids de las ultimas paginas servidas por query y version: el delta de `since` es el de la pagina.
+        self.pages = PageHistory(delta_cache_size) if delta_cache_size > 0 else None
+        self._refresh_lock = threading.Lock()
+        self._versions: dict[str, dict] = {}
+        self.released_bytes = 0
+        self.released_versions = 0
+        self._retired: weakref.WeakSet[NativeDataset] = weakref.WeakSet()
+        # Reentrante: el finalizer de una version puede saltar por GC mientras este hilo ya tiene el lock.
+        self._held_lock = threading.RLock()
+        self._held: dict[Path, Counter[str]] = {}
 
     async def get_cards(self, ctx: AdapterContext, req: QueryRequest) -> CardsResponse:
-        payload = self._read_payload(ctx.caso_de_uso, 'cards.json')
-        return CardsResponse.model_validate(payload)
+        dataset = self.dataset(ctx.caso_de_uso)
+        rollup = dataset.rollup()
+        if rollup is None:
+            return dataset.model('cards.json')
+        # Igual que en `/dashboard`, `timeRange` solo acota los datasets particionados.
+        time_range = parse_time_range(req.timeRange) if dataset.partitioned() is not None else None
+        with timed_stage(STAGE_QUERY):
+            return rollup.cards(time_range)
 
     async def get_dashboard(self, ctx: AdapterContext, req: QueryRequest) -> DashboardResponse:
-        payload = self._read_payload(ctx.caso_de_uso, 'dashboard.json')
-        return DashboardResponse.model_validate(payload)
+        dataset = self.dataset(ctx.caso_de_uso)
+        version = dataset.token()
+        partitioned = dataset.partitioned()
+        if partitioned is not None:
+            time_range = parse_time_range(req.timeRange)
+            with timed_stage(STAGE_QUERY):
+                response = partitioned.query(req, time_range, self.default_limit, self.max_limit)
+        else:
+            table = dataset.table()
+            with timed_stage(STAGE_QUERY):
+                search_index = dataset.search_index() if req.search else None
+                response = table.query(req, self.default_limit, self.max_limit, search_index)
+        row_ids = [row.id for row in response.table.rows]
+        delta = self._delta(dataset, req, response, row_ids, version) if req.since else None
+        self._remember(req, version, row_ids)
+        return delta if delta is not None else response.model_copy(update={'version': version})
+
+    async def get_dashboard_columnar(self, ctx: AdapterContext, req: QueryRequest) -> ColumnarDashboardResponse:
+        if req.since:
+            return await super().get_dashboard_columnar(ctx, req)
+        dataset = self.dataset(ctx.caso_de_uso)
+        partitioned = dataset.partitioned()
+        with timed_stage(STAGE_QUERY):
+            if partitioned is not None:
+                columns = partitioned.columns
+                page, total, next_cursor = partitioned.query_page(req, parse_time_range(req.timeRange), self.default_limit, self.max_limit)
+            else:
+                table = dataset.table()
+                columns = table.columns
+                search_index = dataset.search_index() if req.search else None
+                positions, total, next_cursor = table.query_page(req, self.default_limit, self.max_limit, search_index)
+                page = [(table, row) for row in positions]
+            # La pagina se lee columna a columna del motor: ninguna fila pasa por dict ni por TableRow.
+            payload = columnar_page(columns, page, next_cursor, total, projected_fields(req))
+        version = dataset.token()
+        if self.pages is not None:
+            self._remember(req, version, [table.column('id').value(row) for table, row in page])
+        return ColumnarDashboardResponse(table=payload, version=version)
+
+    def _remember(self, req: QueryRequest, version: str, row_ids: list[str]) -> None:
+        if self.pages is not None:
+            self.pages.put(page_key(req), version, row_ids)
+
+    def _delta(
+        self, dataset: NativeDataset, req: QueryRequest, response: DashboardResponse, row_ids: list[str], version: str
+    ) -> DashboardResponse | None:
+        """La pagina como delta de la que se sirvio con `req.since`, si se recuerda y el log cubre sus cambios.
+
+        Misma regla que `PageDiffCache` para los proxies; aqui el log dice que filas de la pagina han cambiado
+        sin comparar contenidos.
+        """
+        previous = self.pages.get(page_key(req), req.since) if self.pages is not None else None
+        changes = dataset.changes.since(req.since, dataset.seq) if previous is not None and req.since.startswith(f'{dataset.epoch}.') else None
+        if changes is None:
+            add_span_event('dashboard.delta', decision='full')
+            return None
+        on_page = page_changes(previous, row_ids, lambda row_id: row_id in changes)
+        if len(on_page) > len(row_ids):
+            add_span_event('dashboard.delta', decision='full')
+            return None
+        add_span_event('dashboard.delta', decision='delta', changes=len(on_page))
+        return page_delta(response, version, req.since, on_page)
+
+    async def get_chart(self, ctx: AdapterContext, spec: ChartSpec, req: QueryRequest) -> ChartResponse:
+        if spec.data_source != '/dashboard':
+            return await super().get_chart(ctx, spec, req)
+        dataset = self.dataset(ctx.caso_de_uso)
+        partitioned = dataset.partitioned()
+        time_range = parse_time_range(req.timeRange) if partitioned is not None else None
+        # La pagina no cambia la serie: la clave solo lleva lo que decide que filas entran. Una ventana relativa
+        # (`24h`) se mueve con el reloj, asi que entra resuelta y redondeada al minuto.
+        window = (time_range.start // 60 if time_range.start is not None else None, time_range.end) if time_range is not None else None
+        data_version = partitioned.version if partitioned is not None else dataset.table().version
+        query_key = req.model_dump_json(exclude={'cursor', 'limit', 'sort', 'timeRange', 'since', 'fields'})
+        key = (ctx.caso_de_uso, dataset.version, data_version, spec.cache_key(), query_key, window)
+        chart = self.chart_cache.get(key)
+        add_span_event('chart.cache', decision='miss' if chart is None else 'hit', component=spec.component)
+        if chart is None:
+            with timed_stage(STAGE_QUERY):
+                if partitioned is not None:
+                    chart = aggregate_many(partitioned.selections(req, time_range), spec)
+                else:
+                    table = dataset.table()
+                    search_index = dataset.search_index() if req.search else None
+                    chart = aggregate(table, table.matching(req, search_index), spec)
+            self.chart_cache.put(key, chart)
+        return chart
 
     async def get_detail(self, ctx: AdapterContext, id: str, req: QueryRequest | None) -> DashboardDetailResponse:
-        payload = self._read_payload(ctx.caso_de_uso, 'dashboard_detail.json')
-        return DashboardDetailResponse.model_validate(payload)
+        dataset = self.dataset(ctx.caso_de_uso)
+        details = dataset.details()
+        limit, cursor = (req.messages_limit, req.messages_cursor) if req is not None else (None, None)
+        if details is None:
+            # Sin detalle por fila, todas las filas comparten el de ejemplo.
+            detail = dataset.model('dashboard_detail.json')
+            if limit is None and cursor is None:
+                return detail
+            return DashboardDetailResponse.model_validate(window_payload(detail.model_dump(), limit, cursor))
+        with timed_stage(STAGE_VALIDATE):
+            return details.get(id, limit, cursor)
 
-    def _resolve_base_path(self, caso_de_uso: str) -> Path:
-        if self._local_data_dir:
-            return Path(self._local_data_dir)
-        return Path(__file__).resolve().parents[1] / 'data' / caso_de_uso
+    def dataset(self, caso_de_uso: str) -> NativeDataset:
+        """Version vigente del caso de uso; la primera vez se abre la que marque `CURRENT`."""
+        dataset = self._datasets.get(caso_de_uso)
+        if dataset is None:
+            add_span_event('dataset.open', caso_de_uso=caso_de_uso)
+            dataset = self._datasets.setdefault(caso_de_uso, self._open(caso_de_uso, current_version(self._resolve_base_path(caso_de_uso))))
+        return dataset
 
-    def _read_payload(self, caso_de_uso: str, filename: str) -> dict:
-        path = self._resolve_base_path(caso_de_uso) / filename
-        cache_key = str(path)
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+    def refresh(self, caso_de_uso: str) -> bool:
+        """Carga e indexa la version publicada si ha cambiado y la pone en servicio de una vez.
 
-        if not path.exists():
+        Pensado para un hilo aparte: mientras carga, las requests siguen sirviendose de la version anterior.
+        """
+        with self._refresh_lock:
+            current = self._datasets.get(caso_de_uso)
+            version = current_version(self._resolve_base_path(caso_de_uso))
+            if current is not None and version == current.version:
+                return False
+            start = time.perf_counter()
+            candidate = self._open(caso_de_uso, version)
+            candidate.preload(self.retention_days)
+            if current is not None:
+                self._record_switch(current, candidate)
+            load_ms = (time.perf_counter() - start) * 1000
+            self._datasets[caso_de_uso] = candidate
+            self._changes[caso_de_uso] = candidate.changes
+            previous = self._versions.get(caso_de_uso, {})
+            self._versions[caso_de_uso] = {
+                'version': version,
+                'switched_at': time.time(),
+                'load_ms': round(load_ms, 2),
+                'switches': previous.get('switches', 0) + (current is not None),
+                'bytes': candidate.nbytes(),
+            }
+        if current is not None:
+            # La version anterior se libera cuando termina la ultima request que la usa.
+            self._retired.add(current)
+            weakref.finalize(current, self._released, current.nbytes())
+            logger.info(
+                'native dataset switched',
+                extra={'fields': {'event': 'dataset_switch', 'caso_de_uso': caso_de_uso, 'from': current.version, **self._versions[caso_de_uso]}},
+            )
+        return True
+
+    def _record_switch(self, current: NativeDataset, candidate: NativeDataset) -> None:
+        if current.partitioned() is not None or candidate.partitioned() is not None:
+            # Comparar historicos particionados entero no compensa: la version nueva estrena log (epoca nueva) y los
+            # clientes recargan completo. El log de la anterior no se toca: se sigue sirviendo hasta el cambio.
+            candidate.changes = ChangeLog(self.change_log_size)
+        else:
+            candidate.changes.record(diff_digests(current.digests(), candidate.digests()))
+        candidate.mark()
+
+    async def watch_versions(self, interval_s: float) -> None:
+        """Bucle de fondo: comprueba el `CURRENT` de cada caso de uso abierto y cambia de version si lo han movido."""
+        while True:
+            await asyncio.sleep(interval_s)
+            for caso_de_uso in list(self._datasets):
+                try:
+                    if not await asyncio.to_thread(self.refresh, caso_de_uso):
+                        # Misma version: se recogen los appends hechos por fuera. En el event loop, porque toca las
+                        # particiones abiertas que usan las requests; solo se leen las filas nuevas.
+                        self.reload(caso_de_uso)
+                except Exception as error:  # noqa: BLE001 - una version rota no tumba la que se esta sirviendo
+                    self._versions.setdefault(caso_de_uso, {})['last_error'] = str(error) or type(error).__name__
+                    logger.warning(
+                        'native dataset refresh failed',
+                        extra={'fields': {'event': 'dataset_switch_failed', 'caso_de_uso': caso_de_uso, 'error': str(error)}},
+                    )
+
+    async def run_retention(self, interval_s: float) -> None:
+        """Bucle de fondo: borra las particiones que han salido de la retencion en los casos de uso abiertos.
+
+        Corre en el event loop y no en un hilo: toca las particiones abiertas que usan las requests, y solo
+        reescribe un manifest y borra ficheros.
+        """
+        while True:
+            await asyncio.sleep(interval_s)
+            for caso_de_uso in list(self._datasets):
+                try:
+                    expired = self.expire(caso_de_uso)
+                except Exception as error:  # noqa: BLE001 - un fallo al caducar no para el bucle
+                    logger.warning(
+                        'native partition expiry failed',
+                        extra={'fields': {'event': 'partition_expiry_failed', 'caso_de_uso': caso_de_uso, 'error': str(error)}},
+                    )
+                    continue
+                if expired:
+                    logger.info('native partitions expired', extra={'fields': {'event': 'partition_expiry', 'caso_de_uso': caso_de_uso, 'days': expired}})
+
+    def version_stats(self) -> dict:
+        return {
+            'datasets': {caso_de_uso: {'version': dataset.version, **self._versions.get(caso_de_uso, {})} for caso_de_uso, dataset in self._datasets.items()},
+            'retired_pending': len(self._retired),
+            'released_versions': self.released_versions,
+            'released_bytes': self.released_bytes,
+        }
+
+    def _released(self, nbytes: int) -> None:
+        self.released_versions += 1
+        self.released_bytes += nbytes
+
+    def preload(self, caso_de_uso: str) -> int:
+        return self.dataset(caso_de_uso).preload(self.retention_days)
+
+    def reload(self, caso_de_uso: str) -> bool:
+        return self.dataset(caso_de_uso).reload()
+
+    def expire(self, caso_de_uso: str, now: float | None = None) -> list[str]:
+        return self.dataset(caso_de_uso).expire(self.retention_days, time.time() if now is None else now)
+
+    def append(self, caso_de_uso: str, rows: list[dict]) -> dict[str, int]:
+        """Anade filas a un dataset particionado y las suma a los rollups sin recalcular lo que ya estaba."""
+        dataset = self.dataset(caso_de_uso)
+        partitioned = dataset.partitioned()
+        if partitioned is None:
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'{caso_de_uso} has no partitioned dataset to append to', 400)
+        if dataset.version is not None:
             raise OrchestratorError(
-                ErrorCode.VALIDATION_ERROR,
-                f'Local data file not found for {caso_de_uso}: {path}',
-                500,
+                ErrorCode.VALIDATION_ERROR, f'{caso_de_uso} serves published version {dataset.version}; publish a new version instead of appending', 400
             )
+        appended = partitioned.append(rows)
+        changes = [(CHANGE_INSERT, row['id'], day) for day, day_rows in split_by_day(rows, partitioned.time_field).items() for row in day_rows]
+        dataset.changes.record(changes)
+        dataset.mark()
+        dataset.sync_rollup()
+        return appended
+
+    def rollup(self, caso_de_uso: str) -> Rollup | None:
+        return self.dataset(caso_de_uso).rollup()
+
+    def partitioned(self, caso_de_uso: str) -> PartitionedDataset | None:
+        return self.dataset(caso_de_uso).partitioned()
+
+    def details(self, caso_de_uso: str) -> DetailStore | None:
+        return self.dataset(caso_de_uso).details()
+
+    def search_index(self, caso_de_uso: str) -> SearchIndex:
+        return self.dataset(caso_de_uso).search_index()
+
+    def table(self, caso_de_uso: str) -> ColumnarTable:
+        return self.dataset(caso_de_uso).table()
+
+    def _open(self, caso_de_uso: str, version: str | None) -> NativeDataset:
+        changes = self._changes.get(caso_de_uso)
+        if changes is None:
+            changes = self._changes[caso_de_uso] = ChangeLog(self.change_log_size)
+        base = self._resolve_base_path(caso_de_uso)
+        dataset = NativeDataset(caso_de_uso, version_path(base, version), version, changes, self.max_open_partitions)
+        if version is not None:
+            # La version queda anunciada mientras exista el objeto (vigente o retirada con requests en curso).
+            self._hold(base, version, 1)
+            weakref.finalize(dataset, self._hold, base, version, -1)
+        return dataset
+
+    def _hold(self, base: Path, version: str, delta: int) -> None:
+        with self._held_lock:
+            held = self._held.setdefault(base, Counter())
+            held[version] += delta
+            if held[version] <= 0:
+                del held[version]
+            try:
+                hold_versions(base, held)
+            except OSError as error:
+                logger.warning('dataset version lease not written', extra={'fields': {'event': 'version_lease_failed', 'path': str(base), 'error': str(error)}})
+
+    def _resolve_base_path(self, caso_de_uso: str) -> Path:
+        if self._local_data_dir:
+            return Path(self._local_data_dir)
+        return Path(__file__).resolve().parents[1] / 'data' / caso_de_uso
 
-        payload = json.loads(path.read_text(encoding='utf-8'))
-        self._cache[cache_key] = payload
-        return payload
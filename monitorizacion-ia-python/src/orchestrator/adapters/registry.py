@@ -1,11 +1,19 @@
+from __future__ import annotations
+
 from collections.abc import Callable
+from typing import TYPE_CHECKING
 
+from orchestrator.adapters.balancer import DEFAULT_EJECT_AFTER_FAILURES, BalancedProxyAdapter, Endpoint, run_health_checks
 from orchestrator.adapters.base import Adapter
-from orchestrator.adapters.http_proxy import HttpProxyAdapter
 from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import ViewConfiguration, ViewRuntimeConfig
+from orchestrator.core.adaptive_timeout import AdaptiveTimeouts
 from orchestrator.core.errors import ErrorCode, OrchestratorError
 from orchestrator.core.use_case_loader import RoutingConfig
 
+if TYPE_CHECKING:
+    from orchestrator.adapters.http_proxy import HttpProxyAdapter
+
 
 AdapterFactory = Callable[[str], Adapter]
 
@@ -55,5 +63,136 @@ class AdapterRegistry:
         return NativeAdapter(cfg)
 
     def _build_http_proxy_adapter(self, caso_de_uso: str) -> Adapter:
+        from orchestrator.adapters.http_proxy import HttpProxyAdapter
+
         cfg = self.routing.use_cases[caso_de_uso]
         return HttpProxyAdapter(cfg, self.default_timeout_ms)
+
+
+class ViewAdapterProvider:
+    """Resuelve el adapter de una `ViewConfiguration` reutilizando instancias y pools HTTP por upstream.
+
+    Cada endpoint upstream tiene un unico pool y un unico estado de salud, aunque lo compartan varias vistas.
+    """
+
+    def __init__(
+        self,
+        default_timeout_ms: int,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        retries: int = 0,
+        retry_backoff_ms: int = 50,
+        min_attempt_ms: int = 50,
+        eject_after_failures: int = DEFAULT_EJECT_AFTER_FAILURES,
+        adaptive_timeouts: AdaptiveTimeouts | None = None,
+        default_limit: int = 0,
+        max_limit: int = 100,
+        chart_cache_size: int = 256,
+        retention_days: int = 0,
+        max_open_partitions: int = 32,
+        change_log_size: int = 10000,
+        delta_cache_size: int = 256,
+        capability_reprobe_s: float = 300.0,
+    ):
+        self.default_timeout_ms = default_timeout_ms
+        self.eject_after_failures = eject_after_failures
+        self.adaptive_timeouts = adaptive_timeouts
+        self.delta_cache_size = delta_cache_size
+        self.capability_reprobe_s = capability_reprobe_s
+        self._max_connections = max_connections
+        self._max_keepalive_connections = max_keepalive_connections
+        self._retry_options = {'retries': retries, 'retry_backoff_ms': retry_backoff_ms, 'min_attempt_ms': min_attempt_ms}
+        self._native = NativeAdapter(
+            default_limit=default_limit,
+            max_limit=max_limit,
+            chart_cache_size=chart_cache_size,
+            retention_days=retention_days,
+            max_open_partitions=max_open_partitions,
+            change_log_size=change_log_size,
+            delta_cache_size=delta_cache_size,
+        )
+        self._proxies: dict[str, HttpProxyAdapter] = {}
+        self._endpoints: dict[str, Endpoint] = {}
+        self._balancers: dict[tuple[tuple[str, ...], str], BalancedProxyAdapter] = {}
+
+    @property
+    def native(self) -> NativeAdapter:
+        return self._native
+
+    def resolve(self, view: ViewConfiguration) -> tuple[str, Adapter]:
+        if view.runtime is None:
+            return 'native', self._native
+        return view.runtime.adapter, self.balancer_for(view.runtime)
+
+    def balancer_for(self, runtime: ViewRuntimeConfig) -> BalancedProxyAdapter:
+        key = (tuple(runtime.endpoints), runtime.balancing)
+        balancer = self._balancers.get(key)
+        if balancer is None:
+            balancer = BalancedProxyAdapter(
+                [self.endpoint_for(url) for url in key[0]],
+                runtime.balancing,
+                eject_after_failures=self.eject_after_failures,
+                delta_cache_size=self.delta_cache_size,
+            )
+            self._balancers[key] = balancer
+        return balancer
+
+    def existing_balancer(self, runtime: ViewRuntimeConfig) -> BalancedProxyAdapter | None:
+        """El balanceador ya creado para `runtime`, sin crearlo (para lecturas de estado)."""
+        return self._balancers.get((tuple(runtime.endpoints), runtime.balancing))
+
+    def endpoint_for(self, base_url: str) -> Endpoint:
+        endpoint = self._endpoints.get(base_url)
+        if endpoint is None:
+            endpoint = Endpoint(base_url, self.proxy_for(base_url))
+            self._endpoints[base_url] = endpoint
+        return endpoint
+
+    def endpoints(self) -> list[Endpoint]:
+        return list(self._endpoints.values())
+
+    def balanced_endpoints(self) -> list[Endpoint]:
+        """Endpoints de balanceadores con mas de una replica; con una sola no hay a donde desviar el trafico."""
+        endpoints: dict[str, Endpoint] = {}
+        for balancer in self._balancers.values():
+            if len(balancer.endpoints) > 1:
+                endpoints.update((endpoint.url, endpoint) for endpoint in balancer.endpoints)
+        return list(endpoints.values())
+
+    async def run_health_checks(self, interval_s: float, path: str, timeout_ms: int) -> None:
+        await run_health_checks(self.balanced_endpoints, interval_s, path, timeout_ms, self.eject_after_failures)
+
+    def proxy_for(self, base_url: str) -> HttpProxyAdapter:
+        adapter = self._proxies.get(base_url)
+        if adapter is None or adapter.client is None or adapter.client.is_closed:
+            # httpx y el proxy se importan con el primer upstream: una instancia solo nativa no los carga.
+            import httpx
+
+            from orchestrator.adapters.http_proxy import HttpProxyAdapter
+
+            limits = httpx.Limits(
+                max_connections=self._max_connections,
+                max_keepalive_connections=self._max_keepalive_connections,
+            )
+            adapter = HttpProxyAdapter(
+                base_url,
+                self.default_timeout_ms,
+                client=httpx.AsyncClient(limits=limits),
+                adaptive_timeouts=self.adaptive_timeouts,
+                capability_reprobe_s=self.capability_reprobe_s,
+                **self._retry_options,
+            )
+            self._proxies[base_url] = adapter
+            endpoint = self._endpoints.get(base_url)
+            if endpoint is not None:
+                endpoint.adapter = adapter
+        return adapter
+
+    async def aclose(self) -> None:
+        proxies = list(self._proxies.values())
+        self._proxies.clear()
+        self._endpoints.clear()
+        self._balancers.clear()
+        for adapter in proxies:
+            if adapter.client is not None:
+                await adapter.client.aclose()
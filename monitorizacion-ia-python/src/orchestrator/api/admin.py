@@ -0,0 +1,63 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from orchestrator.api.schemas import ViewConfigCreate, ViewConfiguration, ViewConfigUpdate
+from orchestrator.api.views import get_view_store
+
+router = APIRouter(tags=['Admin'])
+
+
+def _admin_client_key(request: Request) -> str:
+    forwarded_for = request.headers.get('x-forwarded-for')
+    if forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    return request.client.host if request.client else 'unknown'
+
+
+def enforce_admin_rate_limit(request: Request) -> None:
+    limiter = request.app.state.admin_rate_limiter
+    if not limiter.allow(_admin_client_key(request)):
+        raise HTTPException(status_code=429, detail='admin rate limit exceeded')
+
+
+@router.get('/admin/view-configs', response_model=list[ViewConfiguration])
+async def list_view_configs(
+    request: Request,
+    system: str | None = Query(default=None, min_length=1),
+    enabled: bool | None = Query(default=None),
+) -> list[ViewConfiguration]:
+    return get_view_store(request).list_configs(system=system, enabled=enabled)
+
+
+@router.get('/admin/view-configs/{view_id}', response_model=ViewConfiguration)
+async def get_view_config(request: Request, view_id: str) -> ViewConfiguration:
+    try:
+        return get_view_store(request).get(view_id)
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
+
+
+@router.post('/admin/view-configs', response_model=ViewConfiguration)
+async def create_view_config(request: Request, payload: ViewConfigCreate) -> ViewConfiguration:
+    enforce_admin_rate_limit(request)
+    try:
+        return get_view_store(request).create(payload)
+    except ValueError as error:
+        raise HTTPException(status_code=409, detail=str(error)) from error
+
+
+@router.put('/admin/view-configs/{view_id}', response_model=ViewConfiguration)
+async def update_view_config(request: Request, view_id: str, payload: ViewConfigUpdate) -> ViewConfiguration:
+    enforce_admin_rate_limit(request)
+    try:
+        return get_view_store(request).update(view_id, payload)
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
+
+
+@router.delete('/admin/view-configs/{view_id}', status_code=204)
+async def delete_view_config(request: Request, view_id: str) -> None:
+    enforce_admin_rate_limit(request)
+    try:
+        get_view_store(request).delete(view_id)
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Request
+
+from orchestrator.api.schemas import DatopsOverviewResponse, DatopsRoutes, DatopsUseCase
+from orchestrator.api.views import iter_available_systems, resolve_configured_view, use_case_label
+from orchestrator.core.settings import get_settings
+
+router = APIRouter(tags=['DatOps'])
+
+
+def _effective_system_metadata(request: Request, case_id: str):
+    view = resolve_configured_view(request, case_id)
+    if view is None:
+        return None
+
+    timeout_ms = request.app.state.timeout_policy.timeout_for(case_id, view)
+    if view.runtime is not None:
+        # Solo lectura: no se crea el balanceador, y con una sola replica no hay reparto que mostrar.
+        balancer = request.app.state.adapter_provider.existing_balancer(view.runtime)
+        balanced = balancer is not None and len(balancer.endpoints) > 1
+        return {
+            'adapter': view.runtime.adapter,
+            'timeout_ms': timeout_ms,
+            'upstream_base_url': view.runtime.upstream_base_url,
+            'balancing': view.runtime.balancing,
+            'endpoints': balancer.stats(timeout_ms) if balanced else [],
+        }
+
+    return {
+        'adapter': 'native',
+        'timeout_ms': timeout_ms,
+        'upstream_base_url': None,
+        'balancing': None,
+        'endpoints': [],
+    }
+
+
+@router.get('/datops/overview', response_model=DatopsOverviewResponse)
+async def datops_overview(request: Request) -> DatopsOverviewResponse:
+    use_cases = []
+    for case_id in iter_available_systems(request):
+        metadata = _effective_system_metadata(request, case_id)
+        if metadata is None:
+            continue
+        use_cases.append(
+            DatopsUseCase(
+                id=case_id,
+                label=use_case_label(case_id),
+                adapter=metadata['adapter'],
+                timeout_ms=metadata['timeout_ms'],
+                upstream_base_url=metadata['upstream_base_url'],
+                balancing=metadata['balancing'],
+                endpoints=metadata['endpoints'],
+                routes=DatopsRoutes(
+                    cards=f'/cards?caso_de_uso={case_id}',
+                    dashboard=f'/dashboard?caso_de_uso={case_id}',
+                    dashboard_detail=f'/dashboard_detail?caso_de_uso={case_id}&id={{id}}',
+                ),
+            )
+        )
+
+    return DatopsOverviewResponse(
+        generated_at=datetime.now(timezone.utc).isoformat(),
+        profile=get_settings().ENVIRONMENT,
+        use_cases=use_cases,
+    )
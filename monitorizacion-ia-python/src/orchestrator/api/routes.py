@@ -1,102 +1,114 @@
+import asyncio
+import uuid
+from contextlib import nullcontext
+from typing import Literal
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Body, Header, Query, Request
-from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from starlette.applications import Starlette
+from starlette.datastructures import State
+from starlette.responses import Response, StreamingResponse
 
 from orchestrator.adapters.base import AdapterContext
-from orchestrator.adapters.http_proxy import HttpProxyAdapter
-from orchestrator.adapters.native import NativeAdapter
 from orchestrator.api.schemas import (
     CardsResponse,
-    DatopsOverviewResponse,
-    DatopsRoutes,
-    DatopsUseCase,
+    ChartResponse,
+    ColumnarDashboardResponse,
     DashboardDetailResponse,
     DashboardResponse,
     QueryRequest,
     UIShellResponse,
     UIShellSystem,
     UIShellTab,
-    ViewConfigCreate,
+    ViewComponent,
     ViewConfiguration,
-    ViewConfigUpdate,
+    walk_components,
 )
+from orchestrator.api.views import get_view_store, iter_available_systems, resolve_configured_view, resolve_system_view, system_view, use_case_label
+from orchestrator.core.deadline import DEADLINE_HEADER, Deadline, deadline_exceeded
 from orchestrator.core.errors import ErrorCode, OrchestratorError
-from orchestrator.core.settings import settings
+from orchestrator.core.hot_queries import normalized_query
+from orchestrator.core.logging import logging_stats
+from orchestrator.core.prefetch import SESSION_HEADER, page_ids
+from orchestrator.core.settings import get_settings
+from orchestrator.core.timing import STAGE_ADAPTER, STAGE_SERIALIZE, STAGE_VIEW, timed_stage
+from orchestrator.core.tracing import add_span_event, current_span
+from orchestrator.datasets.charts import ChartSpec
+from orchestrator.datasets.projection import component_fields
+from orchestrator.datasets.wire import COLUMNAR_FORMAT, COLUMNAR_MEDIA_TYPE
 
 router = APIRouter()
 
 
-def _use_case_label(case_id: str) -> str:
-    return case_id.replace('_', ' ').title()
+def _resolve_component(view: ViewConfiguration, component_id: str) -> ViewComponent:
+    for component, _depth in walk_components(view.components):
+        if component.id == component_id:
+            return component
+    raise OrchestratorError(ErrorCode.NOT_FOUND, f'component not found in view {view.id}: {component_id}', 404)
 
 
-def _resolve_configured_view(request: Request, case_id: str) -> ViewConfiguration | None:
-    views = get_view_store(request).list_configs(system=case_id, enabled=True)
-    if not views:
-        return None
-    return sorted(views, key=lambda item: item.name)[0]
+def _with_table_fields(request: Request, caso_de_uso: str, req: QueryRequest, component: str | None) -> QueryRequest:
+    """Proyeccion implicita de /dashboard, solo si el cliente dice que tabla pinta con `component`.
 
-
-def _resolve_system_view(request: Request, case_id: str) -> ViewConfiguration:
-    configured_view = _resolve_configured_view(request, case_id)
-    if configured_view is not None:
-        return configured_view
-    raise OrchestratorError(
-        ErrorCode.UNKNOWN_USE_CASE,
-        f'caso_de_uso not configured in view storage: {case_id}',
-        404,
-    )
-
-
-def _iter_available_systems(request: Request):
-    seen: set[str] = set()
-    configured_views = sorted(get_view_store(request).list_configs(enabled=True), key=lambda item: (item.system, item.name))
-    for view in configured_views:
-        if view.system in seen:
-            continue
-        seen.add(view.system)
-        yield view.system
-
-
-def _effective_system_metadata(request: Request, case_id: str):
-    view = _resolve_configured_view(request, case_id)
-    if view is None:
-        return None
-
-    if view.runtime is not None:
-        return {
-            'adapter': view.runtime.adapter,
-            'timeout_ms': settings.UPSTREAM_TIMEOUT_MS,
-            'upstream_base_url': view.runtime.upstream_base_url,
-        }
-
-    return {
-        'adapter': 'native',
-        'timeout_ms': settings.UPSTREAM_TIMEOUT_MS,
-        'upstream_base_url': None,
-    }
-
-
-def get_view_store(request: Request):
-    return request.app.state.view_config_store
+    Sin `component` se devuelven todas las columnas: un cliente que no sabe de componentes nunca pierde campos.
+    """
+    if req.fields is not None or component is None:
+        return req
+    view = resolve_configured_view(request, caso_de_uso)
+    fields = component_fields(_resolve_component(view, component)) if view is not None else None
+    return req if fields is None else req.model_copy(update={'fields': fields})
 
 
 def get_metrics(request: Request):
     return request.app.state.metrics
 
 
-def _admin_client_key(request: Request) -> str:
-    forwarded_for = request.headers.get('x-forwarded-for')
-    if forwarded_for:
-        return forwarded_for.split(',')[0].strip()
-    return request.client.host if request.client else 'unknown'
-
-
-def enforce_admin_rate_limit(request: Request) -> None:
-    limiter = request.app.state.admin_rate_limiter
-    if not limiter.allow(_admin_client_key(request)):
-        raise HTTPException(status_code=429, detail='admin rate limit exceeded')
+async def run_use_case_operation(
+    app: Starlette,
+    caso_de_uso: str,
+    ctx_ids: tuple[str | None, str | None],
+    operation,
+    client_deadline: Deadline | None = None,
+    received_at: float | None = None,
+    state: State | None = None,
+    background: bool = False,
+) -> BaseModel:
+    """Admision, vista, adapter y deadline de una operacion de datos; devuelve el modelo sin serializar.
+
+    Con `background` (precargas) no se hace cola: si no sobra capacidad se lanza `OVERLOADED` al momento.
+    """
+    request_id, x_trace_id = ctx_ids
+    admission = app.state.admission
+    max_wait_ms = client_deadline.remaining_ms() if client_deadline is not None else None
+    if admission is None:
+        admitted = nullcontext()
+    elif background:
+        admitted = admission.admit_background(caso_de_uso)
+    else:
+        admitted = admission.admit(caso_de_uso, max_wait_ms)
+    # Solo los endpoints de datos pasan por admision: /health, /ready y /metrics nunca esperan tras ellos.
+    async with admitted:
+        with timed_stage(STAGE_VIEW):
+            view = system_view(app.state.view_config_store, caso_de_uso)
+        with timed_stage(STAGE_ADAPTER):
+            adapter_name, adapter = app.state.adapter_provider.resolve(view)
+            timeout_ms = app.state.timeout_policy.timeout_for(caso_de_uso, view)
+            if state is not None:
+                state.adapter_name = adapter_name
+        # El presupuesto cuenta desde la llegada de la request (incluye la espera en admision).
+        deadline = Deadline.after_ms(timeout_ms, start=received_at).earliest(client_deadline)
+        deadline.check('admission')
+        span = current_span()
+        trace_id = x_trace_id or (span.context.trace_id if span is not None else None)
+        ctx = AdapterContext(caso_de_uso, request_id, trace_id, timeout_ms, deadline=deadline)
+        try:
+            async with asyncio.timeout(deadline.remaining_ms() / 1000):
+                return await operation(adapter, ctx)
+        except TimeoutError as error:
+            raise deadline_exceeded('adapter') from error
 
 
 async def execute_use_case_operation(
@@ -105,27 +117,90 @@ async def execute_use_case_operation(
     x_request_id: str | None,
     x_trace_id: str | None,
     operation,
-):
+) -> Response:
     request_id = x_request_id or getattr(request.state, 'request_id', None)
-    view = _resolve_system_view(request, caso_de_uso)
-    if view.runtime is not None:
-        adapter = HttpProxyAdapter(view.runtime.upstream_base_url, settings.UPSTREAM_TIMEOUT_MS)
-        timeout_ms = settings.UPSTREAM_TIMEOUT_MS
-    else:
-        adapter = NativeAdapter()
-        timeout_ms = settings.UPSTREAM_TIMEOUT_MS
-    ctx = AdapterContext(caso_de_uso, request_id, x_trace_id, timeout_ms)
-    return await operation(adapter, ctx)
+    client_deadline = Deadline.from_header(request.headers.get(DEADLINE_HEADER))
+    if client_deadline is not None:
+        # Si el cliente ya no espera la respuesta no se gasta ni un hueco de admision en ella.
+        client_deadline.check('received')
+    result = await run_use_case_operation(
+        request.app,
+        caso_de_uso,
+        (request_id, x_trace_id),
+        operation,
+        client_deadline=client_deadline,
+        received_at=getattr(request.state, 'received_at', None),
+        state=request.state,
+    )
+    # El modelo ya sale validado del adapter: se serializa una sola vez en lugar de revalidarlo con response_model.
+    with timed_stage(STAGE_SERIALIZE):
+        return Response(content=result.model_dump_json(), media_type='application/json')
+
+
+async def _serve_hot(
+    request: Request,
+    caso_de_uso: str,
+    route: str,
+    req: QueryRequest,
+    x_request_id: str | None,
+    x_trace_id: str | None,
+    operation,
+    on_result=None,
+) -> Response:
+    """`execute_use_case_operation` con la cache de consultas populares delante (si esta activa)."""
+    hot = request.app.state.hot_queries
+    served: list[BaseModel] = []
+
+    async def observed(adapter, ctx):
+        result = await operation(adapter, ctx)
+        if on_result is not None:
+            on_result(result)
+        served.append(result)
+        return result
+
+    # Una respuesta delta depende del `since` de cada cliente: no se cachea.
+    if hot is None or req.since is not None:
+        return await execute_use_case_operation(request, caso_de_uso, x_request_id, x_trace_id, observed)
+    key = (caso_de_uso, route, normalized_query(req))
+    cached = hot.lookup(key)
+    add_span_event('hot_queries.cache', decision='miss' if cached is None else 'hit', route=route)
+    if cached is not None:
+        request.state.adapter_name = 'hot_cache'
+        if on_result is not None:
+            on_result(cached)
+        with timed_stage(STAGE_SERIALIZE):
+            return Response(content=cached.model_dump_json(), media_type='application/json')
+    response = await execute_use_case_operation(request, caso_de_uso, x_request_id, x_trace_id, observed)
+    app = request.app
+    request_id = f'refresh-{uuid.uuid4().hex[:12]}'
+    hot.store(key, served[0], lambda: run_use_case_operation(app, caso_de_uso, (request_id, None), operation, background=True))
+    return response
 
 
 @router.get('/health', tags=['Root'])
 async def health() -> dict:
+    settings = get_settings()
     return {'status': 'ok', 'service': settings.PROJECT_NAME, 'version': settings.PROJECT_VERSION}
 
 
+@router.get('/ready', tags=['Root'])
+async def ready(request: Request) -> JSONResponse:
+    readiness = request.app.state.readiness
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.to_dict())
+
+
 @router.get('/metrics', tags=['Root'])
-async def metrics(request: Request) -> dict:
-    return get_metrics(request).snapshot()
+async def metrics(request: Request, per_worker: bool = Query(default=False)) -> dict:
+    admission = request.app.state.admission
+    return {
+        **get_metrics(request).snapshot(per_worker=per_worker),
+        'logging': {**logging_stats(), 'sampled_out_requests': request.app.state.request_log_sampler.sampled_out},
+        'admission': admission.stats() if admission is not None else None,
+        'native_datasets': request.app.state.adapter_provider.native.version_stats(),
+        'stream': request.app.state.live_hub.stats(),
+        'hot_queries': hot.stats() if (hot := request.app.state.hot_queries) is not None else None,
+        'detail_prefetch': prefetcher.stats() if (prefetcher := request.app.state.detail_prefetcher) is not None else None,
+    }
 
 
 @router.post('/cards', response_model=CardsResponse)
@@ -135,30 +210,62 @@ async def cards(
     caso_de_uso: str = Query(..., min_length=1),
     x_request_id: str | None = Header(default=None),
     x_trace_id: str | None = Header(default=None),
-) -> CardsResponse:
-    return await execute_use_case_operation(
-        request,
-        caso_de_uso,
-        x_request_id,
-        x_trace_id,
-        lambda adapter, ctx: adapter.get_cards(ctx, req),
-    )
+) -> Response:
+    return await _serve_hot(request, caso_de_uso, 'cards', req, x_request_id, x_trace_id, lambda adapter, ctx: adapter.get_cards(ctx, req))
+
+
+def _wants_columnar(request: Request, format: str | None) -> bool:
+    if format is not None:
+        return format == COLUMNAR_FORMAT
+    return COLUMNAR_MEDIA_TYPE in request.headers.get('accept', '')
+
+
+def _session_key(request: Request) -> tuple[str, ...]:
+    # Sin sesion explicita, el navegador se aproxima por IP + User-Agent.
+    session = request.headers.get(SESSION_HEADER)
+    if session:
+        return (session,)
+    return (request.client.host if request.client else '-', request.headers.get('user-agent', ''))
+
+
+def _prefetch_details(request: Request, caso_de_uso: str, req: QueryRequest, result: BaseModel) -> None:
+    prefetcher = request.app.state.detail_prefetcher
+    if prefetcher is None:
+        return
+    app = request.app
+    request_id = f'prefetch-{uuid.uuid4().hex[:12]}'
+
+    async def fetch(row_id: str, window: QueryRequest | None):
+        return await run_use_case_operation(
+            app, caso_de_uso, (request_id, None), lambda adapter, ctx: adapter.get_detail(ctx, row_id, window), background=True
+        )
 
+    query_key = (caso_de_uso, req.model_dump_json(exclude={'since', 'fields'}))
+    prefetcher.schedule(_session_key(request), query_key, caso_de_uso, result.version, page_ids(result), fetch)
 
-@router.post('/dashboard', response_model=DashboardResponse)
+
+@router.post('/dashboard', response_model=DashboardResponse | ColumnarDashboardResponse)
 async def dashboard(
     request: Request,
     req: QueryRequest,
     caso_de_uso: str = Query(..., min_length=1),
+    format: Literal['rows', 'columnar'] | None = Query(default=None),
+    component: str | None = Query(default=None, description='Tabla de la vista cuyas columnas visibles proyectan la respuesta.'),
     x_request_id: str | None = Header(default=None),
     x_trace_id: str | None = Header(default=None),
-) -> DashboardResponse:
-    return await execute_use_case_operation(
+) -> Response:
+    columnar = _wants_columnar(request, format)
+    req = _with_table_fields(request, caso_de_uso, req, component)
+
+    return await _serve_hot(
         request,
         caso_de_uso,
+        'dashboard_columnar' if columnar else 'dashboard',
+        req,
         x_request_id,
         x_trace_id,
-        lambda adapter, ctx: adapter.get_dashboard(ctx, req),
+        lambda adapter, ctx: adapter.get_dashboard_columnar(ctx, req) if columnar else adapter.get_dashboard(ctx, req),
+        on_result=lambda result: _prefetch_details(request, caso_de_uso, req, result),
     )
 
 
@@ -170,7 +277,15 @@ async def dashboard_detail(
     id: str = Query(..., min_length=1),
     x_request_id: str | None = Header(default=None),
     x_trace_id: str | None = Header(default=None),
-) -> DashboardDetailResponse:
+) -> Response:
+    prefetcher = request.app.state.detail_prefetcher
+    if prefetcher is not None:
+        detail = prefetcher.lookup(_session_key(request), caso_de_uso, id, req)
+        add_span_event('detail_prefetch.cache', decision='miss' if detail is None else 'hit')
+        if detail is not None:
+            request.state.adapter_name = 'prefetch'
+            with timed_stage(STAGE_SERIALIZE):
+                return Response(content=detail.model_dump_json(), media_type='application/json')
     return await execute_use_case_operation(
         request,
         caso_de_uso,
@@ -180,52 +295,98 @@ async def dashboard_detail(
     )
 
 
-@router.get('/datops/overview', response_model=DatopsOverviewResponse, tags=['DatOps'])
-async def datops_overview(request: Request) -> DatopsOverviewResponse:
-    use_cases = []
-    for case_id in _iter_available_systems(request):
-        metadata = _effective_system_metadata(request, case_id)
-        if metadata is None:
-            continue
-        use_cases.append(
-            DatopsUseCase(
-                id=case_id,
-                label=_use_case_label(case_id),
-                adapter=metadata['adapter'],
-                timeout_ms=metadata['timeout_ms'],
-                upstream_base_url=metadata['upstream_base_url'],
-                routes=DatopsRoutes(
-                    cards=f'/cards?caso_de_uso={case_id}',
-                    dashboard=f'/dashboard?caso_de_uso={case_id}',
-                    dashboard_detail=f'/dashboard_detail?caso_de_uso={case_id}&id={{id}}',
-                ),
-            )
-        )
+@router.post('/chart', response_model=ChartResponse)
+async def chart(
+    request: Request,
+    req: QueryRequest | None = Body(default=None),
+    caso_de_uso: str = Query(..., min_length=1),
+    component: str = Query(..., min_length=1),
+    x_request_id: str | None = Header(default=None),
+    x_trace_id: str | None = Header(default=None),
+) -> Response:
+    settings = get_settings()
+    # La serie se define en el `config` del componente; la request solo aporta filtros, busqueda y rango.
+    spec = ChartSpec.from_component(
+        _resolve_component(resolve_system_view(request, caso_de_uso), component),
+        max_points=settings.CHART_MAX_POINTS,
+        max_rows=settings.CHART_MAX_ROWS,
+    )
+    return await execute_use_case_operation(
+        request,
+        caso_de_uso,
+        x_request_id,
+        x_trace_id,
+        lambda adapter, ctx: adapter.get_chart(ctx, spec, req or QueryRequest()),
+    )
 
-    return DatopsOverviewResponse(
-        generated_at=datetime.now(timezone.utc).isoformat(),
-        profile=settings.ENVIRONMENT,
-        use_cases=use_cases,
+
+def _stream_query(query: str | None) -> QueryRequest:
+    if not query:
+        return QueryRequest()
+    try:
+        return QueryRequest.model_validate_json(query)
+    except ValidationError as error:
+        raise OrchestratorError(
+            ErrorCode.VALIDATION_ERROR, 'Invalid stream query', 400, detail={'errors': jsonable_encoder(error.errors())}
+        ) from error
+
+
+def _stream_fetchers(app: Starlette, caso_de_uso: str, req: QueryRequest, columnar: bool) -> dict:
+    request_id = f'stream-{uuid.uuid4().hex[:12]}'
+
+    async def fetch(operation) -> str:
+        # Los sondeos son trabajo de fondo: no hacen cola ni quitan hueco a las requests interactivas.
+        result = await run_use_case_operation(app, caso_de_uso, (request_id, None), operation, background=True)
+        return result.model_dump_json()
+
+    return {
+        'cards': lambda: fetch(lambda adapter, ctx: adapter.get_cards(ctx, req)),
+        'dashboard': lambda: fetch(
+            lambda adapter, ctx: adapter.get_dashboard_columnar(ctx, req) if columnar else adapter.get_dashboard(ctx, req)
+        ),
+    }
+
+
+@router.get('/stream', tags=['Live'])
+async def stream(
+    request: Request,
+    caso_de_uso: str = Query(..., min_length=1),
+    query: str | None = Query(default=None, description='QueryRequest en JSON; se ignoran cursor y since.'),
+    format: Literal['rows', 'columnar'] | None = Query(default=None),
+    component: str | None = Query(default=None),
+) -> StreamingResponse:
+    hub = request.app.state.live_hub
+    columnar = _wants_columnar(request, format)
+    # Todos los clientes de la misma consulta comparten poller y reciben la primera pagina.
+    req = _stream_query(query).model_copy(update={'cursor': None, 'since': None})
+    resolve_system_view(request, caso_de_uso)
+    req = _with_table_fields(request, caso_de_uso, req, component)
+    key = (caso_de_uso, req.model_dump_json(), columnar)
+    hub.check_capacity(key)
+    return StreamingResponse(
+        hub.events(key, lambda: _stream_fetchers(request.app, caso_de_uso, req, columnar)),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
     )
 
 
 @router.get('/ui/shell', response_model=UIShellResponse, tags=['UI'])
 async def ui_shell(request: Request) -> UIShellResponse:
-    available_systems = list(_iter_available_systems(request))
+    available_systems = list(iter_available_systems(request))
     default_case = available_systems[0] if available_systems else None
     if default_case is None and available_systems:
         default_case = available_systems[0]
 
     systems = []
     for case_id in available_systems:
-        label = _use_case_label(case_id)
+        label = use_case_label(case_id)
         systems.append(
             UIShellSystem(
                 id=case_id,
                 label=label,
                 default=case_id == default_case,
                 route_path=f'/monitor?caso_de_uso={case_id}',
-                view=_resolve_system_view(request, case_id),
+                view=resolve_system_view(request, case_id),
             )
         )
 
@@ -234,47 +395,3 @@ async def ui_shell(request: Request) -> UIShellResponse:
         home=UIShellTab(id='home', label='HOME', path='/home'),
         systems=systems,
     )
-
-
-@router.get('/admin/view-configs', response_model=list[ViewConfiguration], tags=['Admin'])
-async def list_view_configs(
-    request: Request,
-    system: str | None = Query(default=None, min_length=1),
-    enabled: bool | None = Query(default=None),
-) -> list[ViewConfiguration]:
-    return get_view_store(request).list_configs(system=system, enabled=enabled)
-
-
-@router.get('/admin/view-configs/{view_id}', response_model=ViewConfiguration, tags=['Admin'])
-async def get_view_config(request: Request, view_id: str) -> ViewConfiguration:
-    try:
-        return get_view_store(request).get(view_id)
-    except KeyError as error:
-        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
-
-
-@router.post('/admin/view-configs', response_model=ViewConfiguration, tags=['Admin'])
-async def create_view_config(request: Request, payload: ViewConfigCreate) -> ViewConfiguration:
-    enforce_admin_rate_limit(request)
-    try:
-        return get_view_store(request).create(payload)
-    except ValueError as error:
-        raise HTTPException(status_code=409, detail=str(error)) from error
-
-
-@router.put('/admin/view-configs/{view_id}', response_model=ViewConfiguration, tags=['Admin'])
-async def update_view_config(request: Request, view_id: str, payload: ViewConfigUpdate) -> ViewConfiguration:
-    enforce_admin_rate_limit(request)
-    try:
-        return get_view_store(request).update(view_id, payload)
-    except KeyError as error:
-        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
-
-
-@router.delete('/admin/view-configs/{view_id}', status_code=204, tags=['Admin'])
-async def delete_view_config(request: Request, view_id: str) -> None:
-    enforce_admin_rate_limit(request)
-    try:
-        get_view_store(request).delete(view_id)
-    except KeyError as error:
-        raise HTTPException(status_code=404, detail=f'view_id not found: {view_id}') from error
@@ -11,6 +11,7 @@ MAX_COMPONENTS_PER_VIEW = 20
 MAX_COMPONENTS_PER_TYPE = 8
 MAX_COMPONENT_DEPTH = 4
 MAX_CONFIG_ENTRIES = 40
+MAX_UPSTREAM_ENDPOINTS = 16
 COMPONENT_DATA_SOURCES = {
     'cards': {'/cards'},
     'table': {'/dashboard'},
@@ -38,6 +39,13 @@ class QueryRequest(BaseModel):
     sort: list[SortItem] | None = None
     cursor: str | None = None
     limit: int | None = Field(default=None, ge=1)
+    # `version` de una respuesta anterior de /dashboard: si se puede, se devuelven solo los cambios desde ella.
+    since: str | None = None
+    # Proyeccion de columnas de /dashboard (`id` y `detail` siempre se incluyen); None = todas.
+    fields: list[str] | None = None
+    # Ventana de `left.messages` en /dashboard_detail; el cursor sale de `nextCursor`/`prevCursor` de una respuesta anterior.
+    messages_limit: int | None = Field(default=None, ge=1)
+    messages_cursor: str | None = None
 
 
 class CardItem(BaseModel):
@@ -85,12 +93,52 @@ class TablePayload(BaseModel):
     columns: list[TableColumn]
     rows: list[TableRow]
     nextCursor: str | None = None
+    total: int | None = None
+
+
+class TableDelta(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    since: str
+    inserted: list[TableRow]
+    updated: list[TableRow]
+    deleted: list[str]
 
 
 class DashboardResponse(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
     table: TablePayload
+    version: str | None = None
+    delta: TableDelta | None = None
+
+
+class DictEncodedColumn(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    # Valores distintos de la columna en la pagina; cada fila lleva el indice de su valor en `values`.
+    values: list[Any]
+    codes: list[int]
+
+
+class ColumnarTablePayload(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    columns: list[TableColumn]
+    rowCount: int = Field(ge=0)
+    # Una lista de valores por clave de fila (null = la fila no tiene ese campo), o diccionario + codigos.
+    data: dict[str, DictEncodedColumn | list[Any]]
+    nextCursor: str | None = None
+    total: int | None = None
+
+
+class ColumnarDashboardResponse(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    format: Literal['columnar'] = 'columnar'
+    table: ColumnarTablePayload
+    version: str | None = None
+    delta: TableDelta | None = None
 
 
 class MessageBlock(BaseModel):
@@ -105,6 +153,10 @@ class LeftPanel(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
     messages: list[MessageBlock]
+    # Solo con ventana de mensajes: total de la conversacion y cursores a la ventana siguiente y anterior.
+    total: int | None = None
+    nextCursor: str | None = None
+    prevCursor: str | None = None
 
 
 class KVItem(BaseModel):
@@ -170,6 +222,25 @@ class DashboardDetailResponse(BaseModel):
     right: list[RightPanel]
 
 
+class ChartSeries(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    name: str
+    x: list[int | float | str]
+    y: list[float | None]
+
+
+class ChartResponse(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    component: str
+    aggregation: str
+    bucket: str | None = None
+    rows: int
+    downsampled: bool = False
+    series: list[ChartSeries]
+
+
 class DatopsRoutes(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
@@ -178,6 +249,31 @@ class DatopsRoutes(BaseModel):
     dashboard_detail: str
 
 
+class DatopsAdaptiveTimeout(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    route: str
+    samples: int
+    p99_ms: float
+    timeout_ms: float
+
+
+class DatopsEndpoint(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+
+    url: str
+    healthy: bool
+    outstanding: int
+    requests: int
+    errors: int
+    ewma_latency_ms: float
+    consecutive_failures: int
+    ejections: int
+    last_check_at: str | None = None
+    last_error: str | None = None
+    adaptive_timeouts: list[DatopsAdaptiveTimeout] = Field(default_factory=list)
+
+
 class DatopsUseCase(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
@@ -186,6 +282,8 @@ class DatopsUseCase(BaseModel):
     adapter: str
     timeout_ms: int
     upstream_base_url: str | None = None
+    balancing: str | None = None
+    endpoints: list[DatopsEndpoint] = Field(default_factory=list)
     routes: DatopsRoutes
 
 
@@ -202,7 +300,27 @@ class ViewRuntimeConfig(BaseModel):
     model_config = ConfigDict(extra='forbid')
 
     adapter: Literal['http_proxy']
-    upstream_base_url: str = Field(min_length=1, max_length=500)
+    upstream_base_url: str | None = Field(default=None, min_length=1, max_length=500)
+    upstream_base_urls: list[Annotated[str, Field(min_length=1, max_length=500)]] | None = Field(
+        default=None, min_length=1, max_length=MAX_UPSTREAM_ENDPOINTS
+    )
+    balancing: Literal['round_robin', 'least_outstanding', 'p2c'] = 'round_robin'
+    timeout_ms: int | None = Field(default=None, ge=100, le=60000)
+
+    @model_validator(mode='after')
+    def validate_endpoints(self):
+        if not self.upstream_base_url and not self.upstream_base_urls:
+            raise ValueError('upstream_base_url or upstream_base_urls is required')
+        # `upstream_base_url` sigue siendo el endpoint principal que consumen los contratos existentes.
+        if self.upstream_base_url is None:
+            self.upstream_base_url = self.upstream_base_urls[0]
+        if len(self.endpoints) > MAX_UPSTREAM_ENDPOINTS:
+            raise ValueError(f'too many upstream endpoints; max: {MAX_UPSTREAM_ENDPOINTS}')
+        return self
+
+    @property
+    def endpoints(self) -> list[str]:
+        return list(dict.fromkeys([self.upstream_base_url, *(self.upstream_base_urls or [])]))
 
 
 class ViewComponent(BaseModel):
@@ -233,11 +351,11 @@ class ViewComponent(BaseModel):
 ViewComponent.model_rebuild()
 
 
-def _walk_components(components: list[ViewComponent], depth: int = 1):
+def walk_components(components: list[ViewComponent], depth: int = 1):
     for component in components:
         yield component, depth
         if component.children:
-            yield from _walk_components(component.children, depth + 1)
+            yield from walk_components(component.children, depth + 1)
 
 
 class ViewConfiguration(BaseModel):
@@ -255,7 +373,7 @@ class ViewConfiguration(BaseModel):
         if len(self.components) == 0:
             raise ValueError('components cannot be empty')
 
-        flattened = list(_walk_components(self.components))
+        flattened = list(walk_components(self.components))
         if len(flattened) > MAX_COMPONENTS_PER_VIEW:
             raise ValueError(f'too many components; max: {MAX_COMPONENTS_PER_VIEW}')
 
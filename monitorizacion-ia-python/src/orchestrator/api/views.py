@@ -0,0 +1,49 @@
+from fastapi import Request
+
+from orchestrator.api.schemas import ViewConfiguration
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.view_config_store import ViewConfigStore
+
+
+def get_view_store(request: Request):
+    return request.app.state.view_config_store
+
+
+def use_case_label(case_id: str) -> str:
+    return case_id.replace('_', ' ').title()
+
+
+def resolve_configured_view(request: Request, case_id: str) -> ViewConfiguration | None:
+    return configured_view(get_view_store(request), case_id)
+
+
+def configured_view(store: ViewConfigStore, case_id: str) -> ViewConfiguration | None:
+    views = store.list_configs(system=case_id, enabled=True)
+    if not views:
+        return None
+    return sorted(views, key=lambda item: item.name)[0]
+
+
+def resolve_system_view(request: Request, case_id: str) -> ViewConfiguration:
+    return system_view(get_view_store(request), case_id)
+
+
+def system_view(store: ViewConfigStore, case_id: str) -> ViewConfiguration:
+    view = configured_view(store, case_id)
+    if view is not None:
+        return view
+    raise OrchestratorError(
+        ErrorCode.UNKNOWN_USE_CASE,
+        f'caso_de_uso not configured in view storage: {case_id}',
+        404,
+    )
+
+
+def iter_available_systems(request: Request):
+    seen: set[str] = set()
+    configured_views = sorted(get_view_store(request).list_configs(enabled=True), key=lambda item: (item.system, item.name))
+    for view in configured_views:
+        if view.system in seen:
+            continue
+        seen.add(view.system)
+        yield view.system
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+
+
+class _LatencyWindow:
+    def __init__(self, size: int) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+        # Resultado de los ultimos intentos (True = agoto su timeout): un timeout no es una latencia.
+        self.outcomes: deque[bool] = deque(maxlen=size)
+        self.timeouts = 0
+        self.p99_ms: float | None = None
+        self._pending = 0
+
+    @property
+    def timeout_share(self) -> float:
+        return self.timeouts / len(self.outcomes) if self.outcomes else 0.0
+
+    def record_outcome(self, timed_out: bool) -> None:
+        if len(self.outcomes) == self.outcomes.maxlen and self.outcomes[0]:
+            self.timeouts -= 1
+        self.outcomes.append(timed_out)
+        self.timeouts += timed_out
+
+    def observe(self, latency_ms: float, recompute_every: int) -> None:
+        self.record_outcome(False)
+        self.samples.append(latency_ms)
+        self._pending += 1
+        if self.p99_ms is None or self._pending >= recompute_every:
+            ordered = sorted(self.samples)
+            self.p99_ms = ordered[max(math.ceil(len(ordered) * 0.99) - 1, 0)]
+            self._pending = 0
+
+
+class AdaptiveTimeouts:
+    """Timeout por intento aprendido de la latencia reciente de cada upstream y ruta.
+
+    Mantiene una ventana deslizante de las ultimas `window` latencias por (upstream, ruta) y propone
+    `multiplier` x p99 acotado a [`min_ms`, `max_ms`]. Hasta reunir `min_samples` se usa el timeout configurado.
+    Los intentos que agotan su timeout no entran como latencias (valdrian lo que el propio timeout y el p99
+    lo perseguiria hacia arriba): se cuentan aparte y, si pasan de `max_timeout_share` de los ultimos intentos,
+    el p99 ya no es fiable y se vuelve al timeout configurado hasta que la ventana se renueve.
+    """
+
+    def __init__(
+        self,
+        multiplier: float = 3.0,
+        min_ms: int = 50,
+        max_ms: int = 5000,
+        window: int = 512,
+        min_samples: int = 50,
+        max_timeout_share: float = 0.01,
+    ) -> None:
+        self.multiplier = multiplier
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.window = window
+        self.min_samples = min_samples
+        self.max_timeout_share = max_timeout_share
+        # Ordenar la ventana en cada muestra es innecesario: el p99 se recalcula cada ~3% de la ventana.
+        self._recompute_every = max(window // 32, 1)
+        self._windows: dict[tuple[str, str], _LatencyWindow] = {}
+
+    def observe(self, upstream: str, route: str, latency_ms: float) -> None:
+        self._window(upstream, route).observe(latency_ms, self._recompute_every)
+
+    def observe_timeout(self, upstream: str, route: str) -> None:
+        self._window(upstream, route).record_outcome(True)
+
+    def _window(self, upstream: str, route: str) -> _LatencyWindow:
+        window = self._windows.get((upstream, route))
+        if window is None:
+            window = self._windows[(upstream, route)] = _LatencyWindow(self.window)
+        return window
+
+    def timeout_for(self, upstream: str, route: str, configured_ms: float) -> float:
+        window = self._windows.get((upstream, route))
+        if window is None or len(window.samples) < self.min_samples or window.p99_ms is None:
+            return configured_ms
+        if window.timeout_share > self.max_timeout_share:
+            return configured_ms
+        return min(max(window.p99_ms * self.multiplier, self.min_ms), self.max_ms)
+
+    def describe(self, upstream: str, configured_ms: float) -> list[dict]:
+        rows = []
+        for (window_upstream, route), window in sorted(self._windows.items()):
+            if window_upstream != upstream:
+                continue
+            rows.append(
+                {
+                    'route': route,
+                    'samples': len(window.samples),
+                    'timeouts': window.timeouts,
+                    'p99_ms': round(window.p99_ms or 0.0, 2),
+                    'timeout_ms': round(min(self.timeout_for(upstream, route, configured_ms), configured_ms), 2),
+                }
+            )
+        return rows
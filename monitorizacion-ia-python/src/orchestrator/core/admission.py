@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.timing import STAGE_QUEUE, record_stage
+
+REJECT_QUEUE_FULL = 'queue_full'
+REJECT_QUEUE_TIMEOUT = 'queue_timeout'
+REJECT_BACKGROUND = 'background'
+
+
+class AdmissionController:
+    """Limita el trabajo en vuelo de los endpoints de datos (global y por caso de uso) con una cola FIFO acotada.
+
+    Vive en el event loop de cada worker: no necesita locks. Con `adaptive` el limite global sigue un AIMD
+    sobre la latencia observada: +1 por cada ventana de `limit` respuestas rapidas y x`decrease_factor`
+    cuando una respuesta supera `latency_target_ms` (como mucho una vez por ventana de latencia objetivo).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 64,
+        case_max_concurrency: int = 0,
+        case_limits: dict[str, int] | None = None,
+        max_queue: int = 128,
+        queue_timeout_ms: int = 250,
+        retry_after_s: int = 1,
+        adaptive: bool = False,
+        min_concurrency: int = 4,
+        latency_target_ms: float = 500.0,
+        decrease_factor: float = 0.9,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.case_max_concurrency = case_max_concurrency
+        self.case_limits = dict(case_limits or {})
+        self.max_queue = max_queue
+        self.queue_timeout_ms = queue_timeout_ms
+        self.retry_after_s = retry_after_s
+        self.adaptive = adaptive
+        self.min_concurrency = min(min_concurrency, max_concurrency)
+        self.latency_target_ms = latency_target_ms
+        self.decrease_factor = decrease_factor
+        self._limit = float(max_concurrency)
+        self._last_decrease = 0.0
+        self._inflight = 0
+        self._inflight_by_case: dict[str, int] = {}
+        self._waiters: deque[tuple[str, asyncio.Future]] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected: dict[str, int] = {REJECT_QUEUE_FULL: 0, REJECT_QUEUE_TIMEOUT: 0}
+        self.background_admitted = 0
+        self.background_skipped = 0
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), 1)
+
+    def try_admit(self, case: str, reserve: int = 0) -> bool:
+        if self._waiters or not self._has_capacity(case) or self._inflight + reserve >= self.limit:
+            return False
+        self._take(case)
+        return True
+
+    def release(self, case: str, latency_ms: float) -> None:
+        self._inflight -= 1
+        remaining = self._inflight_by_case.get(case, 1) - 1
+        if remaining > 0:
+            self._inflight_by_case[case] = remaining
+        else:
+            self._inflight_by_case.pop(case, None)
+        if self.adaptive:
+            self._adapt(latency_ms)
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def admit(self, case: str, max_wait_ms: float | None = None) -> AsyncIterator[None]:
+        if not self.try_admit(case):
+            waited_ms = await self._wait(case, max_wait_ms)
+            record_stage(STAGE_QUEUE, waited_ms)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(case, (time.perf_counter() - start) * 1000)
+
+    @asynccontextmanager
+    async def admit_background(self, case: str) -> AsyncIterator[None]:
+        """Trabajo de fondo (precargas): nunca hace cola y solo entra si, ademas de su hueco, queda otro libre."""
+        if not self.try_admit(case, reserve=1):
+            self.background_skipped += 1
+            raise OrchestratorError(
+                ErrorCode.OVERLOADED, 'No spare capacity for background work', 503, detail={'reason': REJECT_BACKGROUND, 'caso_de_uso': case}
+            )
+        self.background_admitted += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(case, (time.perf_counter() - start) * 1000)
+
+    def stats(self) -> dict:
+        return {
+            'limit': self.limit,
+            'adaptive': self.adaptive,
+            'inflight': self._inflight,
+            'inflight_by_case': dict(sorted(self._inflight_by_case.items())),
+            'waiting': len(self._waiters),
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': dict(self.rejected),
+            'background_admitted': self.background_admitted,
+            'background_skipped': self.background_skipped,
+        }
+
+    async def _wait(self, case: str, max_wait_ms: float | None) -> float:
+        if len(self._waiters) >= self.max_queue:
+            self._reject(case, REJECT_QUEUE_FULL)
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        waiter = (case, future)
+        self._waiters.append(waiter)
+        self.queued += 1
+        # Un waiter bloqueado por el limite de su caso no debe retener a otro caso con hueco.
+        self._wake_waiters()
+        try:
+            wait_ms = self.queue_timeout_ms if max_wait_ms is None else min(self.queue_timeout_ms, max_wait_ms)
+            await asyncio.wait({future}, timeout=wait_ms / 1000)
+        except asyncio.CancelledError:
+            # El cliente se fue mientras esperaba: si ya se le habia asignado hueco, se devuelve.
+            self._abandon(waiter, case)
+            raise
+        if not future.done():
+            self._abandon(waiter, case)
+            self._reject(case, REJECT_QUEUE_TIMEOUT)
+        return (time.perf_counter() - start) * 1000
+
+    def _abandon(self, waiter: tuple[str, asyncio.Future], case: str) -> None:
+        _, future = waiter
+        if future.done() and not future.cancelled():
+            self.release(case, 0.0)
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, case: str, reason: str) -> None:
+        self.rejected[reason] += 1
+        raise OrchestratorError(
+            ErrorCode.OVERLOADED,
+            f'Server overloaded, retry later ({reason})',
+            503,
+            detail={'reason': reason, 'caso_de_uso': case, 'limit': self.limit},
+            headers={'Retry-After': str(self.retry_after_s)},
+        )
+
+    def _has_capacity(self, case: str) -> bool:
+        if self._inflight >= self.limit:
+            return False
+        case_limit = self.case_limits.get(case, self.case_max_concurrency)
+        return case_limit <= 0 or self._inflight_by_case.get(case, 0) < case_limit
+
+    def _take(self, case: str) -> None:
+        self._inflight += 1
+        self._inflight_by_case[case] = self._inflight_by_case.get(case, 0) + 1
+        self.admitted += 1
+
+    def _wake_waiters(self) -> None:
+        # FIFO salvo que el primero este bloqueado por su limite de caso: entonces pasa el siguiente elegible.
+        for waiter in list(self._waiters):
+            if self._inflight >= self.limit:
+                return
+            case, future = waiter
+            if future.done():
+                self._waiters.remove(waiter)
+                continue
+            if not self._has_capacity(case):
+                continue
+            self._waiters.remove(waiter)
+            self._take(case)
+            future.set_result(None)
+
+    def _adapt(self, latency_ms: float) -> None:
+        now = time.monotonic()
+        if latency_ms > self.latency_target_ms:
+            if now - self._last_decrease >= self.latency_target_ms / 1000:
+                self._limit = max(self._limit * self.decrease_factor, float(self.min_concurrency))
+                self._last_decrease = now
+            return
+        if self._inflight + 1 >= self.limit:
+            # Solo crece si el limite se esta usando; si no, aumentarlo no aporta informacion.
+            self._limit = min(self._limit + 1 / self._limit, float(self.max_concurrency))
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = 'x-request-deadline'
+TIMEOUT_HEADER = 'x-request-timeout-ms'
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """Instante limite de una request en reloj monotono; en cabeceras viaja como epoch en milisegundos."""
+
+    expires_at: float
+
+    @classmethod
+    def after_ms(cls, timeout_ms: float, start: float | None = None) -> Deadline:
+        return cls((time.monotonic() if start is None else start) + timeout_ms / 1000)
+
+    @classmethod
+    def from_header(cls, value: str | None) -> Deadline | None:
+        if not value:
+            return None
+        try:
+            epoch_ms = float(value)
+        except ValueError:
+            epoch_ms = math.nan
+        # `nan`/`inf` pasan por float(): un limite que no es finito no se puede comparar ni reenviar.
+        if not math.isfinite(epoch_ms):
+            raise OrchestratorError(
+                ErrorCode.VALIDATION_ERROR,
+                f'{DEADLINE_HEADER} must be a Unix epoch in milliseconds',
+                400,
+            )
+        return cls(time.monotonic() + (epoch_ms - time.time() * 1000) / 1000)
+
+    def remaining_ms(self) -> float:
+        return max((self.expires_at - time.monotonic()) * 1000, 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def earliest(self, other: Deadline | None) -> Deadline:
+        if other is None or self.expires_at <= other.expires_at:
+            return self
+        return other
+
+    def shrink(self, timeout_ms: float) -> Deadline:
+        return self.earliest(Deadline.after_ms(timeout_ms))
+
+    def headers(self) -> dict[str, str]:
+        remaining_ms = self.remaining_ms()
+        return {
+            DEADLINE_HEADER: str(int(time.time() * 1000 + remaining_ms)),
+            TIMEOUT_HEADER: str(int(remaining_ms)),
+        }
+
+    def check(self, stage: str) -> None:
+        if self.expired:
+            raise deadline_exceeded(stage)
+
+
+def deadline_exceeded(stage: str) -> OrchestratorError:
+    return OrchestratorError(ErrorCode.DEADLINE_EXCEEDED, 'Request deadline exceeded', 504, detail={'stage': stage})
+
+
+class TimeoutPolicy:
+    """Timeout efectivo por vista: `runtime.timeout_ms`, despues `timeouts.ms` de use_cases.yaml y por ultimo el global."""
+
+    def __init__(self, default_timeout_ms: int, use_cases_path: str | None = None) -> None:
+        self.default_timeout_ms = default_timeout_ms
+        self.use_cases_path = use_cases_path
+        self._by_case: dict[str, int] | None = None
+
+    def timeout_for(self, caso_de_uso: str, view=None) -> int:
+        runtime = getattr(view, 'runtime', None)
+        if runtime is not None and runtime.timeout_ms:
+            return runtime.timeout_ms
+        return self.case_timeouts().get(caso_de_uso, self.default_timeout_ms)
+
+    def case_timeouts(self) -> dict[str, int]:
+        if self._by_case is None:
+            self._by_case = self._load_case_timeouts()
+        return self._by_case
+
+    def _load_case_timeouts(self) -> dict[str, int]:
+        if not self.use_cases_path or not Path(self.use_cases_path).exists():
+            return {}
+        from orchestrator.core.use_case_loader import UseCaseLoader
+
+        try:
+            routing = UseCaseLoader(self.use_cases_path).load()
+        except Exception as error:  # noqa: BLE001 - un catalogo invalido no debe tumbar las requests: se usa el global
+            logger.warning('use case timeouts not loaded', extra={'fields': {'path': self.use_cases_path, 'error': str(error)}})
+            return {}
+        return {case_id: cfg.timeouts.ms for case_id, cfg in routing.use_cases.items() if cfg.timeouts.ms}
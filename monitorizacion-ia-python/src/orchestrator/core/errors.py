@@ -9,10 +9,13 @@ from pydantic import BaseModel
 
 class ErrorCode(StrEnum):
     UNKNOWN_USE_CASE = 'UNKNOWN_USE_CASE'
+    NOT_FOUND = 'NOT_FOUND'
     VALIDATION_ERROR = 'VALIDATION_ERROR'
     UPSTREAM_ERROR = 'UPSTREAM_ERROR'
     UPSTREAM_TIMEOUT = 'UPSTREAM_TIMEOUT'
     INTERNAL_ERROR = 'INTERNAL_ERROR'
+    OVERLOADED = 'OVERLOADED'
+    DEADLINE_EXCEEDED = 'DEADLINE_EXCEEDED'
 
 
 class ErrorResponse(BaseModel):
@@ -23,20 +26,39 @@ class ErrorResponse(BaseModel):
 
 
 class OrchestratorError(Exception):
-    def __init__(self, code: ErrorCode, message: str, status_code: int, detail: dict | None = None):
+    def __init__(
+        self,
+        code: ErrorCode,
+        message: str,
+        status_code: int,
+        detail: dict | None = None,
+        headers: dict[str, str] | None = None,
+    ):
         self.code = code
         self.message = message
         self.status_code = status_code
         self.detail = detail
+        self.headers = headers
         super().__init__(message)
 
 
+def is_upstream_failure(error: OrchestratorError) -> bool:
+    # Timeouts, errores de conexion y 5xx son fallos del upstream; un 4xx es un problema de la request.
+    if error.code == ErrorCode.UPSTREAM_TIMEOUT:
+        return True
+    if error.code != ErrorCode.UPSTREAM_ERROR:
+        return False
+    status_code = (error.detail or {}).get('status_code')
+    return status_code is None or status_code >= 500
+
+
 def install_error_handlers(app: FastAPI) -> None:
     @app.exception_handler(OrchestratorError)
     async def handle_orch_error(_: Request, exc: OrchestratorError) -> JSONResponse:
         return JSONResponse(
             status_code=exc.status_code,
             content=ErrorResponse(code=exc.code, message=exc.message, detail=exc.detail).model_dump(),
+            headers=exc.headers,
         )
 
     @app.exception_handler(RequestValidationError)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Hashable
+
+from pydantic import BaseModel
+
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.popularity import HeavyHitters
+
+logger = logging.getLogger(__name__)
+
+Refetch = Callable[[], Awaitable[BaseModel]]
+
+# Cada entrada se refresca en un punto al azar de este tramo de su TTL: asi no caducan ni se refrescan todas a la vez.
+REFRESH_WINDOW = (0.5, 0.8)
+
+
+def normalized_query(req: QueryRequest) -> str:
+    """Forma canonica de una consulta, para que la misma consulta escrita de otra forma comparta clave."""
+    data = req.model_dump(exclude_none=True, exclude={'since'})
+    filters = data.pop('filters', None)
+    if filters:
+        # Los valores de un filtro son un conjunto: su orden no cambia la respuesta.
+        data['filters'] = {key: sorted(value, key=str) if isinstance(value, list) else value for key, value in filters.items()}
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class _Entry:
+    __slots__ = ('result', 'fetched_at', 'refresh_at', 'refetch', 'refreshing')
+
+    def __init__(self, result: BaseModel, fetched_at: float, refresh_at: float, refetch: Refetch) -> None:
+        self.result = result
+        self.fetched_at = fetched_at
+        self.refresh_at = refresh_at
+        self.refetch = refetch
+        self.refreshing = False
+
+
+class HotQueryCache:
+    """Cache de respuestas de las consultas mas pedidas, refrescada en segundo plano antes de caducar.
+
+    La popularidad de cada `(caso de uso, ruta, consulta normalizada, formato)` se cuenta con un count-min
+    sketch + top-K (memoria fija aunque haya millones de consultas distintas). Solo se guardan respuestas de
+    las claves del top con al menos `min_count` peticiones recientes; el resto va siempre al adapter. Los
+    refrescos en vuelo no pasan de `refresh_share` de la capacidad (`capacity()`, p. ej. el limite de admision)
+    y entran por admision de fondo, asi que nunca desplazan a una request interactiva.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 64,
+        ttl_s: float = 10.0,
+        min_count: int = 5,
+        refresh_share: float = 0.1,
+        capacity: Callable[[], int] = lambda: 64,
+        decay_s: float = 60.0,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.popularity = HeavyHitters(top_k)
+        self.ttl_s = ttl_s
+        self.min_count = min_count
+        self.refresh_share = refresh_share
+        self.capacity = capacity
+        self.decay_s = decay_s
+        self._rng = rng or random.Random()
+        self._entries: dict[Hashable, _Entry] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._decay_at = time.monotonic() + decay_s
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_skipped = 0
+        self.refresh_errors = 0
+        self.evicted = 0
+
+    def is_hot(self, key: Hashable) -> bool:
+        return self.popularity.count(key) >= self.min_count
+
+    def lookup(self, key: Hashable, now: float | None = None) -> BaseModel | None:
+        """Cuenta la peticion y devuelve la respuesta guardada si sigue vigente."""
+        self.popularity.add(key)
+        entry = self._entries.get(key)
+        if entry is None or (now if now is not None else time.monotonic()) - entry.fetched_at >= self.ttl_s:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.result
+
+    def store(self, key: Hashable, result: BaseModel, refetch: Refetch, now: float | None = None) -> None:
+        """Guarda una respuesta recien servida, solo si la clave es popular."""
+        if not self.is_hot(key):
+            return
+        now = now if now is not None else time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.refreshing:
+            return
+        self._entries[key] = _Entry(result, now, self._next_refresh(now), refetch)
+
+    def budget(self) -> int:
+        return max(1, int(self.capacity() * self.refresh_share))
+
+    def tick(self, now: float | None = None) -> int:
+        """Lanza los refrescos que tocan, los mas populares primero y sin pasar del presupuesto; devuelve cuantos."""
+        now = now if now is not None else time.monotonic()
+        if now >= self._decay_at:
+            self.popularity.decay()
+            self._decay_at = now + self.decay_s
+        for key in [key for key, entry in self._entries.items() if not entry.refreshing and not self.is_hot(key)]:
+            del self._entries[key]
+            self.evicted += 1
+        due = [key for key, entry in self._entries.items() if not entry.refreshing and now >= entry.refresh_at]
+        due.sort(key=self.popularity.count, reverse=True)
+        launched = 0
+        for key in due[: max(self.budget() - len(self._inflight), 0)]:
+            entry = self._entries[key]
+            entry.refreshing = True
+            # Contexto vacio: el refresco no pertenece a ninguna request ni a su traza.
+            task = asyncio.create_task(self._refresh(entry), context=contextvars.Context())
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            launched += 1
+        return launched
+
+    async def _refresh(self, entry: _Entry) -> None:
+        try:
+            result = await entry.refetch()
+        except OrchestratorError as error:
+            if error.code == ErrorCode.OVERLOADED:
+                self.refresh_skipped += 1
+            else:
+                self.refresh_errors += 1
+            # Sin hueco o con el upstream fallando se reintenta pronto, pero no en el siguiente tick.
+            entry.refresh_at = time.monotonic() + self.ttl_s * self._rng.uniform(0.05, 0.15)
+        except Exception:
+            self.refresh_errors += 1
+            logger.exception('hot query refresh failed', extra={'fields': {'event': 'hot_query_refresh_error'}})
+            entry.refresh_at = time.monotonic() + self.ttl_s * self._rng.uniform(0.05, 0.15)
+        else:
+            now = time.monotonic()
+            entry.result = result
+            entry.fetched_at = now
+            entry.refresh_at = self._next_refresh(now)
+            self.refreshes += 1
+        finally:
+            entry.refreshing = False
+
+    def _next_refresh(self, now: float) -> float:
+        return now + self.ttl_s * self._rng.uniform(*REFRESH_WINDOW)
+
+    async def run(self, interval_s: float | None = None) -> None:
+        interval_s = interval_s or max(self.ttl_s / 20, 0.05)
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception('hot query scheduler failed', extra={'fields': {'event': 'hot_query_tick_error'}})
+            # Ticks con jitter: varios workers con el mismo intervalo no sincronizan sus refrescos.
+            await asyncio.sleep(interval_s * self._rng.uniform(0.5, 1.5))
+
+    async def aclose(self) -> None:
+        tasks = list(self._inflight)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'tracked': self.popularity.sketch.total,
+            'hot': sum(1 for _key, count in self.popularity.top() if count >= self.min_count),
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'refreshes': self.refreshes,
+            'refreshing': len(self._inflight),
+            'refresh_budget': self.budget(),
+            'refresh_skipped': self.refresh_skipped,
+            'refresh_errors': self.refresh_errors,
+            'evicted': self.evicted,
+            'top': [
+                {'caso_de_uso': key[0], 'route': key[1], 'query': key[2], 'count': count}
+                for key, count in self.popularity.top(5)
+                if isinstance(key, tuple) and len(key) >= 3
+            ],
+        }
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+
+from orchestrator.core.admission import REJECT_BACKGROUND
+from orchestrator.core.errors import ErrorCode, ErrorResponse, OrchestratorError
+
+logger = logging.getLogger(__name__)
+
+EVENT_ERROR = 'error'
+# Los datos vuelven a llegar tras un `error`: el cliente quita el aviso (no se guarda como ultimo estado).
+EVENT_RECOVERED = 'recovered'
+
+Fetcher = Callable[[], Awaitable[str]]
+
+
+class Subscription:
+    """Buzon de un cliente de `/stream`: solo guarda el ultimo estado de cada evento.
+
+    Si el cliente lee mas despacio de lo que cambian los datos, los estados intermedios se sobrescriben
+    (y se cuentan en `dropped`) en lugar de acumularse: la memoria por cliente esta acotada y al leer
+    siempre recibe lo mas reciente.
+    """
+
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+        self.dropped = 0
+        self._pending: dict[str, str] = {}
+        self._wake = asyncio.Event()
+
+    def offer(self, event: str, data: str) -> None:
+        if event in self._pending:
+            self.dropped += 1
+        self._pending[event] = data
+        self._wake.set()
+
+    def retract(self, event: str) -> None:
+        self._pending.pop(event, None)
+
+    async def next(self, timeout_s: float) -> list[tuple[str, str]]:
+        """Eventos pendientes, o lista vacia si pasa `timeout_s` sin cambios (toca heartbeat)."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout_s)
+            except TimeoutError:
+                return []
+        self._wake.clear()
+        pending, self._pending = self._pending, {}
+        return list(pending.items())
+
+
+class LivePoller:
+    """Consulta los datos de una clave cada `interval_s` y reparte a los suscriptores solo lo que cambia."""
+
+    def __init__(self, key: Hashable, fetchers: dict[str, Fetcher], interval_s: float) -> None:
+        self.key = key
+        self.fetchers = fetchers
+        self.interval_s = interval_s
+        self.subscribers: set[Subscription] = set()
+        self.latest: dict[str, str] = {}
+        self.polls = 0
+        self.skipped = 0
+        self.events = 0
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        # Contexto vacio: el poller sobrevive a la request que lo crea y no debe apuntar en sus timings ni en su traza.
+        self.task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    def publish(self, event: str, data: str) -> None:
+        if self.latest.get(event) == data:
+            return
+        self.latest[event] = data
+        self.events += 1
+        for subscription in self.subscribers:
+            subscription.offer(event, data)
+
+    async def poll(self) -> None:
+        events = list(self.fetchers)
+        results = await asyncio.gather(*(self.fetchers[event]() for event in events), return_exceptions=True)
+        self.polls += 1
+        error = None
+        fetched = False
+        for event, result in zip(events, results):
+            if _no_spare_capacity(result):
+                # Sin hueco para trabajo de fondo se salta el ciclo: los clientes se quedan con el ultimo estado.
+                self.skipped += 1
+            elif isinstance(result, BaseException):
+                error = error or result
+            else:
+                fetched = True
+                self.publish(event, result)
+        if error is not None:
+            self.publish(EVENT_ERROR, _error_payload(error))
+        elif fetched and self.latest.pop(EVENT_ERROR, None) is not None:
+            self.events += 1
+            for subscription in self.subscribers:
+                subscription.retract(EVENT_ERROR)
+                subscription.offer(EVENT_RECOVERED, '{}')
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('live poller failed', extra={'fields': {'event': 'live_poll_error', 'key': str(self.key)}})
+            await asyncio.sleep(self.interval_s)
+
+
+def _no_spare_capacity(result: object) -> bool:
+    return isinstance(result, OrchestratorError) and isinstance(result.detail, dict) and result.detail.get('reason') == REJECT_BACKGROUND
+
+
+def _error_payload(error: BaseException) -> str:
+    if isinstance(error, OrchestratorError):
+        return ErrorResponse(code=error.code, message=error.message, detail=error.detail).model_dump_json()
+    if isinstance(error, TimeoutError):
+        return ErrorResponse(code=ErrorCode.UPSTREAM_TIMEOUT, message='Live poll timed out').model_dump_json()
+    logger.error('live poll error', exc_info=error)
+    return ErrorResponse(code=ErrorCode.INTERNAL_ERROR, message='Unexpected error').model_dump_json()
+
+
+def _sse(event: str, data: str) -> str:
+    return f'event: {event}\ndata: {data}\n\n'
+
+
+class LiveHub:
+    """Un poller por `(caso de uso, query)` compartido por todos los clientes suscritos a esa clave.
+
+    La carga sobre el upstream depende del numero de claves distintas, no del de clientes: el poller
+    arranca con el primer suscriptor y se para cuando se va el ultimo.
+    """
+
+    def __init__(self, interval_s: float = 5.0, heartbeat_s: float = 15.0, max_pollers: int = 256) -> None:
+        self.interval_s = interval_s
+        self.heartbeat_s = heartbeat_s
+        self.max_pollers = max_pollers
+        self._pollers: dict[Hashable, LivePoller] = {}
+        self.started = 0
+        self.stopped = 0
+        # Estados descartados por clientes lentos que ya se han ido (los de los activos se suman en `stats`).
+        self._dropped = 0
+
+    def check_capacity(self, key: Hashable) -> None:
+        if key not in self._pollers and len(self._pollers) >= self.max_pollers:
+            raise OrchestratorError(ErrorCode.OVERLOADED, 'Too many live streams', 503, headers={'Retry-After': '5'})
+
+    def subscribe(self, key: Hashable, fetchers: Callable[[], dict[str, Fetcher]]) -> Subscription:
+        poller = self._pollers.get(key)
+        if poller is None:
+            self.check_capacity(key)
+            poller = self._pollers[key] = LivePoller(key, fetchers(), self.interval_s)
+            poller.start()
+            self.started += 1
+        subscription = Subscription(key)
+        poller.subscribers.add(subscription)
+        # Un cliente nuevo recibe de entrada el ultimo estado conocido sin esperar al siguiente ciclo.
+        for event, data in poller.latest.items():
+            subscription.offer(event, data)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        poller = self._pollers.get(subscription.key)
+        if poller is None:
+            return
+        poller.subscribers.discard(subscription)
+        self._dropped += subscription.dropped
+        if not poller.subscribers:
+            del self._pollers[subscription.key]
+            if poller.task is not None:
+                poller.task.cancel()
+            self.stopped += 1
+
+    async def events(self, key: Hashable, fetchers: Callable[[], dict[str, Fetcher]]) -> AsyncIterator[str]:
+        """Stream SSE de un cliente; la suscripcion se da de baja al cerrarse el generador (desconexion incluida)."""
+        try:
+            subscription = self.subscribe(key, fetchers)
+        except OrchestratorError as error:
+            yield _sse(EVENT_ERROR, _error_payload(error))
+            return
+        try:
+            yield f'retry: {int(self.interval_s * 1000)}\n\n'
+            while True:
+                batch = await subscription.next(self.heartbeat_s)
+                if not batch:
+                    yield ': heartbeat\n\n'
+                for event, data in batch:
+                    yield _sse(event, data)
+        finally:
+            self.unsubscribe(subscription)
+
+    async def aclose(self) -> None:
+        tasks = [poller.task for poller in self._pollers.values() if poller.task is not None]
+        self._pollers.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        pollers = list(self._pollers.values())
+        return {
+            'pollers': len(pollers),
+            'subscribers': sum(len(poller.subscribers) for poller in pollers),
+            'polls': sum(poller.polls for poller in pollers),
+            'skipped': sum(poller.skipped for poller in pollers),
+            'events': sum(poller.events for poller in pollers),
+            'dropped': self._dropped + sum(subscription.dropped for poller in pollers for subscription in poller.subscribers),
+            'started': self.started,
+            'stopped': self.stopped,
+        }
@@ -1,8 +1,142 @@
+from __future__ import annotations
+
+import atexit
+import json
 import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(name)s] %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict):
+            payload.update(fields)
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = getattr(record, 'fields', None)
+        if isinstance(fields, dict) and fields:
+            line = f"{line} | {' '.join(f'{key}={value}' for key, value in fields.items())}"
+        return line
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler sobre una cola acotada: si el listener no da abasto descarta y cuenta el registro."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self._lock = Lock()
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Sin formatear: el formatter del listener necesita `exc_info` y `fields` intactos, y asi el event loop no formatea.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class RequestLogSampler:
+    """Muestreo determinista por ruta de requests correctas y rapidas; errores y lentas se registran siempre."""
+
+    def __init__(self, default_rate: float = 1.0, rates_by_route: dict[str, float] | None = None) -> None:
+        self.default_rate = default_rate
+        self.rates_by_route = dict(rates_by_route or {})
+        self._lock = Lock()
+        self._seen_by_route: dict[str, int] = {}
+        self.sampled_out = 0
+
+    def should_log(self, route: str, status: int, slow: bool) -> bool:
+        if status >= 400 or slow:
+            return True
+        rate = self.rates_by_route.get(route, self.default_rate)
+        if rate >= 1.0:
+            return True
+        with self._lock:
+            seen = self._seen_by_route.get(route, 0)
+            self._seen_by_route[route] = seen + 1
+            keep = rate > 0.0 and seen % max(round(1 / rate), 1) == 0
+            if not keep:
+                self.sampled_out += 1
+        return keep
+
+
+class LoggingPipeline:
+    def __init__(self, handler: DroppingQueueHandler, listener: QueueListener, queue_size: int) -> None:
+        self.handler = handler
+        self.listener = listener
+        self.queue_size = queue_size
+        self.running = False
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'queue_size': self.queue_size,
+            'queued_records': self.handler.queue.qsize(),
+            'dropped_records': self.handler.dropped,
+        }
+
+    def start(self) -> None:
+        if not self.running:
+            self.listener.start()
+            self.running = True
+
+    def stop(self) -> None:
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+    def resume(self) -> None:
+        # Tras un fork el hilo del listener no existe en el hijo: se detiene antes y se relanza en cada proceso.
+        self.start()
+
+
+_pipeline: LoggingPipeline | None = None
+
+
+def configure_logging(level: str = 'INFO', log_format: str = 'json', queue_size: int = 10000) -> LoggingPipeline:
+    global _pipeline
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _pipeline is not None:
+        return _pipeline
+
+    # El event loop solo encola; el formateo y la escritura a stdout ocurren en el hilo del listener.
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if log_format == 'json' else TextFormatter())
+    queue_handler = DroppingQueueHandler(log_queue)
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _pipeline = LoggingPipeline(queue_handler, listener, queue_size)
+    _pipeline.start()
+    root.addHandler(queue_handler)
+    atexit.register(_pipeline.stop)
+    return _pipeline
 
 
-def configure_logging() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s %(levelname)s [%(name)s] %(message)s',
-    )
+def logging_stats() -> dict[str, int]:
+    if _pipeline is None:
+        return {'queue_size': 0, 'queued_records': 0, 'dropped_records': 0}
+    return _pipeline.stats()
@@ -1,14 +1,72 @@
 from __future__ import annotations
 
+import os
+from bisect import bisect_left
 from collections import defaultdict
 from threading import Lock
 
+LATENCY_BUCKETS_MS = (1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+
+    @classmethod
+    def from_counts(cls, counts: list[int], sum_ms: float, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS) -> LatencyHistogram:
+        histogram = cls(bounds)
+        histogram.counts = list(counts)
+        histogram.count = sum(counts)
+        histogram.sum_ms = sum_ms
+        return histogram
+
+    def observe(self, value_ms: float) -> None:
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+
+    def quantile(self, fraction: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if bucket_count == 0:
+                continue
+            if seen + bucket_count >= target:
+                lower = self.bounds[idx - 1] if idx > 0 else 0.0
+                upper = self.bounds[idx] if idx < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * ((target - seen) / bucket_count)
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def to_dict(self) -> dict[str, float | int | dict[str, int]]:
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for idx, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            label = str(self.bounds[idx]) if idx < len(self.bounds) else '+Inf'
+            buckets[label] = cumulative
+        return {
+            'count': self.count,
+            'sum_ms': round(self.sum_ms, 3),
+            'avg_ms': round(self.sum_ms / max(self.count, 1), 3),
+            'p50_ms': round(self.quantile(0.50), 3),
+            'p95_ms': round(self.quantile(0.95), 3),
+            'p99_ms': round(self.quantile(0.99), 3),
+            'buckets': buckets,
+        }
+
 
 class InMemoryMetrics:
     def __init__(self) -> None:
         self._lock = Lock()
         self._count_by_key: dict[str, int] = defaultdict(int)
         self._latency_sum_ms: dict[str, float] = defaultdict(float)
+        self._stage_histograms: dict[tuple[str, str], LatencyHistogram] = {}
 
     def observe_request(self, method: str, path: str, status: int, latency_ms: float, case: str) -> None:
         key = self._key(method, path, status, case)
@@ -16,25 +74,49 @@ class InMemoryMetrics:
             self._count_by_key[key] += 1
             self._latency_sum_ms[key] += latency_ms
 
-    def snapshot(self) -> dict[str, list[dict[str, float | int | str]]]:
+    def observe_stages(self, path: str, stages_ms: dict[str, float]) -> None:
         with self._lock:
-            rows = []
-            for key, count in self._count_by_key.items():
-                method, path, status, case = key.split('|')
-                latency_sum = self._latency_sum_ms[key]
-                rows.append(
-                    {
-                        'method': method,
-                        'path': path,
-                        'status': int(status),
-                        'caso_de_uso': case,
-                        'count': count,
-                        'avg_latency_ms': round(latency_sum / max(count, 1), 2),
-                    }
-                )
-        rows.sort(key=lambda row: (row['path'], row['method'], row['status'], row['caso_de_uso']))
-        return {'requests': rows}
+            for stage, elapsed_ms in stages_ms.items():
+                histogram = self._stage_histograms.get((path, stage))
+                if histogram is None:
+                    histogram = self._stage_histograms[(path, stage)] = LatencyHistogram()
+                histogram.observe(elapsed_ms)
+
+    def snapshot(self, per_worker: bool = False) -> dict[str, list[dict]]:
+        with self._lock:
+            rows = [request_row(key, count, self._latency_sum_ms[key]) for key, count in self._count_by_key.items()]
+            stages = [
+                {'path': path, 'stage': stage, **histogram.to_dict()}
+                for (path, stage), histogram in self._stage_histograms.items()
+            ]
+            total_requests = sum(self._count_by_key.values())
+        snapshot = sort_snapshot(rows, stages)
+        if per_worker:
+            snapshot['workers'] = [{'pid': os.getpid(), 'alive': True, 'requests': total_requests, 'series': len(rows) + len(stages)}]
+        return snapshot
 
     @staticmethod
     def _key(method: str, path: str, status: int, case: str) -> str:
-        return f'{method}|{path}|{status}|{case}'
+        return request_key(method, path, status, case)
+
+
+def request_key(method: str, path: str, status: int, case: str) -> str:
+    return f'{method}|{path}|{status}|{case}'
+
+
+def request_row(key: str, count: int, latency_sum_ms: float) -> dict:
+    method, path, status, case = key.split('|')
+    return {
+        'method': method,
+        'path': path,
+        'status': int(status),
+        'caso_de_uso': case,
+        'count': count,
+        'avg_latency_ms': round(latency_sum_ms / max(count, 1), 2),
+    }
+
+
+def sort_snapshot(rows: list[dict], stages: list[dict]) -> dict[str, list[dict]]:
+    rows.sort(key=lambda row: (row['path'], row['method'], row['status'], row['caso_de_uso']))
+    stages.sort(key=lambda row: (row['path'], row['stage']))
+    return {'requests': rows, 'stages': stages}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import random
+from array import array
+from collections.abc import Hashable
+
+# Primo de Mersenne 2^61 - 1 para la familia de hashes (a*x + b) mod p, independientes por fila.
+_PRIME = (1 << 61) - 1
+
+
+class CountMinSketch:
+    """Contador aproximado de frecuencias con memoria fija (`width` x `depth` contadores).
+
+    Nunca subestima: el error es por colisiones y solo suma. Con actualizacion conservadora cada `add`
+    sube unicamente los contadores que estaban en el minimo, lo que reduce ese error para las claves poco
+    frecuentes. `decay` divide todo a la mitad para que la popularidad siga al trafico reciente.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self._rows = [array('I', bytes(4 * width)) for _ in range(depth)]
+        rng = random.Random(width * 31 + depth)
+        self._seeds = [(rng.randrange(1, _PRIME), rng.randrange(_PRIME)) for _ in range(depth)]
+        self.total = 0
+
+    def _cells(self, key: Hashable) -> list[int]:
+        # `hash` es estable dentro del proceso, que es todo lo que vive el sketch.
+        value = hash(key) % _PRIME
+        return [(a * value + b) % _PRIME % self.width for a, b in self._seeds]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """Suma `count` a la clave y devuelve su frecuencia estimada."""
+        cells = self._cells(key)
+        estimate = min(row[cell] for row, cell in zip(self._rows, cells)) + count
+        for row, cell in zip(self._rows, cells):
+            if row[cell] < estimate:
+                row[cell] = estimate
+        self.total += count
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[cell] for row, cell in zip(self._rows, self._cells(key)))
+
+    def decay(self) -> None:
+        for index, row in enumerate(self._rows):
+            self._rows[index] = array('I', (value >> 1 for value in row))
+        self.total >>= 1
+
+
+class HeavyHitters:
+    """Las `k` claves mas frecuentes segun un `CountMinSketch` (top-K aproximado en memoria O(k))."""
+
+    def __init__(self, k: int = 64, sketch: CountMinSketch | None = None) -> None:
+        self.k = k
+        self.sketch = sketch or CountMinSketch()
+        self._top: dict[Hashable, int] = {}
+        # Minimo del top cacheado: la mayoria de claves no llegan y se descartan sin recorrer el top.
+        self._floor = 0
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        estimate = self.sketch.add(key, count)
+        if key in self._top:
+            self._top[key] = estimate
+        elif len(self._top) < self.k:
+            self._top[key] = estimate
+            self._floor = min(self._top.values())
+        elif estimate > self._floor:
+            coldest = min(self._top, key=self._top.__getitem__)
+            if self._top[coldest] < estimate:
+                del self._top[coldest]
+                self._top[key] = estimate
+            self._floor = min(self._top.values())
+        return estimate
+
+    def count(self, key: Hashable) -> int:
+        """Frecuencia estimada si la clave esta en el top, 0 si no."""
+        return self._top.get(key, 0)
+
+    def top(self, limit: int | None = None) -> list[tuple[Hashable, int]]:
+        ranked = sorted(self._top.items(), key=lambda item: item[1], reverse=True)
+        return ranked if limit is None else ranked[:limit]
+
+    def decay(self) -> None:
+        self.sketch.decay()
+        self._top = {key: count >> 1 for key, count in self._top.items() if count >> 1}
+        self._floor = min(self._top.values(), default=0)
+
+    def __len__(self) -> int:
+        return len(self._top)
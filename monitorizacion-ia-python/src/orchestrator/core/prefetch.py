@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import NamedTuple
+
+from orchestrator.api.schemas import ColumnarDashboardResponse, DashboardDetailResponse, DashboardResponse, DictEncodedColumn, QueryRequest
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.details import message_window, window_fields
+
+logger = logging.getLogger(__name__)
+
+# Identifica al navegador para cancelar su precarga cuando cambia de pagina; sin el se usa IP + User-Agent.
+SESSION_HEADER = 'x-session-id'
+
+DetailFetcher = Callable[[str, QueryRequest | None], Awaitable[DashboardDetailResponse]]
+# Clave de un detalle precargado: (caso de uso, version de la pagina de la que salio, id de fila).
+EntryKey = tuple[str, str | None, str]
+
+
+def page_ids(response: DashboardResponse | ColumnarDashboardResponse) -> list[str]:
+    """Ids de las filas de una pagina, en orden, en cualquiera de los dos formatos."""
+    if isinstance(response, DashboardResponse):
+        return [row.id for row in response.table.rows]
+    ids = response.table.data.get('id', [])
+    if isinstance(ids, DictEncodedColumn):
+        return [ids.values[code] for code in ids.codes]
+    return list(ids)
+
+
+class _Entry(NamedTuple):
+    detail: DashboardDetailResponse
+    rank: int
+    expires_at: float
+
+
+class _Batch:
+    def __init__(self, query_key: Hashable, caso_de_uso: str, version: str | None, ids: list[str]) -> None:
+        self.query_key = query_key
+        self.caso_de_uso = caso_de_uso
+        # Version de la ultima pagina que ha recibido la sesion: un clic solo usa detalles de esa version.
+        self.version = version
+        self.ids = ids
+        self.task: asyncio.Task | None = None
+
+    def cancel(self) -> bool:
+        if self.task is None or self.task.done():
+            return False
+        self.task.cancel()
+        return True
+
+
+class DetailPrefetcher:
+    """Precarga en segundo plano el detalle de las primeras `top_k` filas de cada pagina servida de /dashboard.
+
+    Cada sesion (navegador) tiene como mucho una precarga en curso: si pide otra pagina u otros filtros, la
+    anterior se cancela. Las precargas comparten `max_concurrency` huecos y solo entran en admision si sobra
+    capacidad, asi que nunca hacen esperar a una request interactiva. Solo se pide la primera ventana de
+    `messages_limit` mensajes, no la conversacion entera. `hits_by_rank` dice que posiciones se acaban abriendo
+    y `missed_beyond_k` cuantas veces se abre una fila de la pagina que no se precargo.
+    """
+
+    def __init__(
+        self,
+        top_k: int = 3,
+        max_concurrency: int = 2,
+        max_entries: int = 1024,
+        ttl_s: float = 60.0,
+        max_sessions: int = 1024,
+        messages_limit: int | None = 50,
+    ) -> None:
+        self.top_k = top_k
+        self.ttl_s = ttl_s
+        self.window = QueryRequest(messages_limit=messages_limit) if messages_limit is not None else None
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._entries: OrderedDict[EntryKey, _Entry] = OrderedDict()
+        self._sessions: OrderedDict[Hashable, _Batch] = OrderedDict()
+        self.scheduled = 0
+        self.prefetched = 0
+        self.skipped = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.lookups = 0
+        self.hits = 0
+        self.hits_by_rank = [0] * top_k
+        self.missed_beyond_k = 0
+        self.beyond_window = 0
+        self.unused = 0
+
+    def schedule(
+        self, session: Hashable, query_key: Hashable, caso_de_uso: str, version: str | None, ids: list[str], fetch: DetailFetcher
+    ) -> None:
+        """Lanza la precarga de una pagina recien servida; una pagina distinta de la misma sesion cancela la anterior."""
+        previous = self._sessions.get(session)
+        if not ids:
+            # Una respuesta delta no trae pagina: la sesion sigue en la misma, pero ya con la version nueva.
+            if previous is not None and previous.query_key == query_key:
+                previous.version = version
+            return
+        running = previous is not None and previous.task is not None and not previous.task.done()
+        if running and (previous.query_key, previous.version) == (query_key, version):
+            return
+        if previous is not None and previous.cancel():
+            self.cancelled += 1
+        batch = self._sessions[session] = _Batch(query_key, caso_de_uso, version, ids)
+        self._sessions.move_to_end(session)
+        while len(self._sessions) > self.max_sessions:
+            _session, evicted = self._sessions.popitem(last=False)
+            if evicted.cancel():
+                self.cancelled += 1
+        pending = [(rank, row_id) for rank, row_id in enumerate(ids[: self.top_k]) if self._fresh((caso_de_uso, version, row_id)) is None]
+        if not pending:
+            return
+        self.scheduled += 1
+        # Contexto vacio: la precarga sobrevive a la request de /dashboard y no debe apuntar en sus timings ni en su traza.
+        batch.task = asyncio.create_task(self._run(caso_de_uso, version, pending, fetch), context=contextvars.Context())
+
+    async def _run(self, caso_de_uso: str, version: str | None, pending: list[tuple[int, str]], fetch: DetailFetcher) -> None:
+        await asyncio.gather(*(self._prefetch((caso_de_uso, version, row_id), rank, fetch) for rank, row_id in pending))
+
+    async def _prefetch(self, key: EntryKey, rank: int, fetch: DetailFetcher) -> None:
+        async with self._slots:
+            # Otra sesion ha podido precargarla mientras se esperaba hueco.
+            if self._fresh(key) is not None:
+                return
+            try:
+                detail = await fetch(key[2], self.window)
+            except OrchestratorError as error:
+                if error.code == ErrorCode.OVERLOADED:
+                    self.skipped += 1
+                else:
+                    self.errors += 1
+                return
+            except Exception:
+                self.errors += 1
+                logger.exception('detail prefetch failed', extra={'fields': {'event': 'detail_prefetch_error', 'caso_de_uso': key[0]}})
+                return
+        self.prefetched += 1
+        self._put(key, _Entry(detail, rank, time.monotonic() + self.ttl_s))
+
+    def lookup(self, session: Hashable, caso_de_uso: str, row_id: str, req: QueryRequest | None) -> DashboardDetailResponse | None:
+        """Detalle precargado para un clic, con la ventana de mensajes pedida aplicada; None si hay que pedirlo.
+
+        Solo vale lo precargado para la version de la pagina que tiene la sesion, y solo si los mensajes
+        precargados cubren la ventana pedida.
+        """
+        self.lookups += 1
+        batch = self._sessions.get(session)
+        if batch is None or batch.caso_de_uso != caso_de_uso:
+            return None
+        key = (caso_de_uso, batch.version, row_id)
+        entry = self._fresh(key)
+        if entry is None:
+            if row_id in batch.ids[self.top_k :]:
+                self.missed_beyond_k += 1
+            return None
+        detail = _windowed(entry.detail, req)
+        if detail is None:
+            self.beyond_window += 1
+            return None
+        # Cada precarga cuenta una vez: un segundo clic en la misma fila no dice nada nuevo sobre K.
+        del self._entries[key]
+        self.hits += 1
+        self.hits_by_rank[entry.rank] += 1
+        return detail
+
+    def _fresh(self, key: EntryKey) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            self.unused += 1
+            return None
+        return entry
+
+    def _put(self, key: EntryKey, entry: _Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.unused += 1
+
+    async def aclose(self) -> None:
+        tasks = [batch.task for batch in self._sessions.values() if batch.task is not None]
+        self._sessions.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            'top_k': self.top_k,
+            'entries': len(self._entries),
+            'scheduled': self.scheduled,
+            'prefetched': self.prefetched,
+            'skipped': self.skipped,
+            'cancelled': self.cancelled,
+            'errors': self.errors,
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'hit_rate': round(self.hits / self.lookups, 4) if self.lookups else None,
+            'hits_by_rank': list(self.hits_by_rank),
+            'missed_beyond_k': self.missed_beyond_k,
+            'beyond_window': self.beyond_window,
+            'unused': self.unused,
+        }
+
+
+def _windowed(detail: DashboardDetailResponse, req: QueryRequest | None) -> DashboardDetailResponse | None:
+    """La ventana pedida a partir de los primeros mensajes precargados, o None si piden mensajes que no estan."""
+    left = detail.left
+    total = left.total if left.total is not None else len(left.messages)
+    limit, cursor = (req.messages_limit, req.messages_cursor) if req is not None else (None, None)
+    start, end = message_window(total, limit, cursor)
+    if end > len(left.messages):
+        return None
+    fields = window_fields(start, end, total) if limit is not None or cursor is not None else {'total': None, 'nextCursor': None, 'prevCursor': None}
+    return detail.model_copy(update={'left': left.model_copy(update={'messages': left.messages[start:end], **fields})})
@@ -1,4 +1,7 @@
-from pydantic import Field
+from functools import lru_cache
+from typing import Literal
+
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,10 +13,101 @@ class Settings(BaseSettings):
     PROJECT_VERSION: str = Field(default='0.1.0')
     VIEW_CONFIG_STORAGE_PATH: str = Field(default='src/orchestrator/config/view_configs.json')
     UPSTREAM_TIMEOUT_MS: int = Field(default=5000, ge=100, le=60000)
+    UPSTREAM_MAX_CONNECTIONS: int = Field(default=100, ge=1, le=10000)
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20, ge=0, le=10000)
+    UPSTREAM_PING_PATH: str = Field(default='/health')
+    UPSTREAM_RETRIES: int = Field(default=0, ge=0, le=5)
+    UPSTREAM_RETRY_BACKOFF_MS: int = Field(default=50, ge=0, le=10000)
+    UPSTREAM_MIN_ATTEMPT_MS: int = Field(default=50, ge=1, le=60000)
+    UPSTREAM_CAPABILITY_REPROBE_S: float = Field(default=300.0, ge=1, le=86400)
+    UPSTREAM_HEALTHCHECK_INTERVAL_S: float = Field(default=5.0, ge=0, le=3600)
+    UPSTREAM_HEALTHCHECK_TIMEOUT_MS: int = Field(default=1000, ge=50, le=60000)
+    UPSTREAM_EJECT_AFTER_FAILURES: int = Field(default=3, ge=1, le=100)
+    UPSTREAM_ADAPTIVE_TIMEOUT_ENABLED: bool = Field(default=False)
+    UPSTREAM_ADAPTIVE_TIMEOUT_MULTIPLIER: float = Field(default=3.0, ge=1.0, le=100.0)
+    UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS: int = Field(default=50, ge=1, le=60000)
+    UPSTREAM_ADAPTIVE_TIMEOUT_MAX_MS: int = Field(default=5000, ge=1, le=60000)
+    UPSTREAM_ADAPTIVE_TIMEOUT_WINDOW: int = Field(default=512, ge=16, le=65536)
+    UPSTREAM_ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = Field(default=50, ge=1, le=65536)
+    USE_CASES_CONFIG_PATH: str | None = Field(default='src/orchestrator/config/use_cases.yaml')
     UPSTREAM_LIMIT_DEFAULT: int = Field(default=25, ge=1, le=1000)
     UPSTREAM_LIMIT_MAX: int = Field(default=100, ge=1, le=1000)
+    CHART_MAX_POINTS: int = Field(default=500, ge=3, le=100000)
+    CHART_MAX_ROWS: int = Field(default=50000, ge=1, le=10000000)
+    CHART_CACHE_SIZE: int = Field(default=256, ge=1, le=100000)
+    NATIVE_RETENTION_INTERVAL_S: float = Field(default=3600.0, gt=0, le=86400)
+    NATIVE_LIMIT_DEFAULT: int = Field(default=0, ge=0, le=1000)
+    NATIVE_RETENTION_DAYS: int = Field(default=0, ge=0, le=36500)
+    NATIVE_MAX_OPEN_PARTITIONS: int = Field(default=32, ge=1, le=10000)
+    NATIVE_VERSION_POLL_INTERVAL_S: float = Field(default=5.0, ge=0, le=3600)
+    NATIVE_CHANGE_LOG_SIZE: int = Field(default=10000, ge=1, le=10000000)
+    DASHBOARD_DELTA_CACHE_SIZE: int = Field(default=256, ge=0, le=100000)
+    STREAM_POLL_INTERVAL_S: float = Field(default=5.0, ge=0.1, le=3600)
+    STREAM_HEARTBEAT_S: float = Field(default=15.0, ge=1, le=3600)
+    STREAM_MAX_POLLERS: int = Field(default=256, ge=1, le=100000)
+    HOT_QUERY_TOP_K: int = Field(default=0, ge=0, le=10000)
+    HOT_QUERY_MIN_COUNT: int = Field(default=5, ge=1, le=1000000)
+    HOT_QUERY_TTL_S: float = Field(default=10.0, ge=0.5, le=3600)
+    HOT_QUERY_REFRESH_SHARE: float = Field(default=0.1, gt=0, le=1)
+    HOT_QUERY_DECAY_S: float = Field(default=60.0, ge=1, le=86400)
+    DETAIL_PREFETCH_TOP_K: int = Field(default=0, ge=0, le=100)
+    DETAIL_PREFETCH_CONCURRENCY: int = Field(default=2, ge=1, le=64)
+    DETAIL_PREFETCH_CACHE_SIZE: int = Field(default=1024, ge=1, le=1000000)
+    DETAIL_PREFETCH_TTL_S: float = Field(default=60.0, ge=1, le=86400)
+    DETAIL_PREFETCH_MESSAGES: int = Field(default=50, ge=1, le=100000)
     ADMIN_RATE_LIMIT_REQUESTS: int = Field(default=120, ge=10, le=5000)
     ADMIN_RATE_LIMIT_WINDOW_SECONDS: int = Field(default=60, ge=10, le=3600)
+    ADMIN_API_ENABLED: bool = Field(default=True)
+    DATOPS_API_ENABLED: bool = Field(default=True)
+    SERVER_TIMING_ENABLED: bool = Field(default=True)
+    SLOW_REQUEST_THRESHOLD_MS: int = Field(default=1000, ge=1, le=600000)
+    WARMUP_ENABLED: bool = Field(default=True)
+    WARMUP_PING_UPSTREAMS: bool = Field(default=False)
+    LOG_LEVEL: str = Field(default='INFO')
+    LOG_FORMAT: Literal['json', 'text'] = Field(default='json')
+    LOG_QUEUE_SIZE: int = Field(default=10000, ge=100, le=1000000)
+    LOG_REQUEST_SAMPLE_RATE: float = Field(default=1.0, ge=0.0, le=1.0)
+    LOG_REQUEST_SAMPLE_RATES: dict[str, float] = Field(default_factory=dict)
+    TRACING_EXPORTER: Literal['none', 'memory', 'jsonl', 'otlp'] = Field(default='none')
+    TRACING_SAMPLE_RATIO: float = Field(default=1.0, ge=0.0, le=1.0)
+    TRACING_JSONL_PATH: str = Field(default='logs/traces.jsonl')
+    TRACING_OTLP_ENDPOINT: str = Field(default='http://127.0.0.1:4318/v1/traces')
+    ADMISSION_ENABLED: bool = Field(default=True)
+    ADMISSION_MAX_CONCURRENCY: int = Field(default=64, ge=1, le=100000)
+    ADMISSION_CASE_MAX_CONCURRENCY: int = Field(default=0, ge=0, le=100000)
+    ADMISSION_CASE_LIMITS: dict[str, int] = Field(default_factory=dict)
+    ADMISSION_MAX_QUEUE: int = Field(default=128, ge=0, le=100000)
+    ADMISSION_QUEUE_TIMEOUT_MS: int = Field(default=250, ge=1, le=60000)
+    ADMISSION_RETRY_AFTER_S: int = Field(default=1, ge=1, le=3600)
+    ADMISSION_ADAPTIVE: bool = Field(default=False)
+    ADMISSION_MIN_CONCURRENCY: int = Field(default=4, ge=1, le=100000)
+    ADMISSION_LATENCY_TARGET_MS: int = Field(default=500, ge=1, le=600000)
+    METRICS_SHARED_DIR: str | None = Field(default=None)
+    METRICS_MAX_SERIES: int = Field(default=1024, ge=16, le=1000000)
+    SERVE_HOST: str = Field(default='127.0.0.1')
+    SERVE_PORT: int = Field(default=8002, ge=0, le=65535)
+    SERVE_WORKERS: int = Field(default=0, ge=0, le=256)
+    SERVE_LOOP: Literal['auto', 'uvloop', 'asyncio'] = Field(default='auto')
+    SERVE_HTTP: Literal['auto', 'httptools', 'h11'] = Field(default='auto')
+    SERVE_PRELOAD: bool = Field(default=True)
+    SERVE_BACKLOG: int = Field(default=2048, ge=16, le=65535)
+    SERVE_KEEPALIVE_TIMEOUT_S: int = Field(default=5, ge=1, le=600)
+    SERVE_GRACEFUL_TIMEOUT_S: int = Field(default=30, ge=1, le=600)
+
+    @model_validator(mode='after')
+    def validate_adaptive_timeout_bounds(self):
+        if self.UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS > self.UPSTREAM_ADAPTIVE_TIMEOUT_MAX_MS:
+            raise ValueError('UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS must not exceed UPSTREAM_ADAPTIVE_TIMEOUT_MAX_MS')
+        return self
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
 
 
-settings = Settings()
+def __getattr__(name: str):
+    # `settings` se construye en el primer acceso y no al importar el modulo.
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+
+from orchestrator.core.metrics import (
+    LATENCY_BUCKETS_MS,
+    InMemoryMetrics,
+    LatencyHistogram,
+    request_key,
+    request_row,
+    sort_snapshot,
+)
+
+SEGMENT_MAGIC = b'ORCHMET1'
+SEGMENT_VERSION = 1
+SEGMENT_PREFIX = 'worker-'
+SEGMENT_SUFFIX = '.metrics'
+DEFAULT_MAX_SERIES = 1024
+KIND_REQUEST = 1
+KIND_STAGE = 2
+MAX_KEY_BYTES = 184
+READ_RETRIES = 100
+
+# Cabecera: magic, version, pid, series usadas, capacidad, series descartadas, padding, started_at.
+_HEADER = struct.Struct('<8sIIIIIId')
+# Slot: seq (seqlock), kind, longitud de clave, clave, count, sum_ms y un contador por bucket.
+_SLOT_HEAD = struct.Struct(f'<QBxH4x{MAX_KEY_BYTES}s')
+_BUCKETS = len(LATENCY_BUCKETS_MS) + 1
+_SLOT_VALUES = struct.Struct(f'<Qd{_BUCKETS}Q')
+_SEQ = struct.Struct('<Q')
+_U64 = struct.Struct('<Q')
+_USED_OFFSET = 16
+_DROPPED_OFFSET = 24
+_VALUES_OFFSET = _SLOT_HEAD.size
+_BUCKETS_OFFSET = _VALUES_OFFSET + 16
+SLOT_SIZE = _SLOT_HEAD.size + _SLOT_VALUES.size
+
+
+def _slot_offset(index: int) -> int:
+    return _HEADER.size + index * SLOT_SIZE
+
+
+@dataclass
+class SegmentSnapshot:
+    pid: int
+    started_at: float
+    capacity: int
+    dropped_series: int
+    series: dict[tuple[int, str], tuple[int, float, list[int]]] = field(default_factory=dict)
+
+    @property
+    def alive(self) -> bool:
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+
+class _WorkerSegment:
+    """Segmento de un unico escritor (el proceso dueno): registrar no requiere locks entre procesos."""
+
+    def __init__(self, path: Path, capacity: int) -> None:
+        self.pid = os.getpid()
+        self.capacity = capacity
+        self._slots: dict[tuple[int, str], int] = {}
+        self._dropped = 0
+        # Si el pid se reutiliza queda el segmento de un worker muerto con ese nombre: sus totales se heredan
+        # en vez de truncarlos, para que los contadores agregados nunca retrocedan.
+        retired = read_segment(path) if path.exists() else None
+        size = _slot_offset(capacity)
+        staging = path.with_name(f'.{path.name}.tmp')
+        with open(staging, 'w+b') as handle:
+            handle.truncate(size)
+            self._mmap = mmap.mmap(handle.fileno(), size)
+        _HEADER.pack_into(self._mmap, 0, SEGMENT_MAGIC, SEGMENT_VERSION, self.pid, 0, capacity, 0, 0, time.time())
+        if retired is not None:
+            self._fold(retired)
+        # Los lectores ven el segmento anterior o el nuevo ya completo, nunca uno a medias.
+        os.replace(staging, path)
+
+    def _fold(self, retired: SegmentSnapshot) -> None:
+        self._dropped = retired.dropped_series
+        struct.pack_into('<I', self._mmap, _DROPPED_OFFSET, self._dropped)
+        for (kind, key), (count, sum_ms, buckets) in retired.series.items():
+            index = self._allocate(kind, key)
+            if index is not None:
+                _SLOT_VALUES.pack_into(self._mmap, _slot_offset(index) + _VALUES_OFFSET, count, sum_ms, *buckets)
+
+    def observe(self, kind: int, key: str, value_ms: float) -> None:
+        index = self._slots.get((kind, key))
+        if index is None:
+            index = self._allocate(kind, key)
+            if index is None:
+                return
+        base = _slot_offset(index)
+        seq = _SEQ.unpack_from(self._mmap, base)[0]
+        _SEQ.pack_into(self._mmap, base, seq + 1)
+        count, sum_ms = struct.unpack_from('<Qd', self._mmap, base + _VALUES_OFFSET)
+        struct.pack_into('<Qd', self._mmap, base + _VALUES_OFFSET, count + 1, sum_ms + value_ms)
+        bucket_offset = base + _BUCKETS_OFFSET + 8 * bisect_left(LATENCY_BUCKETS_MS, value_ms)
+        _U64.pack_into(self._mmap, bucket_offset, _U64.unpack_from(self._mmap, bucket_offset)[0] + 1)
+        _SEQ.pack_into(self._mmap, base, seq + 2)
+
+    def _allocate(self, kind: int, key: str) -> int | None:
+        encoded = key.encode('utf-8')
+        index = len(self._slots)
+        if index >= self.capacity or len(encoded) > MAX_KEY_BYTES:
+            self._dropped += 1
+            struct.pack_into('<I', self._mmap, _DROPPED_OFFSET, self._dropped)
+            return None
+        _SLOT_HEAD.pack_into(self._mmap, _slot_offset(index), 0, kind, len(encoded), encoded)
+        self._slots[(kind, key)] = index
+        # La serie solo es visible para los lectores una vez escrita su clave.
+        struct.pack_into('<I', self._mmap, _USED_OFFSET, index + 1)
+        return index
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def read_segment(path: Path) -> SegmentSnapshot | None:
+    try:
+        with open(path, 'rb') as handle:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        # Un fichero truncado o ajeno con el mismo patron de nombre se ignora igual que uno de otra version.
+        if len(buffer) < _HEADER.size:
+            return None
+        magic, version, pid, used, capacity, dropped, _, started_at = _HEADER.unpack_from(buffer, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION or len(buffer) < _slot_offset(capacity):
+            return None
+        snapshot = SegmentSnapshot(pid=pid, started_at=started_at, capacity=capacity, dropped_series=dropped)
+        for index in range(min(used, capacity)):
+            base = _slot_offset(index)
+            for _ in range(READ_RETRIES):
+                seq_before = _SEQ.unpack_from(buffer, base)[0]
+                _, kind, key_length, key = _SLOT_HEAD.unpack_from(buffer, base)
+                count, sum_ms, *buckets = _SLOT_VALUES.unpack_from(buffer, base + _VALUES_OFFSET)
+                if seq_before % 2 == 0 and _SEQ.unpack_from(buffer, base)[0] == seq_before:
+                    break
+            # Si se agotan los reintentos (p. ej. un worker murio a mitad de escritura) se usa la ultima lectura.
+            snapshot.series[(kind, key[:key_length].decode('utf-8'))] = (count, sum_ms, buckets)
+        return snapshot
+    finally:
+        buffer.close()
+
+
+def prune_dead_segments(directory: str | Path) -> int:
+    """Borra los segmentos ilegibles o de procesos que ya no existen; devuelve cuantos.
+
+    Es para el arranque del supervisor, con un `METRICS_SHARED_DIR` persistente: sin esto `/metrics` seguiria
+    sumando los contadores de workers de ejecuciones anteriores. Con el pool en marcha no se llama, porque
+    los segmentos de workers muertos se conservan para que los totales no retrocedan.
+    """
+    removed = 0
+    for path in Path(directory).glob(f'{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}'):
+        segment = read_segment(path)
+        if segment is not None and segment.alive:
+            continue
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+class SharedMetrics:
+    """Metricas en segmentos mmap por worker dentro de `directory`; cualquier worker agrega todos al leer."""
+
+    def __init__(self, directory: str | Path, max_series: int = DEFAULT_MAX_SERIES) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_series = max_series
+        self._lock = Lock()
+        self._segment: _WorkerSegment | None = None
+
+    def observe_request(self, method: str, path: str, status: int, latency_ms: float, case: str) -> None:
+        key = request_key(method, path, status, case)
+        with self._lock:
+            self._current_segment().observe(KIND_REQUEST, key, latency_ms)
+
+    def observe_stages(self, path: str, stages_ms: dict[str, float]) -> None:
+        with self._lock:
+            segment = self._current_segment()
+            for stage, elapsed_ms in stages_ms.items():
+                segment.observe(KIND_STAGE, f'{path}|{stage}', elapsed_ms)
+
+    def snapshot(self, per_worker: bool = False) -> dict[str, list[dict]]:
+        segments = self.read_segments()
+        merged: dict[tuple[int, str], tuple[int, float, list[int]]] = {}
+        for segment in segments:
+            for series_key, (count, sum_ms, buckets) in segment.series.items():
+                previous = merged.get(series_key)
+                if previous is None:
+                    merged[series_key] = (count, sum_ms, list(buckets))
+                else:
+                    merged[series_key] = (
+                        previous[0] + count,
+                        previous[1] + sum_ms,
+                        [left + right for left, right in zip(previous[2], buckets)],
+                    )
+
+        rows = []
+        stages = []
+        for (kind, key), (count, sum_ms, buckets) in merged.items():
+            if kind == KIND_REQUEST:
+                rows.append(request_row(key, count, sum_ms))
+            else:
+                path, stage = key.rsplit('|', 1)
+                stages.append({'path': path, 'stage': stage, **LatencyHistogram.from_counts(buckets, sum_ms).to_dict()})
+        snapshot = sort_snapshot(rows, stages)
+        if per_worker:
+            snapshot['workers'] = [self._worker_summary(segment) for segment in segments]
+        return snapshot
+
+    def read_segments(self) -> list[SegmentSnapshot]:
+        segments = []
+        for path in sorted(self.directory.glob(f'{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}')):
+            segment = read_segment(path)
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def _current_segment(self) -> _WorkerSegment:
+        # Tras un fork el hijo hereda el objeto: cada pid abre su propio segmento en el primer registro.
+        if self._segment is None or self._segment.pid != os.getpid():
+            path = self.directory / f'{SEGMENT_PREFIX}{os.getpid()}{SEGMENT_SUFFIX}'
+            self._segment = _WorkerSegment(path, self.max_series)
+        return self._segment
+
+    @staticmethod
+    def _worker_summary(segment: SegmentSnapshot) -> dict:
+        requests_by_path: dict[str, int] = {}
+        for (kind, key), (count, _, _) in segment.series.items():
+            if kind == KIND_REQUEST:
+                path = key.split('|')[1]
+                requests_by_path[path] = requests_by_path.get(path, 0) + count
+        return {
+            'pid': segment.pid,
+            'alive': segment.alive,
+            'started_at': segment.started_at,
+            'requests': sum(requests_by_path.values()),
+            'requests_by_path': dict(sorted(requests_by_path.items())),
+            'series': len(segment.series),
+            'capacity': segment.capacity,
+            'dropped_series': segment.dropped_series,
+        }
+
+
+def build_metrics(shared_dir: str | None, max_series: int = DEFAULT_MAX_SERIES) -> InMemoryMetrics | SharedMetrics:
+    if shared_dir:
+        return SharedMetrics(shared_dir, max_series)
+    return InMemoryMetrics()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+
+TIME_UNITS_S = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+_RELATIVE = re.compile(r'^(\d+)\s*([mhdw])$')
+
+
+@dataclass(frozen=True)
+class TimeRange:
+    """Ventana `[start, end)` en epoch (segundos, UTC); un extremo None queda abierto."""
+
+    start: float | None = None
+    end: float | None = None
+
+    def overlaps(self, start: float, end: float) -> bool:
+        return (self.start is None or end > self.start) and (self.end is None or start < self.end)
+
+    def covers(self, start: float, end: float) -> bool:
+        return (self.start is None or start >= self.start) and (self.end is None or end <= self.end)
+
+
+def _parse_instant(value: str, raw: str) -> float | None:
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError as error:
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Invalid timeRange: {raw}', 400) from error
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_time_range(value: str | None, now: float | None = None) -> TimeRange | None:
+    """`24h`, `30m`, `7d`, `2w` (hasta ahora) o `inicio/fin` en ISO 8601 con cualquiera de los extremos vacio."""
+    if not value or not value.strip():
+        return None
+    text = value.strip().lower()
+    relative = _RELATIVE.match(text)
+    if relative is not None:
+        current = time.time() if now is None else now
+        return TimeRange(current - int(relative.group(1)) * TIME_UNITS_S[relative.group(2)], None)
+    if '/' in text:
+        start, _, end = value.strip().partition('/')
+        time_range = TimeRange(_parse_instant(start.strip(), value), _parse_instant(end.strip(), value))
+        if time_range.start is not None and time_range.end is not None and time_range.end <= time_range.start:
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Invalid timeRange: {value}', 400)
+        return time_range
+    raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Invalid timeRange: {value}', 400)
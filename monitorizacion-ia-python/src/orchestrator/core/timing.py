@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STAGE_QUEUE = 'queue'
+STAGE_VIEW = 'view'
+STAGE_ADAPTER = 'adapter'
+STAGE_DATASET = 'dataset'
+STAGE_QUERY = 'query'
+STAGE_UPSTREAM_CONNECT = 'upstream_connect'
+STAGE_UPSTREAM_TTFB = 'upstream_ttfb'
+STAGE_UPSTREAM_BODY = 'upstream_body'
+STAGE_VALIDATE = 'validate'
+STAGE_SERIALIZE = 'serialize'
+STAGE_TOTAL = 'total'
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar('orchestrator_request_timings', default=None)
+
+
+class RequestTimings:
+    """Acumula milisegundos por etapa de una request; una etapa repetida suma duraciones."""
+
+    def __init__(self) -> None:
+        self._started = time.perf_counter()
+        self._stages_ms: dict[str, float] = {}
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        self._stages_ms[stage] = self._stages_ms.get(stage, 0.0) + max(elapsed_ms, 0.0)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def breakdown(self) -> dict[str, float]:
+        return {stage: round(elapsed_ms, 3) for stage, elapsed_ms in self._stages_ms.items()}
+
+    def server_timing(self, total_ms: float | None = None) -> str:
+        entries = [f'{stage};dur={elapsed_ms:.3f}' for stage, elapsed_ms in self._stages_ms.items()]
+        if total_ms is not None:
+            entries.append(f'{STAGE_TOTAL};dur={total_ms:.3f}')
+        return ', '.join(entries)
+
+
+def start_request_timings() -> RequestTimings:
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> RequestTimings | None:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    with timings.stage(name):
+        yield
+
+
+def record_stage(name: str, elapsed_ms: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.record(name, elapsed_ms)
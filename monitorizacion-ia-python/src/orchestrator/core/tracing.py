@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import json
+import queue
+import re
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+SPAN_KIND_INTERNAL = 'internal'
+SPAN_KIND_SERVER = 'server'
+SPAN_KIND_CLIENT = 'client'
+_OTLP_SPAN_KINDS = {SPAN_KIND_INTERNAL: 1, SPAN_KIND_SERVER: 2, SPAN_KIND_CLIENT: 3}
+_TRACEPARENT_RE = re.compile(r'^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_INVALID_TRACE_ID = '0' * 32
+_INVALID_SPAN_ID = '0' * 16
+
+_current_span: ContextVar[Span | None] = ContextVar('orchestrator_current_span', default=None)
+
+
+@dataclass(frozen=True)
+class TraceContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @classmethod
+    def parse(cls, header: str | None) -> TraceContext | None:
+        if not header:
+            return None
+        match = _TRACEPARENT_RE.match(header.strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == 'ff' or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+            return None
+        return cls(trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & 0x01))
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+@dataclass
+class SpanEvent:
+    name: str
+    time_unix_nano: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Span:
+    name: str
+    kind: str
+    context: TraceContext
+    parent_span_id: str | None
+    tracer: Tracer | None
+    start_unix_nano: int = field(default_factory=time.time_ns)
+    end_unix_nano: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    events: list[SpanEvent] = field(default_factory=list)
+    status: str = 'unset'
+
+    @property
+    def recording(self) -> bool:
+        return self.context.sampled and self.tracer is not None and self.tracer.enabled
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.end_unix_nano is None:
+            return None
+        return (self.end_unix_nano - self.start_unix_nano) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: dict[str, Any] | None = None) -> None:
+        if self.recording:
+            self.events.append(SpanEvent(name, time.time_ns(), dict(attributes or {})))
+
+    def set_error(self, description: str) -> None:
+        if self.recording:
+            self.status = 'error'
+            self.attributes['error.message'] = description
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'trace_id': self.context.trace_id,
+            'span_id': self.context.span_id,
+            'parent_span_id': self.parent_span_id,
+            'start_unix_nano': self.start_unix_nano,
+            'end_unix_nano': self.end_unix_nano,
+            'duration_ms': self.duration_ms,
+            'status': self.status,
+            'attributes': self.attributes,
+            'events': [
+                {'name': event.name, 'time_unix_nano': event.time_unix_nano, 'attributes': event.attributes}
+                for event in self.events
+            ],
+        }
+
+
+class SpanExporter:
+    def export(self, spans: list[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        return None
+
+
+class InMemorySpanExporter(SpanExporter):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self._spans.extend(spans)
+
+    def finished_spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class JsonlSpanExporter(SpanExporter):
+    def __init__(self, path: str) -> None:
+        self._path = Path(path)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        lines = ''.join(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + '\n' for span in spans)
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open('a', encoding='utf-8') as handle:
+                handle.write(lines)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Envia spans en OTLP/HTTP JSON (`POST /v1/traces`) a un collector local."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout_seconds: float = 2.0) -> None:
+        self._endpoint = endpoint
+        self._service_name = service_name
+        self._timeout_seconds = timeout_seconds
+
+    def export(self, spans: list[Span]) -> None:
+        import urllib.request
+
+        body = json.dumps(self.encode(spans)).encode('utf-8')
+        request = urllib.request.Request(
+            self._endpoint, data=body, headers={'Content-Type': 'application/json'}, method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout_seconds):
+            pass
+
+    def encode(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            'resourceSpans': [
+                {
+                    'resource': {'attributes': _otlp_attributes({'service.name': self._service_name})},
+                    'scopeSpans': [
+                        {'scope': {'name': 'orchestrator'}, 'spans': [self._encode_span(span) for span in spans]}
+                    ],
+                }
+            ]
+        }
+
+    @staticmethod
+    def _encode_span(span: Span) -> dict[str, Any]:
+        encoded = {
+            'traceId': span.context.trace_id,
+            'spanId': span.context.span_id,
+            'name': span.name,
+            'kind': _OTLP_SPAN_KINDS.get(span.kind, 1),
+            'startTimeUnixNano': str(span.start_unix_nano),
+            'endTimeUnixNano': str(span.end_unix_nano or span.start_unix_nano),
+            'attributes': _otlp_attributes(span.attributes),
+            'events': [
+                {'timeUnixNano': str(event.time_unix_nano), 'name': event.name, 'attributes': _otlp_attributes(event.attributes)}
+                for event in span.events
+            ],
+            'status': {'code': 2 if span.status == 'error' else 1 if span.status == 'ok' else 0},
+        }
+        if span.parent_span_id:
+            encoded['parentSpanId'] = span.parent_span_id
+        return encoded
+
+
+class SpanProcessor:
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor(SpanProcessor):
+    """Exporta en un hilo aparte para no bloquear el event loop; si la cola se llena descarta spans."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 256,
+        flush_interval_seconds: float = 1.0,
+    ) -> None:
+        super().__init__(exporter)
+        self._queue: queue.Queue[Span | None] = queue.Queue(maxsize=max_queue_size)
+        self._max_batch_size = max_batch_size
+        self._flush_interval_seconds = flush_interval_seconds
+        self.dropped_spans = 0
+        self.export_errors = 0
+        self._worker = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+        self._worker.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped_spans += 1
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+        self.exporter.shutdown()
+
+    def _run(self) -> None:
+        batch: list[Span] = []
+        deadline = time.monotonic() + self._flush_interval_seconds
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = ...
+            if item is None:
+                self._export(batch)
+                return
+            if item is not ...:
+                batch.append(item)
+            if len(batch) >= self._max_batch_size or time.monotonic() >= deadline:
+                self._export(batch)
+                batch = []
+                deadline = time.monotonic() + self._flush_interval_seconds
+
+    def _export(self, batch: list[Span]) -> None:
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception:  # noqa: BLE001 - un collector caido no debe tumbar el hilo exportador
+            self.export_errors += 1
+
+
+class Tracer:
+    def __init__(self, processor: SpanProcessor | None, sample_ratio: float = 1.0) -> None:
+        self.processor = processor
+        self.sample_ratio = min(max(sample_ratio, 0.0), 1.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def should_sample(self, trace_id: str) -> bool:
+        if not self.enabled or self.sample_ratio <= 0.0:
+            return False
+        if self.sample_ratio >= 1.0:
+            return True
+        # Decision determinista por trace_id: todos los servicios que apliquen el mismo ratio coinciden.
+        return int(trace_id[-16:], 16) < int(self.sample_ratio * 2**64)
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        kind: str = SPAN_KIND_INTERNAL,
+        attributes: dict[str, Any] | None = None,
+        parent: TraceContext | None = None,
+    ) -> Iterator[Span]:
+        parent_span = _current_span.get()
+        if parent is None and parent_span is not None:
+            parent = parent_span.context
+        if parent is None:
+            trace_id = secrets.token_hex(16)
+            sampled = self.should_sample(trace_id)
+            parent_span_id = None
+        else:
+            trace_id = parent.trace_id
+            sampled = parent.sampled
+            parent_span_id = parent.span_id
+        span = Span(
+            name=name,
+            kind=kind,
+            context=TraceContext(trace_id, secrets.token_hex(8), sampled),
+            parent_span_id=parent_span_id,
+            tracer=self,
+        )
+        if span.recording:
+            span.attributes.update(attributes or {})
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(type(exc).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_unix_nano = time.time_ns()
+            if span.recording and self.processor is not None:
+                self.processor.on_end(span)
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def build_tracer(
+    exporter: str,
+    sample_ratio: float,
+    service_name: str,
+    jsonl_path: str,
+    otlp_endpoint: str,
+) -> Tracer:
+    if exporter == 'memory':
+        return Tracer(SpanProcessor(InMemorySpanExporter()), sample_ratio)
+    if exporter == 'jsonl':
+        return Tracer(BatchSpanProcessor(JsonlSpanExporter(jsonl_path)), sample_ratio)
+    if exporter == 'otlp':
+        return Tracer(BatchSpanProcessor(OtlpHttpSpanExporter(otlp_endpoint, service_name)), sample_ratio)
+    return Tracer(None, sample_ratio)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def start_child_span(name: str, kind: str = SPAN_KIND_INTERNAL, attributes: dict[str, Any] | None = None) -> Iterator[Span | None]:
+    parent = _current_span.get()
+    if parent is None or parent.tracer is None:
+        yield None
+        return
+    with parent.tracer.start_span(name, kind=kind, attributes=attributes) as span:
+        yield span
+
+
+def add_span_event(name: str, **attributes: Any) -> None:
+    span = _current_span.get()
+    if span is not None:
+        span.add_event(name, attributes)
+
+
+def propagation_headers(request_id: str | None = None, trace_id: str | None = None) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    span = _current_span.get()
+    if span is not None:
+        headers['traceparent'] = span.context.traceparent()
+    if request_id:
+        headers['x-request-id'] = request_id
+    if trace_id:
+        headers['x-trace-id'] = trace_id
+    return headers
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded_value = {'boolValue': value}
+        elif isinstance(value, int):
+            encoded_value = {'intValue': str(value)}
+        elif isinstance(value, float):
+            encoded_value = {'doubleValue': value}
+        else:
+            encoded_value = {'stringValue': str(value)}
+        encoded.append({'key': key, 'value': encoded_value})
+    return encoded
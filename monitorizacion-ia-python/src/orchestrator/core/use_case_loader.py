@@ -1,6 +1,5 @@
 from pathlib import Path
 
-import yaml
 from pydantic import BaseModel, Field, model_validator
 
 
@@ -50,5 +49,7 @@ class UseCaseLoader:
     def load(self) -> RoutingConfig:
         if not self._config_path.exists():
             raise FileNotFoundError(f'Routing config not found: {self._config_path}')
+        import yaml  # solo se necesita al cargar routing YAML, no en el arranque de la API
+
         data = yaml.safe_load(self._config_path.read_text(encoding='utf-8')) or {}
         return RoutingConfig.model_validate(data)
@@ -6,26 +6,53 @@ from threading import Lock
 from orchestrator.api.schemas import ViewConfigCreate, ViewConfigUpdate, ViewConfiguration
 
 
+class _ViewIndex:
+    def __init__(self, signature: tuple[int, int, int] | None, models: list[ViewConfiguration]):
+        self.signature = signature
+        self.models = models
+        self.by_id = {model.id: model for model in models}
+        self.by_system: dict[str, list[ViewConfiguration]] = {}
+        for model in models:
+            self.by_system.setdefault(model.system, []).append(model)
+
+
 class ViewConfigStore:
     def __init__(self, storage_path: str):
         self._path = Path(storage_path)
         self._lock = Lock()
+        self._index: _ViewIndex | None = None
 
     def list_configs(self, system: str | None = None, enabled: bool | None = None) -> list[ViewConfiguration]:
-        data = self._read_raw()
-        models = [ViewConfiguration.model_validate(item) for item in data]
-        if system is not None:
-            models = [item for item in models if item.system == system]
-        if enabled is not None:
-            models = [item for item in models if item.enabled is enabled]
-        return models
+        index = self._current_index()
+        models = index.models if system is None else index.by_system.get(system, [])
+        # Copias: el indice se comparte entre requests y un llamador que toque el modelo no debe alterarlo.
+        return [item.model_copy(deep=True) for item in models if enabled is None or item.enabled is enabled]
 
     def get(self, view_id: str) -> ViewConfiguration:
-        items = self._read_raw()
-        for item in items:
-            if item.get('id') == view_id:
-                return ViewConfiguration.model_validate(item)
-        raise KeyError(view_id)
+        model = self._current_index().by_id.get(view_id)
+        if model is None:
+            raise KeyError(view_id)
+        return model.model_copy(deep=True)
+
+    def warm(self) -> int:
+        return len(self._current_index().models)
+
+    def _current_index(self) -> _ViewIndex:
+        # El indice validado se reutiliza mientras el fichero no cambie (mtime, tamano, inode).
+        signature = self._signature()
+        index = self._index
+        if index is not None and index.signature == signature:
+            return index
+        index = _ViewIndex(signature, [ViewConfiguration.model_validate(item) for item in self._read_raw()])
+        self._index = index
+        return index
+
+    def _signature(self) -> tuple[int, int, int] | None:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
 
     def create(self, payload: ViewConfigCreate) -> ViewConfiguration:
         with self._lock:
@@ -74,6 +101,7 @@ class ViewConfigStore:
         payload = json.dumps(items, indent=2, ensure_ascii=False)
         tmp_path.write_text(payload, encoding='utf-8')
         os.replace(tmp_path, self._path)
+        self._index = None
 
     def _backup_current_file(self) -> None:
         if not self._path.exists():
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self.ready = False
+        self.started_at: str | None = None
+        self.completed_at: str | None = None
+        self.steps: dict[str, dict] = {}
+        self.errors: list[dict[str, str]] = []
+
+    def record_step(self, name: str, elapsed_ms: float, **detail) -> None:
+        self.steps[name] = {'elapsed_ms': round(elapsed_ms, 2), **detail}
+
+    def record_error(self, step: str, target: str, error: Exception | str) -> None:
+        self.errors.append({'step': step, 'target': target, 'error': str(error) or type(error).__name__})
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.completed_at = datetime.now(timezone.utc).isoformat()
+
+    def to_dict(self) -> dict:
+        return {
+            'status': 'ready' if self.ready else 'starting',
+            'started_at': self.started_at,
+            'completed_at': self.completed_at,
+            'total_ms': round(sum(step['elapsed_ms'] for step in self.steps.values()), 2),
+            'steps': self.steps,
+            'errors': self.errors,
+        }
+
+
+async def warm_up(app: FastAPI, ping_upstreams: bool, ping_path: str, ping_timeout_ms: int) -> Readiness:
+    readiness: Readiness = app.state.readiness
+    readiness.started_at = datetime.now(timezone.utc).isoformat()
+    store = app.state.view_config_store
+    provider = app.state.adapter_provider
+
+    start = time.perf_counter()
+    try:
+        views = await asyncio.to_thread(store.list_configs, None, True)
+    except Exception as error:  # noqa: BLE001 - sin vistas validas no hay nada que servir: queda sin ready
+        readiness.record_error('view_configs', 'storage', error)
+        logger.error('warm-up failed', extra={'fields': {'event': 'warmup', **readiness.to_dict()}})
+        return readiness
+    readiness.record_step('view_configs', (time.perf_counter() - start) * 1000, views=len(views))
+
+    start = time.perf_counter()
+    case_timeouts = await asyncio.to_thread(app.state.timeout_policy.case_timeouts)
+    readiness.record_step('timeouts', (time.perf_counter() - start) * 1000, use_cases=len(case_timeouts))
+
+    start = time.perf_counter()
+    native_systems = sorted({view.system for view in views if view.runtime is None})
+    preloaded = []
+    for system in native_systems:
+        try:
+            await asyncio.to_thread(provider.native.preload, system)
+            preloaded.append(system)
+        except Exception as error:  # noqa: BLE001 - un dataset roto se reporta, no impide arrancar
+            readiness.record_error('native_datasets', system, error)
+    readiness.record_step('native_datasets', (time.perf_counter() - start) * 1000, systems=preloaded)
+
+    start = time.perf_counter()
+    for view in views:
+        if view.runtime is not None:
+            provider.balancer_for(view.runtime)
+    upstreams = sorted({url for view in views if view.runtime is not None for url in view.runtime.endpoints})
+    pinged = 0
+    for base_url in upstreams:
+        if not ping_upstreams:
+            continue
+        try:
+            await provider.proxy_for(base_url).ping(ping_path, ping_timeout_ms)
+            pinged += 1
+        except Exception as error:  # noqa: BLE001 - un upstream caido no bloquea la readiness del orquestador
+            readiness.record_error('upstream_pools', base_url, error)
+    readiness.record_step('upstream_pools', (time.perf_counter() - start) * 1000, pools=len(upstreams), pinged=pinged)
+
+    start = time.perf_counter()
+    app.openapi()
+    readiness.record_step('openapi', (time.perf_counter() - start) * 1000)
+
+    readiness.mark_ready()
+    logger.info('warm-up complete', extra={'fields': {'event': 'warmup', **readiness.to_dict()}})
+    return readiness
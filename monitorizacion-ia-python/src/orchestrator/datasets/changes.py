@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from orchestrator.api.schemas import DashboardResponse, QueryRequest, TableDelta, TablePayload, TableRow
+from orchestrator.datasets.columnar import ColumnarTable
+
+CHANGE_INSERT = 'insert'
+CHANGE_UPDATE = 'update'
+CHANGE_DELETE = 'delete'
+# Como se combinan dos cambios seguidos de la misma fila (None = para el cliente la fila nunca existio).
+_COLLAPSE = {
+    (CHANGE_INSERT, CHANGE_UPDATE): CHANGE_INSERT,
+    (CHANGE_INSERT, CHANGE_DELETE): None,
+    (CHANGE_UPDATE, CHANGE_DELETE): CHANGE_DELETE,
+    (CHANGE_DELETE, CHANGE_INSERT): CHANGE_UPDATE,
+}
+
+Change = tuple[str, str, str | None]
+
+
+class ChangeLog:
+    """Cambios por fila (alta, modificacion, baja) de un dataset nativo, numerados por lote.
+
+    El token de version es `<epoca>.<lote>`: la epoca cambia en cada arranque o `reset`, asi que un token de
+    otro proceso o de antes de un cambio que no se pudo registrar nunca produce un delta incompleto.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self.reset()
+
+    def reset(self) -> None:
+        self.epoch = os.urandom(4).hex()
+        self.seq = 0
+        self._seqs: list[int] = []
+        self._changes: list[Change] = []
+        # Lotes hasta `_floor` (incluido) pueden haber perdido entradas por el limite de tamano.
+        self._floor = 0
+
+    def token(self, seq: int | None = None) -> str:
+        return f'{self.epoch}.{self.seq if seq is None else seq}'
+
+    def record(self, changes: Iterable[Change]) -> int:
+        """Registra un lote de `(operacion, id, localizador)` y devuelve su numero."""
+        batch = list(changes)
+        if not batch:
+            return self.seq
+        self.seq += 1
+        self._seqs.extend([self.seq] * len(batch))
+        self._changes.extend(batch)
+        overflow = len(self._changes) - self.max_entries
+        if overflow > 0:
+            self._floor = self._seqs[overflow - 1]
+            del self._seqs[:overflow]
+            del self._changes[:overflow]
+        return self.seq
+
+    def since(self, token: str, upto: int) -> dict[str, tuple[str, str | None]] | None:
+        """Cambio neto de cada fila entre `token` y el lote `upto`, o None si no se puede reconstruir."""
+        epoch, _, raw_seq = token.partition('.')
+        if epoch != self.epoch or not raw_seq.isdigit():
+            return None
+        since = int(raw_seq)
+        if since > upto or since < self._floor:
+            return None
+        net: dict[str, tuple[str, str | None]] = {}
+        start = bisect_right(self._seqs, since)
+        end = bisect_right(self._seqs, upto)
+        for operation, row_id, locator in self._changes[start:end]:
+            previous = net.get(row_id)
+            if previous is None:
+                net[row_id] = (operation, locator)
+                continue
+            collapsed = _COLLAPSE.get((previous[0], operation), operation)
+            if collapsed is None:
+                del net[row_id]
+            else:
+                net[row_id] = (collapsed, locator)
+        return net
+
+
+def row_digest(row: dict) -> bytes:
+    return hashlib.blake2b(json.dumps(row, sort_keys=True, ensure_ascii=False).encode('utf-8'), digest_size=8).digest()
+
+
+def table_digests(table: ColumnarTable) -> dict[str, bytes]:
+    return {row['id']: row_digest(row) for row in map(table.row, range(table.row_count))}
+
+
+def diff_digests(old: dict[str, bytes], new: dict[str, bytes]) -> list[Change]:
+    """Cambios por fila entre dos versiones completas de una tabla (por id y contenido)."""
+    changes: list[Change] = [(CHANGE_DELETE, row_id, None) for row_id in old if row_id not in new]
+    for row_id, digest in new.items():
+        previous = old.get(row_id)
+        if previous is None:
+            changes.append((CHANGE_INSERT, row_id, None))
+        elif previous != digest:
+            changes.append((CHANGE_UPDATE, row_id, None))
+    return changes
+
+
+def build_delta(
+    since: str,
+    changes: dict[str, tuple[str, str | None]],
+    lookup: Callable[[str, str | None], dict | TableRow | None],
+) -> TableDelta:
+    """Delta para una query: `lookup` devuelve la fila actual si existe y cumple la query, o None.
+
+    Una fila modificada que ya no cumple la query sale como baja: el cliente la tenia y debe quitarla.
+    """
+    inserted: list[dict | TableRow] = []
+    updated: list[dict | TableRow] = []
+    deleted: list[str] = []
+    for row_id, (operation, locator) in changes.items():
+        row = None if operation == CHANGE_DELETE else lookup(row_id, locator)
+        if row is not None:
+            (inserted if operation == CHANGE_INSERT else updated).append(row)
+        elif operation != CHANGE_INSERT:
+            deleted.append(row_id)
+    return TableDelta(since=since, inserted=inserted, updated=updated, deleted=deleted)
+
+
+def page_key(req: QueryRequest) -> str:
+    """Clave de la pagina que pide una query: todo menos `since`."""
+    return req.model_dump_json(exclude={'since'})
+
+
+class PageHistory:
+    """Lo que se sirvio en las ultimas versiones de cada pagina (LRU por query y por version)."""
+
+    def __init__(self, max_entries: int = 256, versions_per_query: int = 4) -> None:
+        self.max_entries = max_entries
+        self.versions_per_query = versions_per_query
+        self._entries: OrderedDict[str, OrderedDict[str, object]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, version: str | None):
+        versions = self._entries.get(key)
+        return versions.get(version) if versions is not None and version else None
+
+    def put(self, key: str, version: str, page: object) -> None:
+        versions = self._entries.get(key)
+        if versions is None:
+            versions = self._entries[key] = OrderedDict()
+        self._entries.move_to_end(key)
+        versions[version] = page
+        versions.move_to_end(version)
+        while len(versions) > self.versions_per_query:
+            versions.popitem(last=False)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def page_changes(previous: Iterable[str], rows: Iterable[str], changed: Callable[[str], bool]) -> dict[str, tuple[str, None]]:
+    """Cambios que convierten la pagina que tenia el cliente en la actual.
+
+    Es la misma regla para todos los adapters: alta = fila que no estaba en la pagina, modificacion = fila que
+    sigue y `changed` dice que ha cambiado, baja = fila que ha salido de la pagina (borrada, filtrada o desplazada).
+    """
+    before = set(previous)
+    current = list(rows)
+    changes: dict[str, tuple[str, None]] = {row_id: (CHANGE_DELETE, None) for row_id in before.difference(current)}
+    for row_id in current:
+        if row_id not in before:
+            changes[row_id] = (CHANGE_INSERT, None)
+        elif changed(row_id):
+            changes[row_id] = (CHANGE_UPDATE, None)
+    return changes
+
+
+class PageDiffCache:
+    """Ultimas paginas servidas por query para sacar deltas de upstreams que no entienden `since`.
+
+    La version de una pagina es un hash de su contenido; si el cliente manda una que aun esta en cache se
+    compara fila a fila con la pagina nueva y solo viaja la diferencia.
+    """
+
+    def __init__(self, max_entries: int = 256, versions_per_query: int = 4) -> None:
+        self.pages = PageHistory(max_entries, versions_per_query)
+        self.deltas = 0
+        self.full = 0
+
+    def respond(self, req: QueryRequest, response: DashboardResponse) -> DashboardResponse:
+        key = page_key(req)
+        digests = {row.id: hashlib.blake2b(row.model_dump_json().encode('utf-8'), digest_size=8).digest() for row in response.table.rows}
+        fingerprint = hashlib.blake2b(digest_size=8)
+        for row_id, digest in digests.items():
+            fingerprint.update(row_id.encode('utf-8') + digest)
+        fingerprint.update(f'{response.table.total}|{response.table.nextCursor}'.encode('utf-8'))
+        version = f'p.{fingerprint.hexdigest()}'
+
+        previous = self.pages.get(key, req.since)
+        self.pages.put(key, version, digests)
+        if previous is not None:
+            changes = page_changes(previous, digests, lambda row_id: previous[row_id] != digests[row_id])
+            # Si cambia casi toda la pagina sale mas a cuenta mandarla entera.
+            if len(changes) <= len(digests):
+                self.deltas += 1
+                return page_delta(response, version, req.since, changes)
+        self.full += 1
+        return response.model_copy(update={'version': version})
+
+    def stats(self) -> dict:
+        return {'queries': len(self.pages), 'deltas': self.deltas, 'full': self.full}
+
+
+def page_delta(response: DashboardResponse, version: str, since: str, changes: dict[str, tuple[str, None]]) -> DashboardResponse:
+    rows = {row.id: row for row in response.table.rows}
+    return delta_response(response.table, version, build_delta(since, changes, lambda row_id, _locator: rows.get(row_id)))
+
+
+def delta_response(table: TablePayload, version: str, delta: TableDelta) -> DashboardResponse:
+    # Las filas viajan en `delta`; `table` solo conserva columnas, total y cursor de la pagina actual.
+    return DashboardResponse(
+        table=TablePayload(columns=table.columns, rows=[], nextCursor=table.nextCursor, total=table.total),
+        version=version,
+        delta=delta,
+    )
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import math
+from collections import Counter, OrderedDict, defaultdict
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from orchestrator.api.schemas import CardsResponse, ChartResponse, ChartSeries, ViewComponent
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.columnar import ColumnarTable, DictColumn, NumberColumn, TimeColumn
+
+BUCKET_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400, 'week': 604800}
+# El epoch 0 cae en jueves: las semanas se alinean al lunes desplazandolas 4 dias.
+WEEK_OFFSET_S = 4 * 86400
+OTHER_LABEL = 'Otros'
+EMPTY_LABEL = 'Sin valor'
+# Tamano de pagina pedido a un upstream cuando hay que traer sus filas para agregarlas aqui.
+CHART_PAGE_ROWS = 1000
+
+
+class ChartSpec(BaseModel):
+    """Serie que pide un componente `chart`, leida de su `config` (las claves de presentacion se ignoran)."""
+
+    model_config = ConfigDict(extra='ignore')
+
+    component: str
+    data_source: str
+    group_by: str | None = None
+    bucket: Literal['minute', 'hour', 'day', 'week'] | None = None
+    time_field: str = 'fecha_hora'
+    aggregation: Literal['count', 'sum', 'avg', 'min', 'max', 'percentile'] = 'count'
+    value_field: str | None = None
+    percentile: float = Field(default=95.0, gt=0, le=100)
+    max_groups: int = Field(default=10, ge=1, le=100)
+    max_points: int = Field(default=500, ge=3, le=100000)
+    max_rows: int = Field(default=50000, ge=1, le=10_000_000)
+
+    @classmethod
+    def from_component(cls, component: ViewComponent, max_points: int | None = None, max_rows: int | None = None) -> ChartSpec:
+        """`max_points`/`max_rows` son el valor por defecto y el tope: el `config` de la vista puede bajarlos, no subirlos."""
+        if component.type != 'chart' or component.data_source not in ('/dashboard', '/cards'):
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'component {component.id} is not a chart with data', 400)
+        try:
+            limits = {key: value for key, value in (('max_points', max_points), ('max_rows', max_rows)) if value is not None}
+            spec = cls.model_validate({**limits, **(component.config or {}), 'component': component.id, 'data_source': component.data_source})
+        except ValidationError as error:
+            raise OrchestratorError(
+                ErrorCode.VALIDATION_ERROR,
+                f'invalid chart config for {component.id}',
+                400,
+                {'errors': [{'loc': list(item['loc']), 'msg': item['msg']} for item in error.errors()]},
+            ) from error
+        if spec.aggregation != 'count' and not spec.value_field:
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'aggregation {spec.aggregation} requires value_field', 400)
+        return spec.model_copy(update={key: min(getattr(spec, key), value) for key, value in limits.items()})
+
+    def cache_key(self) -> str:
+        return self.model_dump_json()
+
+    def fields(self) -> list[str]:
+        """Columnas que necesita la agregacion (lo que se le pide a un upstream remoto)."""
+        return [field for field in (self.time_field if self.bucket else None, self.group_by, self.value_field) if field]
+
+
+class ChartCache:
+    """LRU de series ya calculadas; la clave incluye la version del dataset, asi que un dataset nuevo nunca sirve series viejas."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, ChartResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> ChartResponse | None:
+        chart = self._entries.get(key)
+        if chart is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return chart
+
+    def put(self, key: Hashable, chart: ChartResponse) -> None:
+        self._entries[key] = chart
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: indices de los `threshold` puntos que mejor conservan la forma de la serie."""
+    size = len(xs)
+    if threshold >= size or threshold < 3:
+        return list(range(size))
+    kept = [0]
+    every = (size - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        # Vertice fijo del triangulo siguiente: la media del bucket que viene (o el ultimo punto).
+        if end < next_end:
+            avg_x = sum(xs[end:next_end]) / (next_end - end)
+            avg_y = sum(ys[end:next_end]) / (next_end - end)
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        px, py = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs((px - avg_x) * (ys[index] - py) - (px - xs[index]) * (avg_y - py))
+            if area > best_area:
+                best, best_area = index, area
+        kept.append(best)
+        previous = best
+    kept.append(size - 1)
+    return kept
+
+
+def _percentile(values: list[float], percentile: float) -> float:
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percentile / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _reduce(spec: ChartSpec, values: int | list[float]) -> float | None:
+    if isinstance(values, int):
+        return float(values)
+    if not values:
+        return None
+    if spec.aggregation == 'sum':
+        return math.fsum(values)
+    if spec.aggregation == 'avg':
+        return math.fsum(values) / len(values)
+    if spec.aggregation == 'min':
+        return min(values)
+    if spec.aggregation == 'max':
+        return max(values)
+    return _percentile(values, spec.percentile)
+
+
+def _group_key(table: ColumnarTable, spec: ChartSpec) -> tuple[Callable[[int], Any], Callable[[Any], str]] | None:
+    if spec.group_by is None:
+        return None
+    column = table.column(spec.group_by)
+    if isinstance(column, DictColumn):
+        # Se agrupa por codigo y solo se convierte a etiqueta cada valor distinto.
+        values = column.values
+        return column.codes.__getitem__, lambda code: _label(values[code])
+    return lambda row: _label(column.value(row)), str
+
+
+def _label(value: Any) -> str:
+    return EMPTY_LABEL if value is None else str(value)
+
+
+def _bucket_key(table: ColumnarTable, spec: ChartSpec) -> Callable[[int], float] | None:
+    if spec.bucket is None:
+        return None
+    column = table.column(spec.time_field)
+    if not isinstance(column, TimeColumn):
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'column {spec.time_field} is not a time column', 400)
+    size = BUCKET_SECONDS[spec.bucket]
+    offset = WEEK_OFFSET_S if spec.bucket == 'week' else 0
+    epochs = column.data
+
+    def bucket_of(row: int) -> float:
+        epoch = epochs[row]
+        return epoch if epoch != epoch else ((epoch - offset) // size) * size + offset
+
+    return bucket_of
+
+
+def _merge_cell(cells: dict, key: tuple[Any, float | None], values: int | list[float]) -> None:
+    current = cells.get(key)
+    if current is None:
+        cells[key] = values if isinstance(values, int) else list(values)
+    elif isinstance(current, int):
+        cells[key] = current + values
+    else:
+        current.extend(values)
+
+
+def _cells(table: ColumnarTable, rows: Sequence[int], spec: ChartSpec) -> dict[tuple[str | None, float | None], int | list[float]]:
+    """Celdas (etiqueta de grupo, bucket) -> recuento o valores de una tabla."""
+    group = _group_key(table, spec)
+    bucket_of = _bucket_key(table, spec)
+    group_of = group[0] if group is not None else None
+
+    def key_of(row: int) -> tuple[Any, float | None]:
+        return (group_of(row) if group_of is not None else None, bucket_of(row) if bucket_of is not None else None)
+
+    keyed = (key_of(row) for row in rows)
+    if bucket_of is not None:
+        keyed = (key for key in keyed if key[1] == key[1])
+    cells: dict[tuple[Any, float | None], int | list[float]]
+    if spec.aggregation == 'count':
+        cells = dict(Counter(keyed))
+    else:
+        column = table.column(spec.value_field)
+        if not isinstance(column, NumberColumn) or isinstance(column, TimeColumn):
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'column {spec.value_field} is not numeric', 400)
+        numbers = column.data
+        collected: defaultdict[tuple[Any, float | None], list[float]] = defaultdict(list)
+        for row in rows:
+            value = numbers[row]
+            if value == value:
+                key = key_of(row)
+                if key[1] == key[1]:
+                    collected[key].append(value)
+        cells = collected
+    if group is None:
+        return cells
+    # Las claves pasan de codigo a etiqueta: asi se pueden juntar celdas de tablas (particiones) distintas.
+    labelled: dict[tuple[str | None, float | None], int | list[float]] = {}
+    to_label = group[1]
+    for (group_value, bucket), values in cells.items():
+        _merge_cell(labelled, (to_label(group_value), bucket), values)
+    return labelled
+
+
+def aggregate(table: ColumnarTable, selection: Sequence[int] | None, spec: ChartSpec) -> ChartResponse:
+    """Agrega las filas seleccionadas en series (grupo x bucket temporal) y reduce cada serie larga con LTTB."""
+    return aggregate_many([(table, selection)], spec)
+
+
+def aggregate_many(parts: Iterable[tuple[ColumnarTable, Sequence[int] | None]], spec: ChartSpec) -> ChartResponse:
+    """Igual que `aggregate` sobre varias tablas (p. ej. particiones por dia) a la vez."""
+    cells: dict[tuple[str | None, float | None], int | list[float]] = {}
+    row_count = 0
+    for table, selection in parts:
+        rows: Sequence[int] = range(table.row_count) if selection is None else selection
+        row_count += len(rows)
+        for key, values in _cells(table, rows, spec).items():
+            _merge_cell(cells, key, values)
+
+    # Los grupos con mas filas se sirven tal cual; el resto se junta en "Otros".
+    weights: Counter = Counter()
+    for (group_value, _bucket), values in cells.items():
+        weights[group_value] += values if isinstance(values, int) else len(values)
+    top: list[str | None] = [value for value, _weight in sorted(weights.items(), key=lambda item: -item[1])[: spec.max_groups]]
+    if len(weights) > len(top):
+        kept = set(top)
+        merged: dict[tuple[str | None, float | None], int | list[float]] = {}
+        for (group_value, bucket), values in cells.items():
+            _merge_cell(merged, (group_value if group_value in kept else OTHER_LABEL, bucket), values)
+        cells = merged
+        top.append(OTHER_LABEL)
+
+    series: list[ChartSeries] = []
+    downsampled = False
+    if spec.bucket is None:
+        if spec.group_by is None:
+            value = cells.get((None, None), 0 if spec.aggregation == 'count' else [])
+            series.append(ChartSeries(name=spec.aggregation, x=['total'], y=[_reduce(spec, value)]))
+        else:
+            series.append(ChartSeries(name=spec.aggregation, x=list(top), y=[_reduce(spec, cells[(value, None)]) for value in top]))
+    else:
+        by_group: defaultdict[str | None, list[tuple[float, Any]]] = defaultdict(list)
+        for (group_value, bucket), values in cells.items():
+            by_group[group_value].append((bucket, values))
+        for group_value in top:
+            points = sorted(by_group[group_value], key=lambda point: point[0])
+            xs = [int(bucket * 1000) for bucket, _values in points]
+            ys = [_reduce(spec, values) for _bucket, values in points]
+            if len(xs) > spec.max_points:
+                kept_points = lttb(xs, ys, spec.max_points)
+                xs = [xs[index] for index in kept_points]
+                ys = [ys[index] for index in kept_points]
+                downsampled = True
+            series.append(ChartSeries(name=spec.aggregation if group_value is None else group_value, x=xs, y=ys))
+    return ChartResponse(
+        component=spec.component, aggregation=spec.aggregation, bucket=spec.bucket, rows=row_count, downsampled=downsampled, series=series
+    )
+
+
+def chart_from_cards(spec: ChartSpec, cards: CardsResponse) -> ChartResponse:
+    # Sobre `/cards` no hay filas que agregar: cada tarjeta numerica es un punto.
+    numeric = [card for card in cards.cards if isinstance(card.value, (int, float))]
+    return ChartResponse(
+        component=spec.component,
+        aggregation='value',
+        rows=len(numeric),
+        series=[ChartSeries(name='value', x=[card.title for card in numeric], y=[float(card.value) for card in numeric])],
+    )
@@ -0,0 +1,502 @@
+from __future__ import annotations
+
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from orchestrator.api.schemas import DashboardResponse, QueryRequest, SortItem, TableColumn, TablePayload
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.projection import project_columns, projected_fields
+
+if TYPE_CHECKING:
+    from orchestrator.core.time_range import TimeRange
+    from orchestrator.datasets.search import SearchIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy es opcional (extra `perf`): sin el se usan los mismos algoritmos en Python puro
+    np = None
+
+KIND_DICT = 'dict'
+KIND_LIST = 'list'
+KIND_NUMBER = 'number'
+KIND_TIME = 'time'
+TIME_FORMATS = ('%d-%m-%Y · %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+# Una columna de texto se codifica con diccionario si tiene como mucho este ratio de valores distintos.
+DICT_MAX_DISTINCT_RATIO = 0.5
+# Por debajo de esta fraccion de filas seleccionadas es mas barato ordenar la seleccion que recorrer la permutacion.
+SORT_SELECTION_RATIO = 0.125
+# Mayor entero que un float de 64 bits representa sin perder precision.
+MAX_EXACT_INT = 2**53
+
+
+def hashable(value: Any) -> Any:
+    """Clave hashable y estable para cualquier valor JSON (dicts y listas incluidos)."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return ('{}', tuple(sorted((key, hashable(item)) for key, item in value.items())))
+    if isinstance(value, list):
+        return ('[]', tuple(hashable(item) for item in value))
+    return json.dumps(value, sort_keys=True, ensure_ascii=False)
+
+
+def _sort_value(value: Any) -> tuple:
+    if value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (3, hashable(value))
+
+
+class DictColumn:
+    """Valores repetidos (p. ej. `resolucion`) como codigos `uint32` sobre un diccionario de valores distintos."""
+
+    kind = KIND_DICT
+
+    def __init__(self, values: list[Any], codes: array) -> None:
+        self.values = values
+        self.codes = codes
+        self._code_of = {hashable(value): code for code, value in enumerate(values)}
+        self._postings: list[array] | None = None
+        self._sort_keys: Sequence | None = None
+
+    @classmethod
+    def build(cls, raw: list[Any], max_distinct: int | None = None) -> DictColumn | None:
+        values: list[Any] = [None]
+        code_of: dict[Any, int] = {None: 0}
+        codes = array('I', bytes(4 * len(raw)))
+        scalar = (str, int, float, bool)
+        for row, value in enumerate(raw):
+            key = value if value is None or isinstance(value, scalar) else hashable(value)
+            code = code_of.get(key)
+            if code is None:
+                if max_distinct is not None and len(values) > max_distinct:
+                    return None
+                code = code_of[key] = len(values)
+                values.append(value)
+            codes[row] = code
+        return cls(values, codes)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def value(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+    def select(self, wanted: list[Any]) -> array:
+        postings = self.postings()
+        matched = [postings[code] for code in {self._code_of.get(hashable(value)) for value in wanted} if code is not None]
+        if len(matched) == 1:
+            return matched[0]
+        return array('I', sorted(row for rows in matched for row in rows))
+
+    def postings(self) -> list[array]:
+        # Filas por codigo: un filtro de igualdad cuesta O(filas que cumplen), no O(total).
+        if self._postings is None:
+            postings = [array('I') for _ in self.values]
+            for row, code in enumerate(self.codes):
+                postings[code].append(row)
+            self._postings = postings
+        return self._postings
+
+    def sort_keys(self) -> Sequence:
+        if self._sort_keys is None:
+            ranks = [0] * len(self.values)
+            for rank, code in enumerate(sorted(range(len(self.values)), key=lambda code: _sort_value(self.values[code]))):
+                ranks[code] = rank
+            if np is not None:
+                self._sort_keys = np.asarray(ranks, dtype=np.uint32)[np.frombuffer(self.codes, dtype=np.uint32)]
+            else:
+                self._sort_keys = array('I', (ranks[code] for code in self.codes))
+        return self._sort_keys
+
+    def nbytes(self) -> int:
+        return self.codes.itemsize * len(self.codes) + sum(sys.getsizeof(value) for value in self.values)
+
+
+class ListColumn:
+    """Texto de alta cardinalidad (nombres, telefonos) u objetos: una lista Python sin codificar."""
+
+    kind = KIND_LIST
+
+    def __init__(self, values: list[Any]) -> None:
+        self.values = values
+        self._sort_keys: list | None = None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def value(self, row: int) -> Any:
+        return self.values[row]
+
+    def select(self, wanted: list[Any]) -> array:
+        keys = {hashable(value) for value in wanted}
+        return array('I', (row for row, value in enumerate(self.values) if hashable(value) in keys))
+
+    def sort_keys(self) -> Sequence:
+        if self._sort_keys is None:
+            self._sort_keys = [_sort_value(value) for value in self.values]
+        return self._sort_keys
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.values) + sum(sys.getsizeof(value) for value in self.values)
+
+
+class NumberColumn:
+    """Numeros en un `array('d')`; los nulos se guardan como NaN y ordenan primero.
+
+    Si pasar a float cambiaria algun valor (enteros y decimales mezclados, o enteros mas alla de 2^53) se
+    guardan ademas los valores originales en `exact`: se sirven, filtran y ordenan con ellos, y `data` queda
+    para agregar.
+    """
+
+    kind = KIND_NUMBER
+
+    def __init__(self, data: array, integral: bool, exact: list[Any] | None = None) -> None:
+        self.data = data
+        self.integral = integral
+        self.exact = exact
+        self._sort_keys: Sequence | None = None
+
+    @classmethod
+    def build(cls, raw: list[Any]) -> NumberColumn:
+        data = array('d', (float('nan') if value is None else float(value) for value in raw))
+        integral = all(value is None or isinstance(value, int) for value in raw)
+        floats = all(value is None or isinstance(value, float) for value in raw)
+        lossless = floats or (integral and all(value is None or abs(value) <= MAX_EXACT_INT for value in raw))
+        return cls(data, integral, None if lossless else list(raw))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def value(self, row: int) -> Any:
+        if self.exact is not None:
+            return self.exact[row]
+        number = self.data[row]
+        if number != number:
+            return None
+        return int(number) if self.integral else number
+
+    def select(self, wanted: list[Any]) -> array:
+        keys = {value for value in wanted if isinstance(value, (int, float)) and not isinstance(value, bool)}
+        if self.exact is not None:
+            return array('I', (row for row, value in enumerate(self.exact) if value is not None and value in keys))
+        keys = {float(value) for value in keys}
+        if np is not None:
+            return array('I', np.flatnonzero(np.isin(np.frombuffer(self.data, dtype=np.float64), list(keys))).astype(np.uint32).tobytes())
+        return array('I', (row for row, number in enumerate(self.data) if number in keys))
+
+    def sort_keys(self) -> Sequence:
+        if self._sort_keys is None:
+            if self.exact is not None:
+                self._sort_keys = [_sort_value(value) for value in self.exact]
+            else:
+                self._sort_keys = array('d', (float('-inf') if number != number else number for number in self.data))
+        return self._sort_keys
+
+    def nbytes(self) -> int:
+        exact = 0 if self.exact is None else sys.getsizeof(self.exact) + sum(sys.getsizeof(value) for value in self.exact)
+        return self.data.itemsize * len(self.data) + exact
+
+
+class TimeColumn(NumberColumn):
+    """Fechas como epoch (segundos) en un `array('d')`; se vuelven a formatear con su formato original al servirlas."""
+
+    kind = KIND_TIME
+
+    def __init__(self, data: array, time_format: str) -> None:
+        super().__init__(data, integral=False)
+        self.time_format = time_format
+
+    @classmethod
+    def parse(cls, raw: list[Any]) -> TimeColumn | None:
+        sample = next((value for value in raw if value is not None), None)
+        if not isinstance(sample, str):
+            return None
+        for time_format in TIME_FORMATS:
+            parsed = _parse_times(raw, time_format)
+            if parsed is not None:
+                return cls(parsed, time_format)
+        return None
+
+    def value(self, row: int) -> Any:
+        epoch = self.data[row]
+        if epoch != epoch:
+            return None
+        return datetime.fromtimestamp(epoch, timezone.utc).strftime(self.time_format)
+
+    def select(self, wanted: list[Any]) -> array:
+        epochs = _parse_times([value for value in wanted if isinstance(value, str)], self.time_format)
+        return super().select(list(epochs or []))
+
+
+def _parse_times(raw: list[Any], time_format: str) -> array | None:
+    # Se parsea cada valor distinto una vez; solo se acepta el formato si el valor se reconstruye identico.
+    epochs: dict[str, float] = {}
+    data = array('d', bytes(8 * len(raw)))
+    for row, value in enumerate(raw):
+        if value is None:
+            data[row] = float('nan')
+            continue
+        epoch = epochs.get(value) if isinstance(value, str) else None
+        if epoch is None:
+            if not isinstance(value, str):
+                return None
+            try:
+                moment = datetime.strptime(value, time_format).replace(tzinfo=timezone.utc)
+            except ValueError:
+                return None
+            if moment.strftime(time_format) != value:
+                return None
+            epoch = epochs[value] = moment.timestamp()
+        data[row] = epoch
+    return data
+
+
+Column = DictColumn | ListColumn | NumberColumn | TimeColumn
+
+
+def build_column(raw: list[Any]) -> Column:
+    if any(value is not None for value in raw) and all(
+        value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)) for value in raw
+    ):
+        return NumberColumn.build(raw)
+    time_column = TimeColumn.parse(raw)
+    if time_column is not None:
+        return time_column
+    dictionary = DictColumn.build(raw, max_distinct=max(int(DICT_MAX_DISTINCT_RATIO * len(raw)), 1))
+    return dictionary if dictionary is not None else ListColumn(raw)
+
+
+def encode_cursor(offset: int) -> str:
+    return str(offset)
+
+
+def decode_cursor(cursor: str | None) -> int:
+    if not cursor:
+        return 0
+    if not cursor.isdigit():
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Invalid cursor: {cursor}', 400)
+    return int(cursor)
+
+
+def page_limit(req: QueryRequest, default_limit: int, max_limit: int, total: int) -> int:
+    # Sin `limit` explicito, `default_limit` 0 devuelve todas las filas que cumplen la query (sin paginar).
+    if req.limit:
+        return min(req.limit, max_limit)
+    return min(default_limit, max_limit) if default_limit else total
+
+
+def intersect(left: Sequence[int], right: Sequence[int]) -> array:
+    if np is not None:
+        return array('I', np.intersect1d(np.asarray(left, dtype=np.uint32), np.asarray(right, dtype=np.uint32), assume_unique=True).tobytes())
+    small, large = (left, right) if len(left) <= len(right) else (right, left)
+    wanted = set(small)
+    return array('I', (row for row in large if row in wanted))
+
+
+class ColumnarTable:
+    """Tabla de `dashboard.json` en columnas tipadas; filtra, ordena y cuenta sobre columnas y solo construye las filas de la pagina."""
+
+    def __init__(
+        self,
+        columns: list[TableColumn],
+        data: dict[str, Column],
+        row_count: int,
+        version: str | None = None,
+        nulls: dict[str, frozenset[int]] | None = None,
+        missing_as_null: bool = False,
+    ) -> None:
+        self.columns = columns
+        self.data = data
+        self.row_count = row_count
+        self.version = version
+        # Filas con la clave presente y valor null: se sirven como null en vez de omitir la clave.
+        self.nulls = nulls or {}
+        # Con `missing_as_null` una clave que no existe es una columna de nulos (particiones de un mismo dataset).
+        self.missing_as_null = missing_as_null
+        self._null_columns: dict[str, Column] = {}
+        self._orders: dict[tuple[str, bool], array] = {}
+        self._position_of: dict[str, int] | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict, version: str | None = None, missing_as_null: bool = False) -> ColumnarTable:
+        table = payload.get('table') if isinstance(payload, dict) else None
+        if not isinstance(table, dict) or not isinstance(table.get('rows'), list):
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, 'dashboard dataset must contain table.rows', 500)
+        columns = [TableColumn.model_validate(column) for column in table.get('columns', [])]
+        rows = table['rows']
+        keys = list(dict.fromkeys([column.key for column in columns] + [key for row in rows for key in row]))
+        for row in rows:
+            if not isinstance(row, dict) or not isinstance(row.get('id'), str) or not isinstance(row.get('detail'), dict):
+                raise OrchestratorError(ErrorCode.VALIDATION_ERROR, 'dashboard rows require id and detail', 500)
+        data = {key: build_column([row.get(key) for row in rows]) for key in keys}
+        nulls: dict[str, set[int]] = {}
+        for position, row in enumerate(rows):
+            for key, value in row.items():
+                if value is None:
+                    nulls.setdefault(key, set()).add(position)
+        return cls(columns, data, len(rows), version, {key: frozenset(found) for key, found in nulls.items()}, missing_as_null)
+
+    def column(self, key: str) -> Column:
+        column = self.data.get(key)
+        if column is not None:
+            return column
+        if not self.missing_as_null:
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Unknown column: {key}', 400)
+        column = self._null_columns.get(key)
+        if column is None:
+            column = self._null_columns[key] = build_column([None] * self.row_count)
+        return column
+
+    def row(self, row: int, fields: Sequence[str] | None = None) -> dict[str, Any]:
+        columns = self.data.items() if fields is None else [(key, self.data[key]) for key in fields if key in self.data]
+        materialised = {}
+        for key, column in columns:
+            value = column.value(row)
+            if value is not None or row in self.nulls.get(key, ()):
+                materialised[key] = value
+        return materialised
+
+    def positions(self, row_ids: Iterable[str]) -> array:
+        if self._position_of is None:
+            id_column = self.column('id')
+            self._position_of = {id_column.value(row): row for row in range(self.row_count)}
+        position_of = self._position_of
+        return array('I', sorted(position for position in map(position_of.get, row_ids) if position is not None))
+
+    def select(self, filters: dict[str, Any] | None) -> Sequence[int] | None:
+        # None significa "todas las filas" y evita materializar range(n).
+        selection: Sequence[int] | None = None
+        for key, wanted in (filters or {}).items():
+            rows = self.column(key).select(wanted if isinstance(wanted, list) else [wanted])
+            selection = rows if selection is None else intersect(selection, rows)
+        return selection
+
+    def sort_value(self, key: str, row: int) -> tuple:
+        # Clave comparable entre tablas distintas (los rangos de `sort_keys` solo valen dentro de una tabla).
+        column = self.column(key)
+        if isinstance(column, NumberColumn) and column.exact is None:
+            number = column.data[row]
+            return (0, 0) if number != number else (1, number)
+        return _sort_value(column.value(row))
+
+    def time_range(self, key: str, time_range: TimeRange) -> array:
+        """Filas (ordenadas) con `key` dentro de la ventana; se busca por biseccion sobre la permutacion de la columna."""
+        column = self.column(key)
+        if not isinstance(column, TimeColumn):
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'column {key} is not a time column', 400)
+        order = self.order(key)
+        keys = column.sort_keys()
+        low = 0 if time_range.start is None else bisect_left(order, time_range.start, key=keys.__getitem__)
+        high = len(order) if time_range.end is None else bisect_left(order, time_range.end, key=keys.__getitem__)
+        return array('I', sorted(order[low:high]))
+
+    def matching(
+        self,
+        req: QueryRequest,
+        search_index: SearchIndex | None = None,
+        time_window: tuple[str, TimeRange] | None = None,
+    ) -> Sequence[int] | None:
+        selection = self.select(req.filters)
+        if time_window is not None:
+            in_window = self.time_range(*time_window)
+            selection = in_window if selection is None else intersect(selection, in_window)
+        found = search_index.rows(req.search, self) if search_index is not None and req.search else None
+        if found is not None:
+            selection = found if selection is None else intersect(selection, found)
+        return selection
+
+    def order(self, key: str, descending: bool = False) -> array:
+        # Permutacion estable por columna, calculada una vez y reutilizada por todas las queries. En las dos
+        # direcciones los empates quedan en orden de fila, igual que en la ordenacion multi-clave.
+        order = self._orders.get((key, descending))
+        if order is None:
+            keys = self.column(key).sort_keys()
+            if np is not None and not isinstance(keys, list):
+                values = np.asarray(keys)
+                if descending:
+                    # argsort estable sobre la columna invertida y vuelta a invertir: descendente con empates por fila.
+                    flipped = np.argsort(values[::-1], kind='stable')
+                    order = array('I', (self.row_count - 1 - flipped[::-1]).astype(np.uint32).tobytes())
+                else:
+                    order = array('I', np.argsort(values, kind='stable').astype(np.uint32).tobytes())
+            else:
+                order = array('I', sorted(range(self.row_count), key=keys.__getitem__, reverse=descending))
+            self._orders[(key, descending)] = order
+        return order
+
+    def warm(self) -> None:
+        # Permutaciones de las columnas ordenables e indices de las filtrables: la primera query no paga su construccion.
+        for column in self.columns:
+            if column.sortable:
+                self.order(column.key)
+            data = self.data.get(column.key)
+            if column.filterable and isinstance(data, DictColumn):
+                data.postings()
+
+    def ordered_page(self, selection: Sequence[int] | None, sort: list[SortItem] | None, offset: int, limit: int) -> list[int]:
+        end = offset + limit
+        if not sort:
+            rows = range(self.row_count) if selection is None else selection
+            return list(rows[offset:end])
+        if len(sort) == 1 and (selection is None or len(selection) > self.row_count * SORT_SELECTION_RATIO):
+            order = self.order(sort[0].field, sort[0].direction == 'desc')
+            if selection is None:
+                return list(order[offset:end])
+            mask = bytearray(self.row_count)
+            for row in selection:
+                mask[row] = 1
+            page: list[int] = []
+            seen = 0
+            for row in order:
+                if not mask[row]:
+                    continue
+                if seen >= offset:
+                    page.append(row)
+                    if len(page) >= limit:
+                        break
+                seen += 1
+            return page
+        rows = list(range(self.row_count) if selection is None else selection)
+        # Ordenaciones estables sucesivas, de la ultima clave a la primera.
+        for item in reversed(sort):
+            keys = self.column(item.field).sort_keys()
+            rows.sort(key=keys.__getitem__, reverse=item.direction == 'desc')
+        return rows[offset:end]
+
+    def query_page(
+        self, req: QueryRequest, default_limit: int, max_limit: int, search_index: SearchIndex | None = None
+    ) -> tuple[list[int], int, str | None]:
+        """Posiciones de la pagina pedida, total de filas que cumplen la query y cursor siguiente."""
+        offset = decode_cursor(req.cursor)
+        selection = self.matching(req, search_index)
+        total = self.row_count if selection is None else len(selection)
+        limit = page_limit(req, default_limit, max_limit, total)
+        next_cursor = encode_cursor(offset + limit) if offset + limit < total else None
+        return self.ordered_page(selection, req.sort, offset, limit), total, next_cursor
+
+    def query(
+        self, req: QueryRequest, default_limit: int, max_limit: int, search_index: SearchIndex | None = None
+    ) -> DashboardResponse:
+        page, total, next_cursor = self.query_page(req, default_limit, max_limit, search_index)
+        fields = projected_fields(req)
+        # Solo se valida la pagina, y solo con las columnas pedidas: el resto nunca se convierte en modelos.
+        rows = [self.row(row, fields) for row in page]
+        columns = project_columns(self.columns, fields)
+        return DashboardResponse(table=TablePayload(columns=columns, rows=rows, nextCursor=next_cursor, total=total))
+
+    def stats(self) -> dict:
+        return {
+            'rows': self.row_count,
+            'columns': {key: column.kind for key, column in self.data.items()},
+            'bytes': sum(column.nbytes() for column in self.data.values()),
+            'numpy': np is not None,
+        }
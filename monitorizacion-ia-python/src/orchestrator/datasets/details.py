@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import re
+from array import array
+from collections.abc import Iterable, Iterator
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from orchestrator.api.schemas import DashboardDetailResponse
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.columnar import decode_cursor, encode_cursor
+
+DETAILS_FILE = 'dashboard_details.jsonl'
+# Cada cuantos mensajes se guarda su offset: una ventana lee como mucho este numero de mensajes de mas.
+MESSAGE_CHECKPOINT = 32
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class MessageIndex(NamedTuple):
+    """Posicion de `left.messages` dentro de la linea de un detalle (offsets relativos al inicio de la linea)."""
+
+    start: int
+    end: int
+    count: int
+    checkpoints: array
+
+
+def message_window(total: int, limit: int | None, cursor: str | None) -> tuple[int, int]:
+    """Rango `[inicio, fin)` de mensajes: `N` pide los `limit` siguientes al N y `-N` los `limit` anteriores."""
+    backward = cursor is not None and cursor.startswith('-')
+    boundary = min(decode_cursor(cursor.removeprefix('-') if cursor else None), total)
+    if backward:
+        return (0 if limit is None else max(0, boundary - limit)), boundary
+    return boundary, (total if limit is None else min(total, boundary + limit))
+
+
+def window_fields(start: int, end: int, total: int) -> dict[str, Any]:
+    return {
+        'total': total,
+        'nextCursor': encode_cursor(end) if end < total else None,
+        'prevCursor': f'-{start}' if start > 0 else None,
+    }
+
+
+def window_payload(payload: Any, limit: int | None, cursor: str | None) -> Any:
+    """Aplica la ventana a un detalle crudo que trae todos los mensajes (upstreams sin ventana, detalle de ejemplo)."""
+    left = payload.get('left') if isinstance(payload, dict) else None
+    if not isinstance(left, dict) or not isinstance(left.get('messages'), list):
+        return payload
+    messages = left['messages']
+    start, end = message_window(len(messages), limit, cursor)
+    return {**payload, 'left': {**left, 'messages': messages[start:end], **window_fields(start, end, len(messages))}}
+
+
+def _skip(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _members(text: str, pos: int) -> dict[str, tuple[int, int]]:
+    # Rango de cada valor del objeto JSON que empieza en `pos`; el JSON ya se ha validado con json.loads.
+    members: dict[str, tuple[int, int]] = {}
+    pos = _skip(text, pos + 1)
+    while text[pos] != '}':
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip(text, _skip(text, pos) + 1)
+        _value, end = _DECODER.raw_decode(text, pos)
+        members[key] = (pos, end)
+        pos = _skip(text, end)
+        if text[pos] == ',':
+            pos = _skip(text, pos + 1)
+    return members
+
+
+def _items(text: str, pos: int) -> Iterator[tuple[Any, int, int]]:
+    # Elementos del array JSON que empieza en `pos`, con su rango.
+    pos = _skip(text, pos + 1)
+    while text[pos] != ']':
+        value, end = _DECODER.raw_decode(text, pos)
+        yield value, pos, end
+        pos = _skip(text, end)
+        if text[pos] == ',':
+            pos = _skip(text, pos + 1)
+
+
+def index_messages(line: bytes) -> MessageIndex | None:
+    # En latin-1 cada byte es un caracter, asi que las posiciones del texto son offsets en el fichero.
+    # Los bytes de UTF-8 multibyte nunca coinciden con caracteres estructurales de JSON.
+    text = line.decode('latin-1')
+    left = _members(text, _skip(text, 0)).get('left')
+    if left is None or text[left[0]] != '{':
+        return None
+    messages = _members(text, left[0]).get('messages')
+    if messages is None or text[messages[0]] != '[':
+        return None
+    checkpoints = array('I')
+    count = 0
+    for _value, start, _end in _items(text, messages[0]):
+        if count % MESSAGE_CHECKPOINT == 0:
+            checkpoints.append(start)
+        count += 1
+    return MessageIndex(messages[0], messages[1], count, checkpoints)
+
+
+class DetailStore:
+    """Detalle por fila en JSON Lines (`{"id": ..., "left": ..., "right": ...}` por linea).
+
+    Al abrirlo solo se recorre el fichero para indexar el offset de cada id; cada detalle se lee y valida
+    cuando se pide, asi que la memoria no crece con la longitud de las conversaciones. En las conversaciones
+    largas se guarda ademas el offset de uno de cada `MESSAGE_CHECKPOINT` mensajes: una ventana de mensajes
+    lee el resto del detalle y solo los mensajes que necesita, sea cual sea la longitud de la conversacion.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._offsets: dict[str, tuple[int, int]] = {}
+        self._messages: dict[str, MessageIndex] = {}
+        with open(self.path, 'rb') as handle:
+            offset = 0
+            for line in handle:
+                if line.strip():
+                    payload = self._parse(line)
+                    row_id = payload.get('id')
+                    if not isinstance(row_id, str):
+                        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'detail without id in {self.path}', 500)
+                    self._offsets[row_id] = (offset, len(line))
+                    left = payload.get('left')
+                    messages = left.get('messages') if isinstance(left, dict) else None
+                    # Las cortas se leen enteras: no compensa indexarlas.
+                    if isinstance(messages, list) and len(messages) > MESSAGE_CHECKPOINT:
+                        index = index_messages(line)
+                        if index is not None:
+                            self._messages[row_id] = index
+                offset += len(line)
+
+    def _parse(self, line: bytes) -> dict:
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'detail lines must be JSON objects in {self.path}', 500)
+        return payload
+
+    def __contains__(self, row_id: str) -> bool:
+        return row_id in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def _location(self, row_id: str) -> tuple[int, int]:
+        location = self._offsets.get(row_id)
+        if location is None:
+            raise OrchestratorError(ErrorCode.NOT_FOUND, f'detail not found: {row_id}', 404)
+        return location
+
+    def raw(self, row_id: str) -> dict:
+        offset, length = self._location(row_id)
+        with open(self.path, 'rb') as handle:
+            handle.seek(offset)
+            payload = json.loads(handle.read(length))
+        payload.pop('id', None)
+        return payload
+
+    def raw_window(self, row_id: str, limit: int | None, cursor: str | None) -> dict:
+        """Detalle con solo la ventana de mensajes pedida (ver `message_window`)."""
+        offset, length = self._location(row_id)
+        index = self._messages.get(row_id)
+        if index is None:
+            return window_payload(self.raw(row_id), limit, cursor)
+        start, end = message_window(index.count, limit, cursor)
+        messages = []
+        with open(self.path, 'rb') as handle:
+            # Todo lo que no es `left.messages` (id, paneles de la derecha...) mas el tramo de mensajes de la ventana.
+            handle.seek(offset)
+            prefix = handle.read(index.start)
+            handle.seek(offset + index.end)
+            suffix = handle.read(length - index.end)
+            if end > start:
+                first = start // MESSAGE_CHECKPOINT
+                last = (end - 1) // MESSAGE_CHECKPOINT + 1
+                region_start = index.checkpoints[first]
+                region_end = index.checkpoints[last] if last < len(index.checkpoints) else index.end - 1
+                handle.seek(offset + region_start)
+                region = handle.read(region_end - region_start).decode('utf-8')
+                # El tramo va de checkpoint a checkpoint; se cierra como array para recorrerlo con el mismo parser.
+                items = _items('[' + region.rstrip().rstrip(',') + ']', 0)
+                for position, (value, _start, _end) in enumerate(items, first * MESSAGE_CHECKPOINT):
+                    if position >= end:
+                        break
+                    if position >= start:
+                        messages.append(value)
+        payload = json.loads(prefix + b'[]' + suffix)
+        payload.pop('id', None)
+        payload['left'].update(messages=messages, **window_fields(start, end, index.count))
+        return payload
+
+    def get(self, row_id: str, messages_limit: int | None = None, messages_cursor: str | None = None) -> DashboardDetailResponse:
+        if messages_limit is None and messages_cursor is None:
+            return DashboardDetailResponse.model_validate(self.raw(row_id))
+        return DashboardDetailResponse.model_validate(self.raw_window(row_id, messages_limit, messages_cursor))
+
+    def iter_messages(self, row_ids: Iterable[str] | None = None) -> Iterator[tuple[str, list[str]]]:
+        """Textos de los mensajes de cada fila, un detalle en memoria cada vez.
+
+        Con `row_ids` solo se leen esas filas (por su offset, en orden de fichero): indexar una particion no
+        recorre el detalle de todo el historico.
+        """
+        with open(self.path, 'rb') as handle:
+            if row_ids is None:
+                lines = (line for line in handle if line.strip())
+            else:
+                locations = sorted(location for location in map(self._offsets.get, row_ids) if location is not None)
+                lines = (_read_at(handle, offset, length) for offset, length in locations)
+            for line in lines:
+                payload = self._parse(line)
+                messages = (payload.get('left') or {}).get('messages') or []
+                yield payload['id'], [message.get('text', '') for message in messages if isinstance(message, dict)]
+
+
+def _read_at(handle, offset: int, length: int) -> bytes:
+    handle.seek(offset)
+    return handle.read(length)
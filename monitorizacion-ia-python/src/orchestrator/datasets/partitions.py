@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import heapq
+import json
+import mmap
+import os
+import tempfile
+from collections import OrderedDict, defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from orchestrator.api.schemas import DashboardResponse, QueryRequest, SortItem, TableColumn, TablePayload
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.time_range import TimeRange
+from orchestrator.datasets.columnar import ColumnarTable, TimeColumn, decode_cursor, encode_cursor, page_limit
+from orchestrator.datasets.details import DetailStore
+from orchestrator.datasets.projection import project_columns, projected_fields
+from orchestrator.datasets.search import SearchIndex
+
+PARTITIONS_DIR = 'dashboard'
+MANIFEST_FILE = 'manifest.json'
+DAY_S = 86400
+
+
+@dataclass(frozen=True)
+class Partition:
+    day: str
+    file: str
+    rows: int
+    start: float
+
+    @property
+    def end(self) -> float:
+        return self.start + DAY_S
+
+
+class _MergeKey:
+    """Compara claves de orden multi-campo respetando la direccion de cada campo (para `heapq.merge`)."""
+
+    __slots__ = ('values', 'descending')
+
+    def __init__(self, values: tuple, descending: list[bool]) -> None:
+        self.values = values
+        self.descending = descending
+
+    def __lt__(self, other: _MergeKey) -> bool:
+        for mine, theirs, descending in zip(self.values, other.values, self.descending):
+            if mine != theirs:
+                return mine > theirs if descending else mine < theirs
+        return False
+
+
+def _day_start(day: str) -> float:
+    return datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+
+
+def _read_rows(path: Path, start: int = 0, stop: int | None = None) -> list[dict]:
+    # Solo se parsean las filas [start, stop): las anteriores se saltan sobre el mapeo sin decodificarlas y
+    # la lectura para en `stop`, asi que ponerse al dia tras un append no vuelve a parsear la particion entera.
+    rows: list[dict] = []
+    with open(path, 'rb') as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return rows
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            seen = 0
+            for line in iter(mapped.readline, b''):
+                if stop is not None and seen >= stop:
+                    break
+                if not line.strip():
+                    continue
+                if seen >= start:
+                    rows.append(json.loads(line))
+                seen += 1
+    return rows
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Escribe `content` en un temporal del mismo directorio y lo renombra: los lectores ven el fichero viejo o el nuevo."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+        handle.write(content)
+    os.replace(tmp_path, path)
+
+
+def split_by_day(rows: list[dict], time_field: str) -> dict[str, list[dict]]:
+    times = TimeColumn.parse([row.get(time_field) for row in rows])
+    if times is None or any(epoch != epoch for epoch in times.data):
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'every row needs a parseable {time_field} to be partitioned', 500)
+    by_day: defaultdict[str, list[dict]] = defaultdict(list)
+    for row, epoch in zip(rows, times.data):
+        by_day[datetime.fromtimestamp(epoch, timezone.utc).strftime('%Y-%m-%d')].append(row)
+    return by_day
+
+
+def _jsonl(rows: list[dict]) -> str:
+    return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+
+def write_partitions(base_path: str | Path, payload: dict, time_field: str = 'fecha_hora') -> int:
+    """Reparte las filas de un `dashboard.json` en un JSONL por dia (UTC) bajo `<base>/dashboard/` con su manifest."""
+    table = payload.get('table') if isinstance(payload, dict) else None
+    if not isinstance(table, dict) or not isinstance(table.get('rows'), list):
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, 'dashboard dataset must contain table.rows', 500)
+    by_day = split_by_day(table['rows'], time_field)
+    directory = Path(base_path) / PARTITIONS_DIR
+    directory.mkdir(parents=True, exist_ok=True)
+    partitions = []
+    for day in sorted(by_day):
+        filename = f'{day}.jsonl'
+        write_atomic(directory / filename, _jsonl(by_day[day]))
+        partitions.append({'day': day, 'file': filename, 'rows': len(by_day[day])})
+    manifest = {'time_field': time_field, 'columns': table.get('columns', []), 'partitions': partitions}
+    write_atomic(directory / MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return len(partitions)
+
+
+class PartitionedDataset:
+    """Dataset nativo particionado por dia: `dashboard/manifest.json` + un JSONL por particion.
+
+    Una query solo abre las particiones que solapan con `timeRange`; cada particion se carga al usarla
+    como `ColumnarTable` y se mantienen abiertas como mucho `max_open` (LRU), asi que el coste depende
+    de la ventana pedida y no de todo el historico.
+    """
+
+    def __init__(self, directory: str | Path, max_open: int = 32, details: DetailStore | None = None) -> None:
+        self.directory = Path(directory)
+        self.max_open = max_open
+        self.details = details
+        self._open: OrderedDict[str, tuple[ColumnarTable, SearchIndex | None]] = OrderedDict()
+        self.loads = 0
+        self._read_manifest()
+
+    @classmethod
+    def open(cls, base_path: str | Path, max_open: int = 32, details: DetailStore | None = None) -> PartitionedDataset | None:
+        directory = Path(base_path) / PARTITIONS_DIR
+        if not (directory / MANIFEST_FILE).exists():
+            return None
+        return cls(directory, max_open, details)
+
+    def _manifest_version(self) -> str:
+        stat = (self.directory / MANIFEST_FILE).stat()
+        return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+    def _read_manifest(self) -> None:
+        path = self.directory / MANIFEST_FILE
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+        self.version = self._manifest_version()
+        self.time_field: str = manifest.get('time_field', 'fecha_hora')
+        self.columns = [TableColumn.model_validate(column) for column in manifest.get('columns', [])]
+        self.partitions = sorted(
+            (Partition(item['day'], item['file'], int(item.get('rows', 0)), _day_start(item['day'])) for item in manifest.get('partitions', [])),
+            key=lambda partition: partition.start,
+        )
+
+    def reload(self) -> dict[str, int] | None:
+        """Relee el manifest si otro proceso lo ha reescrito (p. ej. un append desde la CLI).
+
+        Devuelve las filas que tenia antes cada particion que ha cambiado (0 si es nueva, -1 si ya no esta) o
+        None si el manifest no ha cambiado. Las particiones cambiadas se vuelven a leer al usarlas.
+        """
+        if self._manifest_version() == self.version:
+            return None
+        previous = {partition.day: partition.rows for partition in self.partitions}
+        self._read_manifest()
+        current = {partition.day: partition.rows for partition in self.partitions}
+        changed = {day: rows for day, rows in previous.items() if current.get(day) != rows}
+        changed.update({day: 0 for day in current if day not in previous})
+        for day in changed:
+            self._open.pop(day, None)
+        return {day: rows if day in current else -1 for day, rows in changed.items()}
+
+    def overlapping(self, time_range: TimeRange | None) -> list[Partition]:
+        if time_range is None:
+            return list(self.partitions)
+        return [partition for partition in self.partitions if time_range.overlaps(partition.start, partition.end)]
+
+    def table(self, partition: Partition) -> ColumnarTable:
+        return self._load(partition)[0]
+
+    def search_index(self, partition: Partition) -> SearchIndex:
+        table, index = self._load(partition)
+        if index is None:
+            index = SearchIndex.from_table(table, self.details)
+            self._open[partition.day] = (table, index)
+        return index
+
+    def read_rows(self, partition: Partition, start: int = 0) -> list[dict]:
+        # El manifest manda: lineas de mas al final (un append a medias) no existen hasta que el manifest las cuenta.
+        return _read_rows(self.directory / partition.file, start, partition.rows)
+
+    def _load(self, partition: Partition) -> tuple[ColumnarTable, SearchIndex | None]:
+        loaded = self._open.get(partition.day)
+        if loaded is not None:
+            self._open.move_to_end(partition.day)
+            return loaded
+        rows = self.read_rows(partition)
+        columns = [column.model_dump(exclude_none=True) for column in self.columns]
+        # Una clave que solo aparece en otras particiones se lee aqui como null en vez de ser una columna desconocida.
+        table = ColumnarTable.from_payload({'table': {'columns': columns, 'rows': rows}}, f'{self.version}:{partition.day}', missing_as_null=True)
+        self.loads += 1
+        self._open[partition.day] = (table, None)
+        while len(self._open) > self.max_open:
+            self._open.popitem(last=False)
+        return table, None
+
+    def selection(self, partition: Partition, req: QueryRequest, time_range: TimeRange | None) -> tuple[ColumnarTable, Sequence[int] | None]:
+        table = self.table(partition)
+        # Solo las particiones de los bordes de la ventana necesitan filtrar por hora.
+        window = None if time_range is None or time_range.covers(partition.start, partition.end) else (self.time_field, time_range)
+        return table, table.matching(req, self.search_index(partition) if req.search else None, window)
+
+    def selections(self, req: QueryRequest, time_range: TimeRange | None) -> list[tuple[ColumnarTable, Sequence[int] | None]]:
+        parts = [self.selection(partition, req, time_range) for partition in self.overlapping(time_range) if partition.rows]
+        # Una clave que no esta en el manifest ni en ninguna particion de la ventana si es un error del cliente.
+        known = {column.key for column in self.columns}.union(*(table.data for table, _selection in parts))
+        for key in [*(req.filters or {}), *(item.field for item in req.sort or [])]:
+            if key not in known:
+                raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Unknown column: {key}', 400)
+        return parts
+
+    def query_page(
+        self, req: QueryRequest, time_range: TimeRange | None, default_limit: int, max_limit: int
+    ) -> tuple[list[tuple[ColumnarTable, int]], int, str | None]:
+        offset = decode_cursor(req.cursor)
+        parts = self.selections(req, time_range)
+        total = sum(table.row_count if selection is None else len(selection) for table, selection in parts)
+        limit = page_limit(req, default_limit, max_limit, total)
+        next_cursor = encode_cursor(offset + limit) if offset + limit < total else None
+        return self._page(parts, req.sort, offset, limit), total, next_cursor
+
+    def query(self, req: QueryRequest, time_range: TimeRange | None, default_limit: int, max_limit: int) -> DashboardResponse:
+        page, total, next_cursor = self.query_page(req, time_range, default_limit, max_limit)
+        fields = projected_fields(req)
+        rows = [table.row(row, fields) for table, row in page]
+        columns = project_columns(self.columns, fields)
+        return DashboardResponse(table=TablePayload(columns=columns, rows=rows, nextCursor=next_cursor, total=total))
+
+    def _page(
+        self, parts: list[tuple[ColumnarTable, Sequence[int] | None]], sort: list[SortItem] | None, offset: int, limit: int
+    ) -> list[tuple[ColumnarTable, int]]:
+        if not sort:
+            # Sin orden explicito: particiones en orden cronologico y, dentro de cada una, el orden del fichero.
+            page: list[tuple[ColumnarTable, int]] = []
+            skip = offset
+            for table, selection in parts:
+                count = table.row_count if selection is None else len(selection)
+                if skip >= count:
+                    skip -= count
+                    continue
+                page.extend((table, row) for row in table.ordered_page(selection, None, skip, limit - len(page)))
+                skip = 0
+                if len(page) >= limit:
+                    break
+            return page
+        # Cada particion aporta su propia pagina ordenada y se mezclan por valor (k-way merge).
+        descending = [item.direction == 'desc' for item in sort]
+        streams = [
+            [(_MergeKey(tuple(table.sort_value(item.field, row) for item in sort), descending), table, row) for row in table.ordered_page(selection, sort, 0, offset + limit)]
+            for table, selection in parts
+        ]
+        merged = heapq.merge(*streams, key=lambda item: item[0])
+        return [(table, row) for _key, table, row in islice(merged, offset, offset + limit)]
+
+    def append(self, rows: list[dict]) -> dict[str, int]:
+        """Anade filas al final de la particion de su dia (o crea la particion) y reescribe el manifest."""
+        by_day = split_by_day(rows, self.time_field)
+        manifest_path = self.directory / MANIFEST_FILE
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        entries = {item['day']: item for item in manifest.get('partitions', [])}
+        for day, day_rows in by_day.items():
+            entry = entries.get(day)
+            if entry is None:
+                entry = entries[day] = {'day': day, 'file': f'{day}.jsonl', 'rows': 0}
+            path = self.directory / entry['file']
+            path.touch(exist_ok=True)
+            with open(path, 'r+b') as handle:
+                # Se recorta lo que haya tras la ultima fila contada (un append anterior que no llego al manifest).
+                for _row in range(entry['rows']):
+                    handle.readline()
+                handle.truncate()
+                handle.write(_jsonl(day_rows).encode('utf-8'))
+            entry['rows'] += len(day_rows)
+            self._open.pop(day, None)
+        manifest['partitions'] = [entries[day] for day in sorted(entries)]
+        # Las filas ya estan en disco; el manifest las publica de una vez.
+        write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+        self._read_manifest()
+        return {day: len(day_rows) for day, day_rows in by_day.items()}
+
+    def expire(self, retention_days: int, now: float) -> list[str]:
+        """Borra las particiones que quedan enteras fuera de la retencion y reescribe el manifest."""
+        cutoff = now - retention_days * DAY_S
+        expired = [partition for partition in self.partitions if partition.end <= cutoff]
+        if not expired:
+            return []
+        manifest_path = self.directory / MANIFEST_FILE
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        expired_days = {partition.day for partition in expired}
+        manifest['partitions'] = [item for item in manifest.get('partitions', []) if item['day'] not in expired_days]
+        # Primero el manifest: si el proceso cae a mitad, quedan ficheros huerfanos pero nunca un manifest que apunte a nada.
+        write_atomic(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2))
+        for partition in expired:
+            self._open.pop(partition.day, None)
+            (self.directory / partition.file).unlink(missing_ok=True)
+        self._read_manifest()
+        return sorted(expired_days)
+
+    def nbytes(self) -> int:
+        return sum(table.stats()['bytes'] for table, _index in self._open.values())
+
+    def stats(self) -> dict:
+        return {
+            'partitions': len(self.partitions),
+            'rows': sum(partition.rows for partition in self.partitions),
+            'open': len(self._open),
+            'loads': self.loads,
+        }
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Particiona por dia el dashboard.json de un caso de uso nativo.')
+    parser.add_argument('data_dir', help='Directorio del caso de uso (contiene dashboard.json).')
+    parser.add_argument('--time-field', default='fecha_hora')
+    parser.add_argument('--append', metavar='FICHERO', help='JSON con filas (lista o dashboard.json) a anadir a las particiones existentes.')
+    args = parser.parse_args(argv)
+    if args.append:
+        dataset = PartitionedDataset.open(args.data_dir)
+        if dataset is None:
+            parser.error(f'no partitioned dataset in {args.data_dir}')
+        payload = json.loads(Path(args.append).read_text(encoding='utf-8'))
+        appended = dataset.append(payload['table']['rows'] if isinstance(payload, dict) else payload)
+        print(f'{sum(appended.values())} rows appended to {len(appended)} partitions in {dataset.directory}')
+        return
+    source = Path(args.data_dir) / 'dashboard.json'
+    written = write_partitions(args.data_dir, json.loads(source.read_text(encoding='utf-8')), args.time_field)
+    print(f'{written} partitions written to {Path(args.data_dir) / PARTITIONS_DIR}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from orchestrator.api.schemas import QueryRequest, TableColumn, ViewComponent
+
+# `TableRow` los exige y el frontend los usa para abrir el detalle: siempre viajan.
+REQUIRED_FIELDS = ('id', 'detail')
+
+
+def component_fields(component: ViewComponent) -> list[str] | None:
+    """Columnas que pinta un componente `table` segun su `config`, o None si las muestra todas."""
+    config = component.config or {}
+    visible = config.get('visible_columns')
+    if not isinstance(visible, list):
+        return None
+    required = config.get('required_columns')
+    return list(dict.fromkeys([*(required if isinstance(required, list) else []), *visible]))
+
+
+def projected_fields(req: QueryRequest) -> list[str] | None:
+    """Campos que hay que materializar: los pedidos, los obligatorios y los de orden (el cliente reordena al aplicar deltas)."""
+    if req.fields is None:
+        return None
+    return list(dict.fromkeys([*REQUIRED_FIELDS, *req.fields, *(item.field for item in req.sort or [])]))
+
+
+def project_columns(columns: list[TableColumn], fields: Sequence[str] | None) -> list[TableColumn]:
+    if fields is None:
+        return columns
+    wanted = set(fields)
+    return [column for column in columns if column.key in wanted]
+
+
+def project_payload(payload: Any, fields: Sequence[str] | None) -> Any:
+    """Recorta una respuesta cruda de /dashboard antes de validarla: los campos no pedidos nunca pasan por pydantic."""
+    if fields is None or not isinstance(payload, dict) or not isinstance(payload.get('table'), dict):
+        return payload
+    wanted = set(fields)
+
+    def rows(items: Any) -> Any:
+        if not isinstance(items, list):
+            return items
+        return [{key: value for key, value in row.items() if key in wanted} if isinstance(row, dict) else row for row in items]
+
+    table = payload['table']
+    projected = {**payload, 'table': {**table, 'rows': rows(table.get('rows'))}}
+    if isinstance(table.get('columns'), list):
+        projected['table']['columns'] = [column for column in table['columns'] if not isinstance(column, dict) or column.get('key') in wanted]
+    delta = payload.get('delta')
+    if isinstance(delta, dict):
+        projected['delta'] = {**delta, 'inserted': rows(delta.get('inserted')), 'updated': rows(delta.get('updated'))}
+    return projected
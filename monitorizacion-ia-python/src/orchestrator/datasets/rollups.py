@@ -0,0 +1,455 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from orchestrator.api.schemas import CardItem, CardsResponse
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.columnar import TIME_FORMATS, hashable
+from orchestrator.datasets.partitions import PartitionedDataset, write_atomic
+
+if TYPE_CHECKING:
+    from orchestrator.core.time_range import TimeRange
+
+ROLLUPS_FILE = 'rollups.json'
+SNAPSHOT_FILE = 'rollups_snapshot.json'
+ROLLUP_BUCKET_SECONDS = {'minute': 60, 'hour': 3600, 'day': 86400}
+DAY_S = 86400
+# Valores de duracion como los de la tabla demo: `1 min 22 s`, `2 h 5 min`, `39 s`.
+_DURATION_PART = re.compile(r'(\d+(?:[.,]\d+)?)\s*(h|min|m|s)\b')
+_DURATION_UNITS_S = {'h': 3600, 'min': 60, 'm': 60, 's': 1}
+
+
+class QuantileSketch:
+    """Sketch de cuantiles con error relativo acotado (estilo DDSketch): cubos logaritmicos que se suman al mezclar.
+
+    Mezclar dos sketches es exacto (se suman los recuentos por cubo), asi que el percentil de una ventana sale
+    de juntar los sketches de sus buckets sin volver a ver las filas.
+    """
+
+    __slots__ = ('relative_accuracy', '_log_gamma', 'zero', 'positive', 'negative')
+
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self.zero = 0
+        self.positive: Counter[int] = Counter()
+        self.negative: Counter[int] = Counter()
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.positive.values()) + sum(self.negative.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if abs(value) < self.MIN_VALUE:
+            self.zero += count
+        elif value > 0:
+            self.positive[math.ceil(math.log(value) / self._log_gamma)] += count
+        else:
+            self.negative[math.ceil(math.log(-value) / self._log_gamma)] += count
+
+    def merge(self, other: QuantileSketch) -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('cannot merge sketches with different relative accuracy')
+        self.zero += other.zero
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+
+    def _value(self, index: int) -> float:
+        # Punto medio (en escala relativa) del cubo `(gamma^(i-1), gamma^i]`.
+        gamma = math.exp(self._log_gamma)
+        return 2 * gamma**index / (gamma + 1)
+
+    def quantile(self, q: float) -> float | None:
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive))
+
+    def to_dict(self) -> dict:
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero': self.zero,
+            'positive': {str(index): count for index, count in self.positive.items()},
+            'negative': {str(index): count for index, count in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> QuantileSketch:
+        sketch = cls(data['relative_accuracy'])
+        sketch.zero = data.get('zero', 0)
+        sketch.positive = Counter({int(index): count for index, count in data.get('positive', {}).items()})
+        sketch.negative = Counter({int(index): count for index, count in data.get('negative', {}).items()})
+        return sketch
+
+
+class Measure:
+    """count/sum/min/max y sketch de cuantiles de un campo numerico dentro de un bucket."""
+
+    __slots__ = ('count', 'sum', 'min', 'max', 'sketch')
+
+    def __init__(self, relative_accuracy: float) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sketch.add(value)
+
+    def merge(self, other: Measure) -> None:
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'sum': self.sum, 'min': self.min, 'max': self.max, 'sketch': self.sketch.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Measure:
+        sketch = QuantileSketch.from_dict(data['sketch'])
+        measure = cls(sketch.relative_accuracy)
+        measure.count, measure.sum, measure.min, measure.max, measure.sketch = data['count'], data['sum'], data['min'], data['max'], sketch
+        return measure
+
+
+class Bucket:
+    """Agregados de las filas de un intervalo: recuento, recuento por valor de cada dimension y medidas numericas."""
+
+    __slots__ = ('count', 'dimensions', 'measures')
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.dimensions: dict[str, Counter] = {}
+        self.measures: dict[str, Measure] = {}
+
+    def merge(self, other: Bucket) -> None:
+        self.count += other.count
+        for field, counts in other.dimensions.items():
+            self.dimensions.setdefault(field, Counter()).update(counts)
+        for field, measure in other.measures.items():
+            current = self.measures.get(field)
+            if current is None:
+                current = self.measures[field] = Measure(measure.sketch.relative_accuracy)
+            current.merge(measure)
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'dimensions': {field: [[value, count] for value, count in counts.items()] for field, counts in self.dimensions.items()},
+            'measures': {field: measure.to_dict() for field, measure in self.measures.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> Bucket:
+        bucket = cls()
+        bucket.count = data['count']
+        bucket.dimensions = {field: Counter({hashable(value): count for value, count in pairs}) for field, pairs in data['dimensions'].items()}
+        bucket.measures = {field: Measure.from_dict(measure) for field, measure in data['measures'].items()}
+        return bucket
+
+
+class CardSpec(BaseModel):
+    """Tarjeta calculada: la presentacion de `CardItem` mas la metrica que se saca de los rollups."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    title: str
+    subtitle: str | None = None
+    format: Literal['seconds', 'percent', 'currencyEUR', 'int', 'float'] | None = None
+    unit: str | None = None
+    variant: Literal['neutral', 'positive', 'warning', 'danger'] | None = None
+    metric: Literal['count', 'sum', 'avg', 'min', 'max', 'percentile', 'ratio']
+    field: str | None = None
+    # Para `count` y `ratio` sobre una dimension: valor (o valores) que cuentan.
+    value: Any = None
+    percentile: float = Field(default=95.0, gt=0, le=100)
+
+
+class RollupConfig(BaseModel):
+    """`rollups.json` de un caso de uso: granularidad de los buckets y tarjetas que se sirven desde ellos."""
+
+    model_config = ConfigDict(extra='forbid')
+
+    time_field: str = 'fecha_hora'
+    bucket: Literal['minute', 'hour', 'day'] = 'hour'
+    relative_accuracy: float = Field(default=0.01, gt=0, lt=1)
+    cards: list[CardSpec] = Field(min_length=1)
+
+    @property
+    def dimensions(self) -> list[str]:
+        return sorted({card.field for card in self.cards if card.metric in ('count', 'ratio') and card.field})
+
+    @property
+    def measures(self) -> list[str]:
+        return sorted({card.field for card in self.cards if card.metric not in ('count', 'ratio') and card.field})
+
+    def key(self) -> str:
+        # Cambiar titulos o formatos no invalida los rollups guardados; cambiar lo que se agrega si.
+        shape = [self.time_field, self.bucket, self.relative_accuracy, self.dimensions, self.measures]
+        return hashlib.sha1(json.dumps(shape).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load(cls, path: Path) -> RollupConfig | None:
+        if not path.exists():
+            return None
+        try:
+            config = cls.model_validate_json(path.read_text(encoding='utf-8'))
+        except ValidationError as error:
+            raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'Invalid rollup config: {path}', 500) from error
+        for card in config.cards:
+            if card.metric != 'count' and not card.field:
+                raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'card {card.title} with metric {card.metric} requires field', 500)
+        return config
+
+
+def parse_measure(value: Any) -> float | None:
+    """Numero de una celda: numeros tal cual, textos numericos y duraciones (`1 min 22 s` -> 82.0)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+    if not isinstance(value, str):
+        return None
+    text = value.strip().lower()
+    try:
+        return float(text.replace(',', '.'))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(text)
+    if not parts or _DURATION_PART.sub('', text).strip():
+        return None
+    return sum(float(amount.replace(',', '.')) * _DURATION_UNITS_S[unit] for amount, unit in parts)
+
+
+class Rollup:
+    """Buckets temporales con agregados incrementales de un caso de uso.
+
+    Las filas nuevas se suman a su bucket (`add_rows`) sin recalcular el resto, y cualquier ventana se
+    responde mezclando los buckets que solapan con ella: el coste de `/cards` depende del numero de buckets,
+    no de filas. Una ventana que corta un bucket lo incluye entero (la resolucion es la del bucket).
+    """
+
+    def __init__(self, config: RollupConfig) -> None:
+        self.config = config
+        self.size = ROLLUP_BUCKET_SECONDS[config.bucket]
+        self.buckets: dict[float, Bucket] = {}
+        self._keys: list[float] = []
+        # Filas ya agregadas de cada particion (dia): lo que haya despues en el fichero es nuevo.
+        self.watermarks: dict[str, int] = {}
+        self.skipped = 0
+        self._time_format: str | None = None
+        # Mezcla ya hecha de los buckets de cada dia: las ventanas largas suman dias enteros y solo los bordes por bucket.
+        self._days: dict[float, Bucket] = {}
+
+    def _epoch(self, value: Any) -> float | None:
+        if not isinstance(value, str):
+            return None
+        formats = (self._time_format, *TIME_FORMATS) if self._time_format else TIME_FORMATS
+        for time_format in formats:
+            try:
+                moment = datetime.strptime(value, time_format)
+            except ValueError:
+                continue
+            self._time_format = time_format
+            return moment.replace(tzinfo=timezone.utc).timestamp()
+        return None
+
+    def _bucket(self, key: float) -> Bucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = Bucket()
+            insort(self._keys, key)
+        return bucket
+
+    def add_rows(self, rows: Iterable[dict]) -> int:
+        dimensions = self.config.dimensions
+        measures = self.config.measures
+        accuracy = self.config.relative_accuracy
+        added = 0
+        for row in rows:
+            epoch = self._epoch(row.get(self.config.time_field))
+            if epoch is None:
+                self.skipped += 1
+                continue
+            bucket = self._bucket((epoch // self.size) * self.size)
+            self._days.pop((epoch // DAY_S) * DAY_S, None)
+            bucket.count += 1
+            for field in dimensions:
+                bucket.dimensions.setdefault(field, Counter())[hashable(row.get(field))] += 1
+            for field in measures:
+                number = parse_measure(row.get(field))
+                if number is not None:
+                    measure = bucket.measures.get(field)
+                    if measure is None:
+                        measure = bucket.measures[field] = Measure(accuracy)
+                    measure.add(number)
+            added += 1
+        return added
+
+    def drop(self, start: float, end: float) -> None:
+        """Quita los buckets de `[start, end)` (p. ej. una particion caducada)."""
+        low, high = bisect_left(self._keys, start), bisect_left(self._keys, end)
+        for key in self._keys[low:high]:
+            del self.buckets[key]
+            self._days.pop((key // DAY_S) * DAY_S, None)
+        del self._keys[low:high]
+
+    def window(self, time_range: TimeRange | None) -> Bucket:
+        low, high = 0, len(self._keys)
+        if time_range is not None:
+            if time_range.start is not None:
+                low = bisect_right(self._keys, time_range.start - self.size)
+            if time_range.end is not None:
+                high = bisect_left(self._keys, time_range.end)
+        merged = Bucket()
+        keys = self._keys
+        index = low
+        while index < high:
+            day = (keys[index] // DAY_S) * DAY_S
+            day_low, day_high = bisect_left(keys, day, 0, index + 1), bisect_left(keys, day + DAY_S, index)
+            if self.size < DAY_S and day_low >= low and day_high <= high:
+                merged.merge(self._day(day, day_low, day_high))
+                index = day_high
+            else:
+                merged.merge(self.buckets[keys[index]])
+                index += 1
+        return merged
+
+    def _day(self, day: float, low: int, high: int) -> Bucket:
+        cached = self._days.get(day)
+        if cached is None:
+            cached = self._days[day] = Bucket()
+            for key in self._keys[low:high]:
+                cached.merge(self.buckets[key])
+        return cached
+
+    def cards(self, time_range: TimeRange | None = None) -> CardsResponse:
+        merged = self.window(time_range)
+        cards = []
+        for card in self.config.cards:
+            presentation = card.model_dump(include={'title', 'subtitle', 'format', 'unit', 'variant'}, exclude_none=True)
+            cards.append(CardItem(**presentation, value=_card_value(card, merged)))
+        return CardsResponse(cards=cards)
+
+    def sync(self, dataset: PartitionedDataset) -> bool:
+        """Agrega solo las filas de cada particion que aun no estaban y olvida las particiones que ya no existen."""
+        days = {partition.day: partition for partition in dataset.partitions}
+        changed = False
+        for day in [day for day in self.watermarks if day not in days]:
+            self._drop_day(day)
+            changed = True
+        for partition in dataset.partitions:
+            seen = self.watermarks.get(partition.day, 0)
+            if partition.rows < seen:
+                # Particion reescrita con menos filas: sus buckets se rehacen (un bucket nunca cruza de dia).
+                self._drop_day(partition.day)
+                seen = 0
+                changed = True
+            if partition.rows > seen:
+                self.add_rows(dataset.read_rows(partition, seen))
+                self.watermarks[partition.day] = partition.rows
+                changed = True
+        return changed
+
+    def _drop_day(self, day: str) -> None:
+        start = datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+        self.drop(start, start + 86400)
+        self.watermarks.pop(day, None)
+
+    def stats(self) -> dict:
+        return {'buckets': len(self._keys), 'rows': sum(bucket.count for bucket in self.buckets.values()), 'skipped': self.skipped}
+
+    def to_dict(self) -> dict:
+        return {
+            'config': self.config.key(),
+            'watermarks': self.watermarks,
+            'buckets': [[key, self.buckets[key].to_dict()] for key in self._keys],
+        }
+
+    @classmethod
+    def from_dict(cls, config: RollupConfig, data: dict) -> Rollup | None:
+        if data.get('config') != config.key():
+            return None
+        rollup = cls(config)
+        rollup.watermarks = dict(data.get('watermarks', {}))
+        for key, bucket in data.get('buckets', []):
+            rollup.buckets[key] = Bucket.from_dict(bucket)
+            rollup._keys.append(key)
+        rollup._keys.sort()
+        return rollup
+
+
+def _matches(card: CardSpec, counts: Counter) -> int:
+    wanted = card.value if isinstance(card.value, list) else [card.value]
+    return sum(counts.get(hashable(value), 0) for value in wanted)
+
+
+def _card_value(card: CardSpec, bucket: Bucket) -> int | float:
+    if card.metric == 'count':
+        return bucket.count if card.field is None else _matches(card, bucket.dimensions.get(card.field, Counter()))
+    if card.metric == 'ratio':
+        if not bucket.count:
+            return 0.0
+        return round(_matches(card, bucket.dimensions.get(card.field, Counter())) / bucket.count, 4)
+    measure = bucket.measures.get(card.field)
+    # Sin filas en la ventana la tarjeta se sirve a cero: `CardItem.value` es obligatorio.
+    if measure is None or not measure.count:
+        return 0
+    if card.metric == 'sum':
+        value = measure.sum
+    elif card.metric == 'avg':
+        value = measure.sum / measure.count
+    elif card.metric == 'min':
+        value = measure.min
+    elif card.metric == 'max':
+        value = measure.max
+    else:
+        value = measure.sketch.quantile(card.percentile / 100)
+    return round(value, 4)
+
+
+def load_snapshot(path: Path, config: RollupConfig) -> Rollup | None:
+    if not path.exists():
+        return None
+    try:
+        return Rollup.from_dict(config, json.loads(path.read_text(encoding='utf-8')))
+    except (ValueError, KeyError, TypeError):
+        # Un snapshot roto o de otra version se descarta y se reconstruye desde las particiones.
+        return None
+
+
+def save_snapshot(path: Path, rollup: Rollup) -> None:
+    write_atomic(path, json.dumps(rollup.to_dict(), separators=(',', ':')))
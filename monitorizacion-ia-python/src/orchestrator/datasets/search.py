@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import re
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from orchestrator.datasets.columnar import ColumnarTable
+    from orchestrator.datasets.details import DetailStore
+
+SPANISH_STOPWORDS = frozenset(
+    {
+        'a', 'al', 'como', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los', 'me', 'mi', 'no',
+        'o', 'para', 'por', 'que', 'se', 'si', 'su', 'sus', 'te', 'tu', 'un', 'una', 'unos', 'unas', 'y', 'ya',
+    }
+)
+# Se compacta cuando los documentos borrados superan esta fraccion del indice.
+COMPACT_RATIO = 0.25
+# Solo se cachean textos cortos (terminos de consulta, valores de columnas): los mensajes no se quedan en memoria.
+TOKENIZE_CACHE_MAX_CHARS = 64
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def _words(text: str) -> list[str]:
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _TOKEN.findall(folded)
+
+
+def _tokenize(text: str) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(token for token in _words(text) if token not in SPANISH_STOPWORDS))
+
+
+_tokenize_short = lru_cache(maxsize=65536)(_tokenize)
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """Tokens en minusculas y sin tildes (`Resolución` -> `resolucion`, `ñ` -> `n`), sin stopwords ni repetidos."""
+    if len(text) <= TOKENIZE_CACHE_MAX_CHARS:
+        return _tokenize_short(text)
+    return _tokenize(text)
+
+
+class SearchIndex:
+    """Indice invertido token -> documentos, con un documento por fila (`id`) de la tabla.
+
+    Cada termino de la consulta se busca como prefijo sobre el vocabulario ordenado y los terminos se
+    combinan con AND. Las actualizaciones incrementales marcan documentos como borrados y anaden otros nuevos;
+    `compact` renumera cuando los borrados pesan demasiado.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, array] = {}
+        self._doc_ids: list[str | None] = []
+        self._doc_of: dict[str, int] = {}
+        self._deleted = 0
+        self._vocabulary: list[str] | None = None
+        # Mientras el indice no cambie, el documento N es la fila N de la tabla de la que salio.
+        self._aligned_with: ColumnarTable | None = None
+
+    @classmethod
+    def from_table(cls, table: ColumnarTable, details: DetailStore | None = None) -> SearchIndex:
+        from orchestrator.datasets.columnar import DictColumn
+
+        index = cls()
+        id_column = table.column('id')
+        index._doc_ids = [id_column.value(row) for row in range(table.row_count)]
+        index._doc_of = {row_id: doc for doc, row_id in enumerate(index._doc_ids)}
+        postings: dict[str, array] = {}
+        for column in table.columns:
+            data = table.data.get(column.key)
+            if not column.filterable or data is None:
+                continue
+            if isinstance(data, DictColumn):
+                # Un valor repetido se tokeniza una sola vez y aporta de golpe todas sus filas.
+                for code, rows in enumerate(data.postings()):
+                    value = data.values[code]
+                    for token in tokenize(str(value)) if value is not None else ():
+                        postings.setdefault(token, array('I')).extend(rows)
+                continue
+            for row in range(table.row_count):
+                value = data.value(row)
+                for token in tokenize(str(value)) if value is not None else ():
+                    postings.setdefault(token, array('I')).append(row)
+        index._postings = {token: array('I', sorted(set(docs))) for token, docs in postings.items()}
+        index._aligned_with = table
+        if details is not None:
+            # El fichero de detalle puede cubrir mas filas que esta tabla (p. ej. una particion de un dia): solo se leen las suyas.
+            for row_id, texts in details.iter_messages(index._doc_ids):
+                index.add(row_id, texts)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def add(self, row_id: str, texts: Iterable[str]) -> None:
+        doc = self._doc_of.get(row_id)
+        if doc is None:
+            self._aligned_with = None
+            doc = self._doc_of[row_id] = len(self._doc_ids)
+            self._doc_ids.append(row_id)
+        tokens: set[str] = set()
+        for text in texts:
+            if text:
+                tokens.update(tokenize(str(text)))
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('I')
+                self._vocabulary = None
+            postings.append(doc)
+
+    def remove(self, row_id: str) -> None:
+        doc = self._doc_of.pop(row_id, None)
+        if doc is not None:
+            self._aligned_with = None
+            self._doc_ids[doc] = None
+            self._deleted += 1
+
+    def apply(self, upserts: dict[str, list[str]], deletes: Iterable[str] = ()) -> None:
+        """Aplica el cambio entre dos versiones del dataset sin reconstruir el indice."""
+        for row_id in deletes:
+            self.remove(row_id)
+        for row_id, texts in upserts.items():
+            self.remove(row_id)
+            self.add(row_id, texts)
+        if self._deleted > len(self._doc_ids) * COMPACT_RATIO:
+            self.compact()
+
+    def compact(self) -> None:
+        remap = array('I', bytes(4 * len(self._doc_ids)))
+        doc_ids: list[str | None] = []
+        for doc, row_id in enumerate(self._doc_ids):
+            if row_id is not None:
+                remap[doc] = len(doc_ids)
+                doc_ids.append(row_id)
+        postings = {}
+        for token, docs in self._postings.items():
+            alive = sorted({remap[doc] for doc in docs if self._doc_ids[doc] is not None})
+            if alive:
+                postings[token] = array('I', alive)
+        self._postings = postings
+        self._doc_ids = doc_ids
+        self._doc_of = {row_id: doc for doc, row_id in enumerate(doc_ids)}
+        self._deleted = 0
+        self._vocabulary = None
+
+    def search(self, query: str) -> set[str] | None:
+        """Ids de fila que contienen todos los terminos (como prefijo); None si la consulta no tiene palabras.
+
+        Una consulta solo de stopwords no encaja con nada: las stopwords no se indexan.
+        """
+        matched = self._match(query)
+        if matched is None:
+            return None
+        return {row_id for row_id in (self._doc_ids[doc] for doc in matched) if row_id is not None}
+
+    def rows(self, query: str, table: ColumnarTable) -> array | None:
+        """Posiciones (ordenadas) de `table` que encajan con la consulta."""
+        if self._aligned_with is not table:
+            matched = self.search(query)
+            return None if matched is None else table.positions(matched)
+        matched = self._match(query)
+        return None if matched is None else array('I', sorted(matched))
+
+    def _match(self, query: str) -> set[int] | None:
+        terms = tokenize(query)
+        if not terms:
+            return set() if _words(query) else None
+        matched: set[int] | None = None
+        # Primero los terminos mas largos: suelen ser los mas selectivos y acotan antes la interseccion.
+        for term in sorted(terms, key=len, reverse=True):
+            docs = self._prefix_docs(term)
+            matched = docs if matched is None else matched & docs
+            if not matched:
+                return set()
+        return matched
+
+    def _prefix_docs(self, term: str) -> set[int]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        docs: set[int] = set()
+        position = bisect_left(vocabulary, term)
+        while position < len(vocabulary) and vocabulary[position].startswith(term):
+            docs.update(self._postings[vocabulary[position]])
+            position += 1
+        return docs
+
+    def stats(self) -> dict:
+        postings_bytes = sum(docs.itemsize * len(docs) + sys.getsizeof(token) for token, docs in self._postings.items())
+        return {
+            'documents': len(self._doc_of),
+            'deleted': self._deleted,
+            'tokens': len(self._postings),
+            'bytes': postings_bytes + sys.getsizeof(self._postings) + sys.getsizeof(self._doc_of) + sys.getsizeof(self._doc_ids),
+        }
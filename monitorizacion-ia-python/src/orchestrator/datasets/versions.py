@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import shutil
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.partitions import write_atomic
+
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+# Un fichero por proceso (`<pid>`) con las versiones que tiene abiertas: `prune_versions` no las borra.
+LEASES_DIR = '.leases'
+
+
+def current_version(base_path: str | Path) -> str | None:
+    """Version publicada en `<base>/CURRENT`, o None si el caso de uso no usa directorios versionados."""
+    try:
+        version = (Path(base_path) / CURRENT_FILE).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def version_path(base_path: str | Path, version: str | None) -> Path:
+    if version is None:
+        return Path(base_path)
+    path = Path(base_path) / VERSIONS_DIR / version
+    if not path.is_dir():
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'dataset version not found: {path}', 500)
+    return path
+
+
+def publish_version(base_path: str | Path, source_dir: str | Path, version: str | None = None) -> str:
+    """Copia `source_dir` como version nueva y la publica cambiando `CURRENT` de una vez.
+
+    Los lectores nunca ven una version a medias: la copia se hace en un directorio temporal que se renombra
+    entero, y `CURRENT` se sustituye con `os.replace` solo cuando la version ya esta completa.
+    """
+    base = Path(base_path)
+    version = version or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+    versions = base / VERSIONS_DIR
+    target = versions / version
+    if target.exists():
+        raise OrchestratorError(ErrorCode.VALIDATION_ERROR, f'dataset version already exists: {target}', 400)
+    versions.mkdir(parents=True, exist_ok=True)
+    staging = versions / f'.{version}.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.copytree(source_dir, staging)
+    os.rename(staging, target)
+    # `copytree` copia el mtime del origen: se marca la hora de publicacion, que es el orden que usa `prune_versions`.
+    os.utime(target)
+    write_atomic(base / CURRENT_FILE, version + '\n')
+    return version
+
+
+def hold_versions(base_path: str | Path, versions: Iterable[str], pid: int | None = None) -> None:
+    """Anuncia las versiones que este proceso tiene abiertas (la vigente y las retiradas que aun se leen)."""
+    leases = Path(base_path) / VERSIONS_DIR / LEASES_DIR
+    path = leases / str(os.getpid() if pid is None else pid)
+    held = sorted(set(versions))
+    if not held:
+        path.unlink(missing_ok=True)
+        return
+    leases.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, ''.join(f'{version}\n' for version in held))
+
+
+def held_versions(base_path: str | Path) -> set[str]:
+    """Versiones que tiene abiertas algun proceso vivo; las leases de procesos muertos se borran."""
+    leases = Path(base_path) / VERSIONS_DIR / LEASES_DIR
+    held: set[str] = set()
+    if not leases.is_dir():
+        return held
+    for path in leases.iterdir():
+        if not path.name.isdigit() or not _alive(int(path.name)):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            held.update(line.strip() for line in path.read_text(encoding='utf-8').splitlines() if line.strip())
+        except FileNotFoundError:
+            continue
+    return held
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def prune_versions(base_path: str | Path, keep: int = 2) -> list[str]:
+    """Borra las versiones antiguas dejando las `keep` publicadas mas recientes.
+
+    Nunca se borran la publicada ni las que algun worker tiene abiertas (ver `hold_versions`): dos publicaciones
+    seguidas no dejan a un worker que aun no ha cambiado sin la version que esta sirviendo.
+    """
+    versions = Path(base_path) / VERSIONS_DIR
+    if not versions.is_dir():
+        return []
+    protected = held_versions(base_path) | {current_version(base_path)}
+    paths = sorted(
+        (path for path in versions.iterdir() if path.is_dir() and not path.name.startswith('.')),
+        key=lambda path: (path.stat().st_mtime_ns, path.name),
+    )
+    removed = [path.name for path in paths[: max(len(paths) - keep, 0)] if path.name not in protected]
+    for name in removed:
+        shutil.rmtree(versions / name)
+    return removed
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Publica una version nueva de los datos de un caso de uso nativo.')
+    parser.add_argument('data_dir', help='Directorio del caso de uso (donde viven CURRENT y versions/).')
+    parser.add_argument('source_dir', help='Directorio con los ficheros de la version nueva.')
+    parser.add_argument('--version', default=None)
+    parser.add_argument('--keep', type=int, default=2, help='Versiones que se conservan tras publicar.')
+    args = parser.parse_args(argv)
+    version = publish_version(args.data_dir, args.source_dir, args.version)
+    removed = prune_versions(args.data_dir, args.keep)
+    print(f'published {version}' + (f', pruned {", ".join(removed)}' if removed else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+from orchestrator.api.schemas import ColumnarDashboardResponse, ColumnarTablePayload, DashboardResponse, DictEncodedColumn, TableColumn, TablePayload
+from orchestrator.datasets.columnar import ColumnarTable, DictColumn, hashable
+from orchestrator.datasets.projection import project_columns
+
+COLUMNAR_FORMAT = 'columnar'
+COLUMNAR_MEDIA_TYPE = 'application/vnd.monitorizacion.columnar+json'
+# Con menos de esta proporcion de valores distintos sale mas corto mandar diccionario + codigos.
+DICT_MAX_DISTINCT_RATIO = 0.5
+
+
+def encode_values(values: list[Any]) -> DictEncodedColumn | list[Any]:
+    """Codifica una columna con diccionario si sus valores se repiten lo suficiente."""
+    if len(values) < 2:
+        return values
+    max_distinct = len(values) * DICT_MAX_DISTINCT_RATIO
+    index: dict[Any, int] = {}
+    distinct: list[Any] = []
+    codes: list[int] = []
+    for value in values:
+        # Los strings se indexan tal cual; el resto por tipo y valor, para que 1, True y '1' no se confundan.
+        key = value if isinstance(value, str) else (type(value), hashable(value))
+        code = index.get(key)
+        if code is None:
+            if len(distinct) >= max_distinct:
+                return values
+            code = index[key] = len(distinct)
+            distinct.append(value)
+        codes.append(code)
+    return DictEncodedColumn(values=distinct, codes=codes)
+
+
+def _encode_codes(column: DictColumn, rows: list[int]) -> DictEncodedColumn | list[Any] | None:
+    # El motor ya tiene la columna codificada: basta renumerar los codigos de la pagina, sin hashear valores.
+    local: dict[int, int] = {}
+    codes = [local.setdefault(column.codes[row], len(local)) for row in rows]
+    values = [column.values[code] for code in local]
+    if all(value is None for value in values):
+        return None
+    if len(rows) < 2 or len(values) > len(rows) * DICT_MAX_DISTINCT_RATIO:
+        return [values[code] for code in codes]
+    return DictEncodedColumn(values=values, codes=codes)
+
+
+def _keys(columns: list[TableColumn], row_keys: Sequence[str]) -> list[str]:
+    return list(dict.fromkeys([column.key for column in columns] + list(row_keys)))
+
+
+def columnar_page(
+    columns: list[TableColumn],
+    page: list[tuple[ColumnarTable, int]],
+    next_cursor: str | None,
+    total: int | None,
+    fields: Sequence[str] | None = None,
+) -> ColumnarTablePayload:
+    """Pagina del motor nativo leida columna a columna, sin materializar filas; con `fields` solo esas columnas."""
+    tables = list({id(table): table for table, _row in page}.values())
+    columns = project_columns(columns, fields)
+    keys = list(fields) if fields is not None else _keys(columns, [key for table in tables for key in table.data])
+    rows = [row for _table, row in page]
+    data: dict[str, Any] = {}
+    for key in keys:
+        column = tables[0].data.get(key) if len(tables) == 1 else None
+        if isinstance(column, DictColumn):
+            encoded = _encode_codes(column, rows)
+            if encoded is not None:
+                data[key] = encoded
+            continue
+        if column is not None:
+            values = [column.value(row) for row in rows]
+        else:
+            values = [table.data[key].value(row) if key in table.data else None for table, row in page]
+        if any(value is not None for value in values):
+            data[key] = encode_values(values)
+    return ColumnarTablePayload(columns=columns, rowCount=len(page), data=data, nextCursor=next_cursor, total=total)
+
+
+def encode_table(table: TablePayload) -> ColumnarTablePayload:
+    """Transcodifica una pagina de filas (p. ej. de un upstream remoto) al formato columnar."""
+    rows = [row.model_dump() for row in table.rows]
+    keys = _keys(table.columns, [key for row in rows for key in row])
+    data = {}
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        if any(value is not None for value in values):
+            data[key] = encode_values(values)
+    return ColumnarTablePayload(columns=table.columns, rowCount=len(rows), data=data, nextCursor=table.nextCursor, total=table.total)
+
+
+def encode_dashboard(response: DashboardResponse) -> ColumnarDashboardResponse:
+    return ColumnarDashboardResponse(table=encode_table(response.table), version=response.version, delta=response.delta)
+
+
+def decode_rows(table: ColumnarTablePayload) -> list[dict[str, Any]]:
+    """Filas equivalentes a un `ColumnarTablePayload` (los null se omiten, como en el formato por filas)."""
+    columns = {
+        key: [encoded.values[code] for code in encoded.codes] if isinstance(encoded, DictEncodedColumn) else encoded
+        for key, encoded in table.data.items()
+    }
+    return [
+        {key: values[index] for key, values in columns.items() if values[index] is not None} for index in range(table.rowCount)
+    ]
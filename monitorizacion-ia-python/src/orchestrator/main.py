@@ -1,25 +1,78 @@
+import asyncio
+import contextlib
 import logging
 import time
 import uuid
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import Response
 
+from orchestrator.adapters.registry import ViewAdapterProvider
 from orchestrator.api.routes import router
+from orchestrator.core.deadline import TimeoutPolicy
+from orchestrator.core.hot_queries import HotQueryCache
+from orchestrator.core.live import LiveHub
+from orchestrator.core.prefetch import DetailPrefetcher
 from orchestrator.core.errors import install_error_handlers
-from orchestrator.core.logging import configure_logging
+from orchestrator.core.logging import RequestLogSampler, configure_logging
 from orchestrator.core.admin_rate_limit import InMemoryAdminRateLimiter
-from orchestrator.core.metrics import InMemoryMetrics
-from orchestrator.core.settings import settings
+from orchestrator.core.adaptive_timeout import AdaptiveTimeouts
+from orchestrator.core.admission import AdmissionController
+from orchestrator.core.settings import get_settings
+from orchestrator.core.shared_metrics import build_metrics
+from orchestrator.core.timing import STAGE_TOTAL, start_request_timings
+from orchestrator.core.tracing import SPAN_KIND_SERVER, TraceContext, build_tracer
 from orchestrator.core.view_config_store import ViewConfigStore
+from orchestrator.core.warmup import Readiness, warm_up
 
 logger = logging.getLogger(__name__)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    if settings.WARMUP_ENABLED:
+        await warm_up(app, settings.WARMUP_PING_UPSTREAMS, settings.UPSTREAM_PING_PATH, settings.UPSTREAM_TIMEOUT_MS)
+    else:
+        app.state.readiness.mark_ready()
+    health_checks = None
+    if settings.UPSTREAM_HEALTHCHECK_INTERVAL_S > 0:
+        health_checks = asyncio.create_task(
+            app.state.adapter_provider.run_health_checks(
+                settings.UPSTREAM_HEALTHCHECK_INTERVAL_S, settings.UPSTREAM_PING_PATH, settings.UPSTREAM_HEALTHCHECK_TIMEOUT_MS
+            )
+        )
+    version_watch = None
+    if settings.NATIVE_VERSION_POLL_INTERVAL_S > 0:
+        version_watch = asyncio.create_task(app.state.adapter_provider.native.watch_versions(settings.NATIVE_VERSION_POLL_INTERVAL_S))
+    retention = None
+    if settings.NATIVE_RETENTION_DAYS > 0:
+        retention = asyncio.create_task(app.state.adapter_provider.native.run_retention(settings.NATIVE_RETENTION_INTERVAL_S))
+    hot_refresh = None
+    if app.state.hot_queries is not None:
+        hot_refresh = asyncio.create_task(app.state.hot_queries.run())
+    yield
+    for task in (health_checks, version_watch, retention, hot_refresh):
+        if task is None:
+            continue
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await app.state.live_hub.aclose()
+    if app.state.hot_queries is not None:
+        await app.state.hot_queries.aclose()
+    if app.state.detail_prefetcher is not None:
+        await app.state.detail_prefetcher.aclose()
+    await app.state.adapter_provider.aclose()
+    app.state.tracer.shutdown()
+
+
 def create_app() -> FastAPI:
-    configure_logging()
-    app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
+    settings = get_settings()
+    configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_QUEUE_SIZE)
+    app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan)
     app.add_middleware(
         CORSMiddleware,
         allow_origins=['http://127.0.0.1:3100', 'http://localhost:3100'],
@@ -28,44 +81,157 @@ def create_app() -> FastAPI:
         allow_headers=['*'],
     )
     app.state.view_config_store = ViewConfigStore(settings.VIEW_CONFIG_STORAGE_PATH)
-    app.state.metrics = InMemoryMetrics()
+    app.state.metrics = build_metrics(settings.METRICS_SHARED_DIR, settings.METRICS_MAX_SERIES)
+    app.state.readiness = Readiness()
+    app.state.adapter_provider = ViewAdapterProvider(
+        settings.UPSTREAM_TIMEOUT_MS,
+        max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+        retries=settings.UPSTREAM_RETRIES,
+        retry_backoff_ms=settings.UPSTREAM_RETRY_BACKOFF_MS,
+        min_attempt_ms=settings.UPSTREAM_MIN_ATTEMPT_MS,
+        eject_after_failures=settings.UPSTREAM_EJECT_AFTER_FAILURES,
+        default_limit=settings.NATIVE_LIMIT_DEFAULT,
+        max_limit=settings.UPSTREAM_LIMIT_MAX,
+        chart_cache_size=settings.CHART_CACHE_SIZE,
+        retention_days=settings.NATIVE_RETENTION_DAYS,
+        max_open_partitions=settings.NATIVE_MAX_OPEN_PARTITIONS,
+        change_log_size=settings.NATIVE_CHANGE_LOG_SIZE,
+        delta_cache_size=settings.DASHBOARD_DELTA_CACHE_SIZE,
+        capability_reprobe_s=settings.UPSTREAM_CAPABILITY_REPROBE_S,
+        adaptive_timeouts=(
+            AdaptiveTimeouts(
+                multiplier=settings.UPSTREAM_ADAPTIVE_TIMEOUT_MULTIPLIER,
+                min_ms=settings.UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS,
+                max_ms=settings.UPSTREAM_ADAPTIVE_TIMEOUT_MAX_MS,
+                window=settings.UPSTREAM_ADAPTIVE_TIMEOUT_WINDOW,
+                min_samples=settings.UPSTREAM_ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+            )
+            if settings.UPSTREAM_ADAPTIVE_TIMEOUT_ENABLED
+            else None
+        ),
+    )
+    app.state.live_hub = LiveHub(settings.STREAM_POLL_INTERVAL_S, settings.STREAM_HEARTBEAT_S, settings.STREAM_MAX_POLLERS)
+    app.state.hot_queries = (
+        HotQueryCache(
+            top_k=settings.HOT_QUERY_TOP_K,
+            ttl_s=settings.HOT_QUERY_TTL_S,
+            min_count=settings.HOT_QUERY_MIN_COUNT,
+            refresh_share=settings.HOT_QUERY_REFRESH_SHARE,
+            # La capacidad es el limite de admision vigente (sigue al AIMD si es adaptativo) o, sin admision, el pool de conexiones.
+            capacity=lambda: app.state.admission.limit if app.state.admission is not None else settings.UPSTREAM_MAX_CONNECTIONS,
+            decay_s=settings.HOT_QUERY_DECAY_S,
+        )
+        if settings.HOT_QUERY_TOP_K > 0
+        else None
+    )
+    app.state.detail_prefetcher = (
+        DetailPrefetcher(
+            top_k=settings.DETAIL_PREFETCH_TOP_K,
+            max_concurrency=settings.DETAIL_PREFETCH_CONCURRENCY,
+            max_entries=settings.DETAIL_PREFETCH_CACHE_SIZE,
+            ttl_s=settings.DETAIL_PREFETCH_TTL_S,
+            messages_limit=settings.DETAIL_PREFETCH_MESSAGES,
+        )
+        if settings.DETAIL_PREFETCH_TOP_K > 0
+        else None
+    )
+    app.state.timeout_policy = TimeoutPolicy(settings.UPSTREAM_TIMEOUT_MS, settings.USE_CASES_CONFIG_PATH)
     app.state.admin_rate_limiter = InMemoryAdminRateLimiter(
         max_requests=settings.ADMIN_RATE_LIMIT_REQUESTS,
         window_seconds=settings.ADMIN_RATE_LIMIT_WINDOW_SECONDS,
     )
+    app.state.admission = (
+        AdmissionController(
+            max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+            case_max_concurrency=settings.ADMISSION_CASE_MAX_CONCURRENCY,
+            case_limits=settings.ADMISSION_CASE_LIMITS,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout_ms=settings.ADMISSION_QUEUE_TIMEOUT_MS,
+            retry_after_s=settings.ADMISSION_RETRY_AFTER_S,
+            adaptive=settings.ADMISSION_ADAPTIVE,
+            min_concurrency=settings.ADMISSION_MIN_CONCURRENCY,
+            latency_target_ms=settings.ADMISSION_LATENCY_TARGET_MS,
+        )
+        if settings.ADMISSION_ENABLED
+        else None
+    )
+    app.state.request_log_sampler = RequestLogSampler(settings.LOG_REQUEST_SAMPLE_RATE, settings.LOG_REQUEST_SAMPLE_RATES)
+    app.state.tracer = build_tracer(
+        settings.TRACING_EXPORTER,
+        settings.TRACING_SAMPLE_RATIO,
+        settings.PROJECT_NAME,
+        settings.TRACING_JSONL_PATH,
+        settings.TRACING_OTLP_ENDPOINT,
+    )
     app.include_router(router)
+    # Los routers de operacion solo se importan si estan habilitados: no pesan en el arranque de un worker que no los sirve.
+    if settings.ADMIN_API_ENABLED:
+        from orchestrator.api.admin import router as admin_router
+
+        app.include_router(admin_router)
+    if settings.DATOPS_API_ENABLED:
+        from orchestrator.api.datops import router as datops_router
+
+        app.include_router(datops_router)
     install_error_handlers(app)
 
     @app.middleware('http')
     async def request_logging_middleware(request: Request, call_next) -> Response:
         request_id = request.headers.get('x-request-id') or str(uuid.uuid4())
         request.state.request_id = request_id
+        request.state.received_at = time.monotonic()
+        timings = start_request_timings()
+        caso_de_uso = request.query_params.get('caso_de_uso', '-')
         start = time.perf_counter()
-        response = await call_next(request)
+        with app.state.tracer.start_span(
+            f'{request.method} {request.url.path}',
+            kind=SPAN_KIND_SERVER,
+            attributes={'http.method': request.method, 'http.route': request.url.path, 'request_id': request_id, 'caso_de_uso': caso_de_uso},
+            parent=TraceContext.parse(request.headers.get('traceparent')),
+        ) as span:
+            response = await call_next(request)
+            span.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.set_error(f'HTTP {response.status_code}')
         latency_ms = round((time.perf_counter() - start) * 1000, 2)
-        caso_de_uso = request.query_params.get('caso_de_uso', '-')
         response.headers['x-request-id'] = request_id
-        adapter_name = '-'
-        configured_views = request.app.state.view_config_store.list_configs(system=caso_de_uso, enabled=True)
-        if configured_views:
-            active_view = sorted(configured_views, key=lambda item: item.name)[0]
-            adapter_name = active_view.runtime.adapter if active_view.runtime is not None else 'native'
+        response.headers['x-trace-id'] = span.context.trace_id
+        adapter_name = getattr(request.state, 'adapter_name', '-')
+        stages_ms = timings.breakdown()
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers['server-timing'] = timings.server_timing(total_ms=latency_ms)
 
         app.state.metrics.observe_request(request.method, request.url.path, response.status_code, latency_ms, caso_de_uso)
+        app.state.metrics.observe_stages(request.url.path, {**stages_ms, STAGE_TOTAL: latency_ms})
 
-        logger.info(
-            'request event | request_id=%s method=%s path=%s status=%s latency_ms=%s caso_de_uso=%s adapter=%s',
-            request_id,
-            request.method,
-            request.url.path,
-            response.status_code,
-            latency_ms,
-            caso_de_uso,
-            adapter_name,
-        )
+        slow = latency_ms >= settings.SLOW_REQUEST_THRESHOLD_MS
+        if app.state.request_log_sampler.should_log(request.url.path, response.status_code, slow):
+            fields = {
+                'event': 'request',
+                'request_id': request_id,
+                'trace_id': span.context.trace_id,
+                'method': request.method,
+                'path': request.url.path,
+                'status': response.status_code,
+                'latency_ms': latency_ms,
+                'caso_de_uso': caso_de_uso,
+                'adapter': adapter_name,
+            }
+            if slow:
+                fields.update({'event': 'slow_request', 'threshold_ms': settings.SLOW_REQUEST_THRESHOLD_MS, 'stages_ms': stages_ms})
+                logger.warning('slow request', extra={'fields': fields})
+            else:
+                logger.info('request event', extra={'fields': fields})
         return response
 
     return app
 
 
-app = create_app()
+def __getattr__(name: str):
+    # Compatibilidad con `uvicorn orchestrator.main:app`: la app se construye en el primer acceso, no al importar.
+    if name == 'app':
+        app = create_app()
+        globals()['app'] = app
+        return app
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
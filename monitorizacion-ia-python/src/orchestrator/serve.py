@@ -0,0 +1,337 @@
+"""Lanzador de produccion: `python -m orchestrator.serve`."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI
+
+from orchestrator.core.logging import LoggingPipeline, configure_logging
+from orchestrator.core.settings import Settings, get_settings
+from orchestrator.core.shared_metrics import build_metrics, prune_dead_segments
+from orchestrator.core.tracing import build_tracer
+from orchestrator.core.warmup import Readiness, warm_up
+from orchestrator.main import create_app
+
+logger = logging.getLogger(__name__)
+
+SUPERVISOR_POLL_SECONDS = 0.5
+# Margen sobre el drenaje de uvicorn antes de matar a un worker que no termina.
+KILL_GRACE_SECONDS = 5.0
+# Un worker que muere se relanza con espera exponencial; si aguanta STABLE_UPTIME_SECONDS la espera vuelve al minimo.
+RESPAWN_BACKOFF_SECONDS = (0.5, 30.0)
+STABLE_UPTIME_SECONDS = 60.0
+# Mas de CRASH_BUDGET caidas en CRASH_WINDOW_SECONDS (p. ej. un fallo al importar) paran el servicio en vez de reintentar sin fin.
+CRASH_BUDGET = 10
+CRASH_WINDOW_SECONDS = 300.0
+
+
+def default_workers() -> int:
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return max(os.cpu_count() or 1, 1)
+
+
+def select_loop(preference: str) -> str:
+    if preference != 'auto':
+        return preference
+    return 'uvloop' if importlib.util.find_spec('uvloop') is not None else 'asyncio'
+
+
+def select_http(preference: str) -> str:
+    if preference != 'auto':
+        return preference
+    return 'httptools' if importlib.util.find_spec('httptools') is not None else 'h11'
+
+
+@dataclass
+class ServeOptions:
+    host: str
+    port: int
+    workers: int
+    loop: str
+    http: str
+    preload: bool
+    backlog: int
+    keepalive_timeout_s: int
+    graceful_timeout_s: int
+
+    @classmethod
+    def from_settings(cls, settings: Settings, **overrides) -> ServeOptions:
+        values = {
+            'host': settings.SERVE_HOST,
+            'port': settings.SERVE_PORT,
+            'workers': settings.SERVE_WORKERS,
+            'loop': settings.SERVE_LOOP,
+            'http': settings.SERVE_HTTP,
+            'preload': settings.SERVE_PRELOAD,
+            'backlog': settings.SERVE_BACKLOG,
+            'keepalive_timeout_s': settings.SERVE_KEEPALIVE_TIMEOUT_S,
+            'graceful_timeout_s': settings.SERVE_GRACEFUL_TIMEOUT_S,
+        }
+        values.update({key: value for key, value in overrides.items() if value is not None})
+        values['workers'] = values['workers'] or default_workers()
+        values['loop'] = select_loop(values['loop'])
+        values['http'] = select_http(values['http'])
+        return cls(**values)
+
+
+def build_config(app: FastAPI, options: ServeOptions) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=options.host,
+        port=options.port,
+        loop=options.loop,
+        http=options.http,
+        backlog=options.backlog,
+        timeout_keep_alive=options.keepalive_timeout_s,
+        timeout_graceful_shutdown=options.graceful_timeout_s,
+        lifespan='on',
+        access_log=False,
+        log_config=None,
+    )
+
+
+def bind_socket(options: ServeOptions) -> socket.socket:
+    # proto explicito: asyncio solo activa TCP_NODELAY en conexiones aceptadas de sockets IPPROTO_TCP
+    # (el socket de `uvicorn.Config.bind_socket` usa proto 0 y cada respuesta pagaba ~40 ms de delayed ACK).
+    family = socket.AF_INET6 if ':' in options.host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((options.host, options.port))
+    sock.set_inheritable(True)
+    return sock
+
+
+def preload_app(settings: Settings) -> FastAPI:
+    """Construye y calienta la app en el proceso padre para que los workers la hereden por copy-on-write."""
+    app = create_app()
+    if settings.WARMUP_ENABLED:
+        asyncio.run(_warm_shareable_state(app, settings))
+    return app
+
+
+async def _warm_shareable_state(app: FastAPI, settings: Settings) -> None:
+    # Indice de vistas, datasets nativos y OpenAPI sobreviven al fork; los pools HTTP se abren en cada worker.
+    await warm_up(app, False, settings.UPSTREAM_PING_PATH, settings.UPSTREAM_TIMEOUT_MS)
+    await app.state.adapter_provider.aclose()
+    app.state.readiness = Readiness()
+
+
+def _logging_pipeline(settings: Settings) -> LoggingPipeline:
+    return configure_logging(settings.LOG_LEVEL, settings.LOG_FORMAT, settings.LOG_QUEUE_SIZE)
+
+
+def _reset_worker_state(app: FastAPI, settings: Settings) -> None:
+    app.state.tracer = build_tracer(
+        settings.TRACING_EXPORTER,
+        settings.TRACING_SAMPLE_RATIO,
+        settings.PROJECT_NAME,
+        settings.TRACING_JSONL_PATH,
+        settings.TRACING_OTLP_ENDPOINT,
+    )
+
+
+def _run_worker(options: ServeOptions, app: FastAPI | None, sock: socket.socket, metrics_dir: str) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    settings = get_settings()
+    _logging_pipeline(settings).resume()
+    if app is None:
+        app = create_app()
+    else:
+        _reset_worker_state(app, settings)
+    # El directorio lo decide el supervisor (puede ser uno temporal suyo): llega como argumento, no por los settings.
+    app.state.metrics = build_metrics(metrics_dir, settings.METRICS_MAX_SERIES)
+    uvicorn.Server(build_config(app, options)).run(sockets=[sock])
+
+
+class Supervisor:
+    """Pre-fork: un socket compartido, N workers uvicorn y drenaje ordenado ante SIGTERM/SIGINT."""
+
+    def __init__(
+        self,
+        options: ServeOptions,
+        app: FastAPI | None,
+        settings: Settings,
+        metrics_dir: str,
+        crash_budget: int = CRASH_BUDGET,
+        crash_window_s: float = CRASH_WINDOW_SECONDS,
+    ) -> None:
+        self.options = options
+        self.app = app
+        self.settings = settings
+        self.metrics_dir = metrics_dir
+        self.crash_budget = crash_budget
+        self.crash_window_s = crash_window_s
+        self._context = multiprocessing.get_context('fork')
+        self._workers: list[multiprocessing.process.BaseProcess | None] = []
+        self._started_at: list[float] = []
+        self._backoff_s: list[float] = []
+        self._respawn_at: list[float] = []
+        self._crashes: deque[float] = deque()
+        self._stopping = False
+        self.crash_budget_exhausted = False
+
+    def run(self) -> int:
+        sock = bind_socket(self.options)
+        if self.app is not None:
+            self.app.state.tracer.shutdown()
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        pruned_segments = prune_dead_segments(self.metrics_dir)
+        try:
+            self._start_workers(sock)
+            logger.info(
+                'workers started',
+                extra={
+                    'fields': {
+                        'event': 'serve',
+                        'address': f'{self.options.host}:{sock.getsockname()[1]}',
+                        'workers': self.options.workers,
+                        'pids': [worker.pid for worker in self._workers if worker is not None],
+                        'pruned_metric_segments': pruned_segments,
+                    }
+                },
+            )
+            while not self._stopping:
+                time.sleep(SUPERVISOR_POLL_SECONDS)
+                self._replace_dead_workers(sock)
+            drained = self._drain()
+            return 1 if self.crash_budget_exhausted else drained
+        finally:
+            sock.close()
+
+    def _start_workers(self, sock: socket.socket) -> None:
+        for _ in range(self.options.workers):
+            self._workers.append(self._spawn(sock))
+            self._started_at.append(time.monotonic())
+            self._backoff_s.append(RESPAWN_BACKOFF_SECONDS[0])
+            self._respawn_at.append(0.0)
+
+    def _spawn(self, sock: socket.socket):
+        # El hilo del listener de logs no se hereda: se para antes del fork y se relanza a ambos lados.
+        pipeline = _logging_pipeline(self.settings)
+        pipeline.stop()
+        try:
+            worker = self._context.Process(target=_run_worker, args=(self.options, self.app, sock, self.metrics_dir), daemon=False)
+            worker.start()
+        finally:
+            pipeline.resume()
+        return worker
+
+    def _replace_dead_workers(self, sock: socket.socket, now: float | None = None) -> None:
+        now = now if now is not None else time.monotonic()
+        for index, worker in enumerate(self._workers):
+            if self._stopping:
+                return
+            if worker is None:
+                if now >= self._respawn_at[index]:
+                    self._workers[index] = self._spawn(sock)
+                    self._started_at[index] = now
+                continue
+            if worker.is_alive():
+                continue
+            self._crashes.append(now)
+            while self._crashes and self._crashes[0] <= now - self.crash_window_s:
+                self._crashes.popleft()
+            if len(self._crashes) > self.crash_budget:
+                logger.error(
+                    'workers keep crashing, stopping',
+                    extra={'fields': {'event': 'serve', 'crashes': len(self._crashes), 'window_s': self.crash_window_s, 'exitcode': worker.exitcode}},
+                )
+                self.crash_budget_exhausted = True
+                self._stopping = True
+                return
+            if now - self._started_at[index] >= STABLE_UPTIME_SECONDS:
+                self._backoff_s[index] = RESPAWN_BACKOFF_SECONDS[0]
+            delay_s = self._backoff_s[index]
+            self._backoff_s[index] = min(delay_s * 2, RESPAWN_BACKOFF_SECONDS[1])
+            self._workers[index] = None
+            self._respawn_at[index] = now + delay_s
+            logger.warning(
+                'worker exited, respawning',
+                extra={'fields': {'event': 'serve', 'pid': worker.pid, 'exitcode': worker.exitcode, 'respawn_in_s': delay_s}},
+            )
+
+    def _handle_signal(self, signum: int, frame) -> None:
+        self._stopping = True
+
+    def _drain(self) -> int:
+        logger.info('draining workers', extra={'fields': {'event': 'serve', 'graceful_timeout_s': self.options.graceful_timeout_s}})
+        workers = [worker for worker in self._workers if worker is not None]
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.options.graceful_timeout_s + KILL_GRACE_SECONDS
+        for worker in workers:
+            worker.join(timeout=max(deadline - time.monotonic(), 0))
+        forced = [worker for worker in workers if worker.is_alive()]
+        for worker in forced:
+            worker.kill()
+            worker.join()
+        return 1 if forced else 0
+
+
+def serve(options: ServeOptions, settings: Settings) -> int:
+    if options.workers == 1:
+        # Un solo worker: sin fork; el lifespan hace el warm-up completo y uvicorn drena ante SIGTERM.
+        # El socket sale igualmente de `bind_socket` para tener las mismas opciones (TCP_NODELAY) que en pre-fork.
+        sock = bind_socket(options)
+        try:
+            uvicorn.Server(build_config(create_app(), options)).run(sockets=[sock])
+        finally:
+            sock.close()
+        return 0
+    owned_metrics_dir = None
+    metrics_dir = settings.METRICS_SHARED_DIR
+    if not metrics_dir:
+        # Sin directorio compartido cada worker tendria sus propias metricas: /metrics dependeria de quien responda.
+        owned_metrics_dir = metrics_dir = tempfile.mkdtemp(prefix='orchestrator-metrics-')
+    try:
+        app = preload_app(settings) if options.preload else None
+        return Supervisor(options, app, settings, metrics_dir).run()
+    finally:
+        if owned_metrics_dir is not None:
+            shutil.rmtree(owned_metrics_dir, ignore_errors=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='Arranca el orquestador con N workers pre-fork.')
+    parser.add_argument('--host', default=None)
+    parser.add_argument('--port', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help='0 = uno por CPU disponible.')
+    parser.add_argument('--loop', choices=['auto', 'uvloop', 'asyncio'], default=None)
+    parser.add_argument('--http', choices=['auto', 'httptools', 'h11'], default=None)
+    parser.add_argument('--preload', action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument('--backlog', type=int, default=None)
+    parser.add_argument('--keepalive-timeout', dest='keepalive_timeout_s', type=int, default=None)
+    parser.add_argument('--graceful-timeout', dest='graceful_timeout_s', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    _logging_pipeline(settings)
+    options = ServeOptions.from_settings(settings, **vars(args))
+    logger.info(
+        'serve options',
+        extra={'fields': {'event': 'serve', 'workers': options.workers, 'loop': options.loop, 'http': options.http, 'preload': options.preload}},
+    )
+    return serve(options, settings)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks import micro
+
+
+@pytest.fixture(scope='session')
+def dashboard_payload():
+    """Generador de payloads sinteticos de `/dashboard` (el de `benchmarks.micro`): `dashboard_payload(rows)` devuelve uno nuevo en cada llamada."""
+    return micro.dashboard_payload
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.adaptive_timeout import AdaptiveTimeouts
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.settings import Settings
+
+
+def test_timeout_follows_p99_within_bounds():
+    timeouts = AdaptiveTimeouts(multiplier=3.0, min_ms=50, max_ms=1000, window=100, min_samples=20)
+
+    for _ in range(19):
+        timeouts.observe('http://a', 'cards', 40.0)
+    assert timeouts.timeout_for('http://a', 'cards', 5000) == 5000
+
+    timeouts.observe('http://a', 'cards', 40.0)
+    assert timeouts.timeout_for('http://a', 'cards', 5000) == pytest.approx(120.0)
+    assert timeouts.timeout_for('http://a', 'dashboard', 5000) == 5000
+
+    for _ in range(100):
+        timeouts.observe('http://a', 'dashboard', 900.0)
+        timeouts.observe('http://b', 'cards', 1.0)
+    assert timeouts.timeout_for('http://a', 'dashboard', 5000) == 1000
+    assert timeouts.timeout_for('http://b', 'cards', 5000) == 50
+    assert timeouts.describe('http://a', 5000) == [
+        {'route': 'cards', 'samples': 20, 'timeouts': 0, 'p99_ms': 40.0, 'timeout_ms': 120.0},
+        {'route': 'dashboard', 'samples': 100, 'timeouts': 0, 'p99_ms': 900.0, 'timeout_ms': 1000.0},
+    ]
+
+
+def test_timeouts_are_counted_apart_and_never_ratchet_the_timeout_up():
+    timeouts = AdaptiveTimeouts(multiplier=3.0, min_ms=50, max_ms=5000, window=100, min_samples=20)
+    for _ in range(99):
+        timeouts.observe('http://a', 'cards', 40.0)
+    timeouts.observe_timeout('http://a', 'cards')
+    assert timeouts.timeout_for('http://a', 'cards', 5000) == pytest.approx(120.0)
+
+    # Mas del 1% de intentos agotados: el p99 ya no vale y se vuelve al configurado, no a un multiplo del actual.
+    for _ in range(5):
+        timeouts.observe_timeout('http://a', 'cards')
+        assert timeouts.timeout_for('http://a', 'cards', 5000) == 5000
+    assert timeouts.describe('http://a', 5000)[0] == {'route': 'cards', 'samples': 99, 'timeouts': 6, 'p99_ms': 40.0, 'timeout_ms': 5000}
+
+    # Cuando los timeouts salen de la ventana se vuelve al valor aprendido.
+    for _ in range(100):
+        timeouts.observe('http://a', 'cards', 40.0)
+    assert timeouts.timeout_for('http://a', 'cards', 5000) == pytest.approx(120.0)
+
+
+class _DelayedHandler(BaseHTTPRequestHandler):
+    delay_s = 0.0
+
+    def do_POST(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        self.rfile.read(int(self.headers.get('content-length', 0)))
+        time.sleep(type(self).delay_s)
+        body = json.dumps({'cards': [{'title': 'X', 'value': 1}]}).encode('utf-8')
+        try:
+            self.send_response(200)
+            self.send_header('content-type', 'application/json')
+            self.send_header('content-length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *_args):
+        return None
+
+
+def test_settings_reject_inverted_adaptive_bounds():
+    with pytest.raises(ValidationError, match='UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS'):
+        Settings(UPSTREAM_ADAPTIVE_TIMEOUT_MIN_MS=3000, UPSTREAM_ADAPTIVE_TIMEOUT_MAX_MS=1000)
+
+
+def test_stuck_call_fails_at_learned_timeout_instead_of_configured_one():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _DelayedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    timeouts = AdaptiveTimeouts(multiplier=3.0, min_ms=100, max_ms=5000, window=64, min_samples=10)
+    ctx = AdapterContext('remoto', 'req-1', None, 5000)
+
+    async def scenario() -> float:
+        async with httpx.AsyncClient() as client:
+            adapter = HttpProxyAdapter(base_url, 5000, client=client, adaptive_timeouts=timeouts)
+            _DelayedHandler.delay_s = 0.0
+            for _ in range(12):
+                await adapter.get_cards(ctx, QueryRequest())
+            _DelayedHandler.delay_s = 1.5
+            start = time.perf_counter()
+            with pytest.raises(OrchestratorError) as stuck:
+                await adapter.get_cards(ctx, QueryRequest())
+            assert stuck.value.code == ErrorCode.UPSTREAM_TIMEOUT
+            return time.perf_counter() - start
+
+    try:
+        elapsed = asyncio.run(scenario())
+    finally:
+        _DelayedHandler.delay_s = 0.0
+        server.shutdown()
+
+    assert elapsed < 0.5
+    described = timeouts.describe(base_url, 5000)[0]
+    assert (described['samples'], described['timeouts']) == (12, 1)
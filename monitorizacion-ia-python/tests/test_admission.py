@@ -0,0 +1,91 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator import contracts
+from orchestrator.core.admission import AdmissionController
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.main import create_app
+
+
+async def _hold(controller: AdmissionController, case: str, started: asyncio.Event, release: asyncio.Event) -> None:
+    async with controller.admit(case):
+        started.set()
+        await release.wait()
+
+
+async def test_bounded_queue_sheds_immediately_and_admits_waiters_in_order():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout_ms=1000, retry_after_s=2)
+    started, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, 'hipotecas', started, release))
+    await started.wait()
+    waiter_started = asyncio.Event()
+    waiter = asyncio.create_task(_hold(controller, 'hipotecas', waiter_started, asyncio.Event()))
+    await asyncio.sleep(0)
+
+    with pytest.raises(OrchestratorError) as rejected:
+        async with controller.admit('hipotecas'):
+            pass
+    assert rejected.value.code == ErrorCode.OVERLOADED
+    assert rejected.value.headers == {'Retry-After': '2'}
+    assert rejected.value.detail['reason'] == 'queue_full'
+
+    release.set()
+    await holder
+    await asyncio.wait_for(waiter_started.wait(), timeout=1)
+    assert controller.stats()['inflight'] == 1
+    waiter.cancel()
+
+
+async def test_queue_deadline_and_per_case_limit():
+    controller = AdmissionController(max_concurrency=4, case_limits={'hipotecas': 1}, queue_timeout_ms=20)
+    started, release = asyncio.Event(), asyncio.Event()
+    holder = asyncio.create_task(_hold(controller, 'hipotecas', started, release))
+    await started.wait()
+
+    async with controller.admit('seguros'):
+        assert controller.stats()['inflight_by_case'] == {'hipotecas': 1, 'seguros': 1}
+    with pytest.raises(OrchestratorError) as rejected:
+        async with controller.admit('hipotecas'):
+            pass
+
+    assert rejected.value.detail['reason'] == 'queue_timeout'
+    assert controller.stats()['waiting'] == 0
+    release.set()
+    await holder
+
+
+def test_aimd_decreases_on_slow_responses_and_grows_back_when_saturated():
+    controller = AdmissionController(max_concurrency=10, adaptive=True, min_concurrency=2, latency_target_ms=1)
+
+    assert controller.try_admit('hipotecas')
+    controller.release('hipotecas', latency_ms=50)
+    assert controller.limit == 9
+
+    for _ in range(controller.limit):
+        assert controller.try_admit('hipotecas')
+    for _ in range(12):
+        controller.release('hipotecas', latency_ms=0.5)
+        assert controller.try_admit('hipotecas')
+    assert controller.limit == 10
+
+
+def test_overloaded_data_endpoint_returns_503_while_health_is_served():
+    app = create_app()
+    client = TestClient(app)
+    controller = AdmissionController(max_concurrency=1, max_queue=0, retry_after_s=3)
+    app.state.admission = controller
+    assert controller.try_admit('hipotecas')
+
+    response = client.post('/cards', params={'caso_de_uso': 'hipotecas'}, json={})
+
+    assert response.status_code == 503
+    assert response.headers['retry-after'] == '3'
+    assert response.json()['code'] == 'OVERLOADED'
+    error_contract = json.loads((Path(contracts.__file__).parent / 'v1' / 'error_response.schema.json').read_text(encoding='utf-8'))
+    assert 'OVERLOADED' in error_contract['properties']['code']['enum']
+    assert client.get('/health').status_code == 200
+    assert client.get('/metrics').json()['admission']['rejected']['queue_full'] == 1
@@ -0,0 +1,128 @@
+import json
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator.adapters.base import Adapter, AdapterContext
+from orchestrator.api.schemas import DashboardResponse, QueryRequest, ViewComponent
+from orchestrator.core.errors import OrchestratorError
+from orchestrator.core.settings import settings
+from orchestrator.datasets.charts import ChartSpec, aggregate, lttb
+from orchestrator.datasets.columnar import ColumnarTable
+from orchestrator.main import create_app
+
+
+def _spec(**config) -> ChartSpec:
+    component = ViewComponent(id='chart', type='chart', title='Chart', data_source='/dashboard', config=config)
+    return ChartSpec.from_component(component)
+
+
+def _day_ms(fecha_hora: str) -> int:
+    day = datetime.strptime(fecha_hora, '%d-%m-%Y · %H:%M').replace(hour=0, minute=0, tzinfo=timezone.utc)
+    return int(day.timestamp() * 1000)
+
+
+def _numeric_table() -> ColumnarTable:
+    rows = [
+        {'id': f'r{idx}', 'detail': {}, 'canal': f'canal-{idx % 4}', 'importe': float(idx), 'fecha_hora': f'{1 + idx % 3:02d}-02-2026 · 10:00'}
+        for idx in range(40)
+    ]
+    return ColumnarTable.from_payload({'table': {'columns': [], 'rows': rows}})
+
+
+def test_count_by_group_and_day_matches_a_row_scan(dashboard_payload):
+    payload = dashboard_payload(2000)
+    table = ColumnarTable.from_payload(payload)
+    expected = Counter((row['resolucion'], _day_ms(row['fecha_hora'])) for row in payload['table']['rows'] if row['razones_llamada'] == 'Motivo 3')
+
+    chart = aggregate(table, table.select({'razones_llamada': 'Motivo 3'}), _spec(group_by='resolucion', bucket='day'))
+
+    assert chart.rows == 50
+    assert {series.name for series in chart.series} == {resolution for resolution, _day in expected}
+    for series in chart.series:
+        assert series.x == sorted(series.x)
+        assert {(series.name, x): y for x, y in zip(series.x, series.y)} == {key: count for key, count in expected.items() if key[0] == series.name}
+
+
+def test_numeric_aggregations_and_other_group():
+    table = _numeric_table()
+
+    by_canal = aggregate(table, None, _spec(group_by='canal', aggregation='avg', value_field='importe', max_groups=2))
+    p50 = aggregate(table, None, _spec(aggregation='percentile', value_field='importe', percentile=50))
+
+    assert by_canal.series[0].x == ['canal-0', 'canal-1', 'Otros']
+    assert by_canal.series[0].y == [18.0, 19.0, 20.5]
+    assert p50.series[0].y == [19.5]
+    with pytest.raises(OrchestratorError) as missing:
+        _spec(aggregation='sum')
+    assert missing.value.status_code == 400
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    xs = list(range(1000))
+    ys = [0.0] * 1000
+    ys[500] = 100.0
+
+    kept = lttb(xs, ys, 50)
+
+    assert len(kept) == 50
+    assert kept[0] == 0 and kept[-1] == 999
+    assert 500 in kept
+    assert kept == sorted(kept)
+
+
+async def test_remote_adapters_aggregate_paged_rows(dashboard_payload):
+    payload = dashboard_payload(250)
+
+    class PagedAdapter(Adapter):
+        async def get_dashboard(self, ctx, req):
+            offset = int(req.cursor or 0)
+            rows = payload['table']['rows'][offset : offset + 100]
+            next_cursor = str(offset + 100) if offset + 100 < 250 else None
+            return DashboardResponse.model_validate({'table': {**payload['table'], 'rows': rows, 'nextCursor': next_cursor}})
+
+    chart = await PagedAdapter().get_chart(AdapterContext('remoto', None, None, 1000), _spec(group_by='resolucion'), QueryRequest())
+
+    assert chart.rows == 250
+    assert sum(chart.series[0].y) == 250
+
+
+def test_chart_endpoint_uses_component_config_and_caches(tmp_path, monkeypatch):
+    view = {
+        'id': 'vista-hipotecas',
+        'name': 'Hipotecas',
+        'system': 'hipotecas',
+        'components': [
+            {'id': 'table', 'type': 'table', 'title': 'Tabla', 'data_source': '/dashboard'},
+            {'id': 'por-resolucion', 'type': 'chart', 'title': 'Resolucion', 'data_source': '/dashboard', 'config': {'group_by': 'resolucion', 'height': 160}},
+        ],
+    }
+    storage = tmp_path / 'views.json'
+    storage.write_text(json.dumps([view]), encoding='utf-8')
+    monkeypatch.setattr(settings, 'VIEW_CONFIG_STORAGE_PATH', str(storage))
+    app = create_app()
+    client = TestClient(app)
+
+    first = client.post('/chart', params={'caso_de_uso': 'hipotecas', 'component': 'por-resolucion'}, json={})
+    second = client.post('/chart', params={'caso_de_uso': 'hipotecas', 'component': 'por-resolucion'})
+    missing = client.post('/chart', params={'caso_de_uso': 'hipotecas', 'component': 'otro'})
+    not_chart = client.post('/chart', params={'caso_de_uso': 'hipotecas', 'component': 'table'})
+
+    assert first.status_code == 200
+    assert first.json()['series'] == [{'name': 'count', 'x': ['Completada', 'En curso'], 'y': [1.0, 1.0]}]
+    assert second.json() == first.json()
+    assert app.state.adapter_provider.native.chart_cache.stats()['hits'] == 1
+    assert (missing.status_code, missing.json()['code']) == (404, 'NOT_FOUND')
+    assert not_chart.status_code == 400
+
+
+def test_view_config_can_lower_but_not_raise_the_chart_caps():
+    raised = ViewComponent(id='chart', type='chart', title='Chart', data_source='/dashboard', config={'max_points': 90000, 'max_rows': 9_000_000})
+    lowered = ViewComponent(id='chart', type='chart', title='Chart', data_source='/dashboard', config={'max_points': 10})
+
+    capped = ChartSpec.from_component(raised, max_points=500, max_rows=50000)
+
+    assert (capped.max_points, capped.max_rows) == (500, 50000)
+    assert ChartSpec.from_component(lowered, max_points=500, max_rows=50000).max_points == 10
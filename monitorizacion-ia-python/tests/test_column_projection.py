@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.settings import settings
+from orchestrator.datasets.partitions import write_partitions
+from orchestrator.main import create_app
+
+CTX = AdapterContext('projection', 'req-1', None, 1000)
+
+
+async def test_native_engine_only_materialises_projected_columns(tmp_path, dashboard_payload):
+    payload = dashboard_payload(120)
+    (tmp_path / 'monolitico').mkdir()
+    (tmp_path / 'monolitico' / 'dashboard.json').write_text(json.dumps(payload), encoding='utf-8')
+    write_partitions(tmp_path / 'particionado', payload)
+    req = QueryRequest(fields=['resolucion'], sort=[{'field': 'duracion', 'direction': 'desc'}], limit=10)
+
+    for directory in ('monolitico', 'particionado'):
+        adapter = NativeAdapter(str(tmp_path / directory))
+        full = await adapter.get_dashboard(CTX, req.model_copy(update={'fields': None}))
+        projected = await adapter.get_dashboard(CTX, req)
+        columnar = await adapter.get_dashboard_columnar(CTX, req)
+
+        # `id` y `detail` siempre viajan; el campo de orden tambien, para que el cliente pueda reordenar.
+        expected = {'id', 'detail', 'resolucion', 'duracion'}
+        assert {column.key for column in projected.table.columns} <= expected
+        assert all(set(row.model_dump(exclude_none=True)) == expected for row in projected.table.rows)
+        assert [row.id for row in projected.table.rows] == [row.id for row in full.table.rows]
+        assert (projected.table.total, projected.table.nextCursor) == (full.table.total, full.table.nextCursor)
+        assert set(columnar.table.data) == expected
+
+
+def test_dashboard_derives_fields_from_the_table_component():
+    client = TestClient(create_app())
+    url = '/dashboard?caso_de_uso=hipotecas'
+
+    derived = client.post(url + '&component=table-hipotecas', json={}).json()
+    explicit = client.post(url + '&component=table-hipotecas', json={'fields': ['nombre_cliente']}).json()
+
+    visible = {'id', 'detail', 'fecha_hora', 'numero_entrante', 'nombre_cliente', 'razones_llamada', 'duracion', 'resolucion'}
+    assert {column['key'] for column in derived['table']['columns']} <= visible
+    assert {key for row in explicit['table']['rows'] for key in row if row[key] is not None} == {'id', 'detail', 'nombre_cliente'}
+    assert client.post(url + '&component=no_existe', json={}).json()['code'] == 'NOT_FOUND'
+
+
+def test_implicit_projection_is_only_applied_when_the_client_names_the_component(tmp_path, monkeypatch):
+    table = {'id': 'tabla', 'type': 'table', 'title': 'Tabla', 'data_source': '/dashboard', 'config': {'visible_columns': ['resolucion']}}
+    storage = tmp_path / 'views.json'
+    storage.write_text(json.dumps([{'id': 'vista', 'name': 'Vista', 'system': 'hipotecas', 'components': [table]}]), encoding='utf-8')
+    monkeypatch.setattr(settings, 'VIEW_CONFIG_STORAGE_PATH', str(storage))
+    client = TestClient(create_app())
+    url = '/dashboard?caso_de_uso=hipotecas'
+
+    every = client.post(url, json={}).json()['table']['rows']
+    projected = client.post(url + '&component=tabla', json={}).json()['table']['rows']
+
+    assert any(row.get('nombre_cliente') for row in every)
+    assert all(set(row) <= {'id', 'detail', 'resolucion'} for row in projected)
+
+
+async def test_proxy_forwards_fields_and_strips_extras(dashboard_payload):
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if 'fields' in body and len(bodies) > 1:
+            return httpx.Response(422, json={'detail': 'unknown field: fields'})
+        # El upstream ignora la proyeccion y devuelve todas las columnas.
+        return httpx.Response(200, json=dashboard_payload(3))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        proxy = HttpProxyAdapter('http://upstream', 1000, client=client)
+        first = await proxy.get_dashboard(CTX, QueryRequest(fields=['resolucion']))
+        second = await proxy.get_dashboard(CTX, QueryRequest(fields=['duracion']))
+        third = await proxy.get_dashboard(CTX, QueryRequest(fields=['duracion']))
+
+    assert bodies[0]['fields'] == ['id', 'detail', 'resolucion']
+    # Un upstream que rechaza `fields` recibe la request repetida sin ella, y ya no se le vuelve a mandar.
+    assert ['fields' in body for body in bodies] == [True, True, False, False]
+    assert proxy.supports_projection is False
+    assert {column.key for column in first.table.columns} == {'id', 'detail', 'resolucion'}
+    for response in (second, third):
+        assert all(set(row.model_dump(exclude_none=True)) == {'id', 'detail', 'duracion'} for row in response.table.rows)
+
+
+async def test_proxy_only_stops_projecting_when_the_upstream_rejects_fields(dashboard_payload):
+    bodies = []
+    replies = [(400, {'detail': 'invalid filter value'}), (200, None), (422, {'detail': [{'loc': ['body', 'fields']}]}), (200, None)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        status, body = replies.pop(0) if replies else (200, None)
+        return httpx.Response(status, json=body or dashboard_payload(3))
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        proxy = HttpProxyAdapter('http://upstream', 1000, client=client, capability_reprobe_s=0.05)
+        await proxy.get_dashboard(CTX, QueryRequest(fields=['resolucion']))
+        # Un 400 que no habla de `fields` no apaga la proyeccion.
+        assert proxy.supports_projection is True
+        await proxy.get_dashboard(CTX, QueryRequest(fields=['resolucion']))
+        assert proxy.supports_projection is False
+        await proxy.get_dashboard(CTX, QueryRequest(fields=['resolucion']))
+        await asyncio.sleep(0.06)
+        # Pasado el intervalo se vuelve a probar.
+        await proxy.get_dashboard(CTX, QueryRequest(fields=['resolucion']))
+
+    assert ['fields' in body for body in bodies] == [True, False, True, False, False, True]
+    assert proxy.supports_projection is True
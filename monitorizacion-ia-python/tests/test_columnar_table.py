@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.errors import OrchestratorError
+from orchestrator.datasets.columnar import KIND_DICT, KIND_LIST, KIND_TIME, ColumnarTable
+from orchestrator.main import create_app
+
+
+@pytest.fixture(scope='module')
+def payload(dashboard_payload):
+    return dashboard_payload(2000)
+
+
+@pytest.fixture(scope='module')
+def table(payload):
+    return ColumnarTable.from_payload(payload)
+
+
+def _ids(response):
+    return [row.id for row in response.table.rows]
+
+
+def _when(row):
+    return datetime.strptime(row['fecha_hora'], '%d-%m-%Y · %H:%M')
+
+
+def test_columns_are_typed_and_rows_roundtrip(table, payload):
+    stats = table.stats()
+
+    assert stats['rows'] == 2000
+    assert stats['columns']['resolucion'] == KIND_DICT
+    assert stats['columns']['detail'] == KIND_DICT
+    assert stats['columns']['fecha_hora'] == KIND_TIME
+    assert stats['columns']['numero_entrante'] == KIND_LIST
+    assert [table.row(index) for index in (0, 7, 1999)] == [payload['table']['rows'][index] for index in (0, 7, 1999)]
+
+
+def test_filter_sort_and_cursor_match_a_row_scan(table, payload):
+    rows = payload['table']['rows']
+    expected = sorted(
+        (row for row in rows if row['resolucion'] in ('Completada', 'Escalada')),
+        key=_when,
+        reverse=True,
+    )
+    req = {'filters': {'resolucion': ['Completada', 'Escalada']}, 'sort': [{'field': 'fecha_hora', 'direction': 'desc'}], 'limit': 40}
+
+    first = table.query(QueryRequest.model_validate(req), 25, 100)
+    second = table.query(QueryRequest.model_validate({**req, 'cursor': first.table.nextCursor}), 25, 100)
+
+    assert first.table.total == len(expected) == 1000
+    assert [_when(row) for row in first.table.model_dump()['rows'] + second.table.model_dump()['rows']] == [
+        _when(row) for row in expected[:80]
+    ]
+    assert set(_ids(first)).isdisjoint(_ids(second))
+
+
+def test_multi_key_sort_and_combined_filters(table, payload):
+    rows = payload['table']['rows']
+    expected = [
+        row['id']
+        for row in sorted(
+            (row for row in rows if row['resolucion'] == 'En curso' and row['razones_llamada'] == 'Motivo 1'),
+            key=lambda row: (row['duracion'], row['id']),
+        )
+    ]
+    req = QueryRequest.model_validate(
+        {
+            'filters': {'resolucion': 'En curso', 'razones_llamada': 'Motivo 1'},
+            'sort': [{'field': 'duracion', 'direction': 'asc'}, {'field': 'id', 'direction': 'asc'}],
+            'limit': 100,
+        }
+    )
+
+    response = table.query(req, 25, 100)
+
+    assert _ids(response) == expected
+    assert response.table.nextCursor is None
+    with pytest.raises(OrchestratorError) as unknown:
+        table.query(QueryRequest(filters={'missing': 1}), 25, 100)
+    assert unknown.value.status_code == 400
+
+
+def test_native_dashboard_endpoint_pages_the_dataset():
+    client = TestClient(create_app())
+
+    first = client.post('/dashboard', params={'caso_de_uso': 'hipotecas'}, json={'limit': 1}).json()
+    second = client.post('/dashboard', params={'caso_de_uso': 'hipotecas'}, json={'limit': 1, 'cursor': first['table']['nextCursor']}).json()
+
+    assert first['table']['total'] == 2
+    assert [row['id'] for row in first['table']['rows'] + second['table']['rows']] == ['conv-001', 'conv-002']
+    assert second['table']['nextCursor'] is None
+    assert first['table']['rows'][0]['detail'] == {'action': 'Ver detalle'}
+
+
+def _table(rows):
+    return ColumnarTable.from_payload({'table': {'columns': [], 'rows': [{'id': f'r{index}', 'detail': {}, **row} for index, row in enumerate(rows)]}})
+
+
+def test_mixed_and_large_integers_and_explicit_nulls_roundtrip():
+    rows = [{'valor': 2**53 + 1, 'nota': None}, {'valor': 1.5}, {'valor': 3}, {'valor': None}]
+    table = _table(rows)
+
+    assert [table.row(index)['valor'] for index in range(3)] == [2**53 + 1, 1.5, 3]
+    assert isinstance(table.row(2)['valor'], int)
+    assert table.row(0)['nota'] is None and 'nota' not in table.row(1)
+    assert table.row(3) == {'id': 'r3', 'detail': {}, 'valor': None}
+    assert _ids(table.query(QueryRequest(filters={'valor': 2**53 + 1}), 25, 100)) == ['r0']
+    ordered = table.query(QueryRequest.model_validate({'sort': [{'field': 'valor', 'direction': 'asc'}]}), 25, 100)
+    assert _ids(ordered) == ['r3', 'r1', 'r2', 'r0']
+
+
+def test_descending_ties_keep_row_order_with_one_or_several_keys():
+    table = _table([{'grupo': value, 'fijo': 1} for value in (1, 2, 1, 2, 1)])
+    single = QueryRequest.model_validate({'sort': [{'field': 'grupo', 'direction': 'desc'}]})
+    multi = QueryRequest.model_validate({'sort': [{'field': 'grupo', 'direction': 'desc'}, {'field': 'fijo', 'direction': 'desc'}]})
+    filtered = QueryRequest.model_validate({'filters': {'fijo': 1}, 'sort': [{'field': 'grupo', 'direction': 'desc'}]})
+
+    expected = ['r1', 'r3', 'r0', 'r2', 'r4']
+    assert _ids(table.query(single, 25, 100)) == _ids(table.query(multi, 25, 100)) == _ids(table.query(filtered, 25, 100)) == expected
+
+
+def test_default_limit_zero_returns_every_matching_row(table):
+    response = table.query(QueryRequest(), 0, 100)
+
+    assert len(response.table.rows) == response.table.total == 2000
+    assert response.table.nextCursor is None
+    assert len(table.query(QueryRequest(limit=500), 0, 100).table.rows) == 100
@@ -0,0 +1,170 @@
+import json
+import shutil
+from pathlib import Path
+
+import httpx
+
+from orchestrator.adapters.balancer import BalancedProxyAdapter, Endpoint
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import DashboardResponse, QueryRequest
+from orchestrator.datasets.changes import ChangeLog
+from orchestrator.datasets.partitions import write_partitions
+from orchestrator.datasets.versions import publish_version
+
+DEMO_DIR = Path(__file__).resolve().parents[1] / 'src' / 'orchestrator' / 'data' / 'hipotecas'
+CTX = AdapterContext('deltas', 'req-1', None, 1000)
+
+
+def _publish(tmp_path, base, version: str, payload: dict, rows: list[dict]) -> None:
+    source = tmp_path / version
+    source.mkdir()
+    for filename in ('cards.json', 'dashboard_detail.json'):
+        shutil.copy(DEMO_DIR / filename, source / filename)
+    payload = {'table': {**payload['table'], 'rows': rows}}
+    (source / 'dashboard.json').write_text(json.dumps(payload), encoding='utf-8')
+    publish_version(base, source, version)
+
+
+async def test_version_switch_is_served_as_a_delta_of_the_query(tmp_path, dashboard_payload):
+    base = tmp_path / 'caso'
+    base.mkdir()
+    payload = dashboard_payload(40)
+    rows = payload['table']['rows']
+    _publish(tmp_path, base, 'v1', payload, rows)
+    adapter = NativeAdapter(str(base))
+    req = QueryRequest(filters={'resolucion': 'Completada'}, limit=50)
+    first = await adapter.get_dashboard(CTX, req)
+
+    changed = [dict(row) for row in rows if row['id'] not in {'conv-0000001', 'conv-0000008'}]
+    changed[0]['resolucion'] = 'Escalada'  # conv-0000000 deja de cumplir el filtro
+    changed[3]['duracion'] = '9 min 9 s'  # conv-0000004 sigue cumpliendolo
+    changed.append({**rows[0], 'id': 'conv-nueva'})
+    _publish(tmp_path, base, 'v2', payload, changed)
+    assert adapter.refresh('deltas') is True
+
+    response = await adapter.get_dashboard(CTX, req.model_copy(update={'since': first.version}))
+
+    assert response.version != first.version
+    assert response.table.rows == [] and response.table.total == first.table.total - 2 + 1
+    assert [row.id for row in response.delta.inserted] == ['conv-nueva']
+    assert [(row.id, row.duracion) for row in response.delta.updated] == [('conv-0000004', '9 min 9 s')]
+    # conv-0000001 tambien se ha borrado, pero no cumplia el filtro: el cliente nunca la tuvo en la pagina.
+    assert sorted(response.delta.deleted) == ['conv-0000000', 'conv-0000008']
+    # Sin cambios desde la ultima version el delta viene vacio.
+    unchanged = await adapter.get_dashboard(CTX, req.model_copy(update={'since': response.version}))
+    assert (unchanged.delta.inserted, unchanged.delta.updated, unchanged.delta.deleted) == ([], [], [])
+
+
+async def test_appends_are_inserts_and_unknown_tokens_fall_back_to_full_pages(tmp_path, dashboard_payload):
+    payload = dashboard_payload(200)
+    write_partitions(tmp_path, payload)
+    adapter = NativeAdapter(str(tmp_path))
+    req = QueryRequest(filters={'resolucion': 'Escalada'}, limit=10)
+    first = await adapter.get_dashboard(CTX, req)
+    second_page = await adapter.get_dashboard(CTX, req.model_copy(update={'cursor': first.table.nextCursor}))
+    template = payload['table']['rows'][2]
+
+    new_rows = [
+        {**template, 'id': 'conv-a', 'fecha_hora': '03-02-2026 · 10:00'},
+        {**template, 'id': 'conv-b', 'fecha_hora': '01-03-2026 · 09:00', 'resolucion': 'Completada'},
+    ]
+    adapter.append('deltas', new_rows)
+    delta = await adapter.get_dashboard(CTX, req.model_copy(update={'since': first.version}))
+
+    # El delta es el de la pagina: el alta entra en las 10 primeras y desplaza a la ultima.
+    assert [row.id for row in delta.delta.inserted] == ['conv-a']
+    assert delta.delta.deleted == [first.table.rows[-1].id] and delta.table.total == first.table.total + 1
+    # La segunda pagina se corre una fila: la que cae de la primera es un alta aunque no haya cambiado.
+    shifted = await adapter.get_dashboard(CTX, req.model_copy(update={'cursor': first.table.nextCursor, 'since': second_page.version}))
+    assert [row.id for row in shifted.delta.inserted] == [first.table.rows[-1].id]
+    assert shifted.delta.deleted == [second_page.table.rows[-1].id] and shifted.table.nextCursor == second_page.table.nextCursor
+    for since in ('otra-epoca.0', delta.version.split('.')[0] + '.99'):
+        full = await adapter.get_dashboard(CTX, req.model_copy(update={'since': since}))
+        assert full.delta is None and len(full.table.rows) == 10
+
+
+async def test_partitioned_switch_keeps_the_token_of_the_version_still_served(tmp_path, dashboard_payload):
+    base = tmp_path / 'caso'
+    payload = dashboard_payload(50)
+
+    def publish_partitioned(version: str, rows: list[dict]) -> None:
+        write_partitions(tmp_path / version, {'table': {**payload['table'], 'rows': rows}})
+        for filename in ('cards.json', 'dashboard_detail.json'):
+            shutil.copy(DEMO_DIR / filename, tmp_path / version / filename)
+        publish_version(base, tmp_path / version, version)
+
+    publish_partitioned('v1', payload['table']['rows'][:40])
+    adapter = NativeAdapter(str(base))
+    served = adapter.dataset('deltas')
+    before = served.token()
+    publish_partitioned('v2', payload['table']['rows'])
+
+    assert adapter.refresh('deltas') is True
+
+    # La version nueva estrena log: la que aun terminan las requests en curso conserva su token.
+    assert served.token() == before
+    assert adapter.dataset('deltas').token().split('.')[0] != before.split('.')[0]
+    full = await adapter.get_dashboard(CTX, QueryRequest(limit=50, since=before))
+    assert full.delta is None and full.table.total == 50
+
+
+def test_change_log_collapses_and_forgets_trimmed_batches():
+    log = ChangeLog(max_entries=4)
+    start = log.token()
+    log.record([('insert', 'a', None), ('update', 'b', None)])
+    middle = log.token()
+    log.record([('update', 'a', None), ('delete', 'b', None)])
+
+    assert log.since(middle, log.seq) == {'a': ('update', None), 'b': ('delete', None)}
+    assert log.since(start, log.seq) == {'a': ('insert', None), 'b': ('delete', None)}
+    log.record([('insert', 'c', None), ('delete', 'c', None)])
+    assert log.since(start, log.seq) is None
+    assert log.since(middle, log.seq) == {'a': ('update', None), 'b': ('delete', None)}
+
+
+class _PageProxy:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+
+    async def get_dashboard(self, _ctx, _req):
+        return DashboardResponse.model_validate({'table': {'columns': [], 'rows': self.rows, 'total': len(self.rows)}})
+
+
+async def test_balancer_diffs_pages_of_upstreams_without_versions(dashboard_payload):
+    rows = dashboard_payload(5)['table']['rows']
+    proxy = _PageProxy(rows)
+    balancer = BalancedProxyAdapter([Endpoint('http://upstream', proxy)])
+    first = await balancer.get_dashboard(CTX, QueryRequest())
+
+    proxy.rows = [{**rows[0], 'resolucion': 'Escalada'}, *rows[2:], {**rows[1], 'id': 'conv-nueva'}]
+    delta = await balancer.get_dashboard(CTX, QueryRequest(since=first.version))
+    stale = await balancer.get_dashboard(CTX, QueryRequest(since='p.desconocida'))
+
+    assert first.version.startswith('p.') and len(first.table.rows) == 5
+    assert [row.id for row in delta.delta.inserted] == ['conv-nueva']
+    assert [row.id for row in delta.delta.updated] == ['conv-0000000']
+    assert delta.delta.deleted == ['conv-0000001'] and delta.table.total == 5
+    assert stale.delta is None and len(stale.table.rows) == 5
+    assert balancer.page_diffs.stats() == {'queries': 1, 'deltas': 1, 'full': 2}
+
+
+async def test_proxy_only_forwards_since_to_upstreams_that_answer_with_versions():
+    bodies = []
+    versioned = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        table = {'columns': [], 'rows': [], 'total': 0}
+        return httpx.Response(200, json={'table': table, **({'version': 'u.1'} if versioned else {})})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        proxy = HttpProxyAdapter('http://upstream', 1000, client=client)
+        await proxy.get_dashboard(CTX, QueryRequest(since='p.1'))
+        versioned = True
+        await proxy.get_dashboard(CTX, QueryRequest(since='p.1'))
+        await proxy.get_dashboard(CTX, QueryRequest(since='u.1'))
+
+    assert ['since' in body for body in bodies] == [False, False, True]
+    assert bodies[2]['since'] == 'u.1'
@@ -0,0 +1,123 @@
+import gc
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.errors import OrchestratorError
+from orchestrator.datasets.partitions import PARTITIONS_DIR, write_partitions
+from orchestrator.datasets.versions import CURRENT_FILE, VERSIONS_DIR, current_version, held_versions, prune_versions, publish_version
+
+DEMO_DIR = Path(__file__).resolve().parents[1] / 'src' / 'orchestrator' / 'data' / 'hipotecas'
+
+
+def _source(tmp_path, name: str, payload: dict):
+    source = tmp_path / name
+    source.mkdir()
+    for filename in ('cards.json', 'dashboard_detail.json'):
+        shutil.copy(DEMO_DIR / filename, source / filename)
+    (source / 'dashboard.json').write_text(json.dumps(payload), encoding='utf-8')
+    return source
+
+
+@pytest.fixture()
+def case_dir(tmp_path, dashboard_payload):
+    base = tmp_path / 'caso'
+    base.mkdir()
+    publish_version(base, _source(tmp_path, 'v1', dashboard_payload(30)), 'v1')
+    return base
+
+
+async def test_refresh_switches_in_one_step_while_old_readers_finish(tmp_path, case_dir, dashboard_payload):
+    adapter = NativeAdapter(str(case_dir))
+    ctx = AdapterContext('versionado', 'req-1', None, 1000)
+    assert adapter.refresh('versionado') is True
+    in_flight = adapter.dataset('versionado')
+
+    publish_version(case_dir, _source(tmp_path, 'v2', dashboard_payload(60)), 'v2')
+    # Hasta que se refresca, todo el mundo sigue en la version anterior.
+    assert (await adapter.get_dashboard(ctx, QueryRequest())).table.total == 30
+    assert adapter.refresh('versionado') is True
+    assert adapter.refresh('versionado') is False
+
+    assert (await adapter.get_dashboard(ctx, QueryRequest())).table.total == 60
+    assert in_flight.version == 'v1' and in_flight.table().row_count == 30
+    stats = adapter.version_stats()
+    assert stats['datasets']['versionado']['version'] == 'v2'
+    assert stats['datasets']['versionado']['switches'] == 1
+    assert stats['datasets']['versionado']['load_ms'] > 0
+    assert stats['datasets']['versionado']['bytes'] > 0
+    assert stats['retired_pending'] == 1
+
+    released = in_flight.nbytes()
+    del in_flight
+    gc.collect()
+    stats = adapter.version_stats()
+    assert (stats['retired_pending'], stats['released_versions'], stats['released_bytes']) == (0, 1, released)
+
+
+async def test_broken_version_keeps_serving_the_current_one(case_dir):
+    adapter = NativeAdapter(str(case_dir))
+    ctx = AdapterContext('versionado', 'req-1', None, 1000)
+    adapter.preload('versionado')
+
+    (case_dir / CURRENT_FILE).write_text('no-existe\n', encoding='utf-8')
+    with pytest.raises(OrchestratorError):
+        adapter.refresh('versionado')
+
+    assert adapter.dataset('versionado').version == 'v1'
+    assert (await adapter.get_dashboard(ctx, QueryRequest())).table.total == 30
+
+
+def test_publish_is_atomic_and_prune_keeps_the_current_version(tmp_path, case_dir, dashboard_payload):
+    publish_version(case_dir, _source(tmp_path, 'v2', dashboard_payload(5)), 'v2')
+    publish_version(case_dir, _source(tmp_path, 'v3', dashboard_payload(5)), 'v3')
+    (case_dir / CURRENT_FILE).write_text('v1\n', encoding='utf-8')
+
+    removed = prune_versions(case_dir, keep=1)
+
+    assert current_version(case_dir) == 'v1'
+    assert removed == ['v2']
+    assert sorted(path.name for path in (case_dir / VERSIONS_DIR).iterdir()) == ['v1', 'v3']
+    with pytest.raises(OrchestratorError):
+        publish_version(case_dir, tmp_path / 'v3', 'v3')
+
+
+def test_prune_follows_publish_order_and_keeps_versions_workers_hold(tmp_path, dashboard_payload):
+    base = tmp_path / 'caso'
+    base.mkdir()
+    publish_version(base, _source(tmp_path, 'v9', dashboard_payload(5)), 'v9')
+    adapter = NativeAdapter(str(base))
+    serving = adapter.dataset('versionado')
+    # Dos publicaciones antes de que el worker cambie: v9 sigue en uso aunque ya no sea de las `keep` mas recientes.
+    publish_version(base, _source(tmp_path, 'v10', dashboard_payload(5)), 'v10')
+    publish_version(base, _source(tmp_path, 'v11', dashboard_payload(5)), 'v11')
+
+    assert held_versions(base) == {'v9'}
+    assert prune_versions(base, keep=1) == ['v10']
+
+    assert adapter.refresh('versionado') is True
+    del serving
+    gc.collect()
+    assert held_versions(base) == {'v11'}
+    assert prune_versions(base, keep=1) == ['v9']
+
+
+def test_published_versions_are_not_modified(tmp_path, dashboard_payload):
+    source = _source(tmp_path, 'particionado', dashboard_payload(5))
+    write_partitions(source, dashboard_payload(200))
+    base = tmp_path / 'caso'
+    publish_version(base, source, 'v1')
+    adapter = NativeAdapter(str(base), retention_days=1)
+    manifest = (base / VERSIONS_DIR / 'v1' / PARTITIONS_DIR / 'manifest.json').read_text(encoding='utf-8')
+
+    adapter.preload('versionado')
+    with pytest.raises(OrchestratorError) as refused:
+        adapter.append('versionado', dashboard_payload(1)['table']['rows'])
+
+    assert refused.value.status_code == 400
+    assert (base / VERSIONS_DIR / 'v1' / PARTITIONS_DIR / 'manifest.json').read_text(encoding='utf-8') == manifest
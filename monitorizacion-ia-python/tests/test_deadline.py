@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator import contracts
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.api.schemas import QueryRequest, ViewConfiguration
+from orchestrator.core.deadline import DEADLINE_HEADER, TIMEOUT_HEADER, Deadline, TimeoutPolicy
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.settings import settings
+from orchestrator.main import create_app
+
+
+DEFAULT_SCRIPT = [(0.0, 200)]
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    # Cada entrada es (segundos de espera, status); la ultima se repite.
+    script: list[tuple[float, int]] = DEFAULT_SCRIPT
+    received_headers: list[dict[str, str]] = []
+
+    def do_POST(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        self.rfile.read(int(self.headers.get('content-length', 0)))
+        cls = type(self)
+        cls.received_headers.append({key.lower(): value for key, value in self.headers.items()})
+        delay, status = cls.script[min(len(cls.received_headers), len(cls.script)) - 1]
+        time.sleep(delay)
+        body = json.dumps({'cards': [{'title': 'X', 'value': 1}]}).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('content-type', 'application/json')
+            self.send_header('content-length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass
+
+    def log_message(self, *_args):
+        return None
+
+
+@pytest.fixture
+def upstream():
+    _ScriptedHandler.script = DEFAULT_SCRIPT
+    _ScriptedHandler.received_headers = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ScriptedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+
+
+def _runtime_view(base_url: str, timeout_ms: int | None = None) -> ViewConfiguration:
+    runtime = {'adapter': 'http_proxy', 'upstream_base_url': base_url}
+    if timeout_ms is not None:
+        runtime['timeout_ms'] = timeout_ms
+    return ViewConfiguration.model_validate(
+        {
+            'id': 'vista-remota',
+            'name': 'Remota',
+            'system': 'remoto',
+            'enabled': True,
+            'runtime': runtime,
+            'components': [{'id': 'cards', 'type': 'cards', 'title': 'KPIs', 'data_source': '/cards', 'position': 0}],
+        }
+    )
+
+
+def test_deadline_header_roundtrip_and_validation():
+    deadline = Deadline.from_header(str(int(time.time() * 1000) + 2000))
+
+    assert 1500 < deadline.remaining_ms() <= 2000
+    headers = deadline.shrink(500).headers()
+    assert int(headers[TIMEOUT_HEADER]) <= 500
+    assert abs(int(headers[DEADLINE_HEADER]) - (time.time() * 1000 + 500)) < 100
+    for value in ('tomorrow', 'nan', 'inf', '-inf'):
+        with pytest.raises(OrchestratorError) as invalid:
+            Deadline.from_header(value)
+        assert invalid.value.status_code == 400
+
+
+def test_timeout_policy_prefers_view_then_use_case_catalog(tmp_path):
+    catalog = tmp_path / 'use_cases.yaml'
+    catalog.write_text('use_cases:\n  remoto:\n    adapter: native\n    timeouts:\n      ms: 1500\n', encoding='utf-8')
+    policy = TimeoutPolicy(5000, str(catalog))
+
+    assert policy.timeout_for('remoto', _runtime_view('http://upstream', timeout_ms=800)) == 800
+    assert policy.timeout_for('remoto', _runtime_view('http://upstream')) == 1500
+    assert policy.timeout_for('otro') == 5000
+
+
+def test_retries_share_the_deadline_and_forward_it(upstream):
+    _ScriptedHandler.script = [(0.0, 503), (0.0, 200)]
+    adapter = HttpProxyAdapter(upstream, 5000, retries=2, retry_backoff_ms=10)
+    ctx = AdapterContext('remoto', 'req-1', None, 2000, deadline=Deadline.after_ms(1000))
+
+    cards = asyncio.run(adapter.get_cards(ctx, QueryRequest()))
+
+    assert cards.cards[0].title == 'X'
+    assert len(_ScriptedHandler.received_headers) == 2
+    first, second = (int(headers[TIMEOUT_HEADER]) for headers in _ScriptedHandler.received_headers)
+    assert 0 < second < first <= 1000
+
+
+def test_each_attempt_forwards_its_own_budget(upstream):
+    adapter = HttpProxyAdapter(upstream, 5000)
+    ctx = AdapterContext('remoto', 'req-1', None, 300, deadline=Deadline.after_ms(2000))
+
+    asyncio.run(adapter.get_cards(ctx, QueryRequest()))
+
+    assert 0 < int(_ScriptedHandler.received_headers[0][TIMEOUT_HEADER]) <= 300
+
+
+def test_client_deadline_cancels_slow_upstream_call(upstream, tmp_path, monkeypatch):
+    storage = tmp_path / 'views.json'
+    storage.write_text(json.dumps([_runtime_view(upstream).model_dump(mode='json')]), encoding='utf-8')
+    monkeypatch.setattr(settings, 'VIEW_CONFIG_STORAGE_PATH', str(storage))
+    _ScriptedHandler.script = [(1.0, 200)]
+    client = TestClient(create_app())
+
+    start = time.perf_counter()
+    response = client.post(
+        '/cards',
+        params={'caso_de_uso': 'remoto'},
+        json={},
+        headers={DEADLINE_HEADER: str(int(time.time() * 1000) + 200)},
+    )
+
+    assert response.status_code == 504
+    assert response.json()['code'] == ErrorCode.DEADLINE_EXCEEDED
+    error_contract = json.loads((Path(contracts.__file__).parent / 'v1' / 'error_response.schema.json').read_text(encoding='utf-8'))
+    assert ErrorCode.DEADLINE_EXCEEDED in error_contract['properties']['code']['enum']
+    assert time.perf_counter() - start < 0.8
+    assert int(_ScriptedHandler.received_headers[0][TIMEOUT_HEADER]) <= 200
+
+    expired = client.post('/cards', params={'caso_de_uso': 'remoto'}, json={}, headers={DEADLINE_HEADER: '1'})
+    assert expired.status_code == 504
+    assert expired.json()['detail'] == {'stage': 'received'}
+    assert len(_ScriptedHandler.received_headers) == 1
@@ -0,0 +1,155 @@
+import asyncio
+
+import httpx
+import pytest
+
+from orchestrator.api.schemas import DashboardDetailResponse, QueryRequest
+from orchestrator.core.admission import AdmissionController
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.prefetch import SESSION_HEADER, DetailPrefetcher
+from orchestrator.datasets.details import window_payload
+from orchestrator.main import create_app
+
+IDS = [f'conv-{index}' for index in range(10)]
+
+
+def _detail(row_id: str, window: QueryRequest | None = None) -> DashboardDetailResponse:
+    payload = {'left': {'messages': [{'role': 'agente', 'text': f'{row_id} {index}'} for index in range(6)]}, 'right': []}
+    if window is not None:
+        payload = window_payload(payload, window.messages_limit, window.messages_cursor)
+    return DashboardDetailResponse.model_validate(payload)
+
+
+class _Upstream:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def fetch(self, row_id: str, window: QueryRequest | None) -> DashboardDetailResponse:
+        self.calls.append(row_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.gate.wait()
+            await asyncio.sleep(0.001)
+            return _detail(row_id, window)
+        finally:
+            self.running -= 1
+
+
+async def _settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0.005)
+
+
+async def test_top_k_rows_are_prefetched_with_bounded_concurrency_and_hits_are_reported():
+    prefetcher = DetailPrefetcher(top_k=4, max_concurrency=2)
+    upstream = _Upstream()
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v1', IDS, upstream.fetch)
+    await _settle()
+
+    assert upstream.calls == IDS[:4] and upstream.max_running == 2
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-1', None) == _detail('conv-1')
+    windowed = prefetcher.lookup('navegador', 'hipotecas', 'conv-0', QueryRequest(messages_limit=2, messages_cursor='-6'))
+    assert [message.text for message in windowed.left.messages] == ['conv-0 4', 'conv-0 5'] and windowed.left.total == 6
+    # Una fila de la pagina mas alla de K es un indicio para subir K; una fila ajena a la pagina no cuenta.
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-7', None) is None
+    assert prefetcher.lookup('navegador', 'hipotecas', 'otra', None) is None
+    stats = prefetcher.stats()
+    assert (stats['hits'], stats['lookups'], stats['hit_rate'], stats['hits_by_rank']) == (2, 4, 0.5, [1, 1, 0, 0])
+    assert stats['missed_beyond_k'] == 1
+
+    # Repetir la pagina no vuelve a pedir lo que sigue en cache.
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v1', IDS, upstream.fetch)
+    await _settle()
+    assert upstream.calls == IDS[:4] + ['conv-0', 'conv-1']
+
+
+async def test_changing_page_cancels_the_pending_prefetch():
+    prefetcher = DetailPrefetcher(top_k=3, max_concurrency=1)
+    upstream = _Upstream()
+    upstream.gate.clear()
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', None, IDS[:5], upstream.fetch)
+    await _settle()
+    prefetcher.schedule('navegador', 'pagina-2', 'hipotecas', None, IDS[5:], upstream.fetch)
+    upstream.gate.set()
+    await _settle()
+
+    assert upstream.calls == ['conv-0', 'conv-5', 'conv-6', 'conv-7']
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-0', None) is None
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-5', None) is not None
+    assert prefetcher.stats()['cancelled'] == 1
+    await prefetcher.aclose()
+
+
+async def test_details_follow_the_page_version_and_evicted_sessions_stop_prefetching():
+    prefetcher = DetailPrefetcher(top_k=2, max_sessions=1)
+    upstream = _Upstream()
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v1', IDS, upstream.fetch)
+    await _settle()
+    # Un delta deja a la sesion en la version nueva: lo precargado para la anterior ya no se sirve.
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v2', [], upstream.fetch)
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-0', None) is None
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v2', IDS, upstream.fetch)
+    await _settle()
+    assert upstream.calls == IDS[:2] * 2
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-0', None) == _detail('conv-0')
+
+    upstream.gate.clear()
+    prefetcher.schedule('navegador', 'pagina-2', 'hipotecas', 'v2', IDS[5:], upstream.fetch)
+    await _settle()
+    # `max_sessions=1`: la sesion nueva expulsa a la anterior y su precarga se cancela.
+    prefetcher.schedule('otra-pestana', 'pagina-1', 'hipotecas', 'v2', IDS[2:], upstream.fetch)
+    upstream.gate.set()
+    await _settle()
+    assert prefetcher.stats()['cancelled'] == 1 and upstream.calls[-2:] == ['conv-2', 'conv-3']
+    await prefetcher.aclose()
+
+
+async def test_only_the_first_message_window_is_prefetched():
+    prefetcher = DetailPrefetcher(top_k=2, messages_limit=4)
+    upstream = _Upstream()
+    prefetcher.schedule('navegador', 'pagina-1', 'hipotecas', 'v1', IDS, upstream.fetch)
+    await _settle()
+
+    window = prefetcher.lookup('navegador', 'hipotecas', 'conv-0', QueryRequest(messages_limit=3))
+    # La conversacion entera (6 mensajes) no esta en memoria: se pide al adapter.
+    assert prefetcher.lookup('navegador', 'hipotecas', 'conv-1', None) is None
+    assert [message.text for message in window.left.messages] == ['conv-0 0', 'conv-0 1', 'conv-0 2']
+    assert (window.left.total, window.left.nextCursor, window.left.prevCursor) == (6, '3', None)
+    assert prefetcher.stats()['beyond_window'] == 1
+    last = prefetcher.lookup('navegador', 'hipotecas', 'conv-1', QueryRequest(messages_limit=1, messages_cursor='3'))
+    assert [message.text for message in last.left.messages] == ['conv-1 3']
+
+
+async def test_background_admission_never_queues_and_keeps_a_slot_free():
+    controller = AdmissionController(max_concurrency=2, max_queue=4)
+    async with controller.admit_background('hipotecas'):
+        with pytest.raises(OrchestratorError) as skipped:
+            async with controller.admit_background('hipotecas'):
+                pass
+        # La request interactiva sigue teniendo hueco.
+        async with controller.admit('hipotecas'):
+            pass
+    assert skipped.value.code == ErrorCode.OVERLOADED
+    assert controller.stats()['background_skipped'] == 1 and controller.stats()['rejected'] == {'queue_full': 0, 'queue_timeout': 0}
+
+
+async def test_dashboard_page_warms_detail_clicks():
+    app = create_app()
+    app.state.detail_prefetcher = prefetcher = DetailPrefetcher(top_k=2)
+    headers = {SESSION_HEADER: 'pestana-1'}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        page = await client.post('/dashboard?caso_de_uso=hipotecas', json={'limit': 5}, headers=headers)
+        await _settle()
+        first_id = page.json()['table']['rows'][0]['id']
+        clicked = await client.post(f'/dashboard_detail?caso_de_uso=hipotecas&id={first_id}', headers=headers)
+        uncached = await client.post(f'/dashboard_detail?caso_de_uso=hipotecas&id={first_id}', headers=headers)
+        metrics = (await client.get('/metrics')).json()['detail_prefetch']
+
+    assert clicked.json() == uncached.json()
+    assert (metrics['prefetched'], metrics['hits'], metrics['hits_by_rank']) == (2, 1, [1, 0])
+    await prefetcher.aclose()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.datasets.details import MESSAGE_CHECKPOINT, DetailStore
+from orchestrator.main import create_app
+
+CTX = AdapterContext('detalle', 'req-1', None, 1000)
+RIGHT = [{'type': 'list', 'title': 'Razones', 'items': ['Cuota, [revisión]']}]
+
+
+def _detail(row_id: str, messages: int) -> dict:
+    texts = [{'role': 'cliente' if index % 2 else 'agente', 'text': f'mensaje {index} «ñ», ]}}'} for index in range(messages)]
+    return {'id': row_id, 'left': {'messages': texts}, 'right': RIGHT}
+
+
+def test_windows_walk_long_and_short_transcripts_in_both_directions(tmp_path):
+    path = tmp_path / 'dashboard_details.jsonl'
+    details = [_detail('larga', MESSAGE_CHECKPOINT * 4 + 5), _detail('corta', 7)]
+    path.write_text('\n'.join(json.dumps(detail, ensure_ascii=False) for detail in details) + '\n', encoding='utf-8')
+    store = DetailStore(path)
+
+    for detail in details:
+        expected = [message['text'] for message in detail['left']['messages']]
+        forward, cursor = [], None
+        while True:
+            page = store.get(detail['id'], messages_limit=10, messages_cursor=cursor)
+            assert page.left.total == len(expected) and [panel.model_dump() for panel in page.right] == RIGHT
+            forward.extend(message.text for message in page.left.messages)
+            if page.left.nextCursor is None:
+                break
+            cursor = page.left.nextCursor
+        assert forward == expected
+
+        # Desde el final hacia atras con `prevCursor`.
+        backward = []
+        page = store.get(detail['id'], messages_limit=10, messages_cursor=f'-{len(expected)}')
+        while True:
+            backward[:0] = [message.text for message in page.left.messages]
+            if page.left.prevCursor is None:
+                break
+            page = store.get(detail['id'], messages_limit=10, messages_cursor=page.left.prevCursor)
+        assert backward == expected
+
+    # Sin ventana la respuesta no cambia.
+    full = store.get('larga')
+    assert len(full.left.messages) == MESSAGE_CHECKPOINT * 4 + 5 and full.left.total is None
+
+
+def test_dashboard_detail_accepts_a_window_and_rejects_bad_cursors():
+    client = TestClient(create_app())
+    url = '/dashboard_detail?caso_de_uso=hipotecas&id=conv-1'
+
+    window = client.post(url, json={'messages_limit': 2}).json()['left']
+    rest = client.post(url, json={'messages_limit': 2, 'messages_cursor': window['nextCursor']}).json()['left']
+    full = client.post(url).json()['left']
+
+    assert window['messages'] + rest['messages'] == full['messages']
+    assert (window['total'], window['prevCursor'], rest['nextCursor']) == (len(full['messages']), None, None)
+    invalid = client.post(url, json={'messages_limit': 2, 'messages_cursor': 'abc'})
+    assert invalid.status_code == 400 and invalid.json()['code'] == 'VALIDATION_ERROR'
+
+
+async def test_proxy_forwards_the_window_and_trims_upstreams_that_ignore_it():
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        bodies.append(body)
+        if 'messages_limit' in body and len(bodies) > 1:
+            return httpx.Response(422, json={'detail': [{'type': 'extra_forbidden', 'loc': ['body', 'messages_limit'], 'msg': 'Extra inputs are not permitted'}]})
+        payload = _detail('x', 50)
+        payload.pop('id')
+        return httpx.Response(200, json=payload)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        proxy = HttpProxyAdapter('http://upstream', 1000, client=client)
+        ignored = await proxy.get_detail(CTX, 'x', QueryRequest(messages_limit=5, messages_cursor='10'))
+        rejected = await proxy.get_detail(CTX, 'x', QueryRequest(messages_limit=5, messages_cursor='-10'))
+        await proxy.get_detail(CTX, 'x', QueryRequest(messages_limit=5))
+        await proxy.get_detail(CTX, 'x', None)
+
+    assert (bodies[0]['messages_limit'], bodies[0]['messages_cursor']) == (5, '10')
+    assert ['messages_limit' in body for body in bodies] == [True, True, False, False, False]
+    assert proxy.supports_message_window is False
+    assert [message.text.split()[1] for message in ignored.left.messages] == ['10', '11', '12', '13', '14']
+    assert (rejected.left.prevCursor, rejected.left.nextCursor, rejected.left.total) == ('-5', '10', 50)
+
+
+async def test_proxy_keeps_the_window_after_unrelated_rejections_and_re_probes():
+    bodies = []
+    replies = [(400, {'detail': 'unknown conversation'}), (422, {'detail': [{'loc': ['body', 'messages_cursor']}]})]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        if replies and 'messages_limit' in bodies[-1]:
+            status, body = replies.pop(0)
+            return httpx.Response(status, json=body)
+        payload = _detail('x', 10)
+        payload.pop('id')
+        return httpx.Response(200, json=payload)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        proxy = HttpProxyAdapter('http://upstream', 1000, client=client, capability_reprobe_s=0.05)
+        req = QueryRequest(messages_limit=3, messages_cursor='3')
+        await proxy.get_detail(CTX, 'x', req)
+        assert proxy.supports_message_window is True
+        await proxy.get_detail(CTX, 'x', req)
+        assert proxy.supports_message_window is False
+        await asyncio.sleep(0.06)
+        window = await proxy.get_detail(CTX, 'x', req)
+
+    assert ['messages_limit' in body for body in bodies] == [True, False, True, False, True]
+    assert [message.text.split()[1] for message in window.left.messages] == ['3', '4', '5']
@@ -0,0 +1,111 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+from orchestrator.api.schemas import CardsResponse, QueryRequest
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.hot_queries import HotQueryCache, normalized_query
+from orchestrator.core.popularity import CountMinSketch, HeavyHitters
+from orchestrator.main import create_app
+
+
+def _cards(value: int) -> CardsResponse:
+    return CardsResponse.model_validate({'cards': [{'title': 'Llamadas', 'value': value}]})
+
+
+def test_heavy_hitters_find_the_popular_keys_among_many_one_offs():
+    hitters = HeavyHitters(k=3, sketch=CountMinSketch(width=256, depth=4))
+    stream = ['a'] * 500 + ['b'] * 200 + ['c'] * 100 + [f'raro-{index}' for index in range(3000)]
+    random.Random(7).shuffle(stream)
+    for key in stream:
+        hitters.add(key)
+
+    assert [key for key, _count in hitters.top()] == ['a', 'b', 'c']
+    # El sketch puede sobrestimar por colisiones, nunca subestimar.
+    assert hitters.sketch.estimate('a') >= 500 and hitters.sketch.estimate('raro-1') >= 1
+    hitters.decay()
+    assert hitters.count('a') == hitters.sketch.estimate('a') >= 250
+
+
+def test_equivalent_queries_share_a_key():
+    first = QueryRequest(filters={'resolucion': ['Escalada', 'Completada'], 'canal': 'voz'}, limit=25)
+    second = QueryRequest.model_validate({'limit': 25, 'filters': {'canal': 'voz', 'resolucion': ['Completada', 'Escalada']}, 'since': 'v.1'})
+
+    assert normalized_query(first) == normalized_query(second)
+    assert normalized_query(first) != normalized_query(first.model_copy(update={'cursor': '25'}))
+
+
+async def test_hot_entries_are_refreshed_before_expiry_within_the_budget():
+    cache = HotQueryCache(top_k=8, ttl_s=100, min_count=2, refresh_share=0.2, capacity=lambda: 10, decay_s=1000)
+    gate = asyncio.Event()
+    calls = []
+
+    def refetch(key: str):
+        async def fetch() -> CardsResponse:
+            calls.append(key)
+            await gate.wait()
+            return _cards(2)
+
+        return fetch
+
+    keys = [f'consulta-{index}' for index in range(5)]
+    for key in keys:
+        assert cache.lookup(key) is None
+        cache.store(key, _cards(1), refetch(key))
+    # Con una sola peticion todavia no es popular: no se guarda.
+    assert cache.stats()['entries'] == 0
+    for key in keys:
+        cache.lookup(key)
+        cache.store(key, _cards(1), refetch(key))
+    assert cache.lookup(keys[0]) == _cards(1)
+
+    due = time.monotonic() + 100 * 0.8
+    assert cache.tick(due) == 2 and cache.tick(due) == 0
+    await asyncio.sleep(0)
+    assert len(calls) == 2
+    gate.set()
+    await asyncio.sleep(0.01)
+    stats = cache.stats()
+    assert (stats['refreshes'], stats['refreshing'], stats['refresh_budget']) == (2, 0, 2)
+    assert cache.lookup(calls[0]) == _cards(2)
+    await cache.aclose()
+
+
+async def test_refreshes_without_capacity_are_skipped_and_cold_keys_evicted():
+    cache = HotQueryCache(top_k=2, ttl_s=10, min_count=2, decay_s=1000)
+
+    async def overloaded():
+        raise OrchestratorError(ErrorCode.OVERLOADED, 'busy', 503)
+
+    for _ in range(3):
+        cache.lookup('popular')
+    cache.store('popular', _cards(1), overloaded)
+    cache.tick(time.monotonic() + 9)
+    await asyncio.sleep(0.01)
+    assert cache.stats()['refresh_skipped'] == 1 and cache.stats()['entries'] == 1
+
+    # Tras el decaimiento ya no llega a `min_count`: se deja de refrescar.
+    cache.tick(time.monotonic() + 1001)
+    assert cache.stats()['entries'] == 0 and cache.stats()['evicted'] == 1
+
+
+async def test_popular_dashboards_are_served_from_the_hot_cache():
+    app = create_app()
+    app.state.hot_queries = hot = HotQueryCache(top_k=8, ttl_s=30, min_count=2)
+    url = '/dashboard?caso_de_uso=hipotecas'
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        responses = [
+            await client.post(url, json={'limit': 5, 'filters': {'resolucion': ['Escalada', 'Completada']}}),
+            await client.post(url, json={'filters': {'resolucion': ['Completada', 'Escalada']}, 'limit': 5}),
+            await client.post(url, json={'limit': 5, 'filters': {'resolucion': ['Escalada', 'Completada']}}),
+        ]
+        with_since = await client.post(url, json={'limit': 5, 'since': responses[0].json()['version']})
+        metrics = (await client.get('/metrics')).json()['hot_queries']
+
+    assert responses[0].json() == responses[1].json() == responses[2].json()
+    assert with_since.status_code == 200
+    assert (metrics['hits'], metrics['misses'], metrics['entries']) == (1, 2, 1)
+    assert metrics['top'][0]['route'] == 'dashboard' and metrics['top'][0]['count'] == 3
+    await hot.aclose()
@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from orchestrator.core.admission import REJECT_BACKGROUND
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.live import LiveHub, LivePoller, Subscription
+from orchestrator.main import create_app
+
+
+class _Source:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.value = 0
+
+    async def fetch(self) -> str:
+        self.calls += 1
+        return json.dumps({'value': self.value})
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0.02)
+
+
+async def test_one_poller_per_key_fans_out_only_changes():
+    hub = LiveHub(interval_s=0.01, heartbeat_s=0.05)
+    source = _Source()
+    fetchers = lambda: {'cards': source.fetch}  # noqa: E731
+    first = hub.subscribe(('caso', 'q'), fetchers)
+    second = hub.subscribe(('caso', 'q'), fetchers)
+    await _settle()
+
+    assert await first.next(0.1) == [('cards', '{"value": 0}')]
+    assert await second.next(0.1) == [('cards', '{"value": 0}')]
+    # Sin cambios no hay eventos: el cliente recibe heartbeats.
+    assert await first.next(0.05) == []
+    stats = hub.stats()
+    assert (stats['pollers'], stats['subscribers'], stats['events']) == (1, 2, 1)
+    assert stats['polls'] > 1 and source.calls - stats['polls'] <= 1
+
+    # Un cliente que llega tarde recibe el ultimo estado sin esperar al siguiente ciclo.
+    late = hub.subscribe(('caso', 'q'), fetchers)
+    assert await late.next(0) == [('cards', '{"value": 0}')]
+
+    for subscription in (first, second, late):
+        hub.unsubscribe(subscription)
+    calls = source.calls
+    await _settle()
+    assert source.calls == calls
+    assert hub.stats()['pollers'] == 0 and hub.stats()['stopped'] == 1
+
+
+async def test_slow_subscribers_only_get_the_latest_state():
+    hub = LiveHub(interval_s=0.01)
+    source = _Source()
+    slow = hub.subscribe('clave', lambda: {'dashboard': source.fetch})
+    for value in range(1, 6):
+        source.value = value
+        await asyncio.sleep(0.03)
+
+    assert await slow.next(0) == [('dashboard', '{"value": 5}')]
+    assert slow.dropped >= 4
+    await hub.aclose()
+
+
+async def test_recovery_clears_the_error_and_busy_polls_are_skipped():
+    outcomes = [
+        OrchestratorError(ErrorCode.UPSTREAM_TIMEOUT, 'caido', 504),
+        OrchestratorError(ErrorCode.OVERLOADED, 'ocupado', 503, detail={'reason': REJECT_BACKGROUND}),
+        '{"value": 1}',
+    ]
+
+    async def fetch() -> str:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    poller = LivePoller('clave', {'dashboard': fetch}, 1.0)
+    client = Subscription('clave')
+    poller.subscribers.add(client)
+
+    await poller.poll()
+    assert [event for event, _data in await client.next(0)] == ['error']
+    # Sin hueco de fondo no se avisa de nada: el cliente sigue con lo que tenia.
+    await poller.poll()
+    assert await client.next(0) == [] and poller.skipped == 1 and 'error' in poller.latest
+    await poller.poll()
+    assert await client.next(0) == [('dashboard', '{"value": 1}'), ('recovered', '{}')]
+    # Un cliente que llegue ahora solo recibe los datos: ni el error ni el aviso de recuperacion.
+    assert poller.latest == {'dashboard': '{"value": 1}'}
+
+
+async def test_stream_endpoint_sends_cards_and_dashboard_then_tears_down():
+    app = create_app()
+    app.state.live_hub = hub = LiveHub(interval_s=0.05, heartbeat_s=0.05)
+    query = json.dumps({'timeRange': '24h', 'limit': 5})
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/stream',
+        'raw_path': b'/stream',
+        'query_string': f'caso_de_uso=hipotecas&query={query}'.encode(),
+        'headers': [],
+        'client': ('test', 1),
+        'server': ('test', 80),
+    }
+    disconnected = asyncio.Event()
+    messages = []
+    chunks = []
+
+    async def receive():
+        if not messages:
+            messages.append('request')
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if message['type'] == 'http.response.body' and message.get('body'):
+            chunks.append(message['body'].decode())
+            text = ''.join(chunks)
+            if 'event: cards' in text and 'event: dashboard' in text and ': heartbeat' in text:
+                disconnected.set()
+
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    start = messages[1]
+    assert start['status'] == 200
+    assert (b'content-type', b'text/event-stream; charset=utf-8') in start['headers']
+    events = {
+        block.split('\n')[0].removeprefix('event: '): json.loads(block.split('\n')[1].removeprefix('data: '))
+        for block in ''.join(chunks).split('\n\n')
+        if block.startswith('event: ')
+    }
+    assert events['cards']['cards'] and len(events['dashboard']['table']['rows']) <= 5
+    assert hub.stats()['pollers'] == 0
+    # Los sondeos entran por la admision de fondo, no por la interactiva.
+    assert app.state.admission.stats()['background_admitted'] >= 2
+
+
+def test_stream_rejects_unknown_use_cases_and_invalid_queries():
+    client = TestClient(create_app())
+
+    assert client.get('/stream?caso_de_uso=no_existe').json()['code'] == 'UNKNOWN_USE_CASE'
+    invalid = client.get('/stream', params={'caso_de_uso': 'hipotecas', 'query': '{"limit": "muchos"}'})
+    assert invalid.status_code == 400 and invalid.json()['code'] == 'VALIDATION_ERROR'
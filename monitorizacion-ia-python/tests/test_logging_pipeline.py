@@ -0,0 +1,66 @@
+import json
+import logging
+import queue
+import sys
+
+from fastapi.testclient import TestClient
+
+from orchestrator.core.logging import DroppingQueueHandler, JsonFormatter, RequestLogSampler
+from orchestrator.main import app
+
+
+def _record(message: str, **fields) -> logging.LogRecord:
+    record = logging.LogRecord('orchestrator.main', logging.INFO, __file__, 1, message, None, None)
+    record.fields = fields
+    return record
+
+
+def test_queue_handler_drops_and_counts_on_overflow():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+
+    for idx in range(5):
+        handler.handle(_record(f'event {idx}'))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_queued_records_keep_exception_info_for_the_listener():
+    handler = DroppingQueueHandler(queue.Queue())
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = logging.LogRecord('orchestrator.main', logging.ERROR, __file__, 1, 'failed %s', ('upstream',), sys.exc_info())
+    handler.handle(record)
+
+    payload = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    assert payload['message'] == 'failed upstream'
+    assert 'ValueError: boom' in payload['exception']
+
+
+def test_json_formatter_merges_structured_fields():
+    line = JsonFormatter().format(_record('request event', path='/cards', status=200))
+
+    payload = json.loads(line)
+    assert payload['message'] == 'request event'
+    assert payload['path'] == '/cards'
+    assert payload['status'] == 200
+    assert payload['level'] == 'INFO'
+
+
+def test_sampler_keeps_errors_and_slow_requests_and_samples_per_route():
+    sampler = RequestLogSampler(default_rate=1.0, rates_by_route={'/health': 0.25})
+
+    kept = [sampler.should_log('/health', 200, slow=False) for _ in range(8)]
+
+    assert kept.count(True) == 2
+    assert sampler.sampled_out == 6
+    assert sampler.should_log('/health', 503, slow=False) is True
+    assert sampler.should_log('/health', 200, slow=True) is True
+    assert sampler.should_log('/cards', 200, slow=False) is True
+
+
+def test_metrics_expose_logging_pipeline_counters():
+    payload = TestClient(app).get('/metrics').json()
+
+    assert {'queue_size', 'queued_records', 'dropped_records', 'sampled_out_requests'} <= set(payload['logging'])
@@ -0,0 +1,41 @@
+import json
+
+from benchmarks import micro
+from orchestrator.api.schemas import (
+    MAX_COMPONENT_DEPTH,
+    MAX_COMPONENTS_PER_TYPE,
+    MAX_COMPONENTS_PER_VIEW,
+    MAX_CONFIG_ENTRIES,
+    ViewConfiguration,
+    walk_components,
+)
+
+
+def test_view_at_limits_is_a_valid_view_at_max_size():
+    view = ViewConfiguration.model_validate(micro.view_at_limits())
+    flattened = list(walk_components(view.components))
+    leaves = [component for component, _depth in flattened if component.children is None]
+    type_counts = {}
+    for component, _depth in flattened:
+        type_counts[component.type] = type_counts.get(component.type, 0) + 1
+
+    assert view.components[0].type == 'stack'
+    assert len(flattened) == MAX_COMPONENTS_PER_VIEW
+    assert max(depth for _component, depth in flattened) == MAX_COMPONENT_DEPTH
+    assert max(type_counts.values()) <= MAX_COMPONENTS_PER_TYPE
+    assert all(len(leaf.config) == MAX_CONFIG_ENTRIES for leaf in leaves)
+
+
+def test_micro_benchmarks_write_machine_readable_report(tmp_path):
+    output = tmp_path / 'micro.json'
+
+    exit_code = micro.main(['--quick', '--rounds', '1', '--only', 'view_configuration', '--only', 'rate_limiter', '--output', str(output)])
+
+    assert exit_code == 0
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['suite'] == 'micro'
+    names = {item['name'] for item in report['results']}
+    assert names == {'view_configuration.model_validate', 'in_memory_admin_rate_limiter.allow'}
+    limits = next(item for item in report['results'] if item['name'] == 'view_configuration.model_validate')
+    assert limits['params']['components'] == MAX_COMPONENTS_PER_VIEW
+    assert limits['median_us'] > 0
@@ -0,0 +1,137 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import QueryRequest, ViewComponent
+from orchestrator.core.errors import OrchestratorError
+from orchestrator.core.time_range import TimeRange, parse_time_range
+from orchestrator.datasets.charts import ChartSpec
+from orchestrator.datasets.partitions import PARTITIONS_DIR, PartitionedDataset, write_partitions
+
+
+def _epoch(text: str) -> float:
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _when(row: dict) -> float:
+    return datetime.strptime(row['fecha_hora'], '%d-%m-%Y · %H:%M').replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture()
+def payload(dashboard_payload):
+    return dashboard_payload(2000)
+
+
+@pytest.fixture()
+def dataset_dir(tmp_path, payload):
+    assert write_partitions(tmp_path, payload) == 28
+    return tmp_path
+
+
+def test_parse_time_range():
+    now = _epoch('2026-02-20T12:00:00')
+
+    assert parse_time_range('24h', now=now) == TimeRange(now - 86400, None)
+    assert parse_time_range(' 2w ', now=now) == TimeRange(now - 14 * 86400, None)
+    assert parse_time_range('2026-02-01/2026-02-03') == TimeRange(_epoch('2026-02-01T00:00:00'), _epoch('2026-02-03T00:00:00'))
+    assert parse_time_range('2026-02-01T10:00:00+01:00/') == TimeRange(_epoch('2026-02-01T09:00:00'), None)
+    assert parse_time_range(None) is None
+    for invalid in ('ayer', '2026-02-03/2026-02-01', 'x/2026-02-01'):
+        with pytest.raises(OrchestratorError) as error:
+            parse_time_range(invalid)
+        assert error.value.status_code == 400
+
+
+def test_query_opens_only_overlapping_partitions(dataset_dir, payload):
+    dataset = PartitionedDataset.open(dataset_dir)
+    time_range = parse_time_range('2026-02-03T12:00:00/2026-02-05T06:00:00')
+    rows = payload['table']['rows']
+    in_window = [row for row in rows if time_range.start <= _when(row) < time_range.end and row['resolucion'] != 'Escalada']
+    expected = [row['id'] for row in sorted(sorted(in_window, key=lambda row: row['id']), key=lambda row: row['duracion'], reverse=True)]
+    req = {
+        'filters': {'resolucion': ['Completada', 'En curso', 'Abandonada']},
+        'sort': [{'field': 'duracion', 'direction': 'desc'}, {'field': 'id', 'direction': 'asc'}],
+        'limit': 30,
+    }
+
+    first = dataset.query(QueryRequest.model_validate(req), time_range, 25, 100)
+    second = dataset.query(QueryRequest.model_validate({**req, 'cursor': first.table.nextCursor}), time_range, 25, 100)
+
+    assert dataset.stats()['loads'] == 3
+    assert first.table.total == len(expected)
+    assert [row.id for row in first.table.rows + second.table.rows] == expected[:60]
+
+    unsorted = dataset.query(QueryRequest(limit=100), parse_time_range('2026-02-27/'), 25, 100)
+    by_file = [row['id'] for day in ('27', '28') for row in rows if row['fecha_hora'].startswith(day)]
+    assert unsorted.table.total == len(by_file)
+    assert [row.id for row in unsorted.table.rows] == by_file[:100]
+
+
+def test_expire_drops_partitions_beyond_retention(dataset_dir):
+    dataset = PartitionedDataset.open(dataset_dir)
+
+    expired = dataset.expire(3, now=_epoch('2026-02-28T10:00:00'))
+
+    assert expired[0] == '2026-02-01' and expired[-1] == '2026-02-24'
+    assert [partition.day for partition in dataset.partitions] == ['2026-02-25', '2026-02-26', '2026-02-27', '2026-02-28']
+    assert not (dataset_dir / PARTITIONS_DIR / '2026-02-01.jsonl').exists()
+    assert [partition.day for partition in PartitionedDataset.open(dataset_dir).partitions] == ['2026-02-25', '2026-02-26', '2026-02-27', '2026-02-28']
+
+
+async def test_native_adapter_serves_partitions_for_dashboard_and_charts(dataset_dir, payload):
+    adapter = NativeAdapter(str(dataset_dir))
+    ctx = AdapterContext('particionado', 'req-1', None, 1000)
+    window = '2026-02-10/2026-02-12'
+    expected = [row for row in payload['table']['rows'] if _epoch('2026-02-10T00:00:00') <= _when(row) < _epoch('2026-02-12T00:00:00')]
+    chart_spec = ChartSpec.from_component(
+        ViewComponent(id='por-resolucion', type='chart', title='Resolucion', data_source='/dashboard', config={'group_by': 'resolucion'})
+    )
+
+    page = await adapter.get_dashboard(ctx, QueryRequest(timeRange=window, search='motivo'))
+    chart = await adapter.get_chart(ctx, chart_spec, QueryRequest(timeRange=window))
+
+    assert page.table.total == len(expected)
+    assert chart.rows == len(expected)
+    assert sum(chart.series[0].y) == len(expected)
+    assert adapter.partitioned('particionado').stats() == {'partitions': 28, 'rows': 2000, 'open': 2, 'loads': 2}
+
+
+def test_keys_missing_from_some_partitions_read_as_null(tmp_path, payload):
+    rows = [dict(row) for row in payload['table']['rows'][:120]]
+    for row in rows:
+        if row['fecha_hora'].startswith('01-'):
+            row['canal'] = 'web'
+    write_partitions(tmp_path, {'table': {'columns': payload['table']['columns'], 'rows': rows}})
+    dataset = PartitionedDataset.open(tmp_path)
+
+    filtered = dataset.query(QueryRequest(filters={'canal': 'web'}, limit=100), None, 25, 100)
+    ordered = dataset.query(QueryRequest.model_validate({'sort': [{'field': 'canal', 'direction': 'desc'}], 'limit': 5}), None, 25, 100)
+
+    assert filtered.table.total == sum(1 for row in rows if 'canal' in row)
+    assert all(row.model_dump()['canal'] == 'web' for row in ordered.table.rows)
+    with pytest.raises(OrchestratorError) as unknown:
+        dataset.query(QueryRequest(filters={'nada': 1}), None, 25, 100)
+    assert unknown.value.status_code == 400
+
+
+def test_partition_reads_only_parse_the_requested_rows(dataset_dir, payload):
+    dataset = PartitionedDataset.open(dataset_dir)
+    partition = dataset.partitions[0]
+    day_rows = [row for row in payload['table']['rows'] if row['fecha_hora'].startswith('01-')]
+
+    assert dataset.read_rows(partition, 3) == day_rows[3:]
+    assert len(dataset.read_rows(partition)) == partition.rows == len(day_rows)
+
+
+def test_adapter_expires_partitions_and_opens_a_new_change_epoch(dataset_dir):
+    adapter = NativeAdapter(str(dataset_dir), retention_days=3)
+    dataset = adapter.dataset('particionado')
+    before = dataset.changes.token(dataset.seq)
+
+    expired = adapter.expire('particionado', now=_epoch('2026-02-28T10:00:00'))
+
+    assert expired[-1] == '2026-02-24' and len(adapter.partitioned('particionado').partitions) == 4
+    assert dataset.changes.token(dataset.seq) != before
+    assert adapter.expire('particionado', now=_epoch('2026-02-28T10:00:00')) == []
@@ -0,0 +1,62 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+from orchestrator.core.settings import settings
+from orchestrator.core.timing import RequestTimings
+from orchestrator.main import app
+
+
+client = TestClient(app)
+
+
+def _server_timing_stages(header: str) -> dict[str, float]:
+    stages = {}
+    for entry in header.split(','):
+        name, duration = entry.strip().split(';dur=')
+        stages[name] = float(duration)
+    return stages
+
+
+def test_request_timings_accumulates_repeated_stages():
+    timings = RequestTimings()
+    timings.record('validate', 1.5)
+    timings.record('validate', 2.0)
+
+    assert timings.breakdown() == {'validate': 3.5}
+    assert timings.server_timing(total_ms=4.0) == 'validate;dur=3.500, total;dur=4.000'
+
+
+def test_dashboard_response_exposes_server_timing_by_stage():
+    res = client.post('/dashboard?caso_de_uso=hipotecas', json={'timeRange': '24h'})
+
+    assert res.status_code == 200
+    stages = _server_timing_stages(res.headers['server-timing'])
+    assert {'view', 'adapter', 'dataset', 'serialize', 'total'} <= set(stages)
+    assert stages['total'] >= stages['dataset']
+
+
+def test_stage_histograms_are_reported_in_metrics():
+    client.post('/cards?caso_de_uso=hipotecas', json={})
+
+    payload = client.get('/metrics').json()
+
+    stages = {(item['path'], item['stage']): item for item in payload['stages']}
+    assert stages[('/cards', 'dataset')]['count'] >= 1
+    assert stages[('/cards', 'total')]['p99_ms'] >= 0
+    assert '+Inf' in stages[('/cards', 'total')]['buckets']
+
+
+def test_slow_requests_log_structured_breakdown(monkeypatch, caplog):
+    monkeypatch.setattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 0)
+
+    with caplog.at_level(logging.WARNING, logger='orchestrator.main'):
+        client.post('/dashboard?caso_de_uso=hipotecas', json={})
+
+    slow_entries = [record for record in caplog.records if record.getMessage() == 'slow request']
+    assert slow_entries
+    entry = slow_entries[-1].fields
+    assert entry['event'] == 'slow_request'
+    assert entry['path'] == '/dashboard'
+    assert entry['adapter'] == 'native'
+    assert 'view' in entry['stages_ms']
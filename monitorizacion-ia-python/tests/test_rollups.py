@@ -0,0 +1,153 @@
+import json
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.time_range import parse_time_range
+from orchestrator.datasets import partitions
+from orchestrator.datasets.partitions import PARTITIONS_DIR, PartitionedDataset, write_partitions
+from orchestrator.datasets.rollups import ROLLUPS_FILE, SNAPSHOT_FILE, QuantileSketch, parse_measure
+
+ROLLUP_CONFIG = {
+    'bucket': 'hour',
+    'cards': [
+        {'title': 'Conversaciones', 'metric': 'count', 'format': 'int', 'unit': 'casos'},
+        {'title': 'Escaladas', 'metric': 'count', 'field': 'resolucion', 'value': 'Escalada', 'format': 'int'},
+        {'title': 'Tasa de resolucion', 'metric': 'ratio', 'field': 'resolucion', 'value': ['Completada'], 'format': 'percent'},
+        {'title': 'Duracion media', 'metric': 'avg', 'field': 'duracion', 'format': 'seconds', 'variant': 'neutral'},
+        {'title': 'Duracion maxima', 'metric': 'max', 'field': 'duracion', 'format': 'seconds'},
+        {'title': 'Duracion p90', 'metric': 'percentile', 'field': 'duracion', 'percentile': 90, 'format': 'seconds'},
+    ],
+}
+
+
+def _when(row: dict) -> float:
+    return datetime.strptime(row['fecha_hora'], '%d-%m-%Y · %H:%M').replace(tzinfo=timezone.utc).timestamp()
+
+
+def _seconds(duracion: str) -> float:
+    minutes, _min, seconds, _s = duracion.split()
+    return float(int(minutes) * 60 + int(seconds))
+
+
+def _expected(rows: list[dict]) -> dict:
+    durations = sorted(_seconds(row['duracion']) for row in rows)
+    return {
+        'count': len(rows),
+        'escaladas': sum(row['resolucion'] == 'Escalada' for row in rows),
+        'ratio': round(sum(row['resolucion'] == 'Completada' for row in rows) / len(rows), 4),
+        'avg': round(sum(durations) / len(durations), 4),
+        'max': durations[-1],
+        'p90': durations[int(0.9 * (len(durations) - 1))],
+    }
+
+
+@pytest.fixture()
+def dataset_dir(tmp_path, dashboard_payload):
+    payload = dashboard_payload(2000)
+    write_partitions(tmp_path, payload)
+    (tmp_path / ROLLUPS_FILE).write_text(json.dumps(ROLLUP_CONFIG), encoding='utf-8')
+    return tmp_path, payload['table']['rows']
+
+
+def test_sketch_quantiles_are_mergeable_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(3, 1) for _ in range(5000)]
+    whole, left, right = QuantileSketch(0.01), QuantileSketch(0.01), QuantileSketch(0.01)
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 2 else right).add(value)
+
+    left.merge(right)
+
+    ordered = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        exact = ordered[int(q * (len(ordered) - 1))]
+        assert abs(left.quantile(q) - exact) <= 0.01 * exact
+        assert left.quantile(q) == whole.quantile(q)
+    assert parse_measure('1 min 22 s') == 82.0
+    assert parse_measure('2 h 5 min') == 7500.0
+    assert parse_measure('Completada') is None
+
+
+async def test_cards_are_served_from_rollups_for_any_window(dataset_dir):
+    base, rows = dataset_dir
+    adapter = NativeAdapter(str(base))
+    ctx = AdapterContext('rollups', 'req-1', None, 1000)
+    window = '2026-02-10T06:00:00/2026-02-12T18:00:00'
+    time_range = parse_time_range(window)
+
+    every = await adapter.get_cards(ctx, QueryRequest())
+    windowed = await adapter.get_cards(ctx, QueryRequest(timeRange=window))
+
+    for cards, subset in ((every, rows), (windowed, [row for row in rows if time_range.start <= _when(row) < time_range.end])):
+        values = [card.value for card in cards.cards]
+        expected = _expected(subset)
+        assert values[:5] == [expected['count'], expected['escaladas'], expected['ratio'], expected['avg'], expected['max']]
+        assert abs(values[5] - expected['p90']) <= 0.01 * expected['p90']
+    assert every.cards[3].model_dump(exclude_none=True) == {'title': 'Duracion media', 'value': _expected(rows)['avg'], 'format': 'seconds', 'variant': 'neutral'}
+    # La ventana solo toca sus buckets: ninguna particion se abre para servir las tarjetas.
+    assert adapter.partitioned('rollups').stats()['loads'] == 0
+
+
+async def test_appends_update_rollups_incrementally_and_persist(dataset_dir):
+    base, rows = dataset_dir
+    adapter = NativeAdapter(str(base))
+    ctx = AdapterContext('rollups', 'req-1', None, 1000)
+    rollup = adapter.rollup('rollups')
+    new_rows = [
+        {**rows[0], 'id': 'conv-nueva-1', 'fecha_hora': '28-02-2026 · 23:30', 'duracion': '83 min 20 s', 'resolucion': 'Escalada'},
+        {**rows[0], 'id': 'conv-nueva-2', 'fecha_hora': '01-03-2026 · 00:10', 'duracion': '0 min 10 s', 'resolucion': 'Completada'},
+    ]
+    before = {key: bucket.count for key, bucket in rollup.buckets.items()}
+
+    assert adapter.append('rollups', new_rows) == {'2026-02-28': 1, '2026-03-01': 1}
+
+    cards = await adapter.get_cards(ctx, QueryRequest())
+    assert [card.value for card in cards.cards][:2] == [2002, _expected(rows)['escaladas'] + 1]
+    assert cards.cards[4].value == 5000.0
+    changed = {key for key, bucket in rollup.buckets.items() if before.get(key) != bucket.count}
+    assert len(changed) == 2
+    assert rollup.watermarks['2026-02-28'] == sum(row['fecha_hora'].startswith('28-') for row in rows) + 1
+
+    dataset = PartitionedDataset.open(base)
+    assert dataset.stats()['rows'] == 2002
+    assert [row['id'] for row in dataset.read_rows(dataset.partitions[-1])] == ['conv-nueva-2']
+    reopened = NativeAdapter(str(base))
+    assert (await reopened.get_cards(ctx, QueryRequest())).cards == cards.cards
+    assert json.loads((base / PARTITIONS_DIR / SNAPSHOT_FILE).read_text(encoding='utf-8'))['watermarks'] == rollup.watermarks
+
+
+async def test_appends_from_another_process_are_picked_up_on_reload(dataset_dir, tmp_path):
+    base, rows = dataset_dir
+    adapter = NativeAdapter(str(base))
+    ctx = AdapterContext('rollups', 'req-1', None, 1000)
+    dataset = adapter.dataset('rollups')
+    req = QueryRequest(limit=100, timeRange='2026-02-28T23:00:00/2026-03-01T00:00:00')
+    first = await adapter.get_dashboard(ctx, req)
+    new_rows = [{**rows[0], 'id': 'conv-externa', 'fecha_hora': '28-02-2026 · 23:45', 'resolucion': 'Escalada'}]
+    (tmp_path / 'nuevas.json').write_text(json.dumps(new_rows), encoding='utf-8')
+
+    partitions.main([str(base), '--append', str(tmp_path / 'nuevas.json')])
+
+    # Servir /cards no relee nada: las filas nuevas llegan con la relectura del manifest.
+    assert (await adapter.get_cards(ctx, QueryRequest())).cards[0].value == 2000
+    assert adapter.reload('rollups') is True and adapter.reload('rollups') is False
+    assert (await adapter.get_cards(ctx, QueryRequest())).cards[0].value == 2001
+    delta = await adapter.get_dashboard(ctx, req.model_copy(update={'since': first.version}))
+    assert [row.id for row in delta.delta.inserted] == ['conv-externa']
+    assert dataset.rollup().watermarks['2026-02-28'] == sum(row['fecha_hora'].startswith('28-') for row in rows) + 1
+
+
+async def test_use_cases_without_rollup_config_keep_static_cards():
+    adapter = NativeAdapter()
+    ctx = AdapterContext('hipotecas', 'req-1', None, 1000)
+
+    cards = await adapter.get_cards(ctx, QueryRequest())
+
+    assert adapter.rollup('hipotecas') is None
+    assert cards.cards[0].title == 'Conversaciones activas'
@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.datasets.columnar import ColumnarTable
+from orchestrator.datasets.details import DetailStore
+from orchestrator.datasets.search import SearchIndex, tokenize
+
+
+def _detail(row_id: str, *texts: str) -> dict:
+    return {
+        'id': row_id,
+        'left': {'messages': [{'role': 'cliente', 'text': text, 'timestamp': '10:00'} for text in texts]},
+        'right': [],
+    }
+
+
+@pytest.fixture()
+def dataset(tmp_path, dashboard_payload):
+    payload = dashboard_payload(300)
+    (tmp_path / 'dashboard.json').write_text(json.dumps(payload), encoding='utf-8')
+    details = [_detail('conv-0000003', 'Quiero la Resolución de mi hipoteca'), _detail('conv-0000010', 'Consulta de cuota')]
+    (tmp_path / 'dashboard_details.jsonl').write_text('\n'.join(json.dumps(row) for row in details) + '\n', encoding='utf-8')
+    return tmp_path
+
+
+def test_tokenize_folds_accents_case_and_stopwords():
+    assert tokenize('La RESOLUCIÓN de la Cuña, +34 600') == ('resolucion', 'cuna', '34', '600')
+
+
+def test_tokenize_only_caches_short_texts():
+    transcript = 'mensaje largo de una conversacion ' * 10
+
+    # Los textos cortos salen de la cache (mismo objeto); los largos se tokenizan cada vez.
+    assert tokenize(transcript) == ('mensaje', 'largo', 'conversacion')
+    assert tokenize(transcript) is not tokenize(transcript)
+    assert tokenize('motivo 39') is tokenize('motivo 39')
+
+
+def test_detail_lines_that_are_not_objects_are_a_validation_error(tmp_path):
+    path = tmp_path / 'dashboard_details.jsonl'
+    path.write_text('[1, 2]\n', encoding='utf-8')
+
+    with pytest.raises(OrchestratorError) as error:
+        DetailStore(path)
+    assert (error.value.code, error.value.status_code) == (ErrorCode.VALIDATION_ERROR, 500)
+
+
+def test_prefix_terms_are_anded_and_intersected_with_filters(dataset):
+    payload = json.loads((dataset / 'dashboard.json').read_text(encoding='utf-8'))
+    table = ColumnarTable.from_payload(payload)
+    index = SearchIndex.from_table(table, DetailStore(dataset / 'dashboard_details.jsonl'))
+
+    assert index.search('resolucion hipo') == {'conv-0000003'}
+    assert index.search('+3460000001') == {f'conv-{idx:07d}' for idx in range(10, 20)}
+    assert index.search('de la') == set()
+    assert index.search('  +  ') is None
+
+    req = QueryRequest(search='motivo 39', filters={'resolucion': 'Escalada'}, limit=100)
+    expected = [row['id'] for idx, row in enumerate(payload['table']['rows']) if idx % 40 == 39 and row['resolucion'] == 'Escalada']
+    assert [row.id for row in table.query(req, 25, 100, index).table.rows] == expected
+
+
+def test_details_can_be_read_for_a_subset_of_rows(dataset):
+    details = DetailStore(dataset / 'dashboard_details.jsonl')
+
+    assert list(details.iter_messages(['conv-0000010', 'conv-9999999'])) == [('conv-0000010', ['Consulta de cuota'])]
+
+
+def test_incremental_updates_and_compaction(dataset):
+    table = ColumnarTable.from_payload(json.loads((dataset / 'dashboard.json').read_text(encoding='utf-8')))
+    index = SearchIndex.from_table(table)
+
+    index.apply({'conv-0000033': ['Cliente nuevo'], 'conv-9999999': ['Motivo inédito']}, deletes=['conv-0000073'])
+
+    assert index.search('inedito') == {'conv-9999999'}
+    assert index.search('nuevo') == {'conv-0000033'}
+    assert table.query(QueryRequest(search='motivo 33', limit=100), 25, 100, index).table.total == 5
+
+    index.apply({}, deletes=[f'conv-{idx:07d}' for idx in range(100)])
+    assert index.stats()['deleted'] == 0
+    assert len(index) == 201
+    assert index.search('inedito') == {'conv-9999999'}
+
+
+async def test_native_adapter_searches_and_reads_per_row_details(dataset):
+    adapter = NativeAdapter(str(dataset))
+    ctx = AdapterContext('hipotecas', 'req-1', None, 1000)
+
+    found = await adapter.get_dashboard(ctx, QueryRequest(search='cuota'))
+    detail = await adapter.get_detail(ctx, 'conv-0000010', None)
+    with pytest.raises(OrchestratorError) as missing:
+        await adapter.get_detail(ctx, 'conv-0000011', None)
+
+    assert [row.id for row in found.table.rows] == ['conv-0000010']
+    assert detail.left.messages[0].text == 'Consulta de cuota'
+    assert (missing.value.code, missing.value.status_code) == (ErrorCode.NOT_FOUND, 404)
@@ -0,0 +1,110 @@
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from orchestrator import serve
+from orchestrator.core.settings import Settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_serve_options_derive_workers_and_fall_back_to_stdlib_loop(monkeypatch):
+    monkeypatch.setattr(serve.importlib.util, 'find_spec', lambda name: None)
+    monkeypatch.setattr(serve, 'default_workers', lambda: 3)
+
+    options = serve.ServeOptions.from_settings(Settings(SERVE_BACKLOG=512), port=9000)
+
+    assert (options.workers, options.loop, options.http) == (3, 'asyncio', 'h11')
+    assert (options.port, options.backlog) == (9000, 512)
+    assert serve.select_loop('asyncio') == 'asyncio'
+
+
+def _get(port: int, path: str) -> int:
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+    connection.request('GET', path)
+    return connection.getresponse().status
+
+
+def test_prefork_workers_serve_and_drain_on_sigterm():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    env = {**os.environ, 'PYTHONPATH': str(BACKEND_DIR / 'src'), 'LOG_REQUEST_SAMPLE_RATE': '0'}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'orchestrator.serve', '--workers', '2', '--port', str(port), '--graceful-timeout', '5'],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        status = None
+        while time.monotonic() < deadline and status != 200:
+            try:
+                status = _get(port, '/ready')
+            except OSError:
+                time.sleep(0.1)
+        assert status == 200
+        assert _get(port, '/health') == 200
+
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=15) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+class _DeadWorker:
+    pid = 1234
+    exitcode = 1
+
+    def is_alive(self) -> bool:
+        return False
+
+
+def test_crashing_workers_respawn_with_backoff_until_the_crash_budget_runs_out(monkeypatch):
+    options = serve.ServeOptions.from_settings(Settings(), workers=1)
+    supervisor = serve.Supervisor(options, None, Settings(), '', crash_budget=3, crash_window_s=100)
+    spawned = []
+    monkeypatch.setattr(supervisor, '_spawn', lambda sock: spawned.append(sock) or _DeadWorker())
+    supervisor._start_workers(None)
+
+    respawn_times = []
+    for tick in range(1, 200):
+        now = time.monotonic() + tick * 0.25
+        before = len(spawned)
+        supervisor._replace_dead_workers(None, now)
+        if len(spawned) > before:
+            respawn_times.append(tick * 0.25)
+        if supervisor.crash_budget_exhausted:
+            break
+
+    # Cada caida espera el doble que la anterior antes de relanzar, y la cuarta agota el presupuesto.
+    assert respawn_times == [0.75, 2.0, 4.25]
+    assert len(spawned) == 4
+    assert supervisor.crash_budget_exhausted and supervisor._stopping
+
+
+def test_single_worker_serves_from_the_tuned_socket(monkeypatch):
+    served = {}
+
+    class _Server:
+        def __init__(self, config) -> None:
+            pass
+
+        def run(self, sockets=None) -> None:
+            sock = sockets[0]
+            served['proto'] = sock.proto
+            served['reuseaddr'] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+
+    monkeypatch.setattr(serve.uvicorn, 'Server', _Server)
+    options = serve.ServeOptions.from_settings(Settings(), workers=1, port=0, loop='asyncio', http='h11')
+
+    assert serve.serve(options, Settings()) == 0
+    assert served['proto'] == socket.IPPROTO_TCP and served['reuseaddr'] != 0
@@ -0,0 +1,89 @@
+import multiprocessing
+
+from fastapi.testclient import TestClient
+
+from orchestrator.core.settings import settings
+from orchestrator.core.shared_metrics import SharedMetrics, prune_dead_segments
+from orchestrator.main import create_app
+
+
+def _record_in_child(metrics: SharedMetrics) -> None:
+    for latency_ms in (3.0, 7.0, 30.0):
+        metrics.observe_request('POST', '/cards', 200, latency_ms, 'hipotecas')
+    metrics.observe_stages('/cards', {'adapter': 4.0})
+
+
+def test_shared_metrics_aggregate_segments_of_forked_workers(tmp_path):
+    metrics = SharedMetrics(tmp_path)
+    metrics.observe_request('POST', '/cards', 200, 1.0, 'hipotecas')
+    metrics.observe_stages('/cards', {'adapter': 2.0})
+
+    child = multiprocessing.get_context('fork').Process(target=_record_in_child, args=(metrics,))
+    child.start()
+    child.join(timeout=10)
+    assert child.exitcode == 0
+
+    snapshot = SharedMetrics(tmp_path).snapshot(per_worker=True)
+
+    assert snapshot['requests'] == [
+        {'method': 'POST', 'path': '/cards', 'status': 200, 'caso_de_uso': 'hipotecas', 'count': 4, 'avg_latency_ms': 10.25}
+    ]
+    assert snapshot['stages'][0]['count'] == 2
+    assert snapshot['stages'][0]['buckets']['5.0'] == 2
+    workers = {worker['pid']: worker for worker in snapshot['workers']}
+    assert workers[child.pid]['requests'] == 3
+    assert workers[child.pid]['alive'] is False
+    assert sum(worker['requests'] for worker in workers.values()) == 4
+
+
+def test_shared_metrics_drop_series_beyond_fixed_capacity(tmp_path):
+    metrics = SharedMetrics(tmp_path, max_series=2)
+
+    for status in (200, 404, 500):
+        metrics.observe_request('GET', '/health', status, 1.0, '-')
+
+    snapshot = metrics.snapshot(per_worker=True)
+    assert [row['status'] for row in snapshot['requests']] == [200, 404]
+    assert snapshot['workers'][0]['dropped_series'] == 1
+
+
+def test_metrics_endpoint_reads_shared_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'METRICS_SHARED_DIR', str(tmp_path))
+    client = TestClient(create_app())
+
+    client.get('/health')
+    payload = client.get('/metrics', params={'per_worker': 'true'}).json()
+
+    assert any(row['path'] == '/health' for row in payload['requests'])
+    assert payload['workers'][0]['requests_by_path']['/health'] == 1
+
+
+def test_reused_pid_folds_the_dead_segment_instead_of_truncating_it(tmp_path):
+    first = SharedMetrics(tmp_path)
+    for latency_ms in (1.0, 3.0):
+        first.observe_request('POST', '/cards', 200, latency_ms, 'hipotecas')
+    first.observe_stages('/cards', {'adapter': 2.0})
+
+    # Un worker nuevo con el mismo pid que el muerto abre el mismo fichero de segmento.
+    reused = SharedMetrics(tmp_path)
+    reused.observe_request('POST', '/cards', 200, 5.0, 'hipotecas')
+
+    snapshot = SharedMetrics(tmp_path).snapshot()
+    assert snapshot['requests'][0]['count'] == 3 and snapshot['requests'][0]['avg_latency_ms'] == 3.0
+    assert snapshot['stages'][0]['count'] == 1
+    assert [path.name for path in tmp_path.iterdir()] == [path.name for path in tmp_path.glob('worker-*.metrics')]
+
+
+def test_segments_of_exited_workers_are_pruned_on_startup(tmp_path):
+    metrics = SharedMetrics(tmp_path)
+    metrics.observe_request('POST', '/cards', 200, 1.0, 'hipotecas')
+    child = multiprocessing.get_context('fork').Process(target=_record_in_child, args=(metrics,))
+    child.start()
+    child.join(timeout=10)
+    (tmp_path / 'worker-roto.metrics').write_bytes(b'no es un segmento')
+
+    assert prune_dead_segments(tmp_path) == 2
+
+    snapshot = SharedMetrics(tmp_path).snapshot(per_worker=True)
+    assert [worker['pid'] for worker in snapshot['workers']] == [metrics._segment.pid]
+    assert snapshot['requests'][0]['count'] == 1
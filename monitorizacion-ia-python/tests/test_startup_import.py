@@ -0,0 +1,36 @@
+import os
+
+from fastapi.testclient import TestClient
+
+from benchmarks import startup
+from orchestrator.core.settings import settings
+from orchestrator.main import create_app
+
+
+def test_app_import_is_lazy_and_within_budget():
+    budget_ms = float(os.environ.get('STARTUP_IMPORT_BUDGET_MS', startup.DEFAULT_IMPORT_BUDGET_MS))
+
+    profile = startup.import_profile()
+
+    assert profile['lazy_loaded_on_import'] == []
+    assert profile['cumulative_ms'] < budget_ms, profile['heaviest_self_ms']
+
+
+def test_parse_importtime_reads_self_and_cumulative():
+    stderr = (
+        'import time: self [us] | cumulative | imported package\n'
+        'import time:       120 |        120 |   orchestrator.core.timing\n'
+        'import time:      1500 |       4200 | orchestrator.main\n'
+    )
+
+    assert startup.parse_importtime(stderr) == {'orchestrator.core.timing': (120, 120), 'orchestrator.main': (1500, 4200)}
+
+
+def test_admin_and_datops_routers_follow_feature_flags(monkeypatch):
+    monkeypatch.setattr(settings, 'ADMIN_API_ENABLED', False)
+    monkeypatch.setattr(settings, 'DATOPS_API_ENABLED', False)
+    client = TestClient(create_app())
+
+    assert client.get('/admin/view-configs').status_code == 404
+    assert client.get('/datops/overview').status_code == 404
+    assert client.get('/health').status_code == 200
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.http_proxy import HttpProxyAdapter
+from orchestrator.api.schemas import QueryRequest
+from orchestrator.core.hot_queries import HotQueryCache
+from orchestrator.core.prefetch import DetailPrefetcher
+from orchestrator.core.tracing import (
+    SPAN_KIND_SERVER,
+    InMemorySpanExporter,
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+    SpanProcessor,
+    TraceContext,
+    Tracer,
+)
+
+
+class _RecordingHandler(BaseHTTPRequestHandler):
+    received_headers: list[dict[str, str]] = []
+
+    def do_POST(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        self.rfile.read(int(self.headers.get('content-length', 0)))
+        type(self).received_headers.append({key.lower(): value for key, value in self.headers.items()})
+        body = json.dumps({'cards': [{'title': 'X', 'value': 1}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):
+        return None
+
+
+@pytest.fixture
+def upstream():
+    _RecordingHandler.received_headers = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}', _RecordingHandler.received_headers
+    finally:
+        server.shutdown()
+
+
+def _call_upstream(tracer: Tracer, base_url: str, parent: TraceContext | None = None):
+    async def run():
+        with tracer.start_span('POST /cards', kind=SPAN_KIND_SERVER, parent=parent) as span:
+            adapter = HttpProxyAdapter(base_url, 5000)
+            await adapter.get_cards(AdapterContext('hipotecas', 'req-123', span.context.trace_id, 2000), QueryRequest())
+            return span
+
+    return asyncio.run(run())
+
+
+def test_traceparent_roundtrip_and_invalid_values():
+    ctx = TraceContext.parse('00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01')
+
+    assert ctx is not None and ctx.sampled is True
+    assert ctx.traceparent() == '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+    assert TraceContext.parse('00-' + '0' * 32 + '-00f067aa0ba902b7-01') is None
+    assert TraceContext.parse('garbage') is None
+
+
+def test_proxy_propagates_trace_context_and_records_client_span(upstream):
+    base_url, received = upstream
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(SpanProcessor(exporter), sample_ratio=1.0)
+
+    server_span = _call_upstream(tracer, base_url)
+
+    headers = received[0]
+    assert headers['x-request-id'] == 'req-123'
+    forwarded = TraceContext.parse(headers['traceparent'])
+    assert forwarded.trace_id == server_span.context.trace_id
+    spans = {span.kind: span for span in exporter.finished_spans()}
+    assert spans['client'].parent_span_id == server_span.context.span_id
+    assert spans['client'].context.span_id == forwarded.span_id
+    assert spans['client'].attributes['http.status_code'] == 200
+
+
+def test_unsampled_requests_still_propagate_but_are_not_exported(upstream):
+    base_url, received = upstream
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(SpanProcessor(exporter), sample_ratio=0.0)
+
+    _call_upstream(tracer, base_url)
+
+    assert exporter.finished_spans() == []
+    assert received[0]['traceparent'].endswith('-00')
+
+
+def test_inbound_sampled_parent_is_honoured(upstream):
+    base_url, received = upstream
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(SpanProcessor(exporter), sample_ratio=0.0)
+    parent = TraceContext.parse('00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01')
+
+    server_span = _call_upstream(tracer, base_url, parent=parent)
+
+    assert server_span.parent_span_id == '00f067aa0ba902b7'
+    assert received[0]['traceparent'].startswith('00-4bf92f3577b34da6a3ce929d0e0e4736-')
+    assert len(exporter.finished_spans()) == 2
+
+
+def test_jsonl_and_otlp_exporters_encode_spans(tmp_path):
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(SpanProcessor(exporter))
+    with tracer.start_span('POST /dashboard', kind=SPAN_KIND_SERVER, attributes={'caso_de_uso': 'hipotecas'}) as span:
+        span.add_event('dataset.cache', {'decision': 'hit'})
+    spans = exporter.finished_spans()
+
+    path = tmp_path / 'traces.jsonl'
+    JsonlSpanExporter(str(path)).export(spans)
+    line = json.loads(path.read_text(encoding='utf-8').splitlines()[0])
+    assert line['events'][0]['attributes'] == {'decision': 'hit'}
+
+    encoded = OtlpHttpSpanExporter('http://127.0.0.1:4318/v1/traces', 'orchestrator').encode(spans)
+    otlp_span = encoded['resourceSpans'][0]['scopeSpans'][0]['spans'][0]
+    assert otlp_span['kind'] == 2
+    assert otlp_span['attributes'] == [{'key': 'caso_de_uso', 'value': {'stringValue': 'hipotecas'}}]
+
+
+def test_inbound_traceparent_is_reflected_in_response():
+    from fastapi.testclient import TestClient
+
+    from orchestrator.main import app
+
+    res = TestClient(app).post(
+        '/cards?caso_de_uso=hipotecas',
+        json={},
+        headers={'traceparent': '00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'},
+    )
+
+    assert res.status_code == 200
+    assert res.headers['x-trace-id'] == '4bf92f3577b34da6a3ce929d0e0e4736'
+
+
+async def test_cache_decisions_are_recorded_as_span_events():
+    from orchestrator.main import create_app
+
+    app = create_app()
+    exporter = InMemorySpanExporter()
+    app.state.tracer = Tracer(SpanProcessor(exporter), sample_ratio=1.0)
+    app.state.hot_queries = hot = HotQueryCache(top_k=8, ttl_s=30, min_count=1)
+    app.state.detail_prefetcher = prefetcher = DetailPrefetcher(top_k=1)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test') as client:
+        for _ in range(2):
+            await client.post('/dashboard?caso_de_uso=hipotecas', json={'limit': 5})
+        await client.post('/dashboard_detail?caso_de_uso=hipotecas&id=no-precargado', json={})
+    await hot.aclose()
+    await prefetcher.aclose()
+
+    events = [(span.name, event.name, event.attributes.get('decision')) for span in exporter.finished_spans() for event in span.events]
+    assert events.count(('POST /dashboard', 'hot_queries.cache', 'miss')) == 1
+    assert events.count(('POST /dashboard', 'hot_queries.cache', 'hit')) == 1
+    assert ('POST /dashboard', 'dataset.cache', 'miss') in events
+    assert ('POST /dashboard_detail', 'detail_prefetch.cache', 'miss') in events
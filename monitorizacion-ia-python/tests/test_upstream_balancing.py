@@ -0,0 +1,164 @@
+import asyncio
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from orchestrator.adapters.balancer import BalancedProxyAdapter, Endpoint, check_endpoint
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.registry import ViewAdapterProvider
+from orchestrator.api.schemas import QueryRequest, ViewRuntimeConfig
+from orchestrator.core.errors import ErrorCode, OrchestratorError
+from orchestrator.core.settings import settings
+from orchestrator.main import create_app
+
+
+class _FakeProxy:
+    def __init__(self, fail: bool = False, ping_status: int = 200) -> None:
+        self.fail = fail
+        self.ping_status = ping_status
+        self.calls = 0
+
+    async def get_cards(self, _ctx, _req):
+        self.calls += 1
+        if self.fail:
+            raise OrchestratorError(ErrorCode.UPSTREAM_ERROR, 'Upstream connection error', 502)
+        return 'ok'
+
+    async def ping(self, _path, _timeout_ms):
+        return self.ping_status
+
+
+def _endpoints(count: int) -> list[Endpoint]:
+    return [Endpoint(f'http://upstream-{index}', _FakeProxy()) for index in range(count)]
+
+
+def test_runtime_accepts_endpoint_list_and_keeps_primary_url():
+    runtime = ViewRuntimeConfig.model_validate(
+        {'adapter': 'http_proxy', 'upstream_base_urls': ['http://a', 'http://b', 'http://a'], 'balancing': 'p2c'}
+    )
+
+    assert runtime.upstream_base_url == 'http://a'
+    assert runtime.endpoints == ['http://a', 'http://b']
+    with pytest.raises(ValueError):
+        ViewRuntimeConfig.model_validate({'adapter': 'http_proxy'})
+
+
+def test_strategies_pick_healthy_endpoints():
+    first, second, third = endpoints = _endpoints(3)
+    round_robin = BalancedProxyAdapter(endpoints)
+    assert [round_robin.pick() for _ in range(4)] == [first, second, third, first]
+
+    first.outstanding, second.outstanding, third.outstanding = 3, 1, 2
+    assert BalancedProxyAdapter(endpoints, 'least_outstanding').pick() is second
+
+    first.outstanding = second.outstanding = third.outstanding = 0
+    first.ewma_ms, second.ewma_ms, third.ewma_ms = 5.0, 50.0, 500.0
+    p2c = BalancedProxyAdapter(endpoints, 'p2c', rng=random.Random(7))
+    picks = [p2c.pick() for _ in range(200)]
+    assert third not in picks
+    assert picks.count(first) > picks.count(second)
+
+    first.healthy = False
+    assert first not in {round_robin.pick() for _ in range(6)}
+    second.healthy = third.healthy = False
+    # Con todos expulsados se sigue intentando en lugar de rechazar.
+    assert round_robin.pick() in endpoints
+
+
+def test_failing_endpoint_is_ejected_with_failover_and_readmitted_by_health_check():
+    dead, alive = _endpoints(2)
+    dead.adapter.fail = True
+    balancer = BalancedProxyAdapter([dead, alive], eject_after_failures=2)
+    ctx = AdapterContext('remoto', 'req-1', None, 1000)
+
+    results = [asyncio.run(balancer.get_cards(ctx, QueryRequest())) for _ in range(6)]
+
+    assert results == ['ok'] * 6
+    assert dead.healthy is False and dead.ejections == 1
+    assert dead.adapter.calls == 2
+
+    dead.adapter.fail = False
+    assert asyncio.run(check_endpoint(dead, '/health', 100, 2)) is True
+    assert dead.healthy is True and dead.consecutive_failures == 0
+
+
+class _CardsHandler(BaseHTTPRequestHandler):
+    def do_POST(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        self.rfile.read(int(self.headers.get('content-length', 0)))
+        self.server.hits += 1
+        body = json.dumps({'cards': [{'title': 'X', 'value': 1}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802 - interfaz de BaseHTTPRequestHandler
+        self.send_response(200)
+        self.send_header('content-length', '0')
+        self.end_headers()
+
+    def log_message(self, *_args):
+        return None
+
+
+async def test_only_multi_replica_balancers_are_health_checked_and_lookups_do_not_create_them():
+    provider = ViewAdapterProvider(1000)
+    single = ViewRuntimeConfig(adapter='http_proxy', upstream_base_url='http://solo')
+    multi = ViewRuntimeConfig(adapter='http_proxy', upstream_base_urls=['http://a', 'http://b'])
+
+    assert provider.existing_balancer(multi) is None and provider.endpoints() == []
+    provider.balancer_for(single)
+    provider.balancer_for(multi)
+
+    assert provider.existing_balancer(multi) is provider.balancer_for(multi)
+    assert [endpoint.url for endpoint in provider.balanced_endpoints()] == ['http://a', 'http://b']
+    await provider.aclose()
+
+
+@pytest.fixture
+def replicas():
+    servers = []
+    for _ in range(2):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _CardsHandler)
+        server.hits = 0
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    try:
+        yield servers
+    finally:
+        for server in servers:
+            server.shutdown()
+
+
+def test_view_spreads_requests_across_replicas_and_reports_endpoints(replicas, tmp_path, monkeypatch):
+    urls = [f'http://127.0.0.1:{server.server_address[1]}' for server in replicas]
+    storage = tmp_path / 'views.json'
+    view = {
+        'id': 'vista-remota',
+        'name': 'Remota',
+        'system': 'remoto',
+        'enabled': True,
+        'runtime': {'adapter': 'http_proxy', 'upstream_base_urls': urls, 'balancing': 'round_robin'},
+        'components': [{'id': 'cards', 'type': 'cards', 'title': 'KPIs', 'data_source': '/cards'}],
+    }
+    storage.write_text(json.dumps([view]), encoding='utf-8')
+    monkeypatch.setattr(settings, 'VIEW_CONFIG_STORAGE_PATH', str(storage))
+    monkeypatch.setattr(settings, 'UPSTREAM_HEALTHCHECK_INTERVAL_S', 0)
+
+    with TestClient(create_app()) as client:
+        statuses = [client.post('/cards', params={'caso_de_uso': 'remoto'}, json={}).status_code for _ in range(4)]
+        overview = client.get('/datops/overview').json()
+
+    assert statuses == [200] * 4
+    assert [server.hits for server in replicas] == [2, 2]
+    use_case = next(item for item in overview['use_cases'] if item['id'] == 'remoto')
+    assert use_case['balancing'] == 'round_robin'
+    assert [(endpoint['url'], endpoint['requests'], endpoint['healthy']) for endpoint in use_case['endpoints']] == [
+        (urls[0], 2, True),
+        (urls[1], 2, True),
+    ]
@@ -70,3 +70,24 @@ def test_view_store_accepts_nested_layout_components(tmp_path: Path):
     assert created.components[0].type == 'stack'
     assert created.components[0].children is not None
     assert len(created.components[0].children) == 2
+
+
+def test_view_store_callers_cannot_change_the_cached_index(tmp_path: Path):
+    storage = tmp_path / 'view_configs.json'
+    storage.write_text('[]', encoding='utf-8')
+    store = ViewConfigStore(str(storage))
+    store.create(
+        ViewConfigCreate(
+            id='vista-a',
+            name='Vista A',
+            system='hipotecas',
+            enabled=True,
+            components=[{'id': 'cards', 'type': 'cards', 'title': 'KPIs', 'data_source': '/cards', 'position': 0}],
+        )
+    )
+
+    store.get('vista-a').components[0].title = 'Cambiado'
+    store.list_configs(system='hipotecas')[0].name = 'Cambiado'
+
+    assert store.get('vista-a').components[0].title == 'KPIs'
+    assert store.list_configs(enabled=True)[0].name == 'Vista A'
@@ -0,0 +1,60 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from orchestrator.core.settings import settings
+from orchestrator.main import create_app
+
+
+def test_ready_reports_starting_until_lifespan_warm_up_runs():
+    client = TestClient(create_app())
+
+    res = client.get('/ready')
+
+    assert res.status_code == 503
+    assert res.json()['status'] == 'starting'
+    assert client.get('/health').status_code == 200
+
+
+def test_lifespan_warms_views_and_native_datasets_before_ready():
+    app = create_app()
+
+    with TestClient(app) as client:
+        res = client.get('/ready')
+
+    assert res.status_code == 200
+    payload = res.json()
+    assert payload['status'] == 'ready'
+    assert payload['steps']['view_configs']['views'] >= 3
+    assert {'hipotecas', 'prestamos', 'seguros'} <= set(payload['steps']['native_datasets']['systems'])
+    assert {'view_configs', 'native_datasets', 'upstream_pools', 'openapi'} <= set(payload['steps'])
+    assert payload['errors'] == []
+
+
+def test_unreachable_upstream_ping_is_reported_without_blocking_readiness(tmp_path, monkeypatch):
+    storage = tmp_path / 'view_configs.json'
+    storage.write_text(
+        json.dumps(
+            [
+                {
+                    'id': 'vista-remota',
+                    'name': 'Vista remota',
+                    'system': 'remoto',
+                    'enabled': True,
+                    'runtime': {'adapter': 'http_proxy', 'upstream_base_url': 'http://127.0.0.1:9'},
+                    'components': [{'id': 'cards', 'type': 'cards', 'title': 'KPIs', 'data_source': '/cards'}],
+                }
+            ]
+        ),
+        encoding='utf-8',
+    )
+    monkeypatch.setattr(settings, 'VIEW_CONFIG_STORAGE_PATH', str(storage))
+    monkeypatch.setattr(settings, 'WARMUP_PING_UPSTREAMS', True)
+    monkeypatch.setattr(settings, 'UPSTREAM_TIMEOUT_MS', 200)
+
+    with TestClient(create_app()) as client:
+        payload = client.get('/ready').json()
+
+    assert payload['status'] == 'ready'
+    assert payload['steps']['upstream_pools'] == {'elapsed_ms': payload['steps']['upstream_pools']['elapsed_ms'], 'pools': 1, 'pinged': 0}
+    assert payload['errors'][0]['target'] == 'http://127.0.0.1:9'
@@ -0,0 +1,80 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from orchestrator.adapters.balancer import BalancedProxyAdapter, Endpoint
+from orchestrator.adapters.base import AdapterContext
+from orchestrator.adapters.native import NativeAdapter
+from orchestrator.api.schemas import ColumnarDashboardResponse, DashboardResponse, DictEncodedColumn, QueryRequest
+from orchestrator.datasets.partitions import write_partitions
+from orchestrator.datasets.wire import COLUMNAR_MEDIA_TYPE, decode_rows, encode_values
+from orchestrator.main import create_app
+
+CTX = AdapterContext('wire', 'req-1', None, 1000)
+
+
+def _rows(response: DashboardResponse) -> list[dict]:
+    return [row.model_dump(exclude_none=True) for row in response.table.rows]
+
+
+def test_repeated_values_use_a_dictionary_and_unique_ones_stay_plain():
+    assert encode_values(['Completada', 'Escalada', 'Completada', 'Completada']) == DictEncodedColumn(
+        values=['Completada', 'Escalada'], codes=[0, 1, 0, 0]
+    )
+    assert encode_values(['a', 'b', 'c']) == ['a', 'b', 'c']
+    # 1, True y '1' son valores distintos aunque Python los considere iguales.
+    assert encode_values([1, True, '1', 1, True, '1', 1, 1]).values == [1, True, '1']
+
+
+async def test_native_columnar_pages_match_row_pages(tmp_path, dashboard_payload):
+    payload = dashboard_payload(300)
+    (tmp_path / 'monolitico').mkdir()
+    (tmp_path / 'monolitico' / 'dashboard.json').write_text(json.dumps(payload), encoding='utf-8')
+    write_partitions(tmp_path / 'particionado', payload)
+    requests = [
+        QueryRequest(limit=40),
+        QueryRequest(filters={'resolucion': ['Escalada', 'Abandonada']}, sort=[{'field': 'fecha_hora', 'direction': 'desc'}], cursor='20'),
+    ]
+    for directory in ('monolitico', 'particionado'):
+        adapter = NativeAdapter(str(tmp_path / directory))
+        for req in requests:
+            rows = await adapter.get_dashboard(CTX, req)
+            columnar = await adapter.get_dashboard_columnar(CTX, req)
+
+            assert decode_rows(columnar.table) == _rows(rows)
+            assert (columnar.table.total, columnar.table.nextCursor, columnar.version) == (rows.table.total, rows.table.nextCursor, rows.version)
+            assert isinstance(columnar.table.data['resolucion'], DictEncodedColumn)
+            assert isinstance(columnar.table.data['detail'], DictEncodedColumn)
+            assert len(rows.model_dump_json()) / len(columnar.model_dump_json()) > 1.5
+
+
+class _RowsProxy:
+    def __init__(self, payload: dict) -> None:
+        self.payload = payload
+
+    async def get_dashboard(self, _ctx, _req):
+        return DashboardResponse.model_validate(self.payload)
+
+
+async def test_proxied_pages_are_transcoded(dashboard_payload):
+    balancer = BalancedProxyAdapter([Endpoint('http://upstream', _RowsProxy(dashboard_payload(30)))])
+
+    columnar = await balancer.get_dashboard_columnar(CTX, QueryRequest())
+
+    expected = DashboardResponse.model_validate(dashboard_payload(30))
+    assert decode_rows(columnar.table) == _rows(expected) and columnar.version.startswith('p.')
+
+
+def test_dashboard_negotiates_columnar_by_query_flag_or_accept_header():
+    client = TestClient(create_app())
+    url = '/dashboard?caso_de_uso=hipotecas'
+
+    rows = client.post(url, json={})
+    by_flag = client.post(url + '&format=columnar', json={})
+    by_accept = client.post(url, json={}, headers={'Accept': COLUMNAR_MEDIA_TYPE})
+    forced_rows = client.post(url + '&format=rows', json={}, headers={'Accept': COLUMNAR_MEDIA_TYPE})
+
+    assert 'rows' in rows.json()['table'] and forced_rows.json() == rows.json()
+    assert by_flag.json() == by_accept.json()
+    columnar = ColumnarDashboardResponse.model_validate(by_flag.json())
+    assert decode_rows(columnar.table) == [{key: value for key, value in row.items() if value is not None} for row in rows.json()['table']['rows']]
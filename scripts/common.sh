@@ -115,7 +115,7 @@ wait_http_ok() {
 }
 
 start_backend() {
-  bash -lc "cd '${BACK_DIR}' && source .venv/bin/activate && ORCH_CONFIG_PATH='${BACK_ORCH_CONFIG_PATH}' uvicorn src.main:app --port '${BACK_PORT}'" >"${BACK_LOG_FILE}" 2>&1 &
+  bash -lc "cd '${BACK_DIR}' && source .venv/bin/activate && ORCH_CONFIG_PATH='${BACK_ORCH_CONFIG_PATH}' uvicorn src.main:create_app --factory --port '${BACK_PORT}'" >"${BACK_LOG_FILE}" 2>&1 &
   echo $! > "${BACK_PID_FILE}"
 }
 
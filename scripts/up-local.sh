@@ -17,8 +17,8 @@ else
   start_backend
 fi
 
-if ! wait_http_ok "http://127.0.0.1:${BACK_PORT}/health"; then
-  echo "Backend did not become healthy on port ${BACK_PORT}" >&2
+if ! wait_http_ok "http://127.0.0.1:${BACK_PORT}/ready"; then
+  echo "Backend did not become ready on port ${BACK_PORT}" >&2
   tail -n 50 "${BACK_LOG_FILE}" || true
   exit 1
 fi